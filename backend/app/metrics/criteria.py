@@ -144,6 +144,36 @@ def evaluate_walk_forward(
     return CriteriaResult(status=status, reasons=all_reasons, warnings=warnings)
 
 
+# Fração mínima de folds GO no walk-forward multi-fold.
+WALK_FORWARD_MIN_GO_FOLD_RATIO = 0.5
+
+
+def evaluate_walk_forward_folds(
+    is_metrics: Dict[str, any],
+    oos_metrics: Dict[str, any],
+    fold_statuses: List[str],
+    min_go_ratio: float = WALK_FORWARD_MIN_GO_FOLD_RATIO,
+) -> CriteriaResult:
+    """Gate walk-forward multi-fold: agrega os folds em um único veredito.
+
+    ``is_metrics`` é a média dos Treinos (IS) dos folds e ``oos_metrics`` o
+    OOS encadeado (testes contíguos). Aplica ``evaluate_walk_forward`` sobre
+    eles e exige ainda que ao menos ``min_go_ratio`` dos folds sejam GO
+    isoladamente, para que um único período favorável não aprove a estratégia.
+    """
+    result = evaluate_walk_forward(is_metrics, oos_metrics)
+    total = len(fold_statuses)
+    go_folds = sum(1 for status in fold_statuses if status == "GO")
+    required = max(1, math.ceil(total * min_go_ratio))
+    if go_folds >= required:
+        return result
+    reasons = [r for r in result.reasons if not r.startswith("GO walk-forward")]
+    reasons.append(
+        f"Folds — NO-GO: {go_folds}/{total} folds aprovados isoladamente (mínimo {required})."
+    )
+    return CriteriaResult(status="NO-GO", reasons=reasons, warnings=result.warnings)
+
+
 def evaluate_go_nogo(
     metrics: Dict[str, any], criteria: Optional[Dict[str, float]] = None
 ) -> CriteriaResult:
@@ -51,3 +51,69 @@ def calculate_regime_classification(
     df["regime"] = np.select(conditions, choices, default="Unknown")
 
     return df[["regime"]]
+
+
+def regime_at(regime: pd.Series, times) -> np.ndarray:
+    """
+    Regime label in effect at each of ``times``.
+
+    Same lookup as ``regime.index.asof(time)`` (the last candle at or before the
+    time, first row on duplicated timestamps), done for all times in one sorted
+    pass. Naive times are read as UTC, like the candle index of aware frames.
+
+    Returns an object array with ``None`` where a time cannot be parsed or falls
+    before the first candle.
+    """
+    labels = np.full(len(times), None, dtype=object)
+    index = regime.index
+    if not len(times) or regime.empty or not isinstance(index, pd.DatetimeIndex):
+        return labels
+    if not index.is_monotonic_increasing:
+        regime = regime.sort_index(kind="stable")
+        index = regime.index
+
+    parsed = pd.DatetimeIndex(pd.to_datetime(times, utc=True, errors="coerce", format="ISO8601"))
+    if index.tz is None:
+        parsed = parsed.tz_convert(None)
+    else:
+        index = index.tz_convert("UTC")
+
+    positions = index.searchsorted(parsed, side="right") - 1
+    found = (positions >= 0) & ~parsed.isna()
+    first_rows = index.searchsorted(index[positions[found]], side="left")
+    labels[found] = regime.to_numpy(dtype=object)[first_rows]
+    return labels
+
+
+def segment_trades_by_regime(regime: pd.Series, entry_times, pnl) -> dict:
+    """
+    Trade counts and PnL per entry regime.
+
+    Returns ``{regime: {"count", "wins", "losses", "pnl"}}`` in order of first
+    appearance; wins are trades with ``pnl > 0`` and losses ``pnl < 0``. Trades
+    whose entry has no regime are left out.
+    """
+    labels = regime_at(regime, entry_times)
+    values = pd.to_numeric(pd.Series(pnl, dtype=object), errors="coerce")
+    values = values.fillna(0.0).to_numpy(dtype=float)
+
+    known = pd.notna(labels)
+    codes, names = pd.factorize(labels[known])
+    if not len(names):
+        return {}
+    values = values[known]
+    size = len(names)
+    counts = np.bincount(codes, minlength=size)
+    wins = np.bincount(codes, weights=values > 0, minlength=size)
+    losses = np.bincount(codes, weights=values < 0, minlength=size)
+    totals = np.bincount(codes, weights=values, minlength=size)
+
+    return {
+        name: {
+            "count": int(counts[i]),
+            "wins": int(wins[i]),
+            "losses": int(losses[i]),
+            "pnl": float(totals[i]),
+        }
+        for i, name in enumerate(names)
+    }
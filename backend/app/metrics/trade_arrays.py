@@ -0,0 +1,391 @@
+"""
+Trades em colunas (struct-of-arrays) e métricas de trades vetorizadas (NumPy).
+
+``TradeArray`` guarda cada campo do trade em um array tipado (horários em int64
+ns UTC, preços/profit em float64, motivo de saída e direção em int8). O
+otimizador, o deep backtest e as métricas trocam esse formato; a conversão
+para a lista de dicts com horários ISO acontece só na borda da API
+(``TradeArray.to_dicts``).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Códigos de ``TradeArray.reason`` (índice em EXIT_REASONS)
+EXIT_REASONS = ("signal", "stop_loss", "signal_15m", "stop_loss_15m")
+REASON_SIGNAL = 0
+REASON_STOP_LOSS = 1
+REASON_SIGNAL_15M = 2
+REASON_STOP_LOSS_15M = 3
+
+DIRECTION_LONG = 1
+DIRECTION_SHORT = -1
+
+
+def trade_returns(
+    entry_price: np.ndarray, exit_price: np.ndarray, is_short: bool, fee: float
+) -> np.ndarray:
+    """Retorno decimal por trade com taxa na entrada e na saída (mesma fórmula dos loops)."""
+    entry_price = np.asarray(entry_price, dtype=float)
+    exit_price = np.asarray(exit_price, dtype=float)
+    if is_short:
+        return (entry_price * (1 - fee) - exit_price * (1 + fee)) / (entry_price * (1 - fee))
+    return ((exit_price * (1 - fee)) - (entry_price * (1 + fee))) / (entry_price * (1 + fee))
+
+
+def _iso_times(ns: np.ndarray, tz: Any) -> List[str]:
+    index = pd.DatetimeIndex(np.asarray(ns, dtype=np.int64).view("M8[ns]"))
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return [ts.isoformat() for ts in index]
+
+
+@dataclass(frozen=True)
+class TradeArray:
+    """
+    Trades fechados em colunas tipadas.
+
+    Attributes:
+        entry_ns / exit_ns: Horários de entrada/saída (int64 ns UTC)
+        entry_price / exit_price: Preços de execução
+        profit: Retorno decimal por trade (já com taxas)
+        reason: Código do motivo de saída (índice em EXIT_REASONS)
+        direction: 1 = long, -1 = short
+        tz: Fuso do índice de candles de origem (None = naive), usado só em ``to_dicts``
+    """
+
+    entry_ns: np.ndarray
+    exit_ns: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    profit: np.ndarray
+    reason: np.ndarray
+    direction: np.ndarray
+    tz: Any = None
+
+    @classmethod
+    def from_columns(
+        cls,
+        entry_ns,
+        exit_ns,
+        entry_price,
+        exit_price,
+        profit,
+        reason,
+        direction,
+        tz: Any = None,
+    ) -> "TradeArray":
+        size = len(entry_ns)
+        direction_col = np.asarray(direction, dtype=np.int8)
+        if direction_col.ndim == 0:
+            direction_col = np.full(size, direction_col, dtype=np.int8)
+        return cls(
+            entry_ns=np.asarray(entry_ns, dtype=np.int64),
+            exit_ns=np.asarray(exit_ns, dtype=np.int64),
+            entry_price=np.asarray(entry_price, dtype=float),
+            exit_price=np.asarray(exit_price, dtype=float),
+            profit=np.asarray(profit, dtype=float),
+            reason=np.asarray(reason, dtype=np.int8),
+            direction=direction_col,
+            tz=tz,
+        )
+
+    @classmethod
+    def from_dicts(cls, trades: List[Dict[str, Any]]) -> "TradeArray":
+        """Converte a lista de dicts da API (ex.: trades de outro executor) para colunas."""
+        if not trades:
+            return cls.empty()
+        tz = None
+        first_entry = trades[0].get("entry_time")
+        if first_entry is not None:
+            try:
+                tz = pd.Timestamp(first_entry).tz
+            except (ValueError, TypeError):
+                tz = None
+        return cls.from_columns(
+            entry_ns=entry_times_to_ns(t.get("entry_time") for t in trades),
+            exit_ns=entry_times_to_ns(t.get("exit_time") for t in trades),
+            entry_price=[t.get("entry_price", np.nan) for t in trades],
+            exit_price=[t.get("exit_price", np.nan) for t in trades],
+            profit=[np.nan if t.get("profit") is None else t["profit"] for t in trades],
+            reason=[
+                (
+                    EXIT_REASONS.index(t.get("exit_reason"))
+                    if t.get("exit_reason") in EXIT_REASONS
+                    else REASON_SIGNAL
+                )
+                for t in trades
+            ],
+            direction=[
+                DIRECTION_SHORT if t.get("type") == "short" else DIRECTION_LONG for t in trades
+            ],
+            tz=tz,
+        )
+
+    @classmethod
+    def empty(cls, tz: Any = None) -> "TradeArray":
+        return cls.from_columns([], [], [], [], [], [], [], tz=tz)
+
+    @classmethod
+    def concat(cls, arrays: Iterable["TradeArray"]) -> "TradeArray":
+        """Junta trades de vários segmentos (ex.: folds de teste) na ordem dada."""
+        arrays = [array for array in arrays if array is not None]
+        if not arrays:
+            return cls.empty()
+        return cls.from_columns(
+            entry_ns=np.concatenate([a.entry_ns for a in arrays]),
+            exit_ns=np.concatenate([a.exit_ns for a in arrays]),
+            entry_price=np.concatenate([a.entry_price for a in arrays]),
+            exit_price=np.concatenate([a.exit_price for a in arrays]),
+            profit=np.concatenate([a.profit for a in arrays]),
+            reason=np.concatenate([a.reason for a in arrays]),
+            direction=np.concatenate([a.direction for a in arrays]),
+            tz=arrays[0].tz,
+        )
+
+    def __len__(self) -> int:
+        return len(self.entry_ns)
+
+    def select(self, mask: np.ndarray) -> "TradeArray":
+        """Subconjunto por máscara booleana ou índices."""
+        return TradeArray(
+            entry_ns=self.entry_ns[mask],
+            exit_ns=self.exit_ns[mask],
+            entry_price=self.entry_price[mask],
+            exit_price=self.exit_price[mask],
+            profit=self.profit[mask],
+            reason=self.reason[mask],
+            direction=self.direction[mask],
+            tz=self.tz,
+        )
+
+    def entry_index(self) -> pd.DatetimeIndex:
+        """Horários de entrada como DatetimeIndex no fuso de origem."""
+        index = pd.DatetimeIndex(self.entry_ns.view("M8[ns]"))
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Lista de dicts no formato da API (horários ISO, rótulos de sinal)."""
+        if len(self) == 0:
+            return []
+        entry_times = _iso_times(self.entry_ns, self.tz)
+        exit_times = _iso_times(self.exit_ns, self.tz)
+        trades = []
+        for i, (entry_price, exit_price, profit, reason, direction) in enumerate(
+            zip(
+                self.entry_price.tolist(),
+                self.exit_price.tolist(),
+                self.profit.tolist(),
+                self.reason.tolist(),
+                self.direction.tolist(),
+            )
+        ):
+            is_short = direction == DIRECTION_SHORT
+            trades.append(
+                {
+                    "entry_time": entry_times[i],
+                    "entry_price": entry_price,
+                    "type": "short" if is_short else "long",
+                    "entry_signal_type": "Vender" if is_short else "Comprar",
+                    "exit_time": exit_times[i],
+                    "exit_price": exit_price,
+                    "profit": profit,
+                    "exit_reason": EXIT_REASONS[reason],
+                    "signal_type": (
+                        "Stop"
+                        if reason in (REASON_STOP_LOSS, REASON_STOP_LOSS_15M)
+                        else "Close entry(s) order..."
+                    ),
+                }
+            )
+        return trades
+
+
+def as_trade_array(trades: Union["TradeArray", List[Dict[str, Any]], None]) -> "TradeArray":
+    """Aceita ``TradeArray`` ou lista de dicts e devolve sempre ``TradeArray``."""
+    if isinstance(trades, TradeArray):
+        return trades
+    return TradeArray.from_dicts(list(trades or []))
+
+
+def empty_trade_metrics() -> Dict[str, Any]:
+    """Dicionário de métricas para uma lista de trades vazia."""
+    return {
+        # --- Core ---
+        "total_trades": 0,
+        "win_rate": 0.0,
+        "total_return": 0.0,  # decimal (e.g. 0.35 = +35%)
+        "total_return_pct": 0.0,  # percent (e.g. 35.0)
+        "avg_profit": 0.0,  # mean return per trade (decimal)
+        # --- Risk / ratios ---
+        "sharpe_ratio": 0.0,
+        "sortino_ratio": None,  # may be None when degenerate
+        "sortino_status": None,  # ok|degenerate|invalid
+        "downside_deviation": None,  # downside std (same units as returns)
+        "neg_return_count": 0,
+        "return_series_kind": "per_trade",
+        # --- PnL / trade stats ---
+        "profit_factor": 0.0,
+        "max_loss": 0.0,
+        "max_consecutive_losses": 0,
+        # Drawdown: keep both decimal + pct (avoid unit confusion)
+        "max_drawdown": 0.0,  # decimal (0..1)
+        "max_drawdown_pct": 0.0,  # percent (0..100)
+        # Expectancy: provide multiple units explicitly
+        "expectancy": 0.0,  # decimal per trade (same unit as avg_profit)
+        "expectancy_pct": 0.0,  # percent per trade
+        "expectancy_usd_10k": 0.0,  # legacy-style (assumes $10k notional)
+    }
+
+
+def entry_times_to_ns(values: Iterable[Any]) -> np.ndarray:
+    """
+    Converte horários de entrada (ISO string, Timestamp, datetime) em int64 ns UTC.
+
+    Valores ausentes ou inválidos viram 0 (mesma regra de ordenação legada).
+    """
+    raw = list(values)
+    if raw and all(isinstance(v, str) for v in raw):
+        try:
+            parsed = pd.DatetimeIndex(pd.to_datetime(raw, utc=True, format="ISO8601"))
+            return parsed.as_unit("ns").asi8.astype(np.int64, copy=False)
+        except (ValueError, TypeError):
+            pass
+
+    out = np.zeros(len(raw), dtype=np.int64)
+    for i, value in enumerate(raw):
+        if value is None:
+            continue
+        try:
+            ts = pd.Timestamp(value)
+            if not pd.isna(ts):
+                out[i] = ts.value
+        except Exception:
+            continue
+    return out
+
+
+def order_by_entry(entry_ns: Optional[np.ndarray], size: int) -> np.ndarray:
+    """Índices de ordenação estável por horário de entrada."""
+    if entry_ns is None:
+        return np.arange(size)
+    return np.argsort(np.asarray(entry_ns, dtype=np.int64), kind="stable")
+
+
+def compounded_equity(returns: np.ndarray, initial_capital: float) -> np.ndarray:
+    """Curva de capital composta: [capital inicial, após trade 1, ..., após trade n]."""
+    factors = np.empty(len(returns) + 1, dtype=float)
+    factors[0] = float(initial_capital)
+    factors[1:] = 1.0 + np.asarray(returns, dtype=float)
+    # multiply.accumulate é sequencial: mesmo arredondamento do loop `cap *= 1 + r`
+    return np.multiply.accumulate(factors)
+
+
+def _max_run(mask: np.ndarray) -> int:
+    """Maior sequência de True consecutivos."""
+    if not mask.any():
+        return 0
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return int((edges[1::2] - edges[0::2]).max())
+
+
+def metrics_from_returns(
+    returns: np.ndarray,
+    entry_ns: Optional[np.ndarray] = None,
+    initial_capital: float = 100,
+    total_trades: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Métricas por trade a partir de arrays (fonte única do otimizador).
+
+    Args:
+        returns: Retorno decimal de cada trade (NaN = trade sem profit, ignorado)
+        entry_ns: Horário de entrada de cada trade em int64 ns; define a ordem de composição
+        initial_capital: Capital inicial para curva de capital e profit factor em USD
+        total_trades: Quantidade original de trades (reportada quando nenhum retorno é válido)
+
+    Returns:
+        Mesmo dicionário de ``empty_trade_metrics`` preenchido
+    """
+    out = empty_trade_metrics()
+    arr = np.asarray(returns, dtype=float)
+    if total_trades is None:
+        total_trades = len(arr)
+    if len(arr) == 0:
+        return out
+
+    arr = arr[order_by_entry(entry_ns, len(arr))]
+    arr = arr[~np.isnan(arr)]
+    n = len(arr)
+    if n == 0:
+        out["total_trades"] = total_trades
+        return out
+
+    out["total_trades"] = n
+    out["win_rate"] = int(np.count_nonzero(arr > 0)) / n
+
+    equity = compounded_equity(arr, initial_capital)
+    cap = float(equity[-1])
+    total_return_pct = (cap / initial_capital - 1) * 100.0
+    out["total_return"] = float(total_return_pct / 100.0)
+    out["total_return_pct"] = float(total_return_pct)
+
+    mean_r = float(np.mean(arr))
+    out["avg_profit"] = mean_r
+
+    # Sharpe (per-trade return series; not annualized)
+    std_dev = float(np.std(arr))
+    out["sharpe_ratio"] = float(mean_r / std_dev) if std_dev > 0 else 0.0
+
+    # Sortino (downside deviation) with guardrails
+    neg = arr[arr < 0]
+    out["neg_return_count"] = int(len(neg))
+    eps = 1e-9
+    if len(neg) < 2:
+        out["sortino_ratio"] = None
+        out["downside_deviation"] = 0.0
+        out["sortino_status"] = "degenerate"
+    else:
+        down_std = float(np.std(neg))
+        out["downside_deviation"] = down_std
+        if down_std < eps:
+            out["sortino_ratio"] = None
+            out["sortino_status"] = "degenerate"
+        else:
+            out["sortino_ratio"] = float(mean_r / down_std)
+            out["sortino_status"] = "ok"
+
+    # Profit factor (USD com compounding): PnL de cada trade sobre o capital antes dele
+    pnl = equity[:-1] * arr
+    gross_profit_usd = float(pnl[arr > 0].sum())
+    gross_loss_usd = float(np.abs(pnl[arr <= 0]).sum())
+    out["profit_factor"] = (
+        gross_profit_usd / gross_loss_usd
+        if gross_loss_usd > 0
+        else (999.0 if gross_profit_usd > 0 else 0.0)
+    )
+
+    out["max_loss"] = float(np.min(arr))
+
+    # Expectancy: keep units explicit
+    out["expectancy"] = mean_r
+    out["expectancy_pct"] = mean_r * 100.0
+    out["expectancy_usd_10k"] = mean_r * 10000.0  # legacy: assumes $10k notional
+
+    out["max_consecutive_losses"] = _max_run(arr < 0)
+
+    # Max drawdown (equity curve em valor absoluto); o pico parte do capital inicial
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    max_dd = max(0.0, float(np.max(dd)))
+    out["max_drawdown"] = max_dd  # 0..1
+    out["max_drawdown_pct"] = max_dd * 100.0
+
+    return out
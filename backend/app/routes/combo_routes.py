@@ -697,12 +697,18 @@ async def optimize_combo_strategy(
             deep_backtest=request.deep_backtest,
             direction=direction,
             split_train_ratio=request.split_train_ratio,
+            walk_forward_folds=request.walk_forward_folds,
+            walk_forward_mode=request.walk_forward_mode,
         )
 
         logger.info(f"Optimization complete. Best score: {result.get('best_score', 'N/A')}")
 
-        if isinstance(result.get("oos_metrics"), dict) and isinstance(
-            result.get("oos_verdict"), dict
+        # A multi-fold OOS is stitched from test windows each run with its own fold's
+        # parameters, so it does not prove the returned parameters: no promotion proof.
+        if (
+            isinstance(result.get("oos_metrics"), dict)
+            and isinstance(result.get("oos_verdict"), dict)
+            and not result.get("walk_forward")
         ):
             from app.services.oos_promotion_proof import (
                 issue_oos_promotion_proof,
@@ -3,7 +3,7 @@ Pydantic schemas for combo strategy API requests and responses.
 """
 
 from pydantic import BaseModel, Field, model_validator
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional
 
 from app.schemas.strategy_transparency import StrategyTransparency
 
@@ -127,6 +127,16 @@ class ComboOptimizationRequest(BaseModel):
         le=0.99,
         description="Walk-forward split: train fraction for optimization (ex.: 0.7). When set, holdout metrics and GO/NO-GO verdict are produced (card #470).",
     )
+    walk_forward_folds: Optional[int] = Field(
+        None,
+        ge=2,
+        le=12,
+        description="Multi-fold walk-forward: number of folds optimized in parallel (train/test proportion from split_train_ratio, default 0.7). The verdict aggregates all folds.",
+    )
+    walk_forward_mode: Literal["rolling", "anchored"] = Field(
+        "rolling",
+        description="Multi-fold train windows: 'rolling' (fixed length) or 'anchored' (from the first candle)",
+    )
 
     @model_validator(mode="after")
     def validate_data_source(self):
@@ -155,6 +165,8 @@ class ComboOptimizationResponse(BaseModel):
     oos_verdict: Optional[Dict[str, Any]] = None
     oos_proof: Optional[str] = None
     promotion_metrics: Optional[Dict[str, Any]] = None
+    # Multi-fold walk-forward: per-fold windows, parameters, metrics and verdicts
+    walk_forward: Optional[Dict[str, Any]] = None
     # Complete backtest data for visualization
     trades: List[Dict[str, Any]] = Field(default_factory=list)
     candles: List[Dict[str, Any]] = Field(default_factory=list)
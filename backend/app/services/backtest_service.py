@@ -62,6 +62,14 @@ from app.metrics.indicators import calculate_avg_indicators, ensure_ta_lib_conte
 
 # Import Job Manager
 from app.services.job_manager import JobManager
+from app.services.optimization_results import (
+    DEFAULT_TOP_K,
+    PERSIST_ALL,
+    PERSIST_TOP_K,
+    BackgroundResultWriter,
+    ChunkWatermark,
+    TopKResults,
+)
 
 
 class BacktestService:
@@ -619,14 +627,29 @@ class BacktestService:
         job_manager = JobManager()
         start_index = 0
 
+        # Results stream into a bounded in-memory top-K; persistence runs in the background
+        # (every result, or only the final top-K when persist_results="top_k").
+        top_k = int(config.get("top_k_results") or DEFAULT_TOP_K)
+        persist_mode = config.get("persist_results", PERSIST_ALL)
+        top_results = TopKResults(top_k)
+        result_writer = BackgroundResultWriter(job_manager.save_indexed_results)
+
         if resume and job_id:
             state = job_manager.load_state(job_id)
             if state:
                 progress_data = state.get("progress", {})
+                # The checkpoint is a contiguous-completion watermark: every combination
+                # below it is persisted (only its top-K entries in top_k mode), rows above
+                # it are recomputed (and overwritten).
                 start_index = progress_data.get("current_iteration", 0)
-                # Count existing results in SQLite
-                existing = job_manager.get_results(job_id, page=1, limit=1)
-                existing_count = existing["pagination"]["total"]
+                # Seed the top-K with results persisted before the pause, keyed by their
+                # stored result_index so recomputed rows can never be counted twice.
+                existing_count = 0
+                for result_index, previous in job_manager.iter_indexed_results(
+                    job_id, below=start_index
+                ):
+                    top_results.push(previous, result_index, persist=False)
+                    existing_count += 1
                 logger.info(
                     f"Resuming optimization from index {start_index}. Found {existing_count} previous results in database."
                 )
@@ -662,6 +685,7 @@ class BacktestService:
 
                 completed_count = 0
                 total_chunks = len(chunks)
+                watermark = ChunkWatermark(start_index, batch_size, total_steps)
 
                 for future in as_completed(future_to_chunk_idx):
                     # Check Pause Signal
@@ -669,8 +693,8 @@ class BacktestService:
                         logger.info(f"Pause signal detected for job {job_id}")
                         executor.shutdown(wait=False, cancel_futures=True)
 
-                        # Save state
-                        current_processed = start_index + (completed_count * batch_size)
+                        # Save state: resume from the last contiguously finished chunk
+                        current_processed = watermark.value
                         current_state = {
                             "job_id": job_id,
                             "status": "PAUSED",
@@ -681,21 +705,30 @@ class BacktestService:
                             },
                             # Results are in SQLite, not in state
                         }
+                        if persist_mode == PERSIST_TOP_K:
+                            result_writer.submit(job_id, top_results.pending_persistence())
+                        result_writer.close()
                         job_manager.mark_paused(job_id, current_state)
-                        # Get top 10 from SQLite for response
-                        top_results = job_manager.get_results(job_id, page=1, limit=10)["results"]
                         return {
                             "status": "paused",
                             "progress": f"{current_processed}/{total_steps}",
-                            "results": top_results,
+                            "results": top_results.ranked(limit=10),
                         }
 
                     try:
                         chunk_results = future.result()
-                        # Save batch to SQLite for better performance
-                        result_base_index = start_index + (completed_count * batch_size)
-                        job_manager.save_results_batch(job_id, chunk_results, result_base_index)
+                        result_base_index = start_index + future_to_chunk_idx[future] * batch_size
+                        top_results.extend(chunk_results, result_base_index)
+                        if persist_mode != PERSIST_TOP_K:
+                            result_writer.submit(
+                                job_id,
+                                [
+                                    (result_base_index + i, result)
+                                    for i, result in enumerate(chunk_results)
+                                ],
+                            )
                         completed_count += 1
+                        watermark.complete(future_to_chunk_idx[future])
 
                         # Update Progress
                         current_processed_count = start_index + (completed_count * batch_size)
@@ -708,14 +741,23 @@ class BacktestService:
                                 f"Optimizing... {current_processed_count}/{total_steps}", pct
                             )
 
-                        # Save Checkpoint every 5 chunks (250 items)
+                        # Save Checkpoint every 5 chunks (250 items), once the results
+                        # below the watermark have reached the database. In top_k mode
+                        # those are the current top-K entries below the watermark: rows
+                        # outside the top-K are never stored, and a resume re-ranks
+                        # from what is.
                         if job_id and completed_count % 5 == 0:
+                            if persist_mode == PERSIST_TOP_K:
+                                result_writer.submit(
+                                    job_id, top_results.pending_persistence(below=watermark.value)
+                                )
+                            result_writer.flush()
                             checkpoint_state = {
                                 "job_id": job_id,
                                 "status": "RUNNING",
                                 "config": config,
                                 "progress": {
-                                    "current_iteration": current_processed_count,
+                                    "current_iteration": watermark.value,
                                     "total_iterations": total_steps,
                                 },
                                 # Results are in SQLite, not in state
@@ -728,22 +770,16 @@ class BacktestService:
                         # Continue allows partial partial success.
         except Exception as e:
             logger.error(f"Executor pool error: {e}")
-            # Check if we have any results in SQLite
-            result_count = job_manager.get_results(job_id, page=1, limit=1)["pagination"]["total"]
-            if result_count == 0:
+            if len(top_results) == 0:
+                result_writer.close()
                 return {"error": str(e)}
 
-        # 5. Finalize Results
-        # Fetch all results from SQLite and sort by Net Profit
-        # Helper to safely get pnl
-        def get_pnl(r):
-            m = r.get("metrics", {})
-            return m.get("total_pnl", float("-inf")) if m else float("-inf")
+        if persist_mode == PERSIST_TOP_K:
+            result_writer.submit(job_id, top_results.pending_persistence())
 
-        # Get top results from SQLite (limit to 10000 for faster sorting)
-        all_results_data = job_manager.get_results(job_id, page=1, limit=10000)
-        opt_results = all_results_data["results"]
-        opt_results.sort(key=get_pnl, reverse=True)
+        # 5. Finalize Results
+        # Best-first list straight from the in-memory top-K (no reload from the database)
+        opt_results = top_results.ranked()
 
         print(f" DEBUG: opt_results length: {len(opt_results)}")
         print(f" DEBUG: About to check if opt_results (bool: {bool(opt_results)})")
@@ -828,6 +864,8 @@ class BacktestService:
         # 7. Calculate Heavy Metrics for Top 10 Results (excluding best, which already has them)
         # Heavy metrics: ATR, ADX, Regime Performance, Alpha
         top_n_for_heavy_metrics = 10
+        # Heavy metrics mutate result dicts that may still be queued for persistence
+        result_writer.flush()
         logger.info(f"Calculating heavy metrics for top {top_n_for_heavy_metrics} results...")
 
         for idx in range(1, min(top_n_for_heavy_metrics, len(opt_results))):
@@ -871,6 +909,7 @@ class BacktestService:
         if len(timeframe_list) > 1:
             dataset_info["timeframes_tested"] = timeframe_list
 
+        result_writer.close()
         if job_id:
             final_state = {
                 "job_id": job_id,
@@ -1056,54 +1095,31 @@ class BacktestService:
 
             # Regime Performance Analysis
             try:
-                from app.metrics.regime import calculate_regime_classification
+                from app.metrics.regime import (
+                    calculate_regime_classification,
+                    segment_trades_by_regime,
+                )
 
                 context_df = ensure_ta_lib_context_columns(context_df)
 
                 # Regime Classification
                 regime_df = calculate_regime_classification(context_df, sma_period=200)
 
-                # Segment Trades by Regime
+                # Segment Trades by Regime (entry candle, asof) in one sorted pass
                 if trades and not regime_df.empty:
-                    regime_stats = {}
-
                     # Ensure index is datetime
                     if not isinstance(regime_df.index, pd.DatetimeIndex):
                         regime_df.index = pd.to_datetime(regime_df.index)
 
-                    for trade in trades:
-                        entry_time = trade.get("entry_time")
-                        if entry_time:
-                            try:
-                                et = pd.to_datetime(entry_time)
-                                # Find nearest regime (asof)
-                                idx = regime_df.index.asof(et)
-                                if pd.notna(idx):
-                                    r = regime_df.loc[idx, "regime"]
-
-                                    if r not in regime_stats:
-                                        regime_stats[r] = {
-                                            "count": 0,
-                                            "wins": 0,
-                                            "losses": 0,
-                                            "pnl": 0.0,
-                                        }
-
-                                    regime_stats[r]["count"] += 1
-                                    pnl = trade.get("pnl", 0)
-                                    regime_stats[r]["pnl"] += pnl
-                                    if pnl > 0:
-                                        regime_stats[r]["wins"] += 1
-                                    elif pnl < 0:
-                                        regime_stats[r]["losses"] += 1
-                            except:
-                                pass
+                    regime_stats = segment_trades_by_regime(
+                        regime_df["regime"],
+                        [trade.get("entry_time") or None for trade in trades],
+                        [trade.get("pnl", 0) for trade in trades],
+                    )
 
                     # Calc rates
-                    for r, stats in regime_stats.items():
-                        total = stats["count"]
-                        if total > 0:
-                            stats["win_rate"] = (stats["wins"] / total) * 100
+                    for stats in regime_stats.values():
+                        stats["win_rate"] = (stats["wins"] / stats["count"]) * 100
 
                     heavy["regime_performance"] = regime_stats
                 else:
@@ -4,24 +4,63 @@ Batch backtest orchestration.
 Runs optimization per symbol using the same config, saves each best result
 as a new favorite with notes "gerado em lote" and tier=3. Never overwrites
 existing favorites.
+
+Symbols run as a panel: existing favorites for the whole symbol list are found
+with one query, and symbols are taken in cohorts of ``BATCH_BACKTEST_PANEL_SIZE``.
+The first stage of round 1 (the initial grid, identical for every symbol) is
+evaluated once per cohort on a time-aligned symbol panel, one pool task per
+chunk of parameter sets covering all symbols; each symbol's optimizer then
+runs only the stages and rounds where its path diverges. Those optimizations
+share one process pool, so the pool stays busy while other symbols load
+candles, evaluate their holdout or save their favorite, and the next cohort's
+panel runs while the previous cohort refines. Results are recorded as each
+symbol finishes. Each worker keeps one 15m frame per symbol in flight, and a
+pool broken by a dead worker is rebuilt with the affected symbols requeued once.
 """
 
 from __future__ import annotations
 
+import concurrent.futures
 import logging
+import os
 import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Any
 
 from app.database import SessionLocal
 from app.models import FavoriteStrategy
 from app.services.batch_backtest_store import get_batch_backtest_store
-from app.services.combo_optimizer import ComboOptimizer
+from app.services.combo_optimizer import (
+    ComboOptimizer,
+    _init_worker_logging,
+    set_worker_15m_cache_size,
+)
 from app.services.market_data_providers import resolve_data_source_for_symbol
 from app.services.opportunity_service import _is_unsupported_symbol
 
 logger = logging.getLogger(__name__)
 
+# Symbols per panel cohort (1 = one symbol at a time).
+DEFAULT_PANEL_SIZE = 4
+# Times a symbol is resubmitted after a worker crash broke the shared pool.
+POOL_CRASH_RETRIES = 1
+
+
+def _panel_size() -> int:
+    try:
+        return max(1, int(os.getenv("BATCH_BACKTEST_PANEL_SIZE", str(DEFAULT_PANEL_SIZE))))
+    except ValueError:
+        return DEFAULT_PANEL_SIZE
+
+
+def _init_panel_worker(panel_size: int) -> None:
+    _init_worker_logging()
+    # One cohort's panel overlaps the previous cohort's refinement on every
+    # worker: keep one 15m frame per symbol of both.
+    set_worker_15m_cache_size(2 * panel_size)
+
 
 def _persist_progress(job: dict[str, Any]) -> dict[str, Any]:
     return get_batch_backtest_store().save_job(job)
@@ -39,6 +78,59 @@ def _metrics_with_source_trades(
     return metrics
 
 
+def _mark_processed(job: dict[str, Any], total: int) -> None:
+    job["processed"] = job["succeeded"] + job["failed"] + job.get("skipped", 0)
+    if 0 < job["processed"] < total:
+        job["estimated_remaining_sec"] = (job["elapsed_sec"] / job["processed"]) * (
+            total - job["processed"]
+        )
+
+
+def _symbols_with_favorites(
+    *,
+    user_id: Any,
+    template_name: str,
+    symbols: list[str],
+    timeframe: str,
+    direction: str,
+    period_type: str | None,
+    start_date: str | None,
+    end_date: str | None,
+) -> set[str]:
+    """Symbols already saved as favorites for this template, period and direction.
+
+    One query for the whole batch instead of one per symbol.
+    """
+    if not symbols:
+        return set()
+    db = SessionLocal()
+    try:
+        q = db.query(FavoriteStrategy.symbol, FavoriteStrategy.parameters).filter(
+            FavoriteStrategy.user_id == user_id,
+            FavoriteStrategy.strategy_name == template_name,
+            FavoriteStrategy.symbol.in_(symbols),
+            FavoriteStrategy.timeframe == timeframe,
+        )
+        if period_type is not None:
+            q = q.filter(FavoriteStrategy.period_type == period_type)
+        else:
+            if start_date is None:
+                q = q.filter(FavoriteStrategy.start_date.is_(None))
+            else:
+                q = q.filter(FavoriteStrategy.start_date == start_date)
+            if end_date is None:
+                q = q.filter(FavoriteStrategy.end_date.is_(None))
+            else:
+                q = q.filter(FavoriteStrategy.end_date == end_date)
+        return {
+            symbol
+            for symbol, parameters in q.all()
+            if ((parameters or {}).get("direction") or "long").lower() == direction
+        }
+    finally:
+        db.close()
+
+
 def get_batch_progress(job_id: str) -> dict[str, Any] | None:
     """Return current progress for a batch job, or None if not found."""
     return _load_job(job_id)
@@ -136,109 +228,61 @@ def run_batch_backtest(job_id: str, payload: dict[str, Any]) -> None:
 
     started = time.time()
     batch_note = f"gerado em lote ({job_id[:8]})"
-    optimizer = ComboOptimizer()
+    existing = _symbols_with_favorites(
+        user_id=user_id,
+        template_name=template_name,
+        symbols=[symbol for symbol in symbols if not _is_unsupported_symbol(symbol)],
+        timeframe=timeframe,
+        direction=direction,
+        period_type=period_type,
+        start_date=start_date,
+        end_date=end_date,
+    )
 
-    for symbol in symbols:
-        job["elapsed_sec"] = time.time() - started
-        job["current_symbol"] = symbol
+    def _skip(symbol: str, message: str) -> None:
+        logger.info("Batch: skip %s (%s)", symbol, message)
+        job["skipped"] = job.get("skipped", 0) + 1
+        _mark_processed(job, total)
         _persist_progress(job)
 
-        should_stop, job = _should_stop(job_id, job)
-        if should_stop:
-            return
-
-        if _is_unsupported_symbol(symbol):
-            logger.info("Batch: skip %s (unsupported / excluded)", symbol)
-            job["skipped"] = job.get("skipped", 0) + 1
-            job["processed"] = job["succeeded"] + job["failed"] + job["skipped"]
-            if 0 < job["processed"] < total:
-                job["estimated_remaining_sec"] = (job["elapsed_sec"] / job["processed"]) * (
-                    total - job["processed"]
-                )
-            _persist_progress(job)
-            continue
-
-        db_check = SessionLocal()
-        try:
-            q = db_check.query(FavoriteStrategy).filter(
-                FavoriteStrategy.user_id == user_id,
-                FavoriteStrategy.strategy_name == template_name,
-                FavoriteStrategy.symbol == symbol,
-                FavoriteStrategy.timeframe == timeframe,
-            )
-            if period_type is not None:
-                q = q.filter(FavoriteStrategy.period_type == period_type)
-            else:
-                if start_date is None:
-                    q = q.filter(FavoriteStrategy.start_date.is_(None))
-                else:
-                    q = q.filter(FavoriteStrategy.start_date == start_date)
-                if end_date is None:
-                    q = q.filter(FavoriteStrategy.end_date.is_(None))
-                else:
-                    q = q.filter(FavoriteStrategy.end_date == end_date)
-            rows = q.all()
-            if direction is not None:
-                want = (direction or "long").lower()
-                if want not in ("long", "short"):
-                    want = "long"
-                rows = [
-                    row
-                    for row in rows
-                    if ((row.parameters or {}).get("direction") or "long").lower() == want
-                ]
-            if rows:
-                logger.info(
-                    "Batch: skip %s (already in favorites, same period and direction)", symbol
-                )
-                job["skipped"] = job.get("skipped", 0) + 1
-                job["processed"] = job["succeeded"] + job["failed"] + job["skipped"]
-                if 0 < job["processed"] < total:
-                    job["estimated_remaining_sec"] = (job["elapsed_sec"] / job["processed"]) * (
-                        total - job["processed"]
-                    )
-                _persist_progress(job)
-                continue
-        finally:
-            db_check.close()
-
-        effective_data_source = data_source
-        if not effective_data_source:
-            effective_data_source = resolve_data_source_for_symbol(symbol, None)
+    def _first_stage_panel(
+        cohort: list[str], executor: concurrent.futures.ProcessPoolExecutor
+    ) -> dict[str, Any]:
+        return ComboOptimizer().evaluate_first_stage_panel(
+            template_name=template_name,
+            symbols=cohort,
+            timeframe=timeframe,
+            data_source=data_source,
+            start_date=start_date,
+            end_date=end_date,
+            custom_ranges=custom_ranges,
+            deep_backtest=deep_backtest,
+            direction=direction,
+            split_train_ratio=split_train_ratio,
+            executor=executor,
+        )
 
-        try:
-            result = optimizer.run_optimization(
-                template_name=template_name,
-                symbol=symbol,
-                timeframe=timeframe,
-                data_source=effective_data_source,
-                start_date=start_date,
-                end_date=end_date,
-                custom_ranges=custom_ranges,
-                deep_backtest=deep_backtest,
-                job_id=job_id,
-                direction=direction,
-                split_train_ratio=split_train_ratio,
-            )
-        except KeyboardInterrupt:
-            job["status"] = "cancelled"
-            job["estimated_remaining_sec"] = None
-            job["current_symbol"] = None
-            _persist_progress(job)
-            logger.info("Batch %s cancelled (CTRL+C)", job_id[:8])
-            return
-        except Exception as exc:
-            logger.exception("Batch backtest failed for %s: %s", symbol, exc)
-            job["failed"] = job.get("failed", 0) + 1
-            job["errors"].append({"symbol": symbol, "error": str(exc)})
-            job["processed"] = job["succeeded"] + job["failed"] + job.get("skipped", 0)
-            if 0 < job["processed"] < total:
-                job["estimated_remaining_sec"] = (job["elapsed_sec"] / job["processed"]) * (
-                    total - job["processed"]
-                )
-            _persist_progress(job)
-            continue
+    def _optimize(symbol: str, executor: concurrent.futures.ProcessPoolExecutor, seed: Any):
+        effective_data_source = data_source or resolve_data_source_for_symbol(symbol, None)
+        # One optimizer per symbol: concurrent symbols never share loader state.
+        result = ComboOptimizer().run_optimization(
+            template_name=template_name,
+            symbol=symbol,
+            timeframe=timeframe,
+            data_source=effective_data_source,
+            start_date=start_date,
+            end_date=end_date,
+            custom_ranges=custom_ranges,
+            deep_backtest=deep_backtest,
+            job_id=job_id,
+            direction=direction,
+            split_train_ratio=split_train_ratio,
+            executor=executor,
+            panel_seed=seed,
+        )
+        return result, effective_data_source
 
+    def _record(symbol: str, result: dict[str, Any], effective_data_source: str | None) -> None:
         best_params = result.get("best_parameters") or result.get("parameters") or {}
         best_metrics = result.get("best_metrics") or {}
         metrics = _metrics_with_source_trades(best_metrics, result.get("trades"))
@@ -259,28 +303,13 @@ def run_batch_backtest(job_id: str, payload: dict[str, Any]) -> None:
         ):
             reasons = oos_verdict.get("reasons") or ["veredito não-GO no holdout"]
             verdict_status = str(oos_verdict.get("status") or "UNKNOWN").strip().upper()
-            logger.info(
-                "Batch: skip %s (walk-forward %s no holdout): %s",
-                symbol,
-                verdict_status,
-                "; ".join(str(r) for r in reasons[:5]),
-            )
-            job["skipped"] = job.get("skipped", 0) + 1
+            details = "; ".join(str(r) for r in reasons[:5])
             job["skipped_reasons"] = job.get("skipped_reasons", [])
             job["skipped_reasons"].append(
-                {
-                    "symbol": symbol,
-                    "reason": f"walk-forward {verdict_status}",
-                    "details": "; ".join(str(r) for r in reasons[:5]),
-                }
+                {"symbol": symbol, "reason": f"walk-forward {verdict_status}", "details": details}
             )
-            job["processed"] = job["succeeded"] + job["failed"] + job["skipped"]
-            if 0 < job["processed"] < total:
-                job["estimated_remaining_sec"] = (job["elapsed_sec"] / job["processed"]) * (
-                    total - job["processed"]
-                )
-            _persist_progress(job)
-            continue
+            _skip(symbol, f"walk-forward {verdict_status} no holdout: {details}")
+            return
 
         if isinstance(oos_verdict, dict):
             metrics["oos_metrics"] = result.get("oos_metrics")
@@ -291,9 +320,6 @@ def run_batch_backtest(job_id: str, payload: dict[str, Any]) -> None:
         if effective_data_source:
             params_with_direction["data_source"] = effective_data_source
 
-        name = f"{template_name} - {symbol} {timeframe} (batch)"
-        notes = batch_note
-
         db = SessionLocal()
         try:
             from app.services.favorite_uniqueness import lock_and_find_duplicate
@@ -309,20 +335,17 @@ def run_batch_backtest(job_id: str, payload: dict[str, Any]) -> None:
                 end_date=end_date,
                 parameters=params_with_direction,
             ):
-                job["skipped"] = job.get("skipped", 0) + 1
-                job["processed"] = job["succeeded"] + job["failed"] + job["skipped"]
-                logger.info("Batch: skip %s (created concurrently)", symbol)
-                _persist_progress(job)
-                continue
+                _skip(symbol, "created concurrently")
+                return
             favorite = FavoriteStrategy(
                 user_id=user_id,
-                name=name,
+                name=f"{template_name} - {symbol} {timeframe} (batch)",
                 symbol=symbol,
                 timeframe=timeframe,
                 strategy_name=template_name,
                 parameters=params_with_direction,
                 metrics=metrics,
-                notes=notes,
+                notes=batch_note,
                 tier=3,
                 start_date=start_date,
                 end_date=end_date,
@@ -340,12 +363,116 @@ def run_batch_backtest(job_id: str, payload: dict[str, Any]) -> None:
         finally:
             db.close()
 
-        job["processed"] = job["succeeded"] + job["failed"] + job.get("skipped", 0)
-        if 0 < job["processed"] < total:
-            job["estimated_remaining_sec"] = (job["elapsed_sec"] / job["processed"]) * (
-                total - job["processed"]
+        _mark_processed(job, total)
+        _persist_progress(job)
+
+    panel_size = _panel_size()
+    max_workers = max(1, (os.cpu_count() or 2) - 1)
+
+    def _new_pool() -> concurrent.futures.ProcessPoolExecutor:
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_panel_worker, initargs=(panel_size,)
+        )
+
+    pending = iter(symbols)
+    requeued: deque[str] = deque()
+    crash_retries: dict[str, int] = {}
+    in_flight: dict[concurrent.futures.Future, tuple[str, Any]] = {}
+    stopped = False
+    # A new cohort starts while fewer than panel_size symbols are still refining.
+    symbol_pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=2 * panel_size, thread_name_prefix=f"batch-{job_id[:8]}"
+    )
+    executor = _new_pool()
+    try:
+        while True:
+            # Take the next cohort; symbols that need no optimization are settled here.
+            cohort: list[str] = []
+            while not stopped and len(in_flight) < panel_size and len(cohort) < panel_size:
+                symbol = requeued.popleft() if requeued else next(pending, None)
+                if symbol is None:
+                    break
+                job["elapsed_sec"] = time.time() - started
+                job["current_symbol"] = symbol
+                _persist_progress(job)
+
+                stopped, job = _should_stop(job_id, job)
+                if stopped:
+                    break
+                if _is_unsupported_symbol(symbol):
+                    _skip(symbol, "unsupported / excluded")
+                elif symbol in existing:
+                    _skip(symbol, "already in favorites, same period and direction")
+                else:
+                    cohort.append(symbol)
+
+            if cohort:
+                # The shared first stage runs here while the previous cohort refines.
+                try:
+                    seeds = _first_stage_panel(cohort, executor)
+                except BrokenProcessPool:
+                    logger.warning("Batch %s: process pool broke, rebuilding", job_id[:8])
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = _new_pool()
+                    seeds = {}
+                except Exception as exc:
+                    # Each symbol then runs its own first stage (and reports its own errors).
+                    logger.warning("Batch: panel first stage failed for %s: %s", cohort, exc)
+                    seeds = {}
+                for symbol in cohort:
+                    future = symbol_pool.submit(_optimize, symbol, executor, seeds.get(symbol))
+                    in_flight[future] = (symbol, executor)
+
+            if not in_flight:
+                break
+            done, _ = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
             )
+            for future in done:
+                symbol, used_pool = in_flight.pop(future)
+                job["elapsed_sec"] = time.time() - started
+                try:
+                    result, effective_data_source = future.result()
+                except BrokenProcessPool as exc:
+                    if used_pool is executor:
+                        # A worker died (OOM, segfault): every task on this pool is lost.
+                        logger.warning("Batch %s: process pool broke, rebuilding", job_id[:8])
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        executor = _new_pool()
+                    if crash_retries.get(symbol, 0) < POOL_CRASH_RETRIES:
+                        crash_retries[symbol] = crash_retries.get(symbol, 0) + 1
+                        logger.warning("Batch: requeue %s after worker crash", symbol)
+                        requeued.append(symbol)
+                        continue
+                    logger.error("Batch backtest failed for %s: %s", symbol, exc)
+                    job["failed"] = job.get("failed", 0) + 1
+                    job["errors"].append({"symbol": symbol, "error": f"worker crash: {exc}"})
+                    _mark_processed(job, total)
+                    _persist_progress(job)
+                    continue
+                except Exception as exc:
+                    logger.exception("Batch backtest failed for %s: %s", symbol, exc)
+                    job["failed"] = job.get("failed", 0) + 1
+                    job["errors"].append({"symbol": symbol, "error": str(exc)})
+                    _mark_processed(job, total)
+                    _persist_progress(job)
+                    continue
+                _record(symbol, result, effective_data_source)
+    except KeyboardInterrupt:
+        job["status"] = "cancelled"
+        job["estimated_remaining_sec"] = None
+        job["current_symbol"] = None
         _persist_progress(job)
+        logger.info("Batch %s cancelled (CTRL+C)", job_id[:8])
+        return
+    finally:
+        # Nothing is in flight after a normal run; on errors, drop queued symbols.
+        symbol_pool.shutdown(wait=False, cancel_futures=True)
+        executor.shutdown(wait=True)
+
+    if stopped:
+        # Paused/cancelled: symbols already in flight were recorded above.
+        return
 
     job["processed"] = total
     job["elapsed_sec"] = time.time() - started
@@ -0,0 +1,402 @@
+"""Shared Binance REST gateway.
+
+Every Binance REST caller goes through one process-wide gateway so that:
+
+- connections (TLS sessions, HTTP/2 when ``h2`` is installed) are pooled and
+  reused instead of opened per request;
+- request weight is accounted in a single token bucket fed by Binance's
+  ``X-MBX-USED-WEIGHT-1M`` header, shared by sync and async callers;
+- 429/418 responses pause *all* callers until ``Retry-After`` instead of each
+  module retrying on its own. A caller never waits past its own timeout: the
+  gateway raises ``BinanceRateLimitError`` instead.
+
+Callers receive the ``httpx.Response`` and keep their own error mapping.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import importlib.util
+import math
+import os
+import threading
+import time
+import urllib.parse
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+DEFAULT_BASE_URL = "https://api.binance.com"
+DEFAULT_WEIGHT_LIMIT_PER_MINUTE = 6000
+WEIGHT_SAFETY_RATIO = 0.8
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RETRY_AFTER_WAIT_SECONDS = 5.0
+# Pause applied when a 429/418 carries no usable Retry-After header.
+DEFAULT_RETRY_AFTER_SECONDS = 10.0
+# Upper bound for any Retry-After pause (Binance escalates real IP bans itself).
+MAX_BLOCK_SECONDS = 600.0
+
+# Request weight per endpoint (Binance Spot REST docs); unknown paths cost 1.
+_ENDPOINT_WEIGHTS: Dict[str, Callable[[Dict[str, Any]], int]] = {
+    "/api/v3/account": lambda p: 20,
+    "/api/v3/myTrades": lambda p: 5 if "orderId" in p else 20,
+    "/api/v3/exchangeInfo": lambda p: 20,
+    "/api/v3/klines": lambda p: 2,
+    "/api/v3/ticker/price": lambda p: 2 if ("symbol" in p) else 4,
+    "/api/v3/ticker/24hr": lambda p: 2 if ("symbol" in p) else 80,
+    "/api/v3/openOrders": lambda p: 6 if "symbol" in p else 80,
+    "/api/v3/order": lambda p: 4 if "orderId" in p or "origClientOrderId" in p else 1,
+}
+
+
+def endpoint_weight(path: str, params: Optional[Dict[str, Any]] = None) -> int:
+    rule = _ENDPOINT_WEIGHTS.get(urllib.parse.urlsplit(path).path)
+    return int(rule(params or {})) if rule else 1
+
+
+def env_base_url() -> str:
+    return (os.getenv("BINANCE_BASE_URL") or DEFAULT_BASE_URL).strip().rstrip("/")
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def sign_query(params: Dict[str, Any], api_secret: str) -> str:
+    """URL-encode ``params`` and append the HMAC-SHA256 ``signature``."""
+    query = urllib.parse.urlencode(params, doseq=True)
+    signature = hmac.new(api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+    return f"{query}&signature={signature}"
+
+
+class BinanceRateLimitError(httpx.HTTPError):
+    """The weight budget (or a 429/418 pause) would keep the caller past its timeout."""
+
+    def __init__(self, wait_s: float):
+        super().__init__(f"Binance request weight exhausted; retry in {wait_s:.1f}s")
+        self.retry_after = float(wait_s)
+
+
+class WeightBudget:
+    """Thread-safe token bucket over Binance's per-minute request weight.
+
+    Same refill model as the realtime connector's ``_TokenBucket``, usable from
+    threads (``take``) and coroutines (``take_async``), and corrected by the
+    weight Binance reports for this IP on every response (``observe``).
+    """
+
+    def __init__(
+        self,
+        weight_per_minute: int = DEFAULT_WEIGHT_LIMIT_PER_MINUTE,
+        safety_ratio: float = WEIGHT_SAFETY_RATIO,
+    ):
+        self._safety_ratio = float(safety_ratio)
+        self._capacity = max(1.0, float(weight_per_minute) * self._safety_ratio)
+        self._tokens = self._capacity
+        self._lock = threading.Lock()
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self.last_used_weight: Optional[int] = None
+        self.last_weight_limit: Optional[int] = None
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._last_refill)
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._capacity / 60.0)
+        self._last_refill = now
+
+    def _reserve(self, cost: float) -> float:
+        """Take ``cost`` tokens and return 0, or return how long to wait."""
+        required = min(max(0.0, float(cost)), self._capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= required:
+                self._tokens -= required
+                return 0.0
+            return (required - self._tokens) * 60.0 / self._capacity
+
+    @staticmethod
+    def _deadline(timeout_s: Optional[float]) -> Optional[float]:
+        return None if timeout_s is None else time.monotonic() + max(0.0, float(timeout_s))
+
+    @staticmethod
+    def _check_deadline(wait_s: float, deadline: Optional[float]) -> None:
+        if deadline is not None and time.monotonic() + wait_s > deadline:
+            raise BinanceRateLimitError(wait_s)
+
+    def take(self, cost: float = 1.0, timeout_s: Optional[float] = None) -> None:
+        """Wait for ``cost`` tokens; raise ``BinanceRateLimitError`` past ``timeout_s``."""
+        deadline = self._deadline(timeout_s)
+        while True:
+            wait_s = self._reserve(cost)
+            if wait_s <= 0:
+                return
+            self._check_deadline(wait_s, deadline)
+            time.sleep(wait_s)
+
+    async def take_async(self, cost: float = 1.0, timeout_s: Optional[float] = None) -> None:
+        deadline = self._deadline(timeout_s)
+        while True:
+            wait_s = self._reserve(cost)
+            if wait_s <= 0:
+                return
+            self._check_deadline(wait_s, deadline)
+            await asyncio.sleep(wait_s)
+
+    def observe(self, headers: httpx.Headers) -> None:
+        """Align the bucket with the weight Binance says this IP already used."""
+        used = _to_int(headers.get("X-MBX-USED-WEIGHT-1M"))
+        limit = _to_int(headers.get("X-MBX-WEIGHT-1M"))
+        with self._lock:
+            if limit is not None and limit > 0:
+                self.last_weight_limit = limit
+                self._capacity = max(1.0, limit * self._safety_ratio)
+            if used is not None:
+                self.last_used_weight = used
+                self._refill(time.monotonic())
+                self._tokens = max(0.0, min(self._tokens, self._capacity - used))
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + max(0.0, seconds))
+
+
+def _retry_after_seconds(response: httpx.Response) -> float:
+    raw = response.headers.get("Retry-After")
+    try:
+        seconds = float(raw) if raw else DEFAULT_RETRY_AFTER_SECONDS
+    except ValueError:
+        seconds = DEFAULT_RETRY_AFTER_SECONDS
+    if not math.isfinite(seconds):
+        seconds = DEFAULT_RETRY_AFTER_SECONDS
+    return min(max(0.0, seconds), MAX_BLOCK_SECONDS)
+
+
+class BinanceGateway:
+    """Pooled sync/async httpx clients sharing one ``WeightBudget``."""
+
+    def __init__(
+        self,
+        *,
+        timeout_s: float = 10.0,
+        max_connections: int = 32,
+        http2: Optional[bool] = None,
+        budget: Optional[WeightBudget] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._timeout_s = float(timeout_s)
+        self._limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._http2 = _http2_available() if http2 is None else bool(http2)
+        self.budget = budget or WeightBudget()
+        self._transport = transport
+        self._async_transport = async_transport
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        # AsyncClient connections are bound to the loop that opened them.
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Async generators that close each loop's client on loop shutdown; the
+        # loop only keeps weak references to them.
+        self._loop_guards: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                kwargs: Dict[str, Any] = {"timeout": self._timeout_s, "limits": self._limits}
+                if self._transport is not None:
+                    kwargs["transport"] = self._transport
+                else:
+                    kwargs["http2"] = self._http2
+                self._client = httpx.Client(**kwargs)
+            return self._client
+
+    def _loop_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                kwargs: Dict[str, Any] = {"timeout": self._timeout_s, "limits": self._limits}
+                if self._async_transport is not None:
+                    kwargs["transport"] = self._async_transport
+                else:
+                    kwargs["http2"] = self._http2
+                client = httpx.AsyncClient(**kwargs)
+                self._async_clients[loop] = client
+                self._loop_guards[loop] = _close_with_loop(loop, client)
+            return client
+
+    def _after_response(self, response: httpx.Response) -> Optional[float]:
+        """Record rate headers; return the retry delay for 429/418, else None."""
+        self.budget.observe(response.headers)
+        if response.status_code not in (418, 429):
+            return None
+        delay = _retry_after_seconds(response)
+        self.budget.block_for(delay)
+        return delay
+
+    @staticmethod
+    def _should_retry(method: str, delay: Optional[float], attempt: int) -> bool:
+        return (
+            delay is not None
+            and method.upper() == "GET"
+            and attempt < MAX_RATE_LIMIT_RETRIES
+            and delay <= MAX_RETRY_AFTER_WAIT_SECONDS
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        weight: Optional[int] = None,
+        timeout_s: Optional[float] = None,
+        build_url: Optional[Callable[[], str]] = None,
+    ) -> httpx.Response:
+        cost = endpoint_weight(url, params) if weight is None else weight
+        timeout = self._timeout_s if timeout_s is None else float(timeout_s)
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            self.budget.take(cost, timeout_s=deadline - time.monotonic())
+            response = self._sync_client().request(
+                method.upper(),
+                build_url() if build_url else url,
+                params=None if build_url else params,
+                headers=headers,
+                timeout=timeout,
+            )
+            delay = self._after_response(response)
+            if not self._should_retry(method, delay, attempt):
+                return response
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        weight: Optional[int] = None,
+        timeout_s: Optional[float] = None,
+    ) -> httpx.Response:
+        cost = endpoint_weight(url, params) if weight is None else weight
+        timeout = self._timeout_s if timeout_s is None else float(timeout_s)
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.budget.take_async(cost, timeout_s=deadline - time.monotonic())
+            response = await self._loop_client().request(
+                method.upper(), url, params=params, headers=headers, timeout=timeout
+            )
+            delay = self._after_response(response)
+            if not self._should_retry(method, delay, attempt):
+                return response
+
+    def signed_request(
+        self,
+        method: str,
+        url: str,
+        *,
+        api_key: str,
+        api_secret: str,
+        params: Optional[Dict[str, Any]] = None,
+        weight: Optional[int] = None,
+        timeout_s: Optional[float] = None,
+    ) -> httpx.Response:
+        """USER_DATA/TRADE request; timestamp and signature are rebuilt per attempt."""
+        payload = dict(params or {})
+
+        def _build_url() -> str:
+            payload["timestamp"] = int(time.time() * 1000)
+            return f"{url}?{sign_query(payload, api_secret)}"
+
+        return self.request(
+            method,
+            url,
+            params=payload,
+            headers={"X-MBX-APIKEY": api_key},
+            weight=weight,
+            timeout_s=timeout_s,
+            build_url=_build_url,
+        )
+
+    async def aclose(self) -> None:
+        """Close the ``AsyncClient`` of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self) -> None:
+        """Close the sync client and every per-loop ``AsyncClient`` still open."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            async_clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, client in async_clients:
+            if client.is_closed or loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+
+
+def _close_with_loop(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+    """Close ``client`` when ``loop`` shuts down.
+
+    ``asyncio.run`` (and ``loop.shutdown_asyncgens``) finalizes every async
+    generator still parked on the loop before closing it, so one parked per
+    client closes the client's connections on the loop that opened them.
+    """
+
+    async def _guard():
+        try:
+            yield
+        finally:
+            await client.aclose()
+
+    guard = _guard()
+    loop.create_task(_advance(guard))
+    return guard
+
+
+async def _advance(generator) -> None:
+    await generator.__anext__()
+
+
+_GATEWAY: Optional[BinanceGateway] = None
+_GATEWAY_LOCK = threading.Lock()
+
+
+def get_gateway() -> BinanceGateway:
+    global _GATEWAY
+    with _GATEWAY_LOCK:
+        if _GATEWAY is None:
+            _GATEWAY = BinanceGateway()
+        return _GATEWAY
@@ -0,0 +1,399 @@
+"""Shared index of Binance Spot symbols (listing, order filters and 24h quote volume).
+
+Favorites cleanup, the signal feed, OHLCV ingestion and the onchain ranking all
+need "which pairs are trading" and, for ranking, their 24h quote volume; order
+previews, market orders and protective stops need each symbol's order types and
+filters. They all read one index per API base URL instead of each downloading
+``exchangeInfo``:
+
+- listings are refreshed at most once per ``BINANCE_EXCHANGE_INFO_TTL_SECONDS``
+  and volumes once per ``BINANCE_UNIVERSE_VOLUME_TTL_SECONDS``;
+- each refresh is diffed against the stored rows and only changed rows are
+  written to a Redis hash, which other workers load instead of calling Binance;
+- filtered views (trading codes, spot pairs per quote, volume ranking) are
+  built once per refresh and served from memory;
+- a filter failure reported by Binance on an order invalidates the index so the
+  next lookup reloads it.
+
+``BINANCE_EXCHANGE_INFO_URL`` and ``BINANCE_EXCHANGE_INFO_TIMEOUT_SECONDS``
+override where and how long the default index downloads ``exchangeInfo``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from app.services.binance_http import DEFAULT_BASE_URL, env_base_url, get_gateway
+from app.services.redis_store import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_SYMBOLS_KEY = "binance:universe:symbols"
+UNIVERSE_META_KEY = "binance:universe:meta"
+DEFAULT_LISTING_TTL_SECONDS = 3600
+DEFAULT_VOLUME_TTL_SECONDS = 300
+RETRY_AFTER_FAILURE_SECONDS = 60
+# After a Redis error the shared copy is skipped for this long, then tried again.
+REDIS_RETRY_AFTER_SECONDS = 60
+REQUEST_TIMEOUT_SECONDS = 20.0
+
+# exchangeInfo fields kept per symbol; the rest of each row is dropped.
+_LISTING_KEYS = (
+    "symbol",
+    "status",
+    "baseAsset",
+    "quoteAsset",
+    "isSpotTradingAllowed",
+    "orderTypes",
+    "quoteOrderQtyMarketAllowed",
+    "filters",
+)
+_VOLUME_KEYS = ("quoteVolume", "count", "lastPrice")
+
+
+def _env_seconds(name: str, default: int, lower: int, upper: int) -> int:
+    raw = (os.getenv(name) or str(default)).strip()
+    try:
+        return max(lower, min(upper, int(raw)))
+    except ValueError:
+        return default
+
+
+def _request_timeout() -> float:
+    raw = (os.getenv("BINANCE_EXCHANGE_INFO_TIMEOUT_SECONDS") or "").strip()
+    try:
+        value = float(raw) if raw else REQUEST_TIMEOUT_SECONDS
+    except ValueError:
+        return REQUEST_TIMEOUT_SECONDS
+    return value if value > 0 else REQUEST_TIMEOUT_SECONDS
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _listing_row(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    name = str(item.get("symbol") or "").upper()
+    if not name:
+        return None
+    row = {key: item.get(key) for key in _LISTING_KEYS}
+    row["symbol"] = name
+    return row
+
+
+def _listing_rows(payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    rows: Dict[str, Dict[str, Any]] = {}
+    for item in payload.get("symbols") or []:
+        row = _listing_row(item) if isinstance(item, dict) else None
+        if row is not None:
+            rows[row["symbol"]] = row
+    return rows
+
+
+def _volume_fields(ticker: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "quoteVolume": _to_float(ticker.get("quoteVolume")),
+        "count": int(_to_float(ticker.get("count")) or 0),
+        "lastPrice": _to_float(ticker.get("lastPrice")),
+    }
+
+
+def _fetch_json(url: str) -> Any:
+    response = get_gateway().request("GET", url, timeout_s=_request_timeout())
+    response.raise_for_status()
+    return response.json()
+
+
+def _exchange_info_url(base_url: str) -> str:
+    override = (os.getenv("BINANCE_EXCHANGE_INFO_URL") or "").strip()
+    if override and base_url == env_base_url():
+        return override
+    return f"{base_url}/api/v3/exchangeInfo"
+
+
+class MarketUniverse:
+    """Symbol -> listing row (+ 24h volume fields), diff-refreshed and shared via Redis."""
+
+    def __init__(
+        self,
+        *,
+        base_url: Optional[str] = None,
+        fetch_exchange_info: Optional[Callable[[], Dict[str, Any]]] = None,
+        fetch_tickers: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        listing_ttl_seconds: Optional[int] = None,
+        volume_ttl_seconds: Optional[int] = None,
+    ):
+        base = (base_url or env_base_url()).rstrip("/")
+        self._fetch_exchange_info = fetch_exchange_info or (
+            lambda: _fetch_json(_exchange_info_url(base))
+        )
+        self._fetch_tickers = fetch_tickers or (lambda: _fetch_json(f"{base}/api/v3/ticker/24hr"))
+        # Testnet and other base URLs keep their own shared copy.
+        suffix = (
+            "" if base == DEFAULT_BASE_URL else ":" + hashlib.sha256(base.encode()).hexdigest()[:16]
+        )
+        self._symbols_key = UNIVERSE_SYMBOLS_KEY + suffix
+        self._meta_key = UNIVERSE_META_KEY + suffix
+        self._listing_ttl = (
+            int(listing_ttl_seconds)
+            if listing_ttl_seconds is not None
+            else _env_seconds(
+                "BINANCE_EXCHANGE_INFO_TTL_SECONDS", DEFAULT_LISTING_TTL_SECONDS, 60, 86400
+            )
+        )
+        self._volume_ttl = (
+            int(volume_ttl_seconds)
+            if volume_ttl_seconds is not None
+            else _env_seconds(
+                "BINANCE_UNIVERSE_VOLUME_TTL_SECONDS", DEFAULT_VOLUME_TTL_SECONDS, 30, 86400
+            )
+        )
+        self._redis = get_redis_client()
+        self._redis_retry_at = 0.0
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._listing_at: Optional[float] = None
+        self._volume_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._views: Dict[tuple, Any] = {}
+        self.last_diff: Dict[str, List[str]] = {"added": [], "removed": [], "changed": []}
+
+    @staticmethod
+    def _is_fresh(loaded_at: Optional[float], ttl: int) -> bool:
+        return loaded_at is not None and (time.time() - loaded_at) < ttl
+
+    def _stale(self, need_volume: bool) -> tuple[bool, bool]:
+        listing = not self._is_fresh(self._listing_at, self._listing_ttl)
+        volume = need_volume and not self._is_fresh(self._volume_at, self._volume_ttl)
+        return listing, volume
+
+    # -- shared copy -------------------------------------------------------
+    def _shared(self) -> Any:
+        """Redis client, or None while it is unconfigured or cooling down after an error."""
+        if self._redis is None or time.time() < self._redis_retry_at:
+            return None
+        return self._redis
+
+    def _redis_failed(self, action: str, exc: Exception) -> None:
+        logger.warning("Failed to %s Binance symbol universe in Redis: %s", action, exc)
+        self._redis_retry_at = time.time() + REDIS_RETRY_AFTER_SECONDS
+
+    def _load_shared(self) -> None:
+        """Adopt the Redis copy when another worker refreshed it more recently."""
+        redis = self._shared()
+        if redis is None:
+            return
+        try:
+            raw_meta = redis.get(self._meta_key)
+            meta = json.loads(raw_meta) if raw_meta else None
+            if not isinstance(meta, dict):
+                return
+            listing_at = _to_float(meta.get("listing_at"))
+            volume_at = _to_float(meta.get("volume_at"))
+            if (listing_at or 0) <= (self._listing_at or 0) and (volume_at or 0) <= (
+                self._volume_at or 0
+            ):
+                return
+            raw_rows = redis.hgetall(self._symbols_key) or {}
+            rows = {}
+            for name, raw in raw_rows.items():
+                key = name.decode() if isinstance(name, bytes) else str(name)
+                rows[key] = json.loads(raw)
+        except RedisError as exc:
+            self._redis_failed("load", exc)
+            return
+        except (TypeError, ValueError):
+            return
+        if rows:
+            self._replace_rows(rows)
+            self._listing_at, self._volume_at = listing_at, volume_at
+
+    def _save_shared(self, changed: Dict[str, Dict[str, Any]], removed: List[str]) -> None:
+        redis = self._shared()
+        if redis is None:
+            return
+        meta = {"listing_at": self._listing_at, "volume_at": self._volume_at}
+        try:
+            pipe = redis.pipeline(transaction=True)
+            if changed:
+                pipe.hset(
+                    self._symbols_key,
+                    mapping={
+                        name: json.dumps(row, separators=(",", ":"))
+                        for name, row in changed.items()
+                    },
+                )
+            if removed:
+                pipe.hdel(self._symbols_key, *removed)
+            pipe.set(self._meta_key, json.dumps(meta, separators=(",", ":")))
+            pipe.execute()
+        except RedisError as exc:
+            self._redis_failed("persist", exc)
+
+    # -- refresh -----------------------------------------------------------
+    def _replace_rows(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        self._rows = rows
+        self._views = {}
+
+    def _refresh_locked(self, refresh_listing: bool, refresh_volume: bool) -> None:
+        rows = {name: dict(row) for name, row in self._rows.items()}
+        if refresh_listing:
+            listing = _listing_rows(self._fetch_exchange_info())
+            if not listing:
+                raise ValueError("exchangeInfo returned no symbols")
+            for name, row in listing.items():
+                row.update({key: rows.get(name, {}).get(key) for key in _VOLUME_KEYS})
+            rows = listing
+        if refresh_volume:
+            tickers = self._fetch_tickers()
+            for ticker in tickers if isinstance(tickers, list) else []:
+                row = rows.get(str(ticker.get("symbol") or "").upper())
+                if row is not None:
+                    row.update(_volume_fields(ticker))
+
+        changed = {name: row for name, row in rows.items() if self._rows.get(name) != row}
+        removed = [name for name in self._rows if name not in rows]
+        self.last_diff = {
+            "added": sorted(name for name in changed if name not in self._rows),
+            "removed": sorted(removed),
+            "changed": sorted(name for name in changed if name in self._rows),
+        }
+        now = time.time()
+        if refresh_listing:
+            self._listing_at = now
+        if refresh_volume:
+            self._volume_at = now
+        if changed or removed:
+            self._replace_rows(rows)
+        self._save_shared(changed, removed)
+        if self.last_diff["added"] or self.last_diff["removed"]:
+            logger.info(
+                "Binance symbol universe updated: %s added, %s removed",
+                len(self.last_diff["added"]),
+                len(self.last_diff["removed"]),
+            )
+
+    def _ensure(self, *, need_volume: bool = False) -> None:
+        if not any(self._stale(need_volume)):
+            return
+        with self._lock:
+            if not any(self._stale(need_volume)):
+                return
+            self._load_shared()
+            refresh_listing, refresh_volume = self._stale(need_volume)
+            if not (refresh_listing or refresh_volume):
+                return
+            if time.time() < self._retry_at:
+                if self._rows:
+                    return
+                raise RuntimeError("Binance symbol universe is unavailable")
+            try:
+                self._refresh_locked(refresh_listing, refresh_volume)
+            except Exception as exc:
+                self._retry_at = time.time() + RETRY_AFTER_FAILURE_SECONDS
+                if not self._rows:
+                    raise RuntimeError(f"Unable to load Binance symbol universe: {exc}") from exc
+                # Keep serving the previous rows; the next call after the backoff retries.
+                logger.warning("Binance symbol universe refresh failed: %s", exc)
+
+    def _view(self, key: tuple, build: Callable[[], Any]) -> Any:
+        views = self._views
+        if key not in views:
+            views[key] = build()
+        return views[key]
+
+    # -- order lookups -----------------------------------------------------
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """exchangeInfo row for ``symbol`` (None when unknown or the index is unavailable)."""
+        try:
+            self._ensure()
+        except RuntimeError as exc:
+            logger.warning("%s", exc)
+        return self._rows.get(symbol.upper())
+
+    def put(self, symbol_info: Dict[str, Any]) -> None:
+        """Add a row fetched individually (e.g. a symbol listed after the last load)."""
+        row = _listing_row(symbol_info)
+        if row is None:
+            return
+        with self._lock:
+            rows = dict(self._rows)
+            row.update({key: rows.get(row["symbol"], {}).get(key) for key in _VOLUME_KEYS})
+            rows[row["symbol"]] = row
+            self._replace_rows(rows)
+
+    def invalidate(self) -> None:
+        """Drop the local and shared copy so the next lookup reloads exchangeInfo."""
+        with self._lock:
+            self._replace_rows({})
+            self._listing_at = None
+            self._volume_at = None
+            self._retry_at = 0.0
+            redis = self._shared()
+            if redis is not None:
+                try:
+                    redis.delete(self._symbols_key, self._meta_key)
+                except RedisError as exc:
+                    self._redis_failed("drop", exc)
+
+    # -- views -------------------------------------------------------------
+    def trading_symbols(self) -> set[str]:
+        """Codes (``BTCUSDT``) of every symbol whose status is TRADING."""
+        self._ensure()
+        rows = self._rows
+        return set(
+            self._view(
+                ("trading",),
+                lambda: frozenset(n for n, r in rows.items() if r.get("status") == "TRADING"),
+            )
+        )
+
+    def spot_pairs(self, quote: str = "USDT") -> List[Dict[str, Any]]:
+        """Trading Spot rows quoted in ``quote``, ordered by symbol."""
+        self._ensure()
+        quote = quote.upper()
+        rows = self._rows
+        pairs = self._view(
+            ("spot", quote),
+            lambda: tuple(
+                rows[name]
+                for name in sorted(rows)
+                if rows[name].get("status") == "TRADING"
+                and rows[name].get("quoteAsset") == quote
+                and rows[name].get("isSpotTradingAllowed") is True
+            ),
+        )
+        return [dict(row) for row in pairs]
+
+    def ranked_by_volume(self, quote: str = "USDT") -> List[Dict[str, Any]]:
+        """``spot_pairs`` with a positive 24h quote volume, highest volume first."""
+        self._ensure(need_volume=True)
+        return sorted(
+            (row for row in self.spot_pairs(quote) if (row.get("quoteVolume") or 0) > 0),
+            key=lambda row: (-row["quoteVolume"], -(row.get("count") or 0), row["symbol"]),
+        )
+
+
+_UNIVERSES: Dict[str, MarketUniverse] = {}
+_UNIVERSE_LOCK = threading.Lock()
+
+
+def get_market_universe(base_url: Optional[str] = None) -> MarketUniverse:
+    """Process-wide universe for ``base_url`` (``BINANCE_BASE_URL`` by default)."""
+    base = (base_url or env_base_url()).rstrip("/")
+    with _UNIVERSE_LOCK:
+        universe = _UNIVERSES.get(base)
+        if universe is None:
+            universe = _UNIVERSES[base] = MarketUniverse(base_url=base)
+        return universe
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import json
 import os
-import urllib.request
 from typing import Dict, Optional
 
 from app.config import get_settings
+from app.services.binance_http import get_gateway
 from app.services.binance_trades import is_usd_stable_asset
 
 # Ensure .env files are loaded before runtime os.getenv lookups below.
@@ -27,11 +26,11 @@ def fetch_all_binance_prices() -> Dict[str, float]:
     """
 
     base_url = _get_env("BINANCE_BASE_URL") or "https://api.binance.com"
-    url = f"{base_url}/api/v3/ticker/price"
-    req = urllib.request.Request(url)
-
-    with urllib.request.urlopen(req, timeout=30) as f:
-        data = json.load(f)
+    response = get_gateway().request(
+        "GET", f"{base_url.rstrip('/')}/api/v3/ticker/price", timeout_s=30
+    )
+    response.raise_for_status()
+    data = response.json()
 
     out: Dict[str, float] = {}
     if isinstance(data, list):
@@ -10,13 +10,18 @@ import signal
 import time
 from collections import deque
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
 
 import httpx
 import websockets
 
+try:  # orjson parses ticker frames several times faster; json is the fallback.
+    from orjson import loads as _loads_ws_message
+except ImportError:  # pragma: no cover - depends on the installed extras
+    _loads_ws_message = json.loads
+
 from app.config import get_settings
 from app.services.binance_realtime_snapshot_store import (
     read_snapshot,
@@ -108,6 +113,57 @@ class _PriceRecord:
     source: str
 
 
+@dataclass
+class _WsShard:
+    """One combined-stream connection and the ticks it received since the last merge.
+
+    Only the shard's consumer task writes ``pending``; merges swap the dict out,
+    so the hot path needs no lock.
+    """
+
+    index: int
+    pairs: tuple[str, ...]
+    pair_set: frozenset[str]
+    pending: dict[str, _PriceRecord] = field(default_factory=dict)
+    connected: bool = False
+    messages: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    reconnects: int = 0
+    disconnects: int = 0
+    lag_ms: float | None = None
+    last_message_at: float | None = None
+
+    def status(self, now_ts: float) -> dict[str, Any]:
+        return {
+            "index": self.index,
+            "pairs": len(self.pairs),
+            "connected": self.connected,
+            "messages": self.messages,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "pending": len(self.pending),
+            "reconnects": self.reconnects,
+            "disconnects": self.disconnects,
+            "lag_ms": self.lag_ms,
+            "last_message_age_seconds": (
+                now_ts - self.last_message_at if self.last_message_at else None
+            ),
+        }
+
+
+def _build_shards(pairs: list[str], shard_size: int) -> list[_WsShard]:
+    """Split ``pairs`` round-robin so the busiest (top-volume) pairs spread evenly."""
+    if not pairs:
+        return []
+    count = max(1, -(-len(pairs) // max(1, shard_size)))
+    shards = []
+    for index in range(count):
+        members = tuple(pairs[index::count])
+        shards.append(_WsShard(index=index, pairs=members, pair_set=frozenset(members)))
+    return shards
+
+
 class _TokenBucket:
     def __init__(self, max_tokens: int, refill_per_second: float):
         self._max_tokens = max(1, int(max_tokens))
@@ -152,6 +208,9 @@ class BinanceRealtimeConnector:
             1,
             min(self._pair_limit, int(_setting(settings, "binance_ws_stream_limit", 10))),
         )
+        self._ws_shard_size = max(
+            1, min(1024, int(_setting(settings, "binance_ws_streams_per_connection", 50)))
+        )
         self._snapshot_flush_seconds = max(
             1.0,
             float(_setting(settings, "binance_realtime_snapshot_flush_seconds", 2.0)),
@@ -171,6 +230,9 @@ class BinanceRealtimeConnector:
         self._rate_limiter = _TokenBucket(rate_limit_per_minute, rate_limit_per_minute / 60.0)
         self._lock = asyncio.Lock()
         self._prices: dict[str, _PriceRecord] = {}
+        # Ticks handled outside a shard (tests/direct callers); merged like shard buffers.
+        self._pending_prices: dict[str, _PriceRecord] = {}
+        self._shards: list[_WsShard] = []
         self._pairs: list[str] = []
         self._pair_cache_updated_at: float | None = None
         self._tasks: set[asyncio.Task[Any]] = set()
@@ -241,6 +303,7 @@ class BinanceRealtimeConnector:
         await asyncio.to_thread(write_snapshot, payload)
 
     async def _build_snapshot_payload(self, *, running: bool | None = None) -> dict[str, Any]:
+        await self._merge_shard_prices()
         async with self._lock:
             now_ts = time.time()
             running_value = (
@@ -306,6 +369,7 @@ class BinanceRealtimeConnector:
                 "latency_p95_ms": _percentile(self._latency_ms, 95),
                 "latency_p99_ms": _percentile(self._latency_ms, 99),
                 "event_to_cache_last_ms": self._last_ws_event_loop_ms,
+                **self._shard_status(now_ts),
             }
 
         return {
@@ -485,6 +549,7 @@ class BinanceRealtimeConnector:
                     source="rest-sync",
                 )
 
+        await self._merge_shard_prices()
         async with self._lock:
             for symbol, record in records.items():
                 self._prices[symbol] = record
@@ -494,59 +559,108 @@ class BinanceRealtimeConnector:
                 if symbol not in active and self._prices[symbol].updated_at_ts < prune_before:
                     self._prices.pop(symbol, None)
 
+    async def _merge_shard_prices(self) -> None:
+        """Fold the ticks buffered by each shard into ``_prices`` in one pass."""
+        batches = []
+        if self._pending_prices:
+            batches.append(self._pending_prices)
+            self._pending_prices = {}
+        for shard in self._shards:
+            if shard.pending:
+                batches.append(shard.pending)
+                shard.pending = {}
+        if not batches:
+            return
+        async with self._lock:
+            for batch in batches:
+                self._prices.update(batch)
+
+    async def _wait_for_pair_change(self) -> None:
+        waiters = [
+            asyncio.create_task(self._shutdown.wait()),
+            asyncio.create_task(self._pairs_changed.wait()),
+        ]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+
     async def _ws_loop(self) -> None:
         while not self._shutdown.is_set():
+            self._pairs_changed.clear()
             pairs = await self._current_pairs()
-            if not pairs:
-                await asyncio.sleep(min(self._reconnect_base_seconds * 2, 5.0))
-                continue
-
             stream_pairs = pairs[: self._ws_stream_limit]
             if not stream_pairs:
                 await asyncio.sleep(min(self._reconnect_base_seconds * 2, 5.0))
                 continue
 
-            stream_url = (
-                f"{self._ws_base_url}/stream?streams="
-                f"{'/'.join(pair.lower() + '@ticker' for pair in stream_pairs)}"
-            )
-            backoff = self._reconnect_base_seconds
-
-            while not self._shutdown.is_set() and not self._pairs_changed.is_set():
-                try:
-                    async with websockets.connect(
-                        stream_url,
-                        ping_interval=15,
-                        ping_timeout=20,
-                        close_timeout=5,
-                    ) as websocket:
-                        self._last_ws_connect_at = time.time()
-                        self._last_ws_event_loop_ms = None
-                        self._pairs_changed.clear()
-                        await self._consume_ws_stream(websocket)
-                except asyncio.CancelledError:
-                    raise
-                except Exception as exc:
-                    self._ws_disconnect_count += 1
-                    if self._shutdown.is_set():
-                        break
-                    self._last_ws_disconnect_at = time.time()
-                    await self._sync_prices_from_rest(pairs)
-                    self._ws_reconnect_count += 1
-                    delay = min(backoff, self._reconnect_max_seconds)
-                    backoff = min(backoff * 2, self._reconnect_max_seconds)
-                    logger.warning(
-                        "[binance-realtime] ws disconnected: %s; retrying in %.2fs",
-                        exc,
-                        delay,
-                    )
-                    await asyncio.sleep(delay + random.uniform(0.0, 0.4))
+            await self._merge_shard_prices()
+            self._shards = _build_shards(stream_pairs, self._ws_shard_size)
+            tasks = [
+                asyncio.create_task(self._run_shard(shard), name=f"binance-ws-shard-{shard.index}")
+                for shard in self._shards
+            ]
+            try:
+                await self._wait_for_pair_change()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await self._merge_shard_prices()
+
+    async def _run_shard(self, shard: _WsShard) -> None:
+        stream_url = (
+            f"{self._ws_base_url}/stream?streams="
+            f"{'/'.join(pair.lower() + '@ticker' for pair in shard.pairs)}"
+        )
+        backoff = self._reconnect_base_seconds
 
-                if self._pairs_changed.is_set():
+        while not self._shutdown.is_set() and not self._pairs_changed.is_set():
+            try:
+                async with websockets.connect(
+                    stream_url,
+                    ping_interval=15,
+                    ping_timeout=20,
+                    close_timeout=5,
+                ) as websocket:
+                    self._last_ws_connect_at = time.time()
+                    self._last_ws_event_loop_ms = None
+                    shard.connected = True
+                    try:
+                        await self._consume_ws_stream(websocket, shard)
+                    finally:
+                        shard.connected = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._ws_disconnect_count += 1
+                shard.disconnects += 1
+                if self._shutdown.is_set():
                     break
+                self._last_ws_disconnect_at = time.time()
+                await self._sync_prices_from_rest(list(shard.pairs))
+                self._ws_reconnect_count += 1
+                shard.reconnects += 1
+                delay = min(backoff, self._reconnect_max_seconds)
+                backoff = min(backoff * 2, self._reconnect_max_seconds)
+                logger.warning(
+                    "[binance-realtime] ws shard %s disconnected: %s; retrying in %.2fs",
+                    shard.index,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay + random.uniform(0.0, 0.4))
 
-    async def _consume_ws_stream(self, websocket: websockets.WebSocketClientProtocol) -> None:
-        await self._sync_prices_from_rest(await self._current_pairs())
+    async def _consume_ws_stream(
+        self,
+        websocket: websockets.WebSocketClientProtocol,
+        shard: _WsShard | None = None,
+    ) -> None:
+        await self._sync_prices_from_rest(
+            list(shard.pairs) if shard is not None else await self._current_pairs()
+        )
 
         while not self._shutdown.is_set() and not self._pairs_changed.is_set():
             try:
@@ -557,66 +671,89 @@ class BinanceRealtimeConnector:
             except asyncio.TimeoutError:
                 self._ws_disconnect_count += 1
                 self._last_ws_disconnect_at = time.time()
+                if shard is not None:
+                    shard.disconnects += 1
                 logger.warning("[binance-realtime] ws heartbeat timeout, reconnecting")
                 return
             except websockets.ConnectionClosed:
                 self._ws_disconnect_count += 1
                 self._last_ws_disconnect_at = time.time()
+                if shard is not None:
+                    shard.disconnects += 1
                 return
 
             self._last_ws_message_at = time.time()
-            await self._handle_ws_message(message_text)
+            self._handle_ws_message(message_text, shard)
             await asyncio.sleep(0)
 
-    async def _handle_ws_message(self, message_text: str) -> None:
-        try:
-            payload = json.loads(message_text)
-        except json.JSONDecodeError:
+    def _handle_ws_message(self, message_text: str | bytes, shard: _WsShard | None = None) -> None:
+        if shard is not None:
+            shard.messages += 1
+            shard.last_message_at = self._last_ws_message_at
+        record = self._parse_ticker(message_text, shard)
+        if record is None:
+            if shard is not None:
+                shard.dropped += 1
             return
 
+        pending = shard.pending if shard is not None else self._pending_prices
+        if shard is not None:
+            shard.lag_ms = record.event_to_cache_ms
+            if record.symbol in pending:
+                shard.coalesced += 1
+        pending[record.symbol] = record
+
+    def _parse_ticker(
+        self, message_text: str | bytes, shard: _WsShard | None
+    ) -> _PriceRecord | None:
+        try:
+            payload = _loads_ws_message(message_text)
+        except ValueError:
+            return None
+
         if not isinstance(payload, dict):
-            return
+            return None
         if isinstance(payload.get("data"), dict):
             payload = payload["data"]
-            if not isinstance(payload, dict):
-                return
 
         symbol = str(payload.get("s") or "").strip().upper()
         if not symbol:
-            return
+            return None
+        if shard is not None:
+            if symbol not in shard.pair_set:
+                return None
+        elif self._pairs and symbol not in self._pairs:
+            return None
 
-        async with self._lock:
-            if self._pairs and symbol not in self._pairs:
-                return
-
-        last_price = _to_float(payload.get("c"))
-        bid = _to_float(payload.get("b"))
-        ask = _to_float(payload.get("a"))
-        change_24h_pct = _to_float(payload.get("P"))
         event_time_ms = _to_int(payload.get("E"))
         if event_time_ms is None:
-            return
+            return None
 
-        now_ms = int(time.time() * 1000)
-        event_to_cache_ms = max(0.0, float(now_ms - event_time_ms))
+        now = time.time()
+        event_to_cache_ms = max(0.0, float(int(now * 1000) - event_time_ms))
         self._latency_ms.append(event_to_cache_ms)
         self._last_ws_event_loop_ms = event_to_cache_ms
-
-        now = time.time()
-        record = _PriceRecord(
+        return _PriceRecord(
             symbol=symbol,
-            price=last_price,
-            change_24h_pct=change_24h_pct,
-            bid=bid,
-            ask=ask,
+            price=_to_float(payload.get("c")),
+            change_24h_pct=_to_float(payload.get("P")),
+            bid=_to_float(payload.get("b")),
+            ask=_to_float(payload.get("a")),
             event_time_ms=event_time_ms,
             event_to_cache_ms=event_to_cache_ms,
             updated_at_iso=_utc_now_iso(),
             updated_at_ts=now,
             source="websocket",
         )
-        async with self._lock:
-            self._prices[symbol] = record
+
+    def _shard_status(self, now_ts: float) -> dict[str, Any]:
+        shards = [shard.status(now_ts) for shard in self._shards]
+        return {
+            "ws_streams_per_connection": self._ws_shard_size,
+            "ws_shard_count": len(shards),
+            "ws_dropped_messages": sum(shard["dropped"] for shard in shards),
+            "ws_shards": shards,
+        }
 
     async def _current_pairs(self) -> list[str]:
         async with self._lock:
@@ -692,6 +829,7 @@ class BinanceRealtimeConnector:
                 "latency_p95_ms": _percentile(self._latency_ms, 95),
                 "latency_p99_ms": _percentile(self._latency_ms, 99),
                 "event_to_cache_last_ms": self._last_ws_event_loop_ms,
+                **self._shard_status(time.time()),
             }
             return status
 
@@ -707,6 +845,7 @@ class BinanceRealtimeConnector:
         missing: list[str] = []
         snapshots: dict[str, _PriceRecord] = {}
 
+        await self._merge_shard_prices()
         async with self._lock:
             for symbol in requested:
                 record = self._prices.get(symbol)
@@ -853,8 +992,12 @@ async def stop_binance_realtime_connector() -> None:
     await _connector.stop()
 
 
-def _read_external_snapshot() -> dict[str, Any] | None:
-    payload = read_snapshot()
+def read_external_snapshot(symbols: list[str] | None = ()) -> dict[str, Any] | None:
+    """Worker snapshot if fresh; ``prices`` only carries ``symbols`` (all when None).
+
+    Status/top-pairs callers use the default and read no price records.
+    """
+    payload = read_snapshot(None if symbols is None else list(symbols))
     if not snapshot_is_fresh(payload):
         return None
     if not bool(payload.get("running")):
@@ -876,14 +1019,14 @@ def _default_connector_status(*, running: bool = False) -> dict[str, Any]:
 def is_running() -> bool:
     if _connector._running:
         return True
-    return _read_external_snapshot() is not None
+    return read_external_snapshot() is not None
 
 
 async def get_top_pairs() -> dict[str, Any]:
     if _connector._running:
         return await _connector.get_top_pairs()
 
-    payload = _read_external_snapshot()
+    payload = read_external_snapshot()
     if payload is None:
         return await _connector.get_top_pairs()
 
@@ -903,7 +1046,7 @@ async def get_connector_status() -> dict[str, Any]:
     if _connector._running:
         return await _connector.get_status()
 
-    payload = _read_external_snapshot()
+    payload = read_external_snapshot()
     if payload is None:
         return await _connector.get_status()
 
@@ -920,11 +1063,11 @@ async def get_market_latest_prices(
     if _connector._running:
         return await _connector.get_latest_prices(symbols)
 
-    payload = _read_external_snapshot()
+    requested = _normalize_symbols(symbols)
+    payload = read_external_snapshot(requested or None)
     if payload is None:
         return await _connector.get_latest_prices(symbols)
 
-    requested = _normalize_symbols(symbols)
     prices_payload = payload.get("prices")
     if not isinstance(prices_payload, list):
         return [], None, True
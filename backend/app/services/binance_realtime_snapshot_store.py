@@ -1,11 +1,33 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+import threading
+import time
 from pathlib import Path
 from typing import Any
 
+from redis.exceptions import RedisError
+
 from app.config import get_settings
+from app.services.redis_store import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Redis layout: one hash field per symbol, the rest of the payload as a small JSON
+# document and a version counter bumped on every write so readers can skip reloads.
+SNAPSHOT_META_KEY = "binance:realtime:meta"
+SNAPSHOT_PRICES_KEY = "binance:realtime:prices"
+SNAPSHOT_VERSION_KEY = "binance:realtime:version"
+REDIS_RETRY_SECONDS = 30.0
+
+_STATE_LOCK = threading.Lock()
+_redis_retry_at = 0.0
+# Writer side: last JSON written per symbol, so unchanged records are not re-sent.
+_written_prices: dict[str, str] = {}
+# Reader side: metadata and price records already fetched for the current version.
+_read_cache: dict[str, Any] = {"version": None, "meta": None, "prices": {}, "complete": False}
 
 
 def _default_snapshot_path() -> Path:
@@ -28,7 +50,47 @@ def get_snapshot_path() -> Path:
     return _default_snapshot_path()
 
 
-def read_snapshot() -> dict[str, Any] | None:
+def _redis_client():
+    if str(_setting("binance_realtime_snapshot_transport", "redis")).strip().lower() != "redis":
+        return None
+    if time.monotonic() < _redis_retry_at:
+        return None
+    return get_redis_client()
+
+
+def _redis_failed(exc: Exception) -> None:
+    global _redis_retry_at
+    logger.warning("Realtime snapshot Redis transport unavailable, using file: %s", exc)
+    with _STATE_LOCK:
+        _redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        _written_prices.clear()
+        _read_cache.update(version=None, meta=None, prices={}, complete=False)
+
+
+def _normalize_requested(symbols: list[str] | None) -> list[str] | None:
+    if symbols is None:
+        return None
+    return [str(symbol or "").strip().upper() for symbol in symbols if str(symbol or "").strip()]
+
+
+def _filter_prices(payload: dict[str, Any], symbols: list[str] | None) -> dict[str, Any]:
+    if symbols is None or not isinstance(payload.get("prices"), list):
+        return payload
+    wanted = set(symbols)
+    filtered = [
+        item
+        for item in payload["prices"]
+        if isinstance(item, dict) and str(item.get("symbol") or "").strip().upper() in wanted
+    ]
+    return {**payload, "prices": filtered}
+
+
+def _heartbeat(payload: dict[str, Any]) -> float:
+    value = payload.get("heartbeat_ts")
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def _read_file_snapshot() -> dict[str, Any] | None:
     path = get_snapshot_path()
     try:
         payload = json.loads(path.read_text(encoding="utf-8"))
@@ -42,7 +104,94 @@ def read_snapshot() -> dict[str, Any] | None:
     return payload
 
 
-def write_snapshot(payload: dict[str, Any]) -> None:
+def _read_redis_snapshot(client, symbols: list[str] | None) -> dict[str, Any] | None:
+    version = client.get(SNAPSHOT_VERSION_KEY)
+    if version is None:
+        return None
+    with _STATE_LOCK:
+        if _read_cache["version"] != version:
+            raw_meta = client.get(SNAPSHOT_META_KEY)
+            try:
+                meta = json.loads(raw_meta) if raw_meta else None
+            except json.JSONDecodeError:
+                meta = None
+            if not isinstance(meta, dict):
+                return None
+            _read_cache.update(version=version, meta=meta, prices={}, complete=False)
+
+        cached: dict[str, Any] = _read_cache["prices"]
+        if symbols is None:
+            if not _read_cache["complete"]:
+                cached.clear()
+                for symbol, raw in (client.hgetall(SNAPSHOT_PRICES_KEY) or {}).items():
+                    cached[symbol] = json.loads(raw)
+                _read_cache["complete"] = True
+            selected = [cached[symbol] for symbol in sorted(cached) if cached[symbol] is not None]
+        else:
+            missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in cached]
+            if missing and not _read_cache["complete"]:
+                for symbol, raw in zip(missing, client.hmget(SNAPSHOT_PRICES_KEY, missing)):
+                    cached[symbol] = json.loads(raw) if raw else None
+            selected = [cached[symbol] for symbol in dict.fromkeys(symbols) if cached.get(symbol)]
+        return {**_read_cache["meta"], "prices": selected}
+
+
+def read_snapshot(symbols: list[str] | None = None) -> dict[str, Any] | None:
+    """Latest connector snapshot; ``prices`` holds only ``symbols`` when given."""
+    requested = _normalize_requested(symbols)
+    redis_payload = None
+    client = _redis_client()
+    if client is not None:
+        try:
+            redis_payload = _read_redis_snapshot(client, requested)
+        except (RedisError, json.JSONDecodeError) as exc:
+            _redis_failed(exc)
+        if redis_payload is not None and snapshot_is_fresh(redis_payload):
+            return redis_payload
+    # The writer falls back to the file while Redis is unreachable; prefer whichever is newer.
+    payload = _read_file_snapshot()
+    if payload is None:
+        return redis_payload
+    if redis_payload is not None and _heartbeat(redis_payload) >= _heartbeat(payload):
+        return redis_payload
+    return _filter_prices(payload, requested)
+
+
+def _write_redis_snapshot(client, payload: dict[str, Any]) -> None:
+    prices = payload.get("prices") if isinstance(payload.get("prices"), list) else []
+    encoded: dict[str, str] = {}
+    for item in prices:
+        if not isinstance(item, dict):
+            continue
+        symbol = str(item.get("symbol") or "").strip().upper()
+        if symbol:
+            encoded[symbol] = json.dumps(item, ensure_ascii=True, separators=(",", ":"))
+    meta = {key: value for key, value in payload.items() if key != "prices"}
+
+    with _STATE_LOCK:
+        # First write from this process, or Redis lost the data: replace the whole hash.
+        full_rewrite = not _written_prices or not client.exists(SNAPSHOT_META_KEY)
+        if full_rewrite:
+            _written_prices.clear()
+        changed = {
+            symbol: raw for symbol, raw in encoded.items() if _written_prices.get(symbol) != raw
+        }
+        removed = [symbol for symbol in _written_prices if symbol not in encoded]
+        pipe = client.pipeline(transaction=True)
+        if full_rewrite:
+            pipe.delete(SNAPSHOT_PRICES_KEY)
+        if changed:
+            pipe.hset(SNAPSHOT_PRICES_KEY, mapping=changed)
+        if removed:
+            pipe.hdel(SNAPSHOT_PRICES_KEY, *removed)
+        pipe.set(SNAPSHOT_META_KEY, json.dumps(meta, ensure_ascii=True, separators=(",", ":")))
+        pipe.incr(SNAPSHOT_VERSION_KEY)
+        pipe.execute()
+        _written_prices.clear()
+        _written_prices.update(encoded)
+
+
+def _write_file_snapshot(payload: dict[str, Any]) -> None:
     path = get_snapshot_path()
     path.parent.mkdir(parents=True, exist_ok=True)
     temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
@@ -53,6 +202,17 @@ def write_snapshot(payload: dict[str, Any]) -> None:
     temp_path.replace(path)
 
 
+def write_snapshot(payload: dict[str, Any]) -> None:
+    client = _redis_client()
+    if client is not None:
+        try:
+            _write_redis_snapshot(client, payload)
+            return
+        except RedisError as exc:
+            _redis_failed(exc)
+    _write_file_snapshot(payload)
+
+
 def snapshot_is_fresh(payload: dict[str, Any] | None) -> bool:
     if not isinstance(payload, dict):
         return False
@@ -64,7 +224,5 @@ def snapshot_is_fresh(payload: dict[str, Any] | None) -> bool:
     max_age = max(2.0, float(_setting("binance_realtime_snapshot_max_age_seconds", 15.0)))
     now_ts = float(payload.get("now_ts") or 0.0)
     if now_ts <= 0:
-        import time
-
         now_ts = time.time()
     return (now_ts - float(heartbeat)) <= max_age
@@ -12,13 +12,14 @@ import logging
 import threading
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
-from statistics import mean, pstdev
 from typing import Any
 
 import httpx
+import numpy as np
 
 from app.schemas.signal import (
     BollingerBandsPayload,
@@ -29,12 +30,13 @@ from app.schemas.signal import (
     SignalListResponse,
     SignalType,
 )
+from app.services.binance_http import get_gateway
+from app.services.binance_market_universe import get_market_universe
 from app.services.signal_history_writer import save_signal_to_history
 
 logger = logging.getLogger(__name__)
 
 BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
-BINANCE_EXCHANGE_INFO_URL = "https://api.binance.com/api/v3/exchangeInfo"
 BINANCE_TICKER_PRICE_URL = "https://api.binance.com/api/v3/ticker/price"
 CACHE_TTL_SECONDS = 300.0
 KLINES_LIMIT = 120
@@ -96,46 +98,23 @@ def _utc_now() -> datetime:
 
 
 async def _fetch_all_usdt_pairs_from_binance() -> list[str]:
-    """Fetch all USDT trading pairs from Binance exchangeInfo."""
-    timeout = httpx.Timeout(REQUEST_TIMEOUT_SECONDS)
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(BINANCE_EXCHANGE_INFO_URL)
-            if response.status_code == 429:
-                retry_after = response.headers.get("Retry-After")
-                delay = float(retry_after) if retry_after else float(attempt)
-                await asyncio.sleep(min(delay, 5.0))
-                continue
-            response.raise_for_status()
-            payload = response.json()
-            symbols = payload.get("symbols", [])
-            usdt_pairs = [
-                sym["symbol"]
-                for sym in symbols
-                if sym.get("status") == "TRADING"
-                and sym.get("quoteAsset") == "USDT"
-                and sym.get("isSpotTradingAllowed", False)
-            ]
-            return sorted(usdt_pairs)
-        except (httpx.HTTPError, ValueError) as exc:
-            if attempt >= MAX_RETRIES:
-                raise RuntimeError(f"Unable to fetch Binance exchangeInfo: {exc}") from exc
-            await asyncio.sleep(min(2 ** (attempt - 1), 4))
-    return []
+    """All USDT Spot pairs currently trading, from the shared symbol universe."""
+    try:
+        pairs = await asyncio.to_thread(get_market_universe().spot_pairs, "USDT")
+    except RuntimeError as exc:
+        raise RuntimeError(f"Unable to fetch Binance exchangeInfo: {exc}") from exc
+    return [pair["symbol"] for pair in pairs]
 
 
 async def _fetch_latest_price_from_binance(asset: str) -> float:
-    timeout = httpx.Timeout(REQUEST_TIMEOUT_SECONDS)
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(BINANCE_TICKER_PRICE_URL, params={"symbol": asset})
-            if response.status_code == 429:
-                retry_after = response.headers.get("Retry-After")
-                delay = float(retry_after) if retry_after else float(attempt)
-                await asyncio.sleep(min(delay, 5.0))
-                continue
+            response = await get_gateway().arequest(
+                "GET",
+                BINANCE_TICKER_PRICE_URL,
+                params={"symbol": asset},
+                timeout_s=REQUEST_TIMEOUT_SECONDS,
+            )
             response.raise_for_status()
             payload = response.json()
             return float(payload["price"])
@@ -340,21 +319,14 @@ def load_signal_feed_snapshots_from_disk() -> bool:
 
 
 async def _request_klines(asset: str, interval: str, limit: int) -> list[dict[str, Any]]:
-    timeout = httpx.Timeout(REQUEST_TIMEOUT_SECONDS)
     params = {"symbol": asset, "interval": interval, "limit": limit}
 
     last_error: Exception | None = None
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(BINANCE_KLINES_URL, params=params)
-
-            if response.status_code == 429:
-                retry_after = response.headers.get("Retry-After")
-                delay = float(retry_after) if retry_after else float(attempt)
-                await asyncio.sleep(min(delay, 5.0))
-                continue
-
+            response = await get_gateway().arequest(
+                "GET", BINANCE_KLINES_URL, params=params, timeout_s=REQUEST_TIMEOUT_SECONDS
+            )
             response.raise_for_status()
             payload = response.json()
             if not isinstance(payload, list):
@@ -411,65 +383,139 @@ async def get_klines(
     return {"candles": candles, "cached_at": cached_at, "is_stale": False}
 
 
-def _simple_moving_average(values: list[float], window: int) -> float:
-    sample = values[-window:]
-    return mean(sample)
+@dataclass(frozen=True)
+class _Indicators:
+    rsi: float
+    macd_line: float
+    signal_line: float
+    histogram: float
+    macd_sentiment: str
+    bands: BollingerBandsPayload
+
+
+# (asset, interval) -> ((last open_time, last close, length), indicators). The feed builds
+# every risk profile from the same candles, so each series is computed once. Kept as an LRU
+# so symbols that drop out of the universe do not pin their entries forever.
+INDICATOR_CACHE_MAX_ENTRIES = 2048
+_INDICATOR_CACHE: OrderedDict[tuple[str, str], tuple[tuple[datetime, float, int], _Indicators]] = (
+    OrderedDict()
+)
+_INDICATOR_CACHE_LOCK = threading.Lock()
 
 
-def _ema_series(values: list[float], window: int) -> list[float]:
-    if len(values) < window:
+def _ema_matrix(values: np.ndarray, window: int) -> np.ndarray:
+    """Row-wise EMA seeded with the SMA of the first ``window`` columns."""
+    if values.shape[1] < window:
         raise ValueError(f"Not enough values to compute EMA({window})")
     multiplier = 2 / (window + 1)
-    ema_values: list[float] = [_simple_moving_average(values[:window], window)]
-    for price in values[window:]:
-        ema_values.append((price - ema_values[-1]) * multiplier + ema_values[-1])
-    return ema_values
+    out = np.empty((values.shape[0], values.shape[1] - window + 1))
+    out[:, 0] = values[:, :window].mean(axis=1)
+    for idx, column in enumerate(values[:, window:].T, start=1):
+        out[:, idx] = (column - out[:, idx - 1]) * multiplier + out[:, idx - 1]
+    return out
 
 
-def _compute_rsi(closes: list[float], period: int = 14) -> float:
-    if len(closes) <= period:
+def _rsi_matrix(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    if closes.shape[1] <= period:
         raise ValueError("Not enough values to compute RSI")
-    deltas = [current - previous for previous, current in zip(closes[:-1], closes[1:])]
-    relevant = deltas[-period:]
-    gains = [delta for delta in relevant if delta > 0]
-    losses = [-delta for delta in relevant if delta < 0]
-    avg_gain = sum(gains) / period if gains else 0.0
-    avg_loss = sum(losses) / period if losses else 0.0
-    if avg_loss == 0:
-        return 100.0
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+    relevant = np.diff(closes[:, -(period + 1) :], axis=1)
+    avg_gain = np.where(relevant > 0, relevant, 0.0).sum(axis=1) / period
+    avg_loss = np.where(relevant < 0, -relevant, 0.0).sum(axis=1) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    return np.where(avg_loss == 0, 100.0, rsi)
 
 
-def _clamp(value: float, lower: float, upper: float) -> float:
-    return max(lower, min(upper, value))
+def _macd_matrix(closes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ema12 = _ema_matrix(closes, 12)
+    ema26 = _ema_matrix(closes, 26)
+    macd_values = ema12[:, ema12.shape[1] - ema26.shape[1] :] - ema26
+    signal_series = _ema_matrix(macd_values, 9)
+    macd_line = macd_values[:, -1]
+    signal_line = signal_series[:, -1]
+    return macd_line, signal_line, macd_line - signal_line
 
 
-def _compute_macd(closes: list[float]) -> tuple[float, float, float, str]:
-    ema12 = _ema_series(closes, 12)
-    ema26 = _ema_series(closes, 26)
-    offset = len(ema12) - len(ema26)
-    macd_values = [ema12[idx + offset] - ema26[idx] for idx in range(len(ema26))]
-    signal_series = _ema_series(macd_values, 9)
-    macd_line = macd_values[-1]
-    signal_line = signal_series[-1]
-    histogram = macd_line - signal_line
+def _macd_sentiment(macd_line: float, signal_line: float, histogram: float) -> str:
     scale = max(abs(signal_line), abs(macd_line), 1e-9)
     normalized_histogram = histogram / scale
-    sentiment = (
+    return (
         "bullish"
         if normalized_histogram > 0.08
         else "bearish" if normalized_histogram < -0.08 else "neutral"
     )
-    return macd_line, signal_line, histogram, sentiment
 
 
-def _compute_bollinger_bands(closes: list[float], period: int = 20) -> BollingerBandsPayload:
-    window = closes[-period:]
-    middle = mean(window)
-    deviation = pstdev(window) if len(window) > 1 else 0.0
-    distance = deviation * 2
-    return BollingerBandsPayload(upper=middle + distance, middle=middle, lower=middle - distance)
+def _compute_indicator_rows(closes: np.ndarray, period: int = 20) -> list[_Indicators]:
+    """RSI, MACD and Bollinger for stacked series of equal length (one row per asset)."""
+    rsi = _rsi_matrix(closes)
+    macd_line, signal_line, histogram = _macd_matrix(closes)
+    window = closes[:, -period:]
+    middle = window.mean(axis=1)
+    distance = window.std(axis=1) * 2 if window.shape[1] > 1 else np.zeros(len(window))
+    return [
+        _Indicators(
+            rsi=float(rsi[row]),
+            macd_line=float(macd_line[row]),
+            signal_line=float(signal_line[row]),
+            histogram=float(histogram[row]),
+            macd_sentiment=_macd_sentiment(
+                float(macd_line[row]), float(signal_line[row]), float(histogram[row])
+            ),
+            bands=BollingerBandsPayload(
+                upper=float(middle[row] + distance[row]),
+                middle=float(middle[row]),
+                lower=float(middle[row] - distance[row]),
+            ),
+        )
+        for row in range(closes.shape[0])
+    ]
+
+
+def _compute_indicators(
+    candles_by_asset: dict[str, list[dict[str, Any]]], interval: str = KLINES_INTERVAL
+) -> dict[str, _Indicators]:
+    """Indicators per asset; series too short for the indicators are left out."""
+    result: dict[str, _Indicators] = {}
+    pending: dict[int, list[tuple[str, tuple[datetime, float, int], list[float]]]] = {}
+    with _INDICATOR_CACHE_LOCK:
+        for asset, candles in candles_by_asset.items():
+            if not candles:
+                continue
+            marker = (candles[-1]["open_time"], float(candles[-1]["close"]), len(candles))
+            cached = _INDICATOR_CACHE.get((asset, interval))
+            if cached is not None and cached[0] == marker:
+                _INDICATOR_CACHE.move_to_end((asset, interval))
+                result[asset] = cached[1]
+                continue
+            closes = [float(candle["close"]) for candle in candles]
+            pending.setdefault(len(closes), []).append((asset, marker, closes))
+
+    computed: dict[tuple[str, str], tuple[tuple[datetime, float, int], _Indicators]] = {}
+    for length, group in pending.items():
+        try:
+            rows = _compute_indicator_rows(np.array([closes for _, _, closes in group]))
+        except ValueError as exc:
+            logger.warning(
+                "Skipping indicators for %s series of %s candles: %s", len(group), length, exc
+            )
+            continue
+        for (asset, marker, _), indicators in zip(group, rows):
+            result[asset] = indicators
+            computed[(asset, interval)] = (marker, indicators)
+
+    if computed:
+        with _INDICATOR_CACHE_LOCK:
+            for key, entry in computed.items():
+                _INDICATOR_CACHE[key] = entry
+                _INDICATOR_CACHE.move_to_end(key)
+            while len(_INDICATOR_CACHE) > INDICATOR_CACHE_MAX_ENTRIES:
+                _INDICATOR_CACHE.popitem(last=False)
+    return result
+
+
+def _clamp(value: float, lower: float, upper: float) -> float:
+    return max(lower, min(upper, value))
 
 
 def _round_price(value: float) -> float:
@@ -553,15 +599,22 @@ def _build_signal(
     risk_profile: RiskProfile,
     candles: list[dict[str, Any]],
     sentiment_score: int | float | None = None,
+    indicators: _Indicators | None = None,
 ) -> Signal:
-    closes = [float(candle["close"]) for candle in candles]
-    latest_close = closes[-1]
+    if indicators is None:
+        indicators = _compute_indicators({asset: candles}).get(asset)
+        if indicators is None:
+            raise ValueError(f"Not enough candles to compute indicators for {asset}")
+    latest_close = float(candles[-1]["close"])
     entry_price = latest_close
     latest_time = candles[-1]["open_time"]
     settings = _PROFILE_SETTINGS[risk_profile]
-    rsi = round(_compute_rsi(closes), 2)
-    macd_line, signal_line, histogram, macd_sentiment = _compute_macd(closes)
-    bands = _compute_bollinger_bands(closes)
+    rsi = round(indicators.rsi, 2)
+    macd_line = indicators.macd_line
+    signal_line = indicators.signal_line
+    histogram = indicators.histogram
+    macd_sentiment = indicators.macd_sentiment
+    bands = indicators.bands
 
     buy_score = 0.0
     sell_score = 0.0
@@ -729,15 +782,24 @@ def _build_signals_for_profile(
     risk_profile: RiskProfile,
     snapshots_by_asset: dict[str, dict[str, Any]],
     sentiment_score: int | float | None,
+    indicators_by_asset: dict[str, _Indicators] | None = None,
 ) -> list[Signal]:
+    if indicators_by_asset is None:
+        indicators_by_asset = _compute_indicators(
+            {asset: snapshot["candles"] for asset, snapshot in snapshots_by_asset.items()}
+        )
     signals: list[Signal] = []
     for asset, snapshot in snapshots_by_asset.items():
         try:
+            indicators = indicators_by_asset.get(asset)
+            if indicators is None:
+                raise ValueError("Not enough candles to compute indicators")
             signal = _build_signal(
                 asset=asset,
                 risk_profile=risk_profile,
                 candles=snapshot["candles"],
                 sentiment_score=sentiment_score,
+                indicators=indicators,
             )
             signals.append(signal)
         except Exception as exc:
@@ -757,6 +819,9 @@ async def _compute_signal_feed_snapshots() -> dict[RiskProfile, SignalFeedSnapsh
         logger.warning("Failed to refresh market sentiment for signals snapshot: %s", exc)
 
     snapshots_by_asset, cached_at, is_stale = await _fetch_market_snapshots(all_usdt_pairs)
+    indicators_by_asset = _compute_indicators(
+        {asset: snapshot["candles"] for asset, snapshot in snapshots_by_asset.items()}
+    )
     refreshed_at = _utc_now()
     return {
         risk_profile: SignalFeedSnapshot(
@@ -765,6 +830,7 @@ async def _compute_signal_feed_snapshots() -> dict[RiskProfile, SignalFeedSnapsh
                 risk_profile=risk_profile,
                 snapshots_by_asset=snapshots_by_asset,
                 sentiment_score=sentiment_score,
+                indicators_by_asset=indicators_by_asset,
             ),
             available_assets=list(all_usdt_pairs),
             cached_at=cached_at,
@@ -1,16 +1,14 @@
 from __future__ import annotations
 
-import hashlib
-import hmac
-import json
 import os
 import time
-import urllib.parse
-import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.config import get_settings
+from app.services.binance_http import get_gateway
 from app.services.binance_prices import compute_usdt_price_for_asset, fetch_all_binance_prices
+from app.services.binance_trade_history import get_trade_history_store
 from app.services.binance_trades import (
     EARN_STABLE_PREFIX,
     compute_avg_buy_cost_usdt,
@@ -53,15 +51,16 @@ def _signed_get(
     *,
     timeout_s: int,
 ) -> Dict[str, Any]:
-    query = urllib.parse.urlencode(params)
-    signature = hmac.new(api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
-    url = f"{base_url}{path}?{query}&signature={signature}"
-
-    req = urllib.request.Request(url)
-    req.add_header("X-MBX-APIKEY", api_key)
-
-    with urllib.request.urlopen(req, timeout=float(timeout_s)) as f:
-        return json.load(f)
+    response = get_gateway().signed_request(
+        "GET",
+        f"{base_url.rstrip('/')}{path}",
+        api_key=api_key,
+        api_secret=api_secret,
+        params=params,
+        timeout_s=float(timeout_s),
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 def _earn_base_asset(asset: str) -> Optional[str]:
@@ -149,6 +148,22 @@ def _append_balance_row(
     )
 
 
+def _apply_avg_cost(row: Dict[str, Any], avg_cost_usdt: Optional[float]) -> None:
+    row["avg_cost_usdt"] = avg_cost_usdt
+
+    price_usdt = row.get("price_usdt")
+    total = float(row.get("total") or 0.0)
+
+    pnl_usd = None
+    pnl_pct = None
+    if avg_cost_usdt is not None and price_usdt is not None and float(avg_cost_usdt) > 0:
+        pnl_usd = (float(price_usdt) - float(avg_cost_usdt)) * float(total)
+        pnl_pct = ((float(price_usdt) / float(avg_cost_usdt)) - 1.0) * 100.0
+
+    row["pnl_usd"] = pnl_usd
+    row["pnl_pct"] = pnl_pct
+
+
 def fetch_spot_balances_snapshot(
     *,
     lookback_days: Optional[int] = None,
@@ -166,10 +181,15 @@ def fetch_spot_balances_snapshot(
 
     Safeguards:
       - HTTP timeout (env BINANCE_HTTP_TIMEOUT_SECONDS; default 10, clamped 1..60)
-      - Max symbols to query trade history for (env BINANCE_MAX_TRADE_SYMBOLS; default 15, clamped 0..200)
+      - Max symbols to query trade history for (env BINANCE_MAX_TRADE_SYMBOLS; default 200, clamped 0..200)
       - Total time budget for trade-history lookups (env BINANCE_TRADE_LOOKUPS_BUDGET_SECONDS; default 15, clamped 1..120)
+      - Concurrent trade-history lookups (env BINANCE_TRADE_LOOKUP_CONCURRENCY; default 8, clamped 1..32)
       - Optional lookback window applied when deriving avg_cost_usdt
 
+    Trade history is cached per account and refreshed incrementally with
+    ``fromId`` (see ``binance_trade_history``), so a refresh only downloads new
+    trades and can cover every asset of the wallet.
+
     Returns:
       {
         "balances": [{"asset","free","locked","total","earn_amount","price_usdt","value_usd"}, ...],
@@ -198,8 +218,9 @@ def fetch_spot_balances_snapshot(
         )
 
     timeout_s = _clamp_int(_get_int_env("BINANCE_HTTP_TIMEOUT_SECONDS", 10), 1, 60)
-    max_trade_symbols = _clamp_int(_get_int_env("BINANCE_MAX_TRADE_SYMBOLS", 15), 0, 200)
+    max_trade_symbols = _clamp_int(_get_int_env("BINANCE_MAX_TRADE_SYMBOLS", 200), 0, 200)
     trade_budget_s = _clamp_int(_get_int_env("BINANCE_TRADE_LOOKUPS_BUDGET_SECONDS", 15), 1, 120)
+    lookup_concurrency = _clamp_int(_get_int_env("BINANCE_TRADE_LOOKUP_CONCURRENCY", 8), 1, 32)
 
     ts = int(time.time() * 1000)
     as_of_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts / 1000.0))
@@ -299,42 +320,48 @@ def fetch_spot_balances_snapshot(
 
     out.sort(key=lambda x: -(float(x.get("value_usd") or 0.0)))
 
-    lookups_started = time.time()
-    trade_lookups = 0
-
-    for row in out:
-        if max_trade_symbols <= 0:
-            break
-        if trade_lookups >= max_trade_symbols:
-            break
-        if (time.time() - lookups_started) > float(trade_budget_s):
-            break
+    lookup_rows = [
+        row for row in out if not is_usd_stable_asset(str(row.get("asset") or "").strip().upper())
+    ][:max_trade_symbols]
 
-        asset = str(row.get("asset") or "").strip().upper()
-        if is_usd_stable_asset(asset):
-            continue
-
-        avg_cost_usdt = compute_avg_buy_cost_usdt(
-            asset,
-            lookback_days=lookback_days,
-            api_key=api_key,
-            api_secret=api_secret,
-            base_url=base_url,
+    if lookup_rows:
+        history = get_trade_history_store(
+            api_key=api_key, api_secret=api_secret, base_url=base_url, timeout_s=timeout_s
         )
-        trade_lookups += 1
-        row["avg_cost_usdt"] = avg_cost_usdt
-
-        price_usdt = row.get("price_usdt")
-        total = float(row.get("total") or 0.0)
-
-        pnl_usd = None
-        pnl_pct = None
-        if avg_cost_usdt is not None and price_usdt is not None and float(avg_cost_usdt) > 0:
-            pnl_usd = (float(price_usdt) - float(avg_cost_usdt)) * float(total)
-            pnl_pct = ((float(price_usdt) / float(avg_cost_usdt)) - 1.0) * 100.0
-
-        row["pnl_usd"] = pnl_usd
-        row["pnl_pct"] = pnl_pct
+        executor = ThreadPoolExecutor(
+            max_workers=min(lookup_concurrency, len(lookup_rows)),
+            thread_name_prefix="binance-trades",
+        )
+        futures = {
+            executor.submit(
+                compute_avg_buy_cost_usdt,
+                str(row.get("asset") or "").strip().upper(),
+                lookback_days=lookback_days,
+                api_key=api_key,
+                api_secret=api_secret,
+                base_url=base_url,
+                history=history,
+            ): row
+            for row in lookup_rows
+        }
+        deadline = time.monotonic() + float(trade_budget_s)
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        avg_cost_usdt = future.result()
+                    except Exception:
+                        avg_cost_usdt = None
+                    _apply_avg_cost(futures[future], avg_cost_usdt)
+        finally:
+            # Lookups still running past the budget finish in the background and
+            # warm the trade-history cache for the next refresh.
+            executor.shutdown(wait=False)
 
     def _sort_key(x: Dict[str, Any]):
         v = x.get("value_usd")
@@ -1,22 +1,22 @@
 from __future__ import annotations
 
 import hashlib
-import hmac
-import json
 import re
-import time
-import urllib.error
-import urllib.parse
-import urllib.request
 from decimal import Decimal, ROUND_DOWN
 from typing import Any, Dict, Optional, Tuple
 
+import httpx
+
 from app.config import get_settings
+from app.services.binance_http import BinanceRateLimitError, get_gateway
+from app.services.binance_market_universe import MarketUniverse, get_market_universe
 
 get_settings()
 
 CLIENT_ORDER_PREFIX = "cfstop_"
 LIMIT_OFFSET_RATIO = Decimal("0.001")
+# Binance code for "Filter failure: ..." (LOT_SIZE, PRICE_FILTER, NOTIONAL, ...).
+FILTER_FAILURE_CODE = -1013
 
 
 class BinanceOrderError(RuntimeError):
@@ -28,12 +28,14 @@ class BinanceOrderError(RuntimeError):
         code: Optional[int] = None,
         outcome_unknown: bool = False,
         safe_for_user: bool = False,
+        retry_after: Optional[float] = None,
     ):
         super().__init__(message)
         self.status_code = status_code
         self.code = code
         self.outcome_unknown = outcome_unknown
         self.safe_for_user = safe_for_user
+        self.retry_after = retry_after
 
 
 def _env_base_url() -> str:
@@ -52,6 +54,18 @@ def _timeout_s() -> int:
         return 10
 
 
+def _error_payload(response: httpx.Response, default_message: str) -> Tuple[Optional[int], str]:
+    code = None
+    message = default_message
+    try:
+        parsed = response.json()
+        code = parsed.get("code")
+        message = str(parsed.get("msg") or message)
+    except Exception:
+        pass
+    return code, message
+
+
 def signed_request(
     *,
     method: str,
@@ -63,36 +77,45 @@ def signed_request(
     timeout_s: Optional[int] = None,
 ) -> Any:
     base = (base_url or _env_base_url()).rstrip("/")
-    payload = dict(params or {})
-    payload["timestamp"] = int(time.time() * 1000)
-    query = urllib.parse.urlencode(payload, doseq=True)
-    signature = hmac.new(api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
-    url = f"{base}{path}?{query}&signature={signature}"
-    req = urllib.request.Request(url, method=method.upper())
-    req.add_header("X-MBX-APIKEY", api_key)
+    is_order_submit = method.upper() == "POST" and path == "/api/v3/order"
     try:
-        with urllib.request.urlopen(req, timeout=float(timeout_s or _timeout_s())) as resp:
-            body = resp.read().decode("utf-8")
-            if not body:
-                return {}
-            return json.loads(body)
-    except urllib.error.HTTPError as exc:
-        raw = exc.read().decode("utf-8", errors="replace")
-        code = None
-        message = "A Binance recusou a solicitação."
-        try:
-            parsed = json.loads(raw)
-            code = parsed.get("code")
-            message = str(parsed.get("msg") or message)
-        except Exception:
-            pass
-        is_order_submit = method.upper() == "POST" and path == "/api/v3/order"
+        response = get_gateway().signed_request(
+            method,
+            f"{base}{path}",
+            api_key=api_key,
+            api_secret=api_secret,
+            params=params,
+            timeout_s=float(timeout_s or _timeout_s()),
+        )
+    except BinanceRateLimitError as exc:
+        # Raised by the local weight budget before anything is sent: the order
+        # was never submitted, so the outcome is known.
+        raise BinanceOrderError(
+            "Limite de requisições da Binance atingido. Tente novamente em instantes.",
+            status_code=429,
+            outcome_unknown=False,
+            safe_for_user=True,
+            retry_after=exc.retry_after,
+        ) from exc
+    except Exception as exc:
+        raise BinanceOrderError(
+            "Falha ao falar com a Binance.",
+            status_code=502,
+            outcome_unknown=is_order_submit,
+        ) from exc
+
+    if response.status_code >= 400:
+        code, message = _error_payload(response, "A Binance recusou a solicitação.")
+        http_status = int(response.status_code or 0)
         # 429/418 (rate limit) are enforced before order processing by Binance, so a
         # rejected submit here is a definitive non-execution, not an unknown outcome.
         outcome_unknown = is_order_submit and (
-            int(exc.code or 0) >= 500 or int(exc.code or 0) == 408 or code in {-1006, -1007}
+            http_status >= 500 or http_status == 408 or code in {-1006, -1007}
         )
         status = 403 if code in (-2014, -2015, -1022) else (502 if outcome_unknown else 400)
+        if code == FILTER_FAILURE_CODE:
+            # Filters changed on Binance's side; reload them before the next preview.
+            _symbol_index(base).invalidate()
         if code in (-2014, -2015):
             message = (
                 "Chave Binance sem permissão de Spot Trading ou inválida. "
@@ -104,9 +127,13 @@ def signed_request(
             code=code,
             outcome_unknown=outcome_unknown,
             safe_for_user=code in (-2014, -2015),
-        ) from exc
+        )
+
+    if not response.content:
+        return {}
+    try:
+        return response.json()
     except Exception as exc:
-        is_order_submit = method.upper() == "POST" and path == "/api/v3/order"
         raise BinanceOrderError(
             "Falha ao falar com a Binance.",
             status_code=502,
@@ -118,27 +145,20 @@ def public_get(
     path: str, params: Optional[Dict[str, Any]] = None, *, base_url: Optional[str] = None
 ) -> Any:
     base = (base_url or _env_base_url()).rstrip("/")
-    query = urllib.parse.urlencode(params or {}, doseq=True)
-    url = f"{base}{path}" + (f"?{query}" if query else "")
-    req = urllib.request.Request(url, method="GET")
     try:
-        with urllib.request.urlopen(req, timeout=float(_timeout_s())) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as exc:
-        raw = exc.read().decode("utf-8", errors="replace")
-        code = None
-        message = "A Binance recusou a consulta pública."
-        try:
-            parsed = json.loads(raw)
-            code = parsed.get("code")
-            message = str(parsed.get("msg") or message)
-        except Exception:
-            pass
-        status = 502 if int(exc.code or 0) >= 500 or int(exc.code or 0) == 429 else 400
-        raise BinanceOrderError(message, status_code=status, code=code) from exc
+        response = get_gateway().request(
+            "GET", f"{base}{path}", params=dict(params or {}), timeout_s=float(_timeout_s())
+        )
+        if response.status_code < 400:
+            return response.json()
     except Exception as exc:
         raise BinanceOrderError(f"Falha ao consultar exchangeInfo: {exc}", status_code=502) from exc
 
+    code, message = _error_payload(response, "A Binance recusou a consulta pública.")
+    http_status = int(response.status_code or 0)
+    status = 502 if http_status >= 500 or http_status == 429 else 400
+    raise BinanceOrderError(message, status_code=status, code=code)
+
 
 def normalize_symbol(symbol: str) -> str:
     value = re.sub(r"[^A-Za-z0-9]", "", str(symbol or "")).upper()
@@ -171,12 +191,22 @@ def _filter_map(symbol_info: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     return out
 
 
+def _symbol_index(base_url: Optional[str] = None) -> MarketUniverse:
+    return get_market_universe((base_url or _env_base_url()).rstrip("/"))
+
+
 def get_symbol_info(symbol: str, *, base_url: Optional[str] = None) -> Dict[str, Any]:
     sym = normalize_symbol(symbol)
+    index = _symbol_index(base_url)
+    cached = index.get(sym)
+    if cached is not None:
+        return cached
+    # Not in the bulk snapshot (new listing or index unavailable): ask for this symbol.
     info = public_get("/api/v3/exchangeInfo", {"symbol": sym}, base_url=base_url)
     symbols = info.get("symbols") or []
     if not symbols:
         raise BinanceOrderError(f"Símbolo {sym} não encontrado na Binance Spot")
+    index.put(symbols[0])
     return symbols[0]
 
 
@@ -3,8 +3,7 @@ from __future__ import annotations
 import logging
 import os
 
-import httpx
-
+from app.services.binance_market_universe import get_market_universe
 from app.services.exchange_service import ExchangeService
 from app.symbols_config import is_excluded_symbol
 
@@ -19,7 +18,6 @@ FALLBACK_BINANCE_USDT_SYMBOLS = [
 ]
 
 _ALL_SYMBOL_SENTINELS = {"*", "all", "binance:all", "binance_all"}
-BINANCE_EXCHANGE_INFO_URL = "https://api.binance.com/api/v3/exchangeInfo"
 
 
 def _normalize_explicit_symbols(raw_symbols: str) -> list[str]:
@@ -63,24 +61,11 @@ def _apply_limit(symbols: list[str]) -> list[str]:
 
 
 def _fetch_trading_spot_usdt_symbols() -> list[str]:
-    timeout = httpx.Timeout(20.0)
-    with httpx.Client(timeout=timeout) as client:
-        response = client.get(BINANCE_EXCHANGE_INFO_URL)
-        response.raise_for_status()
-        payload = response.json()
-
     resolved: list[str] = []
-    for item in payload.get("symbols", []):
-        if item.get("status") != "TRADING":
-            continue
-        if item.get("quoteAsset") != "USDT":
-            continue
-        if item.get("isSpotTradingAllowed") is not True:
-            continue
+    for item in get_market_universe().spot_pairs("USDT"):
         base = str(item.get("baseAsset") or "").strip().upper()
-        if not base:
-            continue
-        resolved.append(f"{base}/USDT")
+        if base:
+            resolved.append(f"{base}/USDT")
     return sorted(dict.fromkeys(resolved))
 
 
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from app.services.binance_http import get_gateway
+from app.services.binance_trades import _buy_trade_sort_key, _latest_buy_trade
+from app.services.redis_store import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+HISTORY_KEY_PREFIX = "binance:trade_history:"
+MY_TRADES_PATH = "/api/v3/myTrades"
+MY_TRADES_PAGE_LIMIT = 1000
+# Binance code for "Invalid symbol." (e.g. ABCUSDC when only ABCUSDT is listed).
+INVALID_SYMBOL_CODE = -1121
+INVALID_SYMBOL_RECHECK_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_PAGES_PER_SYNC = 10
+
+_MEMORY_LOCK = threading.Lock()
+_MEMORY_HISTORY: Dict[str, Dict[str, str]] = {}
+
+
+class BinanceRequestError(RuntimeError):
+    def __init__(self, message: str, *, status_code: Optional[int] = None, code: Any = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+def _history_key(api_key: str, base_url: str) -> str:
+    # Never store the API key itself; a digest is enough to separate users/accounts.
+    digest = hashlib.sha256(f"{base_url.rstrip('/')}|{api_key}".encode()).hexdigest()[:32]
+    return f"{HISTORY_KEY_PREFIX}{digest}"
+
+
+def _compact_trade(trade: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: trade.get(k) for k in ("id", "time", "price", "qty", "isBuyer")}
+
+
+def _max_trade_id(trades: List[Dict[str, Any]]) -> Optional[int]:
+    ids = []
+    for t in trades:
+        try:
+            ids.append(int(t.get("id")))
+        except (TypeError, ValueError):
+            continue
+    return max(ids) if ids else None
+
+
+class TradeHistoryStore:
+    """Per-account incremental ``myTrades`` cache (Redis hash, in-memory fallback).
+
+    Each symbol keeps the last seen trade id and the latest buy trade. A refresh
+    only asks Binance for trades after that id (``fromId``), so repeated wallet
+    snapshots cost one small request per symbol instead of re-reading history.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        api_secret: str,
+        base_url: str,
+        timeout_s: float,
+        fetch_page: Optional[Callable[[str, Optional[int]], List[Dict[str, Any]]]] = None,
+        max_pages_per_sync: int = DEFAULT_MAX_PAGES_PER_SYNC,
+    ):
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._base_url = base_url
+        self._timeout_s = timeout_s
+        self._key = _history_key(api_key, base_url)
+        self._fetch_page = fetch_page or self._fetch_page_http
+        self._max_pages = max(1, int(max_pages_per_sync))
+        self._redis = get_redis_client()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # -- persistence -------------------------------------------------------
+    def _load_entry(self, symbol: str) -> Dict[str, Any]:
+        raw: Optional[str] = None
+        if self._redis is not None:
+            try:
+                raw = self._redis.hget(self._key, symbol)
+            except RedisError as exc:
+                logger.warning("Failed to load trade history for %s from Redis: %s", symbol, exc)
+                self._redis = None
+        if self._redis is None:
+            with _MEMORY_LOCK:
+                raw = _MEMORY_HISTORY.get(self._key, {}).get(symbol)
+        if not raw:
+            return {}
+        try:
+            entry = json.loads(raw)
+        except json.JSONDecodeError:
+            return {}
+        return entry if isinstance(entry, dict) else {}
+
+    def _save_entry(self, symbol: str, entry: Dict[str, Any]) -> None:
+        payload = json.dumps(entry, separators=(",", ":"))
+        if self._redis is not None:
+            try:
+                self._redis.hset(self._key, symbol, payload)
+                return
+            except RedisError as exc:
+                logger.warning("Failed to persist trade history for %s to Redis: %s", symbol, exc)
+                self._redis = None
+        with _MEMORY_LOCK:
+            _MEMORY_HISTORY.setdefault(self._key, {})[symbol] = payload
+
+    # -- fetching ----------------------------------------------------------
+    def _fetch_page_http(self, symbol: str, from_id: Optional[int]) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"symbol": symbol, "limit": MY_TRADES_PAGE_LIMIT}
+        if from_id is not None:
+            params["fromId"] = int(from_id)
+        try:
+            response = get_gateway().signed_request(
+                "GET",
+                f"{self._base_url.rstrip('/')}{MY_TRADES_PATH}",
+                api_key=self._api_key,
+                api_secret=self._api_secret,
+                params=params,
+                timeout_s=self._timeout_s,
+            )
+        except Exception as exc:
+            raise BinanceRequestError(f"{MY_TRADES_PATH} request failed: {exc}") from exc
+        if response.status_code >= 400:
+            code = None
+            try:
+                code = (response.json() or {}).get("code")
+            except Exception:
+                pass
+            raise BinanceRequestError(
+                f"{MY_TRADES_PATH} returned HTTP {response.status_code}",
+                status_code=response.status_code,
+                code=code,
+            )
+        try:
+            payload = response.json()
+        except ValueError as exc:
+            raise BinanceRequestError(f"{MY_TRADES_PATH} returned invalid JSON") from exc
+        return payload if isinstance(payload, list) else []
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def sync_symbol(self, symbol: str) -> Dict[str, Any]:
+        """Fetch trades newer than the stored cursor and return the updated entry."""
+        symbol = symbol.upper()
+        with self._symbol_lock(symbol):
+            entry = self._load_entry(symbol)
+            now_ms = int(time.time() * 1000)
+            if entry.get("invalid") and (now_ms - int(entry.get("checked_at") or 0)) < (
+                INVALID_SYMBOL_RECHECK_SECONDS * 1000
+            ):
+                return entry
+
+            last_id = entry.get("last_id")
+            latest_buy = entry.get("latest_buy")
+            # First sync reads the newest page only (same window the old lookup used);
+            # later syncs page forward from the stored id until they catch up.
+            from_id = int(last_id) + 1 if last_id is not None else None
+            try:
+                for _ in range(self._max_pages):
+                    page = self._fetch_page(symbol, from_id)
+                    if not page:
+                        break
+                    candidates = [t for t in (latest_buy, _latest_buy_trade(page)) if t]
+                    latest_buy = (
+                        _compact_trade(max(candidates, key=_buy_trade_sort_key))
+                        if candidates
+                        else None
+                    )
+                    page_max = _max_trade_id(page)
+                    if page_max is not None:
+                        last_id = max(page_max, int(last_id)) if last_id is not None else page_max
+                    if from_id is None or page_max is None or len(page) < MY_TRADES_PAGE_LIMIT:
+                        break
+                    from_id = last_id + 1
+            except BinanceRequestError as exc:
+                if exc.code == INVALID_SYMBOL_CODE:
+                    entry = {"invalid": True, "checked_at": now_ms}
+                    self._save_entry(symbol, entry)
+                    return entry
+                # Keep serving the cached cursor; the next refresh retries.
+                logger.info("Trade history refresh failed for %s: %s", symbol, exc)
+                return entry
+
+            entry = {"last_id": last_id, "latest_buy": latest_buy, "checked_at": now_ms}
+            self._save_entry(symbol, entry)
+            return entry
+
+    def latest_buy_trade(
+        self, symbol: str, *, lookback_days: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Latest buy for ``symbol`` after an incremental sync (None if outside lookback)."""
+        latest_buy = self.sync_symbol(symbol).get("latest_buy")
+        if not latest_buy:
+            return None
+        if lookback_days is not None:
+            days = max(1, min(3650, int(lookback_days)))
+            cutoff_ms = int(time.time() * 1000) - days * 24 * 60 * 60 * 1000
+            try:
+                if int(float(latest_buy.get("time"))) < cutoff_ms:
+                    return None
+            except (TypeError, ValueError):
+                return None
+        return latest_buy
+
+
+def get_trade_history_store(
+    *, api_key: str, api_secret: str, base_url: str, timeout_s: float
+) -> TradeHistoryStore:
+    return TradeHistoryStore(
+        api_key=api_key, api_secret=api_secret, base_url=base_url, timeout_s=timeout_s
+    )
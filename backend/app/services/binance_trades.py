@@ -1,15 +1,14 @@
 from __future__ import annotations
 
-import hashlib
-import hmac
-import json
 import os
 import time
-import urllib.parse
-import urllib.request
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from app.config import get_settings
+from app.services.binance_http import get_gateway
+
+if TYPE_CHECKING:
+    from app.services.binance_trade_history import TradeHistoryStore
 
 # Ensure .env files are loaded before runtime os.getenv lookups below.
 get_settings()
@@ -64,15 +63,16 @@ def _signed_get(
     *,
     timeout_s: int,
 ) -> Any:
-    query = urllib.parse.urlencode(params)
-    signature = hmac.new(api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
-    url = f"{base_url}{path}?{query}&signature={signature}"
-
-    req = urllib.request.Request(url)
-    req.add_header("X-MBX-APIKEY", api_key)
-
-    with urllib.request.urlopen(req, timeout=float(timeout_s)) as f:
-        return json.load(f)
+    response = get_gateway().signed_request(
+        "GET",
+        f"{base_url.rstrip('/')}{path}",
+        api_key=api_key,
+        api_secret=api_secret,
+        params=params,
+        timeout_s=float(timeout_s),
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 def fetch_my_trades(
@@ -231,6 +231,7 @@ def compute_avg_buy_cost_usdt(
     api_key: Optional[str] = None,
     api_secret: Optional[str] = None,
     base_url: Optional[str] = None,
+    history: Optional["TradeHistoryStore"] = None,
 ) -> Optional[float]:
     """Compute latest buy trade reference price for an asset across stable quotes.
 
@@ -239,6 +240,9 @@ def compute_avg_buy_cost_usdt(
 
     lookback_days:
       - If set, filters fetched trades to the lookback window.
+    history:
+      - Optional incremental trade-history store; when given, only trades newer
+        than its cursor are requested instead of the latest ``myTrades`` page.
     """
 
     a = (asset or "").strip().upper()
@@ -252,14 +256,17 @@ def compute_avg_buy_cost_usdt(
 
     for quote in COST_QUOTE_SUFFIXES:
         symbol = f"{a}{quote}"
-        trades = fetch_my_trades(
-            symbol,
-            lookback_days=lookback_days,
-            api_key=api_key,
-            api_secret=api_secret,
-            base_url=base_url,
-        )
-        candidate = _latest_buy_trade(trades)
+        if history is not None:
+            candidate = history.latest_buy_trade(symbol, lookback_days=lookback_days)
+        else:
+            trades = fetch_my_trades(
+                symbol,
+                lookback_days=lookback_days,
+                api_key=api_key,
+                api_secret=api_secret,
+                base_url=base_url,
+            )
+            candidate = _latest_buy_trade(trades)
         if candidate is None:
             continue
         trade_time = _buy_trade_sort_key(candidate)
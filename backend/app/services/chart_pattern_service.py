@@ -5,9 +5,15 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 SOURCE_NAME = "chart_pattern_service"
-__all__ = ["ChartPatternConfig", "detect_chart_pattern_events", "detect_chart_patterns"]
+__all__ = [
+    "ChartPatternConfig",
+    "detect_chart_pattern_events",
+    "detect_chart_patterns",
+    "rescan_start",
+]
 
 
 @dataclass(frozen=True)
@@ -21,20 +27,19 @@ class ChartPatternConfig:
     dedupe_window_bars: int = 10
 
 
-@dataclass(frozen=True)
-class Pivot:
-    index: int
-    kind: str
-    price: float
-
-
 def detect_chart_patterns(
     df: pd.DataFrame,
     config: ChartPatternConfig | None = None,
+    *,
+    start_pos: int = 0,
 ) -> pd.Series:
     """
     Return a Series aligned to df.index where each row contains zero or more
     chart-pattern event dictionaries.
+
+    With ``start_pos`` only the tail is rescanned: rows before it come back
+    empty and only the bars that events from ``start_pos`` on can depend on
+    (pivot pair, confirmation wait and dedupe window) are read.
     """
     cfg = config or ChartPatternConfig()
     events_by_pos: list[list[dict[str, Any]]] = [[] for _ in range(len(df))]
@@ -42,10 +47,23 @@ def detect_chart_patterns(
     if df.empty:
         return pd.Series([], index=df.index, dtype=object)
 
-    events = _detect_moving_average_crosses(df)
-    events.extend(_detect_double_patterns(df, cfg))
-    for event in _dedupe_events(events, cfg.dedupe_window_bars):
-        events_by_pos[event.pop("_pos")].append(event)
+    start_pos = max(0, min(int(start_pos), len(df)))
+    scan_from = max(0, start_pos - _context_bars(cfg))
+    events = _detect_moving_average_crosses(df, scan_from=scan_from)
+    events.extend(_detect_double_patterns(df, cfg, scan_from=scan_from))
+    # Timestamps and JSON metadata are only built for the events that survive dedupe.
+    kept = [
+        event
+        for event in _dedupe_events(events, cfg.dedupe_window_bars)
+        if event["_pos"] >= start_pos
+    ]
+    timestamps = _row_timestamps(df, [event["_pos"] for event in kept])
+    for event, timestamp in zip(kept, timestamps):
+        pos = event.pop("_pos")
+        event["ts"] = timestamp
+        event["reference_price"] = _json_float(event["reference_price"])
+        event["metadata"] = _jsonify(event["metadata"])
+        events_by_pos[pos].append(event)
 
     return pd.Series(events_by_pos, index=df.index, dtype=object)
 
@@ -53,276 +71,281 @@ def detect_chart_patterns(
 def detect_chart_pattern_events(
     df: pd.DataFrame,
     config: ChartPatternConfig | None = None,
+    *,
+    start_pos: int = 0,
 ) -> list[list[dict[str, Any]]]:
     """Return chart-pattern events as a plain list aligned to dataframe rows."""
-    return detect_chart_patterns(df, config).tolist()
+    return detect_chart_patterns(df, config, start_pos=start_pos).tolist()
+
+
+def rescan_start(first_new_pos: int, config: ChartPatternConfig | None = None) -> int:
+    """First row whose events can change once candles from ``first_new_pos`` on arrive.
 
+    A pivot is only confirmed ``pivot_window`` bars after it, so patterns completed
+    by new candles may land on the last rows of the previous scan.
+    """
+    cfg = config or ChartPatternConfig()
+    return max(0, int(first_new_pos) - max(0, cfg.pivot_window))
+
+
+def _context_bars(cfg: ChartPatternConfig) -> int:
+    return (
+        max(0, cfg.pivot_window)
+        + max(0, cfg.max_pattern_width)
+        + max(0, cfg.max_confirmation_bars)
+        + max(0, cfg.dedupe_window_bars)
+        + 1
+    )
 
-def _detect_moving_average_crosses(df: pd.DataFrame) -> list[dict[str, Any]]:
+
+def _detect_moving_average_crosses(df: pd.DataFrame, *, scan_from: int = 0) -> list[dict[str, Any]]:
     if "sma_20" not in df.columns or "sma_50" not in df.columns:
         return []
 
     fast = pd.to_numeric(df["sma_20"], errors="coerce")
     slow = pd.to_numeric(df["sma_50"], errors="coerce")
-    close = _numeric_column(df, "close", fallback=(fast + slow) / 2)
+    close = _numeric_column(df, "close", fallback=(fast + slow) / 2).to_numpy(dtype=float)
+    fast_values = fast.to_numpy(dtype=float)
+    slow_values = slow.to_numpy(dtype=float)
+    valid = ~(np.isnan(fast_values) | np.isnan(slow_values))
+    delta = fast_values - slow_values
+    previous_delta, current_delta = delta[:-1], delta[1:]
+    both_valid = valid[:-1] & valid[1:]
+    golden = both_valid & (previous_delta <= 0) & (current_delta > 0)
+    death = both_valid & (previous_delta >= 0) & (current_delta < 0)
+    crosses = np.flatnonzero(golden | death) + 1
     events: list[dict[str, Any]] = []
 
-    for pos in range(1, len(df)):
-        values = (fast.iat[pos - 1], slow.iat[pos - 1], fast.iat[pos], slow.iat[pos])
-        if any(pd.isna(value) for value in values):
-            continue
-
-        previous_delta = float(values[0] - values[1])
-        current_delta = float(values[2] - values[3])
-        if previous_delta <= 0 < current_delta:
-            events.append(
-                _make_event(
-                    pos=pos,
-                    df=df,
-                    pattern="golden_cross",
-                    direction="bullish",
-                    confidence=100.0,
-                    reference_price=close.iat[pos],
-                    dedupe_key=f"golden_cross:{pos}",
-                    metadata={
-                        "fast_ma": "sma_20",
-                        "slow_ma": "sma_50",
-                        "fast_value": values[2],
-                        "slow_value": values[3],
-                    },
-                )
-            )
-        elif previous_delta >= 0 > current_delta:
-            events.append(
-                _make_event(
-                    pos=pos,
-                    df=df,
-                    pattern="death_cross",
-                    direction="bearish",
-                    confidence=100.0,
-                    reference_price=close.iat[pos],
-                    dedupe_key=f"death_cross:{pos}",
-                    metadata={
-                        "fast_ma": "sma_20",
-                        "slow_ma": "sma_50",
-                        "fast_value": values[2],
-                        "slow_value": values[3],
-                    },
-                )
+    for pos in crosses[crosses >= scan_from + 1].tolist():
+        pattern, direction = (
+            ("golden_cross", "bullish") if golden[pos - 1] else ("death_cross", "bearish")
+        )
+        events.append(
+            _make_event(
+                pos=pos,
+                pattern=pattern,
+                direction=direction,
+                confidence=100.0,
+                reference_price=close[pos],
+                dedupe_key=f"{pattern}:{pos}",
+                metadata={
+                    "fast_ma": "sma_20",
+                    "slow_ma": "sma_50",
+                    "fast_value": fast_values[pos],
+                    "slow_value": slow_values[pos],
+                },
             )
+        )
 
     return events
 
 
-def _detect_double_patterns(df: pd.DataFrame, cfg: ChartPatternConfig) -> list[dict[str, Any]]:
+def _detect_double_patterns(
+    df: pd.DataFrame, cfg: ChartPatternConfig, *, scan_from: int = 0
+) -> list[dict[str, Any]]:
     if not {"high", "low", "close"}.issubset(df.columns):
         return []
 
-    high = _numeric_column(df, "high")
-    low = _numeric_column(df, "low")
-    close = _numeric_column(df, "close")
-    pivot_highs = _find_pivots(high, kind="high", window=cfg.pivot_window)
-    pivot_lows = _find_pivots(low, kind="low", window=cfg.pivot_window)
-
-    events = _detect_double_top(df, low, close, pivot_highs, cfg)
-    events.extend(_detect_double_bottom(df, high, close, pivot_lows, cfg))
+    high = _numeric_column(df, "high").to_numpy(dtype=float)
+    low = _numeric_column(df, "low").to_numpy(dtype=float)
+    close = _numeric_column(df, "close").to_numpy(dtype=float)
+    pivot_highs = _find_pivots(high[scan_from:], kind="high", window=cfg.pivot_window)
+    pivot_lows = _find_pivots(low[scan_from:], kind="low", window=cfg.pivot_window)
+    pivot_highs = (pivot_highs[0] + scan_from, pivot_highs[1])
+    pivot_lows = (pivot_lows[0] + scan_from, pivot_lows[1])
+
+    events = [
+        _double_pattern_event(candidate, pattern="double_top", direction="bearish")
+        for candidate in _double_pattern_candidates(low, close, pivot_highs, cfg, kind="top")
+    ]
+    events.extend(
+        _double_pattern_event(candidate, pattern="double_bottom", direction="bullish")
+        for candidate in _double_pattern_candidates(high, close, pivot_lows, cfg, kind="bottom")
+    )
     return events
 
 
-def _detect_double_top(
-    df: pd.DataFrame,
-    low: pd.Series,
-    close: pd.Series,
-    pivots: list[Pivot],
+def _double_pattern_candidates(
+    neckline_source: np.ndarray,
+    close: np.ndarray,
+    pivots: tuple[np.ndarray, np.ndarray],
     cfg: ChartPatternConfig,
+    *,
+    kind: str,
 ) -> list[dict[str, Any]]:
-    events: list[dict[str, Any]] = []
-    for left_pos, first in enumerate(pivots):
-        for second in pivots[left_pos + 1 :]:
-            if not _valid_pivot_pair(first, second, cfg):
-                continue
-
-            similarity = _price_similarity(first.price, second.price)
-            if similarity < 1 - cfg.price_tolerance_pct:
-                continue
-
-            neckline_values = low.iloc[first.index : second.index + 1].to_numpy(dtype=float)
-            valid_neckline_values = neckline_values[np.isfinite(neckline_values)]
-            if valid_neckline_values.size == 0:
-                continue
-            neckline_offset = int(np.nanargmin(neckline_values))
-            neckline_pos = first.index + neckline_offset
-            neckline = float(low.iat[neckline_pos])
-            peak = max(first.price, second.price)
-            depth_pct = _safe_ratio(peak - neckline, peak)
-            if depth_pct < cfg.min_neckline_depth_pct:
-                continue
-
-            confirm_pos = _first_confirming_close(
-                close,
-                start=second.index + 1,
-                end=min(len(df) - 1, second.index + cfg.max_confirmation_bars),
-                threshold=neckline,
-                direction="below",
-            )
-            if confirm_pos is None:
-                continue
-
-            confirmation_strength = _safe_ratio(neckline - float(close.iat[confirm_pos]), neckline)
-            confidence = _double_pattern_confidence(
-                similarity=similarity,
-                depth_pct=depth_pct,
-                confirmation_strength=confirmation_strength,
-            )
-            signature = f"{first.index}-{second.index}-{neckline_pos}"
-            events.append(
-                _make_event(
-                    pos=confirm_pos,
-                    df=df,
-                    pattern="double_top",
-                    direction="bearish",
-                    confidence=confidence,
-                    reference_price=close.iat[confirm_pos],
-                    dedupe_key=f"double_top:bearish:{signature}",
-                    metadata={
-                        "first_pivot_index": first.index,
-                        "second_pivot_index": second.index,
-                        "first_pivot_price": first.price,
-                        "second_pivot_price": second.price,
-                        "neckline_index": neckline_pos,
-                        "neckline": neckline,
-                        "similarity": similarity,
-                        "depth_pct": depth_pct,
-                        "confirmation_close": close.iat[confirm_pos],
-                    },
-                )
-            )
-    return events
+    """Confirmed double tops (``kind="top"``) or bottoms, evaluated on pivot-pair arrays.
 
+    Tops take the neckline at the lowest low between the pivots and confirm on the
+    first close below it; bottoms mirror that with the highest high and a close
+    above. Candidates come back in pivot-pair order.
+    """
+    positions, prices = pivots
+    first, second = _pivot_pairs(positions, cfg)
+    if first.size == 0 or cfg.max_confirmation_bars < 1:
+        return []
 
-def _detect_double_bottom(
-    df: pd.DataFrame,
-    high: pd.Series,
-    close: pd.Series,
-    pivots: list[Pivot],
-    cfg: ChartPatternConfig,
-) -> list[dict[str, Any]]:
-    events: list[dict[str, Any]] = []
-    for left_pos, first in enumerate(pivots):
-        for second in pivots[left_pos + 1 :]:
-            if not _valid_pivot_pair(first, second, cfg):
-                continue
-
-            similarity = _price_similarity(first.price, second.price)
-            if similarity < 1 - cfg.price_tolerance_pct:
-                continue
-
-            neckline_values = high.iloc[first.index : second.index + 1].to_numpy(dtype=float)
-            valid_neckline_values = neckline_values[np.isfinite(neckline_values)]
-            if valid_neckline_values.size == 0:
-                continue
-            neckline_offset = int(np.nanargmax(neckline_values))
-            neckline_pos = first.index + neckline_offset
-            neckline = float(high.iat[neckline_pos])
-            trough = min(first.price, second.price)
-            depth_pct = _safe_ratio(neckline - trough, neckline)
-            if depth_pct < cfg.min_neckline_depth_pct:
-                continue
-
-            confirm_pos = _first_confirming_close(
-                close,
-                start=second.index + 1,
-                end=min(len(df) - 1, second.index + cfg.max_confirmation_bars),
-                threshold=neckline,
-                direction="above",
-            )
-            if confirm_pos is None:
-                continue
-
-            confirmation_strength = _safe_ratio(float(close.iat[confirm_pos]) - neckline, neckline)
-            confidence = _double_pattern_confidence(
-                similarity=similarity,
-                depth_pct=depth_pct,
-                confirmation_strength=confirmation_strength,
-            )
-            signature = f"{first.index}-{second.index}-{neckline_pos}"
-            events.append(
-                _make_event(
-                    pos=confirm_pos,
-                    df=df,
-                    pattern="double_bottom",
-                    direction="bullish",
-                    confidence=confidence,
-                    reference_price=close.iat[confirm_pos],
-                    dedupe_key=f"double_bottom:bullish:{signature}",
-                    metadata={
-                        "first_pivot_index": first.index,
-                        "second_pivot_index": second.index,
-                        "first_pivot_price": first.price,
-                        "second_pivot_price": second.price,
-                        "neckline_index": neckline_pos,
-                        "neckline": neckline,
-                        "similarity": similarity,
-                        "depth_pct": depth_pct,
-                        "confirmation_close": close.iat[confirm_pos],
-                    },
-                )
-            )
-    return events
+    similarity = _price_similarities(prices[first], prices[second])
+    keep = similarity >= 1 - cfg.price_tolerance_pct
+    first, second, similarity = first[keep], second[keep], similarity[keep]
+    if first.size == 0:
+        return []
 
+    first_pos, second_pos = positions[first], positions[second]
+    # Tops search the minimum of the lows; bottoms the maximum of the highs (negated).
+    sign = 1.0 if kind == "top" else -1.0
+    neckline_pos, found = _range_argmin(neckline_source * sign, first_pos, second_pos)
+    neckline = neckline_source[neckline_pos]
+    if kind == "top":
+        extreme = np.maximum(prices[first], prices[second])
+        depth_pct = _safe_ratios(extreme - neckline, extreme)
+    else:
+        extreme = np.minimum(prices[first], prices[second])
+        depth_pct = _safe_ratios(neckline - extreme, neckline)
+    keep = found & (depth_pct >= cfg.min_neckline_depth_pct)
+
+    confirm_pos, confirmed = _first_confirming_close(
+        close,
+        start=second_pos[keep] + 1,
+        bars=cfg.max_confirmation_bars,
+        threshold=neckline[keep],
+        direction="below" if kind == "top" else "above",
+    )
+    selected = np.flatnonzero(keep)[confirmed]
+    confirm_pos = confirm_pos[confirmed]
+    # Same rule as _dedupe_events, applied before any event dict is built.
+    kept = _dedupe_mask(confirm_pos, cfg.dedupe_window_bars)
+    selected, confirm_pos = selected[kept], confirm_pos[kept]
+
+    candidates: list[dict[str, Any]] = []
+    for row, pos in zip(selected.tolist(), confirm_pos.tolist()):
+        row_neckline = float(neckline[row])
+        confirmation_close = close[pos]
+        if kind == "top":
+            strength = _safe_ratio(row_neckline - float(confirmation_close), row_neckline)
+        else:
+            strength = _safe_ratio(float(confirmation_close) - row_neckline, row_neckline)
+        candidates.append(
+            {
+                "pos": pos,
+                "first_index": int(first_pos[row]),
+                "second_index": int(second_pos[row]),
+                "first_price": float(prices[first[row]]),
+                "second_price": float(prices[second[row]]),
+                "neckline_index": int(neckline_pos[row]),
+                "neckline": row_neckline,
+                "similarity": float(similarity[row]),
+                "depth_pct": float(depth_pct[row]),
+                "confirmation_close": confirmation_close,
+                "confirmation_strength": strength,
+            }
+        )
+    return candidates
 
-def _find_pivots(series: pd.Series, *, kind: str, window: int) -> list[Pivot]:
-    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
-    pivots: list[Pivot] = []
-    if window < 1 or len(values) < window * 2 + 1:
-        return pivots
 
-    for pos in range(window, len(values) - window):
-        value = values[pos]
-        if not np.isfinite(value):
-            continue
-        neighborhood = values[pos - window : pos + window + 1]
-        if np.any(~np.isfinite(neighborhood)):
-            continue
-        if (
-            kind == "high"
-            and value == np.max(neighborhood)
-            and np.count_nonzero(neighborhood == value) == 1
-        ):
-            pivots.append(Pivot(index=pos, kind=kind, price=float(value)))
-        elif (
-            kind == "low"
-            and value == np.min(neighborhood)
-            and np.count_nonzero(neighborhood == value) == 1
-        ):
-            pivots.append(Pivot(index=pos, kind=kind, price=float(value)))
-    return pivots
-
-
-def _valid_pivot_pair(first: Pivot, second: Pivot, cfg: ChartPatternConfig) -> bool:
-    distance = second.index - first.index
-    return cfg.min_pivot_separation <= distance <= cfg.max_pattern_width
+def _double_pattern_event(
+    candidate: dict[str, Any], *, pattern: str, direction: str
+) -> dict[str, Any]:
+    confidence = _double_pattern_confidence(
+        similarity=candidate["similarity"],
+        depth_pct=candidate["depth_pct"],
+        confirmation_strength=candidate["confirmation_strength"],
+    )
+    signature = (
+        f"{candidate['first_index']}-{candidate['second_index']}-{candidate['neckline_index']}"
+    )
+    return _make_event(
+        pos=candidate["pos"],
+        pattern=pattern,
+        direction=direction,
+        confidence=confidence,
+        reference_price=candidate["confirmation_close"],
+        dedupe_key=f"{pattern}:{direction}:{signature}",
+        metadata={
+            "first_pivot_index": candidate["first_index"],
+            "second_pivot_index": candidate["second_index"],
+            "first_pivot_price": candidate["first_price"],
+            "second_pivot_price": candidate["second_price"],
+            "neckline_index": candidate["neckline_index"],
+            "neckline": candidate["neckline"],
+            "similarity": candidate["similarity"],
+            "depth_pct": candidate["depth_pct"],
+            "confirmation_close": candidate["confirmation_close"],
+        },
+    )
+
+
+def _find_pivots(values: np.ndarray, *, kind: str, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Positions and prices of strict local highs/lows with ``window`` bars on each side."""
+    values = np.asarray(values, dtype=float)
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+    if kind not in {"high", "low"} or window < 1 or len(values) < window * 2 + 1:
+        return empty
+
+    signed = values if kind == "high" else -values
+    neighborhoods = sliding_window_view(signed, window * 2 + 1)
+    center = neighborhoods[:, window]
+    neighbors = np.maximum(
+        neighborhoods[:, :window].max(axis=1), neighborhoods[:, window + 1 :].max(axis=1)
+    )
+    is_pivot = np.isfinite(neighborhoods).all(axis=1) & (center > neighbors)
+    pivot_positions = np.flatnonzero(is_pivot) + window
+    return pivot_positions, values[pivot_positions]
+
+
+def _pivot_pairs(positions: np.ndarray, cfg: ChartPatternConfig) -> tuple[np.ndarray, np.ndarray]:
+    """Indexes (into ``positions``) of pivot pairs ``min_pivot_separation`` to
+    ``max_pattern_width`` bars apart, ordered by first then second pivot."""
+    count = len(positions)
+    lower = np.searchsorted(positions, positions + cfg.min_pivot_separation, side="left")
+    lower = np.maximum(lower, np.arange(count) + 1)
+    upper = np.searchsorted(positions, positions + cfg.max_pattern_width, side="right")
+    sizes = np.maximum(upper - lower, 0)
+    first = np.repeat(np.arange(count), sizes)
+    offsets = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    second = np.repeat(lower, sizes) + offsets
+    return first, second
+
+
+def _range_argmin(
+    values: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """First position of the minimum of ``values[start:end + 1]`` per range.
+
+    Non-finite values are skipped; ``found`` is False when a range has none.
+    """
+    if starts.size == 0:
+        return starts.copy(), np.zeros(0, dtype=bool)
+    width = int((ends - starts).max()) + 1
+    padded = np.concatenate([values, np.full(width, np.nan)])
+    ranges = sliding_window_view(padded, width)[starts]
+    in_range = np.arange(width) < (ends - starts + 1)[:, None]
+    ranges = np.where(in_range & np.isfinite(ranges), ranges, np.inf)
+    offsets = ranges.argmin(axis=1)
+    found = np.isfinite(ranges[np.arange(len(starts)), offsets])
+    return starts + offsets, found
 
 
 def _first_confirming_close(
-    close: pd.Series,
+    close: np.ndarray,
     *,
-    start: int,
-    end: int,
-    threshold: float,
+    start: np.ndarray,
+    bars: int,
+    threshold: np.ndarray,
     direction: str,
-) -> int | None:
-    if start > end:
-        return None
-    for pos in range(start, end + 1):
-        value = close.iat[pos]
-        if pd.isna(value):
-            continue
-        if direction == "below" and float(value) < threshold:
-            return pos
-        if direction == "above" and float(value) > threshold:
-            return pos
-    return None
+) -> tuple[np.ndarray, np.ndarray]:
+    """First close beyond ``threshold`` within ``bars`` candles from each ``start``.
+
+    Returns positions and a mask of the rows that confirmed.
+    """
+    if start.size == 0:
+        return start.copy(), np.zeros(0, dtype=bool)
+    padded = np.concatenate([close, np.full(bars + 1, np.nan)])
+    windows = sliding_window_view(padded, bars)[start]
+    if direction == "below":
+        hits = windows < threshold[:, None]
+    else:
+        hits = windows > threshold[:, None]
+    return start + hits.argmax(axis=1), hits.any(axis=1)
 
 
 def _dedupe_events(events: list[dict[str, Any]], window: int) -> list[dict[str, Any]]:
@@ -352,6 +375,21 @@ def _dedupe_events(events: list[dict[str, Any]], window: int) -> list[dict[str,
     return deduped
 
 
+def _dedupe_mask(positions: np.ndarray, window: int) -> np.ndarray:
+    """Events of one pattern/direction that ``_dedupe_events`` keeps (input order)."""
+    keep = np.ones(len(positions), dtype=bool)
+    if window < 1:
+        return keep
+    order = np.argsort(positions, kind="stable")
+    last_kept = None
+    for row, pos in zip(order.tolist(), positions[order].tolist()):
+        if last_kept is not None and pos - last_kept <= window:
+            keep[row] = False
+        else:
+            last_kept = pos
+    return keep
+
+
 def _double_pattern_confidence(
     *,
     similarity: float,
@@ -367,7 +405,6 @@ def _double_pattern_confidence(
 def _make_event(
     *,
     pos: int,
-    df: pd.DataFrame,
     pattern: str,
     direction: str,
     confidence: float,
@@ -380,25 +417,43 @@ def _make_event(
         "pattern": pattern,
         "direction": direction,
         "confidence": _clamp_confidence(confidence),
-        "ts": _row_timestamp(df, pos),
-        "reference_price": _json_float(reference_price),
+        "ts": None,
+        "reference_price": reference_price,
         "source": SOURCE_NAME,
         "dedupe_key": dedupe_key,
-        "metadata": _jsonify(metadata),
+        "metadata": metadata,
     }
 
 
-def _row_timestamp(df: pd.DataFrame, pos: int) -> str | None:
+def _row_timestamps(df: pd.DataFrame, positions: list[int]) -> list[str | None]:
     for column in ("ts", "timestamp", "timestamp_utc"):
         if column in df.columns:
-            value = df[column].iat[pos]
-            if pd.isna(value):
-                return None
-            parsed = pd.to_datetime(value, utc=True, errors="coerce")
-            if pd.isna(parsed):
-                return str(value)
-            return parsed.isoformat().replace("+00:00", "Z")
-    index_value = df.index[pos]
+            values = df[column]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                return _iso_timestamps(pd.DatetimeIndex(values.iloc[positions]))
+            return [_row_timestamp(values.iat[pos]) for pos in positions]
+    if isinstance(df.index, pd.DatetimeIndex):
+        return _iso_timestamps(df.index[positions])
+    return [_index_timestamp(df.index[pos]) for pos in positions]
+
+
+def _iso_timestamps(stamps: pd.DatetimeIndex) -> list[str | None]:
+    stamps = stamps.tz_localize("UTC") if stamps.tz is None else stamps.tz_convert("UTC")
+    return [
+        None if pd.isna(stamp) else stamp.isoformat().replace("+00:00", "Z") for stamp in stamps
+    ]
+
+
+def _row_timestamp(value: Any) -> str | None:
+    if pd.isna(value):
+        return None
+    parsed = pd.to_datetime(value, utc=True, errors="coerce")
+    if pd.isna(parsed):
+        return str(value)
+    return parsed.isoformat().replace("+00:00", "Z")
+
+
+def _index_timestamp(index_value: Any) -> str | None:
     if isinstance(index_value, (int, float, np.integer, np.floating)):
         return None
     parsed = pd.to_datetime(index_value, utc=True, errors="coerce")
@@ -415,11 +470,11 @@ def _numeric_column(df: pd.DataFrame, column: str, fallback: pd.Series | None =
     return pd.Series(np.nan, index=df.index, dtype=float)
 
 
-def _price_similarity(first: float, second: float) -> float:
-    denominator = max(abs(first), abs(second))
-    if denominator <= 0:
-        return 0.0
-    return 1.0 - min(1.0, abs(first - second) / denominator)
+def _price_similarities(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    denominator = np.maximum(np.abs(first), np.abs(second))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = 1.0 - np.minimum(1.0, np.abs(first - second) / denominator)
+    return np.where(denominator > 0, similarity, 0.0)
 
 
 def _safe_ratio(numerator: float, denominator: float) -> float:
@@ -429,6 +484,13 @@ def _safe_ratio(numerator: float, denominator: float) -> float:
     return float(ratio) if np.isfinite(ratio) else 0.0
 
 
+def _safe_ratios(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = numerator / denominator
+    valid = (denominator != 0) & np.isfinite(denominator) & np.isfinite(ratios)
+    return np.where(valid, ratios, 0.0)
+
+
 def _clamp_confidence(value: float) -> float:
     if not np.isfinite(value):
         return 0.0
@@ -11,14 +11,19 @@ Features:
 - Deep Backtesting: Integrated simulation for precision testing using 15m intraday data.
 """
 
+import contextlib
 import json
 import concurrent.futures
 import os
 import time
 import logging
 import itertools  # For Grid Search cartesian product
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # Log 15m coverage warning only once per symbol per process (avoids thousands of identical lines)
@@ -31,8 +36,26 @@ from app.services.market_data_providers import (
     validate_data_source_timeframe,
 )
 from src.data.incremental_loader import IncrementalLoader
-from app.services.deep_backtest import simulate_execution_with_15m
+from app.services.deep_backtest import (
+    simulate_execution_with_15m,
+    simulate_execution_with_15m_array,
+)
 from app.metrics.indicators import ensure_ta_lib_context_columns
+from app.metrics.regime import segment_trades_by_regime
+from app.metrics.trade_arrays import (
+    DIRECTION_LONG,
+    DIRECTION_SHORT,
+    REASON_SIGNAL,
+    REASON_STOP_LOSS,
+    TradeArray,
+    as_trade_array,
+    compounded_equity,
+    empty_trade_metrics,
+    entry_times_to_ns,
+    metrics_from_returns,
+    order_by_entry,
+    trade_returns,
+)
 
 # -----------------------------------------------------------------------------
 # WORKER-SIDE INTRADAY CACHE (per process)
@@ -40,14 +63,27 @@ from app.metrics.indicators import ensure_ta_lib_context_columns
 # IMPORTANT:
 # - This cache lives inside each ProcessPoolExecutor worker process.
 # - It only becomes effective if we reuse the same executor across stages/rounds.
-_WORKER_15M_CACHE: Dict[str, Any] = {"key": None, "df": None}
+# - LRU: no batch em painel vários símbolos intercalam tarefas no mesmo worker, então
+#   o cache guarda pelo menos um DF por símbolo em voo (ver set_worker_15m_cache_size).
+WORKER_15M_CACHE_SIZE = 4
+_WORKER_15M_CACHE: "OrderedDict[Tuple[str, str, str], pd.DataFrame]" = OrderedDict()
+
+
+def set_worker_15m_cache_size(size: int) -> None:
+    """Ajusta o LRU de 15m do worker (chamado no initializer do pool do batch)."""
+    global WORKER_15M_CACHE_SIZE
+    WORKER_15M_CACHE_SIZE = max(1, int(size))
+    while len(_WORKER_15M_CACHE) > WORKER_15M_CACHE_SIZE:
+        _WORKER_15M_CACHE.popitem(last=False)
 
 
 def _worker_get_15m_cache(symbol: str, since_str: str, until_str: str) -> Optional[pd.DataFrame]:
     """Load (or reuse) the 15m DF in the current worker process."""
     key = (symbol, since_str, until_str)
-    if _WORKER_15M_CACHE.get("key") == key and _WORKER_15M_CACHE.get("df") is not None:
-        return _WORKER_15M_CACHE["df"]
+    cached = _WORKER_15M_CACHE.get(key)
+    if cached is not None:
+        _WORKER_15M_CACHE.move_to_end(key)
+        return cached
 
     loader = IncrementalLoader()
     df_15m = loader.fetch_intraday_data(
@@ -57,8 +93,10 @@ def _worker_get_15m_cache(symbol: str, since_str: str, until_str: str) -> Option
         until_str=until_str,
         read_only=True,
     )
-    _WORKER_15M_CACHE["key"] = key
-    _WORKER_15M_CACHE["df"] = df_15m
+    if df_15m is not None:
+        _WORKER_15M_CACHE[key] = df_15m
+        while len(_WORKER_15M_CACHE) > WORKER_15M_CACHE_SIZE:
+            _WORKER_15M_CACHE.popitem(last=False)
     return df_15m
 
 
@@ -74,6 +112,129 @@ def split_train_holdout(df: pd.DataFrame, train_ratio: float) -> tuple[pd.DataFr
     return sorted_df.iloc[:split_idx].copy(), sorted_df.iloc[split_idx:].copy()
 
 
+WALK_FORWARD_MODES = ("rolling", "anchored")
+
+
+def walk_forward_fold_windows(
+    n_candles: int, folds: int, *, train_ratio: float = 0.7, mode: str = "rolling"
+) -> List[Dict[str, Any]]:
+    """Janelas posicionais [início, fim) de um walk-forward em ``folds``.
+
+    Os testes são contíguos, disjuntos e cobrem a cauda da série; cada treino
+    termina onde começa o teste do seu fold. O primeiro treino mantém a
+    proporção ``train_ratio`` em relação ao teste: ``rolling`` desliza um treino
+    desse tamanho e ``anchored`` o expande desde o primeiro candle. Com
+    ``folds=1`` as janelas coincidem com ``split_train_holdout``.
+    """
+    if mode not in WALK_FORWARD_MODES:
+        raise ValueError(f"walk-forward mode must be one of {WALK_FORWARD_MODES} (got {mode})")
+    if folds < 1:
+        raise ValueError(f"folds must be >= 1 (got {folds})")
+    if not (0.0 < train_ratio < 1.0):
+        raise ValueError(f"train_ratio must be between 0 and 1 (got {train_ratio})")
+    first_test = int(n_candles * train_ratio / (folds * (1.0 - train_ratio) + train_ratio))
+    test_span = n_candles - first_test
+    if first_test < 2 or test_span < folds:
+        raise ValueError(f"Not enough candles ({n_candles}) for {folds} walk-forward folds")
+    bounds = [first_test + (test_span * i) // folds for i in range(folds + 1)]
+    windows = []
+    for fold in range(folds):
+        test_start, test_end = bounds[fold], bounds[fold + 1]
+        train_start = 0 if mode == "anchored" else test_start - first_test
+        windows.append(
+            {"fold": fold, "train": (train_start, test_start), "test": (test_start, test_end)}
+        )
+    return windows
+
+
+def _add_regime_column(df: pd.DataFrame) -> pd.DataFrame:
+    """Adiciona a coluna ``regime`` (Bull/Bear/Unknown: close vs SMA_50, ou SMA_200)
+    usada pelas heavy metrics; frames que já a possuem são devolvidos como estão."""
+    if df is None or "regime" in df.columns:
+        return df
+    try:
+        df = ensure_ta_lib_context_columns(df)
+
+        # Use SMA_50 as fallback for better coverage (SMA_200 has more warmup NaNs)
+        if "SMA_50" not in df.columns and "SMA_200" in df.columns:
+            df["SMA_50"] = df["SMA_200"]
+
+        sma_col = "SMA_50" if "SMA_50" in df.columns else "SMA_200"
+        if sma_col in df.columns:
+            # Create regime with proper NaN handling
+            df["regime"] = "Unknown"
+            mask_bull = df["close"] > df[sma_col]
+            mask_bear = df["close"] < df[sma_col]
+            df.loc[mask_bull, "regime"] = "Bull"
+            df.loc[mask_bear, "regime"] = "Bear"
+
+            # Log regime distribution for debugging
+            regime_counts = df["regime"].value_counts()
+            logging.info(f"Regime distribution using {sma_col}: {regime_counts.to_dict()}")
+    except Exception as e:
+        logging.warning(f"Failed to enrich final DF with regime: {e}")
+    return df
+
+
+def _add_stage_regime_column(df: pd.DataFrame) -> pd.DataFrame:
+    """Cópia com colunas de contexto e ``regime`` (close vs SMA_50) para os
+    workers dos estágios; frames vazios ou que já a possuem voltam como estão."""
+    if df is None or df.empty or "regime" in df.columns:
+        return df
+    try:
+        df = df.copy()
+        df = ensure_ta_lib_context_columns(df)
+
+        # Regime Classification with NaN handling
+        sma_col = "SMA_50"
+        if sma_col in df.columns:
+            df["regime"] = "Unknown"
+            mask_bull = df["close"] > df[sma_col]
+            mask_bear = df["close"] < df[sma_col]
+            df.loc[mask_bull, "regime"] = "Bull"
+            df.loc[mask_bear, "regime"] = "Bear"
+    except Exception as e:
+        logging.warning(f"Failed to enrich DF with regime metrics: {e}")
+    return df
+
+
+@dataclass
+class WalkForwardData:
+    """Candles de uma janela já divididos em treino/holdout (card #470).
+
+    Carregado uma vez por símbolo/timeframe/janela e reaproveitado por várias
+    avaliações de parâmetros fixos (``ComboOptimizer.evaluate_fixed_parameters``):
+    o treino já traz as colunas de contexto (SMA/ATR/ADX + ``regime``) e
+    ``intraday`` é o 15m do deep backtest lido uma única vez.
+    """
+
+    symbol: str
+    timeframe: str
+    data_source: str
+    start_date: str
+    end_date: str
+    split_train_ratio: float
+    train: pd.DataFrame
+    holdout: Optional[pd.DataFrame] = None
+    warmup: Optional[pd.DataFrame] = None
+    deep_backtest: bool = False
+    intraday: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class PanelSeed:
+    """Primeiro estágio da rodada 1 de um símbolo, já avaliado em painel (batch).
+
+    ``data`` traz os candles preparados por ``_prepare_optimization_data`` e
+    ``first_stage_results`` os resultados no formato de ``_worker_run_batch``;
+    ``run_optimization(panel_seed=...)`` ranqueia esses resultados e segue só
+    com os estágios e rodadas que divergem por símbolo.
+    """
+
+    data: Dict[str, Any]
+    first_stage_results: List[Dict[str, Any]]
+
+
 # -----------------------------------------------------------------------------
 # WORKER LOGGING (ProcessPoolExecutor workers run in separate processes)
 # -----------------------------------------------------------------------------
@@ -92,6 +253,18 @@ def _init_worker_logging():
     root.addHandler(fh)
 
 
+def _optimization_pool(
+    executor: Optional[concurrent.futures.ProcessPoolExecutor], max_workers: int
+):
+    """Pool de processos da otimização: o ``executor`` compartilhado (batch em
+    painel, vários símbolos no mesmo pool) ou um pool próprio desta execução."""
+    if executor is not None:
+        return contextlib.nullcontext(executor)
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker_logging
+    )
+
+
 # -----------------------------------------------------------------------------
 # SHARED LOGIC HELPER
 # -----------------------------------------------------------------------------
@@ -109,70 +282,80 @@ def extract_trades_from_signals(df_with_signals, stop_loss: float, direction: st
     - STOP LOSS ALWAYS has priority over exit signals
     - Stop loss is checked FIRST on each candle before checking exit signals
     """
+    return extract_trade_array_from_signals(df_with_signals, stop_loss, direction).to_dicts()
+
+
+def extract_trade_array_from_signals(
+    df_with_signals, stop_loss: float, direction: str = "long"
+) -> TradeArray:
+    """
+    Same execution rules as ``extract_trades_from_signals``, returning a ``TradeArray``.
+
+    Walks plain NumPy columns instead of ``iterrows`` and never builds per-trade
+    dicts or ISO strings; used by the optimizer hot path.
+    """
     TRADING_FEE = 0.00075  # Binance spot fee: 0.075%
-    trades = []
-    position = None
     is_short = (direction or "long").lower() == "short"
     stop_loss_pct = float(stop_loss) if stop_loss is not None else 0.0
 
-    for idx, row in df_with_signals.iterrows():
+    index = df_with_signals.index
+    if not isinstance(index, pd.DatetimeIndex):
+        raise TypeError("extract_trade_array_from_signals requires a DatetimeIndex")
+    times_ns = index.as_unit("ns").asi8
+    signals = df_with_signals["signal"].tolist()
+    opens = df_with_signals["open"].to_numpy(dtype=float)
+    stop_side = df_with_signals["high" if is_short else "low"].to_numpy(dtype=float)
+
+    entry_idx: List[int] = []
+    exit_idx: List[int] = []
+    entry_prices: List[float] = []
+    exit_prices: List[float] = []
+    reasons: List[int] = []
+    open_entry = -1
+    entry_price = 0.0
+
+    for i, signal in enumerate(signals):
         # PRIORIDADE 1: Check stop loss FIRST if we have an open position
-        if position is not None and stop_loss_pct > 0:
-            entry_price = position["entry_price"]
+        if open_entry >= 0 and stop_loss_pct > 0:
             if is_short:
                 exact_stop_price = entry_price * (1 + stop_loss_pct)  # short: stop above entry
-                current_high = float(row["high"])
-                hit_stop = current_high >= exact_stop_price
+                hit_stop = stop_side[i] >= exact_stop_price
             else:
                 exact_stop_price = entry_price * (1 - stop_loss_pct)  # long: stop below entry
-                current_low = float(row["low"])
-                hit_stop = current_low <= exact_stop_price
-
+                hit_stop = stop_side[i] <= exact_stop_price
             if hit_stop:
-                position["exit_time"] = idx.isoformat()
-                position["exit_price"] = exact_stop_price
-                if is_short:
-                    # Short PnL: sold at entry*(1-fee), buy back at exit*(1+fee); profit when exit < entry
-                    position["profit"] = (
-                        entry_price * (1 - TRADING_FEE) - exact_stop_price * (1 + TRADING_FEE)
-                    ) / (entry_price * (1 - TRADING_FEE))
-                else:
-                    position["profit"] = (
-                        (exact_stop_price * (1 - TRADING_FEE)) - (entry_price * (1 + TRADING_FEE))
-                    ) / (entry_price * (1 + TRADING_FEE))
-                position["exit_reason"] = "stop_loss"
-                position["signal_type"] = "Stop"
-                trades.append(position)
-                position = None
+                entry_idx.append(open_entry)
+                exit_idx.append(i)
+                entry_prices.append(entry_price)
+                exit_prices.append(exact_stop_price)
+                reasons.append(REASON_STOP_LOSS)
+                open_entry = -1
                 continue
 
         # PRIORIDADE 2: Check signals
-        if row["signal"] == 1 and position is None:
-            position = {
-                "entry_time": idx.isoformat(),
-                "entry_price": float(row["open"]),
-                "type": "short" if is_short else "long",
-                "entry_signal_type": "Vender" if is_short else "Comprar",
-            }
-        elif row["signal"] == -1 and position is not None:
-            exit_price = float(row["open"])
-            entry_price = position["entry_price"]
-            position["exit_time"] = idx.isoformat()
-            position["exit_price"] = exit_price
-            if is_short:
-                position["profit"] = (
-                    entry_price * (1 - TRADING_FEE) - exit_price * (1 + TRADING_FEE)
-                ) / (entry_price * (1 - TRADING_FEE))
-            else:
-                position["profit"] = (
-                    (exit_price * (1 - TRADING_FEE)) - (entry_price * (1 + TRADING_FEE))
-                ) / (entry_price * (1 + TRADING_FEE))
-            position["exit_reason"] = "signal"
-            position["signal_type"] = "Close entry(s) order..."
-            trades.append(position)
-            position = None
-
-    return trades
+        if signal == 1 and open_entry < 0:
+            open_entry = i
+            entry_price = float(opens[i])
+        elif signal == -1 and open_entry >= 0:
+            entry_idx.append(open_entry)
+            exit_idx.append(i)
+            entry_prices.append(entry_price)
+            exit_prices.append(float(opens[i]))
+            reasons.append(REASON_SIGNAL)
+            open_entry = -1
+
+    entry_prices_arr = np.asarray(entry_prices, dtype=float)
+    exit_prices_arr = np.asarray(exit_prices, dtype=float)
+    return TradeArray.from_columns(
+        entry_ns=times_ns[np.asarray(entry_idx, dtype=np.intp)],
+        exit_ns=times_ns[np.asarray(exit_idx, dtype=np.intp)],
+        entry_price=entry_prices_arr,
+        exit_price=exit_prices_arr,
+        profit=trade_returns(entry_prices_arr, exit_prices_arr, is_short, TRADING_FEE),
+        reason=reasons,
+        direction=DIRECTION_SHORT if is_short else DIRECTION_LONG,
+        tz=index.tz,
+    )
 
 
 def extract_trades_with_mode(
@@ -185,6 +368,7 @@ def extract_trades_with_mode(
     df_15m_cache: Optional[pd.DataFrame] = None,
     direction: str = "long",
     return_mode: bool = False,
+    as_array: bool = False,
 ):
     """
     Extract trades using either Fast (daily) or Deep (15m) backtesting mode.
@@ -197,14 +381,16 @@ def extract_trades_with_mode(
         since_str: Start date (required for deep backtest)
         until_str: End date (required for deep backtest)
         direction: "long" (default) or "short"
+        as_array: If True, return a TradeArray instead of a list of dicts
 
     Returns:
-        List of trades
+        List of trades (or TradeArray)
     """
     df_exec = df_with_signals.copy()
+    fast_extract = extract_trade_array_from_signals if as_array else extract_trades_from_signals
 
     if not deep_backtest:
-        trades = extract_trades_from_signals(df_exec, stop_loss, direction)
+        trades = fast_extract(df_exec, stop_loss, direction)
         return (trades, "fast_1d") if return_mode else trades
 
     logger = logging.getLogger(__name__)
@@ -213,7 +399,7 @@ def extract_trades_with_mode(
         logger.warning(
             "Deep Backtesting requires symbol and date range. Falling back to fast mode."
         )
-        trades = extract_trades_from_signals(df_exec, stop_loss, direction)
+        trades = fast_extract(df_exec, stop_loss, direction)
         return (trades, "fast_1d") if return_mode else trades
 
     try:
@@ -233,7 +419,7 @@ def extract_trades_with_mode(
         if df_15m.empty:
             if df_15m_cache is None:  # Only warn if we tried to fetch it
                 logger.warning("No 15m data available. Falling back to fast mode.")
-            trades = extract_trades_from_signals(df_exec, stop_loss, direction)
+            trades = fast_extract(df_exec, stop_loss, direction)
             return (trades, "fast_1d") if return_mode else trades
 
         # Coverage guard: we need 15m for the current day of each trade to simulate stop/target correctly.
@@ -270,30 +456,145 @@ def extract_trades_with_mode(
                         str(intraday_start),
                         str(intraday_end),
                     )
-                trades = extract_trades_from_signals(df_exec, stop_loss, direction)
+                trades = fast_extract(df_exec, stop_loss, direction)
                 return (trades, "fast_1d") if return_mode else trades
         except Exception:
             logger.warning("Failed to validate 15m coverage; falling back to fast mode.")
-            trades = extract_trades_from_signals(df_exec, stop_loss, direction)
+            trades = fast_extract(df_exec, stop_loss, direction)
             return (trades, "fast_1d") if return_mode else trades
 
         if df_15m_cache is None:
             logger.info(f"Fetched {len(df_15m)} 15m candles for deep backtest simulation")
 
-        trades = simulate_execution_with_15m(
+        deep_extract = (
+            simulate_execution_with_15m_array if as_array else simulate_execution_with_15m
+        )
+        trades = deep_extract(
             df_daily_signals=df_exec, df_15m=df_15m, stop_loss=stop_loss, direction=direction
         )
         return (trades, "deep_15m") if return_mode else trades
 
     except Exception as e:
         logger.error(f"Error in deep backtest: {e}. Falling back to fast mode.")
-        trades = extract_trades_from_signals(df_exec, stop_loss, direction)
+        trades = fast_extract(df_exec, stop_loss, direction)
         return (trades, "fast_1d") if return_mode else trades
 
 
+# -----------------------------------------------------------------------------
+# PARAMETER BINDING (compiled once per template + param keys)
+# -----------------------------------------------------------------------------
+# Top-level backtest config keys that never bind to an indicator.
+_UNBOUND_PARAM_KEYS = frozenset({"stop_loss", "timeframe", "direction"})
+
+
+class ParamBindingPlan:
+    """
+    Maps each override key to an (indicator index, params field) slot.
+
+    Built once by ``compile_param_binding_plan``; ``apply`` then writes a
+    combination's values into shallow copies of only the bound indicators.
+    """
+
+    __slots__ = ("slots",)
+
+    def __init__(self, slots: List[tuple]):
+        self.slots = slots  # [(param_key, indicator_index, field), ...] in override order
+
+    def apply(self, indicators: List[Dict[str, Any]], params: Dict[str, Any]):
+        bound = list(indicators)
+        copied: Dict[int, Dict[str, Any]] = {}
+        for param_key, idx, field in self.slots:
+            indicator = copied.get(idx)
+            if indicator is None:
+                indicator = dict(indicators[idx])
+                indicator["params"] = dict(indicator.get("params") or {})
+                copied[idx] = indicator
+                bound[idx] = indicator
+            indicator["params"][field] = params[param_key]
+        return bound
+
+
+def compile_param_binding_plan(indicators: List[Dict[str, Any]], param_keys) -> ParamBindingPlan:
+    """
+    Resolve override keys to indicator slots, first matching indicator wins:
+    1. "alias_param" (e.g. "short_length") - generated by auto-schema
+    2. "type_alias" (e.g. "sma_short") - length/period (default length)
+    3. exact alias (e.g. "short") - length/period (default length)
+    4. "type_param" for indicators without alias (e.g. "rsi_length") - legacy stages
+    Fields added by earlier keys are tracked so length/period resolution matches
+    applying the overrides one by one.
+    """
+    known_fields = [set((ind.get("params") or {}).keys()) for ind in indicators]
+    slots = []
+    for param_key in param_keys:
+        if param_key in _UNBOUND_PARAM_KEYS:
+            continue
+        for idx, indicator in enumerate(indicators):
+            alias = indicator.get("alias", "")
+            type_ = indicator.get("type", "")
+            field = None
+            if alias and param_key.startswith(f"{alias}_"):
+                field = param_key[len(alias) + 1 :]
+            elif alias and (param_key == alias or (type_ and param_key == f"{type_}_{alias}")):
+                if "length" in known_fields[idx]:
+                    field = "length"
+                elif "period" in known_fields[idx]:
+                    field = "period"
+                else:
+                    field = "length"
+            elif (not alias) and type_ and param_key.startswith(f"{type_}_"):
+                field = param_key[len(type_) + 1 :]
+            if field is not None:
+                known_fields[idx].add(field)
+                slots.append((param_key, idx, field))
+                break
+    return ParamBindingPlan(slots)
+
+
 # -----------------------------------------------------------------------------
 # WORKER FUNCTION (Top-level for ProcessPoolExecutor)
 # -----------------------------------------------------------------------------
+def _build_combo_strategy(template_data, params, binding_plan=None):
+    """
+    Build the ComboStrategy for one parameter combination from template data.
+
+    Reconstructs the strategy locally (no DB connection in workers).
+    Returns (strategy, indicators, stop_loss, direction).
+    """
+    indicators = template_data["indicators"]
+    entry_logic = template_data["entry_logic"]
+    exit_logic = template_data["exit_logic"]
+    stop_loss = template_data.get("stop_loss", 0.015)
+
+    # Handle stop_loss if it's a dict with 'default' key
+    if isinstance(stop_loss, dict):
+        stop_loss = stop_loss.get("default", 0.015)
+
+    # Apply parameter overrides through the compiled binding plan (no deepcopy)
+    if params:
+        if binding_plan is None:
+            binding_plan = compile_param_binding_plan(indicators, params)
+        indicators = binding_plan.apply(indicators, params)
+        if "stop_loss" in params:
+            stop_loss = params["stop_loss"]
+
+    from app.strategies.combos import ComboStrategy
+
+    strategy = ComboStrategy(
+        indicators=indicators,
+        entry_logic=entry_logic,
+        exit_logic=exit_logic,
+        stop_loss=stop_loss,
+        direction=(params or {}).get("direction", "long"),
+    )
+
+    # Direction: long (default) or short
+    direction = (params or {}).get("direction", "long")
+    if direction not in ("long", "short"):
+        direction = "long"
+    return strategy, indicators, stop_loss, direction
+
+
 def _run_backtest_logic(
     template_data,
     params,
@@ -304,6 +605,8 @@ def _run_backtest_logic(
     until_str,
     df_15m_cache=None,
     initial_capital=100,
+    binding_plan=None,
+    built_strategy=None,
 ):
     """
     Core backtest logic shared by single and batch workers.
@@ -311,104 +614,19 @@ def _run_backtest_logic(
     Args:
         initial_capital: Capital inicial em USD para cálculo de métricas (padrão: $100)
                         Usado para calcular Return e Profit Factor no estilo TradingView
+        binding_plan: ParamBindingPlan pré-compilado para (template, chaves de params);
+                      compilado na hora quando ausente
+        built_strategy: retorno de ``_build_combo_strategy`` já montado para ``params``
+                        (worker em painel reaproveita a estratégia entre símbolos)
     """
     try:
-        # Reconstruct strategy logic locally to avoid DB connection in worker
-        indicators = template_data["indicators"]
-        entry_logic = template_data["entry_logic"]
-        exit_logic = template_data["exit_logic"]
-        stop_loss = template_data.get("stop_loss", 0.015)
-
-        # Handle stop_loss if it's a dict with 'default' key
-        if isinstance(stop_loss, dict):
-            stop_loss = stop_loss.get("default", 0.015)
-
-        # Apply parameter overrides
-        import copy
-
-        indicators = copy.deepcopy(indicators)
-
-        if params:
-            for param_key, param_value in params.items():
-                if param_key == "stop_loss":
-                    stop_loss = param_value
-                    continue
-
-                if param_key == "timeframe":
-                    continue
-                if param_key == "direction":
-                    continue  # Top-level backtest config, not a strategy parameter
-
-                matched = False
-                for indicator in indicators:
-                    alias = indicator.get("alias", "")
-                    type_ = indicator.get("type", "")
-
-                    # 1. Try "alias_param" format (e.g., "short_length") - Generated by auto-schema
-                    if alias and param_key.startswith(f"{alias}_"):
-                        target_field = param_key[len(alias) + 1 :]
-                        if "params" not in indicator:
-                            indicator["params"] = {}
-                        indicator["params"][target_field] = param_value
-                        matched = True
-                        break
-
-                    # 2. Try "type_alias" format (e.g., "sma_short") - Used in multi_ma_crossover
-                    # Default to 'length' or 'period' if not specified
-                    if alias and type_ and param_key == f"{type_}_{alias}":
-                        if "params" not in indicator:
-                            indicator["params"] = {}
-                        # Try to find which param to update: length, period, or default to length
-                        if "length" in indicator["params"]:
-                            indicator["params"]["length"] = param_value
-                        elif "period" in indicator["params"]:
-                            indicator["params"]["period"] = param_value
-                        else:
-                            indicator["params"]["length"] = param_value  # Fallback
-                        matched = True
-                        break
-
-                    # 3. Try exact alias match (e.g. "short")
-                    if alias and param_key == alias:
-                        if "params" not in indicator:
-                            indicator["params"] = {}
-                        if "length" in indicator["params"]:
-                            indicator["params"]["length"] = param_value
-                        elif "period" in indicator["params"]:
-                            indicator["params"]["period"] = param_value
-                        else:
-                            indicator["params"]["length"] = param_value
-                        matched = True
-                        break
-
-                    # 4. Fallback for indicators without alias:
-                    # allow "type_param" format (e.g. "rsi_length") used by legacy stage generation.
-                    if (not alias) and type_ and param_key.startswith(f"{type_}_"):
-                        target_field = param_key[len(type_) + 1 :]
-                        if "params" not in indicator:
-                            indicator["params"] = {}
-                        indicator["params"][target_field] = param_value
-                        matched = True
-                        break
-
-        # Create strategy instance
-        from app.strategies.combos import ComboStrategy
-
-        strategy = ComboStrategy(
-            indicators=indicators,
-            entry_logic=entry_logic,
-            exit_logic=exit_logic,
-            stop_loss=stop_loss,
-            direction=(params or {}).get("direction", "long"),
+        strategy, indicators, stop_loss, direction = built_strategy or _build_combo_strategy(
+            template_data, params, binding_plan
         )
 
         # Generate signals
         df_with_signals = strategy.generate_signals(df.copy())
 
-        # Direction: long (default) or short
-        direction = (params or {}).get("direction", "long")
-        if direction not in ("long", "short"):
-            direction = "long"
         # Extract trades from signals WITH STOP LOSS using Deep or Fast mode
         trades = extract_trades_with_mode(
             df_with_signals,
@@ -419,6 +637,7 @@ def _run_backtest_logic(
             until_str=until_str,
             df_15m_cache=df_15m_cache,
             direction=direction,
+            as_array=True,
         )
 
         # Construct full effective parameters (médias, stop) para log de "profit fora do range"
@@ -534,9 +753,19 @@ def _worker_run_batch(batch_args):
             pass
 
     # 2. Iterate through batch
+    # Batch args share one unpickled template, so each (template, param keys) plan is compiled once.
+    binding_plans: Dict[tuple, ParamBindingPlan] = {}
     for args in batch_args:
         template_data, params, df, stage_param, value, deep_backtest, _, _, _ = args
 
+        plan_key = (id(template_data), tuple(params or ()))
+        binding_plan = binding_plans.get(plan_key)
+        if binding_plan is None:
+            binding_plan = compile_param_binding_plan(
+                template_data.get("indicators") or [], plan_key[1]
+            )
+            binding_plans[plan_key] = binding_plan
+
         metrics, full_params = _run_backtest_logic(
             template_data,
             params,
@@ -546,26 +775,252 @@ def _worker_run_batch(batch_args):
             since_str,
             until_str,
             df_15m_cache,  # Pass the cached data
+            binding_plan=binding_plan,
         )
 
         # Wrap result to match single worker structure
-        if "error" in metrics:
-            results.append({"value": value, "error": metrics["error"], "success": False})
-        else:
-            results.append(
-                {
-                    "value": value,
-                    "params": params,
-                    "full_params": full_params,
-                    "metrics": metrics,
-                    "trades_count": metrics["total_trades"],
-                    "success": True,
-                }
+        results.append(_stage_result(value, params, metrics, full_params))
+
+    return results
+
+
+def _stage_result(value, params, metrics, full_params):
+    """Resultado de um conjunto de parâmetros no formato dos workers de estágio."""
+    if "error" in metrics:
+        return {"value": value, "error": metrics["error"], "success": False}
+    return {
+        "value": value,
+        "params": params,
+        "full_params": full_params,
+        "metrics": metrics,
+        "trades_count": metrics["total_trades"],
+        "success": True,
+    }
+
+
+def _build_symbol_panel(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Alinha os candles de vários símbolos numa matriz tempo × (símbolo, coluna).
+
+    O índice é a união dos tempos; ``_panel_frame`` recupera o frame original
+    de cada símbolo (linhas fora do seu histórico ficam vazias no painel).
+    """
+    return pd.concat(frames, axis=1, sort=True)
+
+
+def _panel_frame(panel: pd.DataFrame, symbol: str, dtypes: Dict[str, Any]) -> pd.DataFrame:
+    frame = panel[symbol].dropna(how="all")
+    return frame.astype(dtypes)
+
+
+def _worker_run_panel(task):
+    """
+    Worker do batch em painel: um lote de conjuntos de parâmetros avaliado em
+    todos os símbolos de uma matriz alinhada (``_build_symbol_panel``).
+
+    Cada (template, params) monta estratégia e binding plan uma única vez e
+    calcula indicadores/sinais coluna a coluna do painel (TA-Lib é 1-D);
+    trades e métricas saem por símbolo, no formato de ``_worker_run_batch``.
+
+    ``task``: (template_data, [(params, value), ...], panel, contexts), com
+    contexts symbol -> (deep_backtest, since_str, until_str, dtypes).
+    Returns symbol -> lista de resultados, na ordem dos conjuntos.
+    """
+    template_data, param_sets, panel, contexts = task
+
+    # Silence loggers
+    logging.getLogger("src.data.incremental_loader").setLevel(logging.WARNING)
+    logging.getLogger("app.services.deep_backtest").setLevel(logging.WARNING)
+    logging.getLogger("app.services.combo_optimizer").setLevel(logging.WARNING)
+
+    frames = {}
+    caches = {}
+    for symbol, (deep_backtest, since_str, until_str, dtypes) in contexts.items():
+        frames[symbol] = _panel_frame(panel, symbol, dtypes)
+        if deep_backtest:
+            try:
+                caches[symbol] = _worker_get_15m_cache(symbol, since_str, until_str)
+            except Exception:
+                # proceed without cache
+                pass
+
+    results: Dict[str, List[Dict[str, Any]]] = {symbol: [] for symbol in contexts}
+    binding_plans: Dict[tuple, ParamBindingPlan] = {}
+    for params, value in param_sets:
+        plan_key = tuple(params or ())
+        binding_plan = binding_plans.get(plan_key)
+        if binding_plan is None:
+            binding_plan = compile_param_binding_plan(
+                template_data.get("indicators") or [], plan_key
+            )
+            binding_plans[plan_key] = binding_plan
+        try:
+            built = _build_combo_strategy(template_data, params, binding_plan)
+        except Exception as e:
+            for symbol in contexts:
+                results[symbol].append({"value": value, "error": str(e), "success": False})
+            continue
+
+        for symbol, (deep_backtest, since_str, until_str, _) in contexts.items():
+            metrics, full_params = _run_backtest_logic(
+                template_data,
+                params,
+                frames[symbol],
+                deep_backtest,
+                symbol,
+                since_str,
+                until_str,
+                caches.get(symbol),
+                binding_plan=binding_plan,
+                built_strategy=built,
             )
+            results[symbol].append(_stage_result(value, params, metrics, full_params))
+
+    return results
+
+
+def _evaluate_fold_windows(
+    template_data,
+    params,
+    df,
+    windows,
+    deep_backtest,
+    symbol,
+    since_str,
+    until_str,
+    df_15m_cache=None,
+    binding_plan=None,
+    with_trades=False,
+):
+    """
+    Backtest one parameter set on several walk-forward windows.
+
+    Signals (and the indicators behind them) are computed once over the full
+    series and sliced per window, so every fold testing the same parameters
+    shares that work. ``windows`` holds (key, start, end) positional slices;
+    returns key -> {"metrics", "execution_mode", "trades"}.
+    """
+    strategy, _, stop_loss, direction = _build_combo_strategy(template_data, params, binding_plan)
+    df_with_signals = strategy.generate_signals(df.copy())
+    results = {}
+    for key, start, end in windows:
+        extracted, execution_mode = extract_trades_with_mode(
+            df_with_signals.iloc[start:end],
+            stop_loss,
+            deep_backtest=deep_backtest,
+            symbol=symbol,
+            since_str=since_str,
+            until_str=until_str,
+            df_15m_cache=df_15m_cache,
+            direction=direction,
+            return_mode=True,
+            as_array=True,
+        )
+        trades = as_trade_array(extracted)
+        results[key] = {
+            "metrics": _metrics_from_trades(trades, initial_capital=100, context_params=params),
+            "execution_mode": execution_mode,
+            "trades": trades if with_trades else None,
+        }
+    return results
+
+
+def _worker_run_fold_batch(batch_args):
+    """
+    Worker for multi-fold walk-forward batches.
+
+    Each item is (template_data, params, df, windows, deep_backtest, symbol,
+    since_str, until_str, with_trades); uses the per-process 15m cache.
+    """
+    if not batch_args:
+        return []
+
+    # Silence loggers
+    logging.getLogger("src.data.incremental_loader").setLevel(logging.WARNING)
+    logging.getLogger("app.services.deep_backtest").setLevel(logging.WARNING)
+    logging.getLogger("app.services.combo_optimizer").setLevel(logging.WARNING)
+
+    _, _, _, _, deep_backtest, symbol, since_str, until_str, _ = batch_args[0]
+    df_15m_cache = None
+    if deep_backtest:
+        try:
+            df_15m_cache = _worker_get_15m_cache(symbol, since_str, until_str)
+        except Exception:
+            # proceed without cache
+            pass
 
+    results = []
+    binding_plans: Dict[tuple, ParamBindingPlan] = {}
+    for template_data, params, df, windows, deep_backtest, _, _, _, with_trades in batch_args:
+        plan_key = (id(template_data), tuple(params or ()))
+        binding_plan = binding_plans.get(plan_key)
+        if binding_plan is None:
+            binding_plan = compile_param_binding_plan(
+                template_data.get("indicators") or [], plan_key[1]
+            )
+            binding_plans[plan_key] = binding_plan
+        try:
+            windows_result = _evaluate_fold_windows(
+                template_data,
+                params,
+                df,
+                windows,
+                deep_backtest,
+                symbol,
+                since_str,
+                until_str,
+                df_15m_cache,
+                binding_plan=binding_plan,
+                with_trades=with_trades,
+            )
+            results.append({"params": params, "windows": windows_result, "success": True})
+        except Exception as e:
+            results.append({"params": params, "error": str(e), "success": False})
     return results
 
 
+def _mean_fold_metrics(fold_metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Média por chave das métricas numéricas dos folds (dicts aninhados, ex.:
+    ``benchmark``, também são agregados); valores não finitos são ignorados."""
+    merged: Dict[str, Any] = {}
+    keys = {key for metrics in fold_metrics for key in metrics}
+    for key in keys:
+        values = [metrics[key] for metrics in fold_metrics if key in metrics]
+        if values and all(isinstance(v, dict) for v in values):
+            merged[key] = _mean_fold_metrics(values)
+            continue
+        numbers = [
+            float(v)
+            for v in values
+            if isinstance(v, (int, float)) and not isinstance(v, bool) and np.isfinite(v)
+        ]
+        if numbers:
+            merged[key] = float(np.mean(numbers))
+    return merged
+
+
+def _rank_stage_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score stage results ({"params", "metrics"}) as 0.7 * normalized Sharpe +
+    0.3 * normalized total return (min-max within the stage), best first.
+    """
+    if not results:
+        return []
+    sharpes = [r["metrics"]["sharpe_ratio"] for r in results]
+    returns = [r["metrics"]["total_return"] for r in results]
+    min_s, max_s = min(sharpes), max(sharpes)
+    min_r, max_r = min(returns), max(returns)
+    range_s = max_s - min_s
+    range_r = max_r - min_r
+
+    scored = []
+    for res, sharpe, total_return in zip(results, sharpes, returns):
+        ns = (sharpe - min_s) / range_s if range_s > 0 else 0
+        nr = (total_return - min_r) / range_r if range_r > 0 else 0
+        scored.append({**res, "score": (0.7 * ns) + (0.3 * nr)})
+    scored.sort(key=lambda x: x["score"], reverse=True)
+    return scored
+
+
 class ComboOptimizer:
     """
     Optimizer for combo strategies.
@@ -1216,6 +1671,166 @@ class ComboOptimizer:
 
         return selected
 
+    @staticmethod
+    def _stage_param_sets(stage: Dict[str, Any], best_params: Dict[str, Any]) -> List[tuple]:
+        """
+        Parameter sets tested by one stage around ``best_params``.
+
+        Returns (test_params, value) pairs: ``value`` is the combo dict for grid
+        stages and the single value otherwise. Timeframe stages produce none.
+        """
+        stage_param = stage["parameter"]
+        stage_values = stage["values"]
+        param_sets = []
+        if stage.get("grid_mode", False):
+            param_names = stage_param
+            for combo in itertools.product(*stage_values):
+                test_params = best_params.copy()
+
+                # --- HEURISTIC FILTER: Multi MA Logic ---
+                # Optimization: Skip combinations where Short >= Inter or Inter >= Long
+                # This dramatically reduces search space for "Cruzamento Medias" strategy.
+
+                # 1. Identify params by common aliases
+                p_short = None
+                p_inter = None
+                p_long = None
+
+                # Map loop values to temp dict for checking
+                # If param not in loop (grid), check best_params (fixed context)
+                current_combo = dict(zip(param_names, combo))
+                full_context = {**best_params, **current_combo}
+
+                for k, v in full_context.items():
+                    k_lower = k.lower()
+                    # Check aliases (suffix match to handle prefixes like 'ema_short')
+                    if (
+                        k_lower.endswith("media_curta")
+                        or k_lower.endswith("ema_short")
+                        or k_lower.endswith("sma_short")
+                    ):
+                        p_short = v
+                    elif k_lower.endswith("media_inter") or k_lower.endswith("sma_medium"):
+                        p_inter = v
+                    elif k_lower.endswith("media_longa") or k_lower.endswith("sma_long"):
+                        p_long = v
+
+                # 2. Check Logical Constraint if all 3 are present
+                if p_short is not None and p_inter is not None and p_long is not None:
+                    # Ensure values are comparable numbers
+                    try:
+                        if not (float(p_short) < float(p_inter) < float(p_long)):
+                            continue  # SKIP INVALID COMBINATION
+                    except (ValueError, TypeError):
+                        pass  # customized params might be non-numeric, ignore filter
+
+                # ----------------------------------------
+
+                test_params.update(current_combo)
+                param_sets.append((test_params, current_combo))
+        elif stage_param != "timeframe":
+            for value in stage_values:
+                test_params = best_params.copy()
+                test_params[stage_param] = value
+                param_sets.append((test_params, value))
+        return param_sets
+
+    def _run_stage_batches(
+        self,
+        worker_args: List[tuple],
+        max_workers: int,
+        executor: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+    ) -> List[Dict[str, Any]]:
+        """Dispatch one stage's worker args in batches and collect the results."""
+        results = []
+        combinations_count = len(worker_args)
+        BATCH_SIZE = 200
+        worker_batches = [
+            worker_args[i : i + BATCH_SIZE] for i in range(0, len(worker_args), BATCH_SIZE)
+        ]
+
+        total_batches = len(worker_batches)
+        logging.info(f"📦 Dividido em {total_batches} batches de até {BATCH_SIZE} combinações cada")
+        logging.info(f"⚙️  Usando {max_workers} workers em paralelo")
+
+        start_time = time.time()
+        completed_batches = 0
+        processed_combinations = 0
+
+        local_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        exec_to_use = executor
+        if exec_to_use is None:
+            # Backward-compatible fallback: create a pool just for this call.
+            local_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_worker_logging
+            )
+            exec_to_use = local_executor
+
+        futures = {}
+        try:
+            futures = {
+                exec_to_use.submit(_worker_run_batch, batch): i
+                for i, batch in enumerate(worker_batches)
+            }
+            for future in concurrent.futures.as_completed(futures):
+                batch_idx = futures[future]
+                try:
+                    batch_results = future.result()
+                    results.extend(batch_results)
+
+                    # Update progress
+                    completed_batches += 1
+                    processed_combinations += len(worker_batches[batch_idx])
+
+                    # Calculate progress metrics
+                    progress_pct = (completed_batches / total_batches) * 100
+                    elapsed_time = time.time() - start_time
+
+                    # Estimate time remaining
+                    if completed_batches > 0:
+                        avg_time_per_batch = elapsed_time / completed_batches
+                        remaining_batches = total_batches - completed_batches
+                        estimated_remaining = avg_time_per_batch * remaining_batches
+
+                        # Format time
+                        elapsed_min = int(elapsed_time / 60)
+                        elapsed_sec = int(elapsed_time % 60)
+                        remaining_min = int(estimated_remaining / 60)
+                        remaining_sec = int(estimated_remaining % 60)
+
+                        logging.info(
+                            f"✅ Batch {completed_batches}/{total_batches} completo "
+                            f"({progress_pct:.1f}%) | "
+                            f"Processadas: {processed_combinations:,}/{combinations_count:,} | "
+                            f"Tempo: {elapsed_min}m{elapsed_sec}s | "
+                            f"Restante: ~{remaining_min}m{remaining_sec}s"
+                        )
+                except BrokenProcessPool:
+                    # Worker morreu: o pool inteiro está inutilizável; quem o criou refaz.
+                    raise
+                except Exception as e:
+                    logging.warning(f"⚠️ Batch {batch_idx} falhou: {e}")
+                    pass
+        except KeyboardInterrupt:
+            # Do NOT shutdown a shared executor; just cancel pending futures.
+            try:
+                for f in futures:
+                    f.cancel()
+            except Exception:
+                pass
+            raise
+        finally:
+            if local_executor is not None:
+                local_executor.shutdown(wait=True)
+
+        total_time = time.time() - start_time
+        total_min = int(total_time / 60)
+        total_sec = int(total_time % 60)
+        logging.info(
+            f"🏁 Stage completo em {total_min}m{total_sec}s | Total processado: {processed_combinations:,} combinações"
+        )
+        return results
+
     def _execute_opt_stages(
         self,
         stages,
@@ -1233,9 +1848,12 @@ class ComboOptimizer:
         df,
         return_top_n: int = 1,
         executor: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+        first_stage_results: Optional[List[Dict[str, Any]]] = None,
     ):
         """
         Execute all stages for a specific branch/candidate.
+        ``first_stage_results`` replaces dispatching the first stage (results
+        already computed in a cross-symbol panel, same format as the workers).
         Returns:
              If return_top_n > 1 (Grid Mode): List of dicts [{'params':..., 'metrics':...}]
              If return_top_n = 1 (Sequential): (best_params, best_metrics)
@@ -1243,24 +1861,8 @@ class ComboOptimizer:
         best_params = initial_params.copy()
         best_metrics = None
 
-        import time  # Import at function level to avoid UnboundLocalError
-
         # Enrich DF with Regime/Context Metrics (if not present) to enable Worker Logic
-        if df is not None and not df.empty and "regime" not in df.columns:
-            try:
-                df = df.copy()
-                df = ensure_ta_lib_context_columns(df)
-
-                # Regime Classification with NaN handling
-                sma_col = "SMA_50"
-                if sma_col in df.columns:
-                    df["regime"] = "Unknown"
-                    mask_bull = df["close"] > df[sma_col]
-                    mask_bear = df["close"] < df[sma_col]
-                    df.loc[mask_bull, "regime"] = "Bull"
-                    df.loc[mask_bear, "regime"] = "Bear"
-            except Exception as e:
-                logging.warning(f"Failed to enrich DF with regime metrics: {e}")
+        df = _add_stage_regime_column(df)
 
         # -----------------------------------------------------------
         # NOTE: For Multi-Focus Grid (Round 1), we typically have ONE stage (the 4D Grid).
@@ -1273,94 +1875,25 @@ class ComboOptimizer:
 
         for stage in stages:
             stage_param = stage["parameter"]
-            stage_values = stage["values"]
             is_grid_mode = stage.get("grid_mode", False)
 
-            start_time = time.time()
             stage_best_value = None
             stage_best_sharpe = float("-inf")
 
-            worker_args = []
-
-            if is_grid_mode:
-                param_names = stage_param
-                value_lists = stage_values
-                for combo in itertools.product(*value_lists):
-                    test_params = best_params.copy()
-
-                    # --- HEURISTIC FILTER: Multi MA Logic ---
-                    # Optimization: Skip combinations where Short >= Inter or Inter >= Long
-                    # This dramatically reduces search space for "Cruzamento Medias" strategy.
-
-                    # 1. Identify params by common aliases
-                    p_short = None
-                    p_inter = None
-                    p_long = None
-
-                    # Map loop values to temp dict for checking
-                    # If param not in loop (grid), check best_params (fixed context)
-                    current_combo = dict(zip(param_names, combo))
-                    full_context = {**best_params, **current_combo}
-
-                    for k, v in full_context.items():
-                        k_lower = k.lower()
-                        # Check aliases (suffix match to handle prefixes like 'ema_short')
-                        if (
-                            k_lower.endswith("media_curta")
-                            or k_lower.endswith("ema_short")
-                            or k_lower.endswith("sma_short")
-                        ):
-                            p_short = v
-                        elif k_lower.endswith("media_inter") or k_lower.endswith("sma_medium"):
-                            p_inter = v
-                        elif k_lower.endswith("media_longa") or k_lower.endswith("sma_long"):
-                            p_long = v
-
-                    # 2. Check Logical Constraint if all 3 are present
-                    if p_short is not None and p_inter is not None and p_long is not None:
-                        # Ensure values are comparable numbers
-                        try:
-                            if not (float(p_short) < float(p_inter) < float(p_long)):
-                                continue  # SKIP INVALID COMBINATION
-                        except (ValueError, TypeError):
-                            pass  # customized params might be non-numeric, ignore filter
-
-                    # ----------------------------------------
-
-                    for pname, pval in zip(param_names, combo):
-                        test_params[pname] = pval
-                    combo_dict = dict(zip(param_names, combo))
-                    worker_args.append(
-                        (
-                            template_metadata,
-                            test_params,
-                            df,
-                            param_names,
-                            combo_dict,
-                            deep_backtest,
-                            symbol,
-                            start_date,
-                            end_date,
-                        )
-                    )
-            else:
-                for value in stage_values:
-                    test_params = best_params.copy()
-                    if stage_param != "timeframe":
-                        test_params[stage_param] = value
-                        worker_args.append(
-                            (
-                                template_metadata,
-                                test_params,
-                                df,
-                                stage_param,
-                                value,
-                                deep_backtest,
-                                symbol,
-                                start_date,
-                                end_date,
-                            )
-                        )
+            worker_args = [
+                (
+                    template_metadata,
+                    test_params,
+                    df,
+                    stage_param,
+                    value,
+                    deep_backtest,
+                    symbol,
+                    start_date,
+                    end_date,
+                )
+                for test_params, value in self._stage_param_sets(stage, best_params)
+            ]
 
             if not worker_args:
                 continue
@@ -1371,125 +1904,27 @@ class ComboOptimizer:
             logging.info(f"🔢 {stage_name}: Testing {combinations_count} combinations")
             total_combinations_tested += combinations_count
 
-            results = []
-            BATCH_SIZE = 200
-            worker_batches = [
-                worker_args[i : i + BATCH_SIZE] for i in range(0, len(worker_args), BATCH_SIZE)
-            ]
-
-            total_batches = len(worker_batches)
-            logging.info(
-                f"📦 Dividido em {total_batches} batches de até {BATCH_SIZE} combinações cada"
-            )
-            logging.info(f"⚙️  Usando {max_workers} workers em paralelo")
-
-            import concurrent.futures
-
-            start_time = time.time()
-            completed_batches = 0
-            processed_combinations = 0
-
-            local_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
-            exec_to_use = executor
-            if exec_to_use is None:
-                # Backward-compatible fallback: create a pool just for this call.
-                local_executor = concurrent.futures.ProcessPoolExecutor(
-                    max_workers=max_workers, initializer=_init_worker_logging
-                )
-                exec_to_use = local_executor
-
-            futures = {}
-            try:
-                futures = {
-                    exec_to_use.submit(_worker_run_batch, batch): i
-                    for i, batch in enumerate(worker_batches)
-                }
-                for future in concurrent.futures.as_completed(futures):
-                    batch_idx = futures[future]
-                    try:
-                        batch_results = future.result()
-                        results.extend(batch_results)
-
-                        # Update progress
-                        completed_batches += 1
-                        processed_combinations += len(worker_batches[batch_idx])
-
-                        # Calculate progress metrics
-                        progress_pct = (completed_batches / total_batches) * 100
-                        elapsed_time = time.time() - start_time
-
-                        # Estimate time remaining
-                        if completed_batches > 0:
-                            avg_time_per_batch = elapsed_time / completed_batches
-                            remaining_batches = total_batches - completed_batches
-                            estimated_remaining = avg_time_per_batch * remaining_batches
-
-                            # Format time
-                            elapsed_min = int(elapsed_time / 60)
-                            elapsed_sec = int(elapsed_time % 60)
-                            remaining_min = int(estimated_remaining / 60)
-                            remaining_sec = int(estimated_remaining % 60)
-
-                            logging.info(
-                                f"✅ Batch {completed_batches}/{total_batches} completo "
-                                f"({progress_pct:.1f}%) | "
-                                f"Processadas: {processed_combinations:,}/{combinations_count:,} | "
-                                f"Tempo: {elapsed_min}m{elapsed_sec}s | "
-                                f"Restante: ~{remaining_min}m{remaining_sec}s"
-                            )
-                    except Exception as e:
-                        logging.warning(f"⚠️ Batch {batch_idx} falhou: {e}")
-                        pass
-            except KeyboardInterrupt:
-                # Do NOT shutdown a shared executor; just cancel pending futures.
-                try:
-                    for f in futures:
-                        f.cancel()
-                except Exception:
-                    pass
-                raise
-            finally:
-                if local_executor is not None:
-                    local_executor.shutdown(wait=True)
-
-            total_time = time.time() - start_time
-            total_min = int(total_time / 60)
-            total_sec = int(total_time % 60)
-            logging.info(
-                f"🏁 Stage completo em {total_min}m{total_sec}s | Total processado: {processed_combinations:,} combinações"
-            )
+            if first_stage_results is not None:
+                # Avaliado em painel com os demais símbolos do batch: só ranqueia aqui.
+                results, first_stage_results = list(first_stage_results), None
+            else:
+                results = self._run_stage_batches(worker_args, max_workers, executor)
 
             valid_results = [r for r in results if r["success"]]
 
             if valid_results:
-                sharpes = [r["metrics"]["sharpe_ratio"] for r in valid_results]
-                returns = [r["metrics"]["total_return"] for r in valid_results]
-                min_s, max_s = min(sharpes), max(sharpes)
-                min_r, max_r = min(returns), max(returns)
-                range_s = max_s - min_s
-                range_r = max_r - min_r
-
-                # Score all results
-                scored_results = []
+                scored_input = []
                 for res in valid_results:
-                    m = res["metrics"]
-                    s = m["sharpe_ratio"]
-                    r = m["total_return"]
-                    ns = (s - min_s) / range_s if range_s > 0 else 0
-                    nr = (r - min_r) / range_r if range_r > 0 else 0
-                    score = (0.7 * ns) + (0.3 * nr)
-
                     # Construct full params for this result
                     result_params = best_params.copy()
                     if is_grid_mode:
                         result_params.update(res["value"])
                     else:
                         result_params[stage_param] = res["value"]
+                    scored_input.append({"params": result_params, "metrics": res["metrics"]})
 
-                    scored_results.append({"params": result_params, "metrics": m, "score": score})
-
-                # Sort by score
-                scored_results.sort(key=lambda x: x["score"], reverse=True)
+                # Score all results (sorted by score)
+                scored_results = _rank_stage_results(scored_input)
 
                 # If we are in Grid Mode and collecting candidates for branching
                 if is_grid_mode and return_top_n > 1:
@@ -1522,54 +1957,25 @@ class ComboOptimizer:
 
         return best_params, best_metrics
 
-    def run_optimization(
+    def _prepare_optimization_data(
         self,
-        template_name: str,
         symbol: str,
-        timeframe: str = "1h",
-        data_source: Optional[str] = None,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        custom_ranges: Optional[Dict[str, Any]] = None,
-        deep_backtest: bool = True,  # Default to Deep Backtesting
-        job_id: Optional[str] = None,
-        direction: str = "long",
-        split_train_ratio: Optional[float] = None,
+        timeframe: str,
+        selected_data_source: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        deep_backtest: bool,
+        split_train_ratio: Optional[float],
+        multi_fold: bool,
     ) -> Dict[str, Any]:
-        """Run parameter optimization.
-
-        Args:
-            split_train_ratio: quando informado (ex.: 0.7), a otimização roda
-                somente no treino (fração mais antiga dos candles) e o resultado
-                final inclui métricas do holdout (período mais recente) com
-                veredito GO/NO-GO (walk-forward gate, card #470). None mantém o
-                comportamento legado (período inteiro, sem gate).
         """
-        if direction not in ("long", "short"):
-            direction = "long"
-
-        optimization_start_time = time.time()
-        # If data_source is omitted, infer based on symbol:
-        # - symbols without "/" are treated as US tickers -> stooq
-        # - symbols with "/" are treated as crypto pairs -> ccxt
-        inferred = data_source
-        if inferred is None or str(inferred).strip() == "":
-            inferred = resolve_data_source_for_symbol(symbol, None)
-
-        selected_data_source = validate_data_source_timeframe(inferred, timeframe)
-
-        # Generate stages
-        fixed_timeframe = timeframe if timeframe else None
-        stages = self.generate_stages(
-            template_name=template_name,
-            symbol=symbol,
-            fixed_timeframe=fixed_timeframe,
-            custom_ranges=custom_ranges,
-        )
-
-        # Get template metadata ONCE for workers
-        template_metadata = self.combo_service.get_template_metadata(template_name)
+        Candles de uma otimização: período padrão, split treino/holdout e
+        prefetch do 15m (deep backtest).
 
+        Returns:
+            Dict com provider, start_date, end_date, df (treino quando há
+            split), df_holdout, df_train_tail_for_warmup e deep_backtest.
+        """
         # Ensure we have date ranges for Deep Backtesting
         # If not provided, use full period (2017-present for comprehensive testing)
         start_date_defaulted = False
@@ -1595,7 +2001,7 @@ class ComboOptimizer:
         # final result includes holdout metrics with GO/NO-GO verdict.
         df_holdout = None
         df_train_tail_for_warmup = None
-        if split_train_ratio is not None:
+        if split_train_ratio is not None and not multi_fold:
             try:
                 train_full, df_holdout = split_train_holdout(df, float(split_train_ratio))
                 # Burn-in: tail do treino para warmup de indicadores do holdout
@@ -1621,72 +2027,23 @@ class ComboOptimizer:
         # Workers will only READ the parquet slice (read_only=True) to avoid concurrent writes/corruption.
         # After prefetch, ensure 15m tail is up to end_date (self-healing: avoids stale cache for this symbol).
         if deep_backtest and selected_data_source == "ccxt":
-            try:
-                # For "all history", align intraday start to the first available daily candle
-                # (avoids downloading 15m before the exchange has data for the symbol).
-                intraday_since = start_date
-                allow_large = False
-                if start_date_defaulted and df is not None and not df.empty:
-                    intraday_since = pd.Timestamp(df.index.min()).date().isoformat()
-                    allow_large = True
-                    logging.warning(
-                        "Deep backtest requested for full history. Building/expanding 15m cache for %s from %s..%s. "
-                        "This may take a long time on first run.",
-                        symbol,
-                        intraday_since,
-                        end_date,
-                    )
-                self.loader.fetch_intraday_data(
-                    symbol=symbol,
-                    timeframe="15m",
-                    since_str=intraday_since,
-                    until_str=end_date,
-                    read_only=False,
-                    allow_large_backfill=allow_large,
-                )
-            except Exception as e:
+            # For "all history", align intraday start to the first available daily candle
+            # (avoids downloading 15m before the exchange has data for the symbol).
+            intraday_since = start_date
+            allow_large = False
+            if start_date_defaulted and df is not None and not df.empty:
+                intraday_since = pd.Timestamp(df.index.min()).date().isoformat()
+                allow_large = True
                 logging.warning(
-                    "Prefetch 15m failed for %s (%s..%s): %s. Deep backtest will fall back to fast mode.",
+                    "Deep backtest requested for full history. Building/expanding 15m cache for %s from %s..%s. "
+                    "This may take a long time on first run.",
                     symbol,
-                    start_date,
+                    intraday_since,
                     end_date,
-                    e,
                 )
-            # Self-healing: ensure 15m cache extends to end_date (handles stale cache or partial prefetch failure).
-            try:
-                from datetime import datetime as _dt, timedelta
-
-                info = self.loader.check_intraday_availability(symbol, "15m")
-                end_dt = _dt.strptime(end_date, "%Y-%m-%d")
-                need_tail = False
-                if not info.get("available") or not info.get("coverage"):
-                    need_tail = True  # No cache or empty: try last 30 days only
-                else:
-                    cache_end_str = info["coverage"].get("end")
-                    if cache_end_str:
-                        cache_end = pd.Timestamp(cache_end_str)
-                        if getattr(cache_end, "tz", None) is None:
-                            cache_end = cache_end.tz_localize("UTC")
-                        if cache_end.date() < end_dt.date():
-                            need_tail = True
-                if need_tail:
-                    tail_since = (end_dt - timedelta(days=30)).strftime("%Y-%m-%d")
-                    logging.info(
-                        "15m cache lags behind end_date; updating tail for %s (%s to %s)",
-                        symbol,
-                        tail_since,
-                        end_date,
-                    )
-                    self.loader.fetch_intraday_data(
-                        symbol=symbol,
-                        timeframe="15m",
-                        since_str=tail_since,
-                        until_str=end_date,
-                        read_only=False,
-                        allow_large_backfill=False,
-                    )
-            except Exception as e2:
-                logging.debug("15m tail update check failed: %s", e2)
+            self._prefetch_intraday(
+                symbol, intraday_since, end_date, allow_large_backfill=allow_large
+            )
             logging.info(
                 "Deep backtest ON: workers will use 15m intraday data for exit simulation (stop/target precision)."
             )
@@ -1697,6 +2054,230 @@ class ComboOptimizer:
             )
             deep_backtest = False
 
+        return {
+            "provider": provider,
+            "start_date": start_date,
+            "end_date": end_date,
+            "df": df,
+            "df_holdout": df_holdout,
+            "df_train_tail_for_warmup": df_train_tail_for_warmup,
+            "deep_backtest": deep_backtest,
+        }
+
+    def evaluate_first_stage_panel(
+        self,
+        template_name: str,
+        symbols: List[str],
+        timeframe: str = "1h",
+        data_source: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        custom_ranges: Optional[Dict[str, Any]] = None,
+        deep_backtest: bool = True,
+        direction: str = "long",
+        split_train_ratio: Optional[float] = None,
+        executor: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+    ) -> Dict[str, PanelSeed]:
+        """Evaluate the first stage of round 1 for several symbols as one panel.
+
+        That stage (the initial grid) starts from ``{"direction": direction}``
+        for every symbol, so its parameter sets are shared: candles are
+        prepared as in ``run_optimization``, aligned on one time index, and each
+        pool task backtests a chunk of parameter sets on every symbol.
+        Symbols whose candles fail to load are left out and take the regular
+        per-symbol path, which reports the error.
+
+        Returns:
+            symbol -> PanelSeed for ``run_optimization(panel_seed=...)``.
+        """
+        if direction not in ("long", "short"):
+            direction = "long"
+        if not symbols:
+            return {}
+
+        stages = self.generate_stages(
+            template_name=template_name,
+            symbol=symbols[0],
+            fixed_timeframe=timeframe if timeframe else None,
+            custom_ranges=custom_ranges,
+        )
+        initial_params = {"direction": direction}
+        param_sets = next(
+            (sets for sets in (self._stage_param_sets(s, initial_params) for s in stages) if sets),
+            [],
+        )
+        if not param_sets:
+            return {}
+        template_metadata = self.combo_service.get_template_metadata(template_name)
+
+        prepared: Dict[str, Dict[str, Any]] = {}
+        for symbol in symbols:
+            try:
+                inferred = data_source
+                if inferred is None or str(inferred).strip() == "":
+                    inferred = resolve_data_source_for_symbol(symbol, None)
+                data = self._prepare_optimization_data(
+                    symbol,
+                    timeframe,
+                    validate_data_source_timeframe(inferred, timeframe),
+                    start_date,
+                    end_date,
+                    deep_backtest,
+                    split_train_ratio,
+                    False,
+                )
+            except Exception as exc:
+                logging.warning("Panel: %s left out of the shared first stage: %s", symbol, exc)
+                continue
+            if data["df"] is not None and not data["df"].empty:
+                prepared[symbol] = data
+        if not prepared:
+            return {}
+
+        # Same enrichment the per-symbol stages apply before dispatching.
+        frames = {symbol: _add_stage_regime_column(data["df"]) for symbol, data in prepared.items()}
+        panel = _build_symbol_panel(frames)
+        contexts = {
+            symbol: (
+                data["deep_backtest"],
+                data["start_date"],
+                data["end_date"],
+                frames[symbol].dtypes.to_dict(),
+            )
+            for symbol, data in prepared.items()
+        }
+        # Same backtests per task as a 200-combination stage batch.
+        chunk = max(1, 200 // len(prepared))
+        tasks = [
+            (template_metadata, param_sets[i : i + chunk], panel, contexts)
+            for i in range(0, len(param_sets), chunk)
+        ]
+        logging.info(
+            "🔢 Panel Round 1 - %d combinations x %d symbols in %d tasks",
+            len(param_sets),
+            len(prepared),
+            len(tasks),
+        )
+
+        results: Dict[str, List[Dict[str, Any]]] = {symbol: [] for symbol in prepared}
+        max_workers = max(1, (os.cpu_count() or 2) - 1)
+        with _optimization_pool(executor, max_workers) as pool:
+            for task_results in pool.map(_worker_run_panel, tasks):
+                for symbol, rows in task_results.items():
+                    results[symbol].extend(rows)
+
+        return {
+            symbol: PanelSeed(data=data, first_stage_results=results[symbol])
+            for symbol, data in prepared.items()
+        }
+
+    def run_optimization(
+        self,
+        template_name: str,
+        symbol: str,
+        timeframe: str = "1h",
+        data_source: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        custom_ranges: Optional[Dict[str, Any]] = None,
+        deep_backtest: bool = True,  # Default to Deep Backtesting
+        job_id: Optional[str] = None,
+        direction: str = "long",
+        split_train_ratio: Optional[float] = None,
+        walk_forward_folds: Optional[int] = None,
+        walk_forward_mode: str = "rolling",
+        executor: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+        panel_seed: Optional[PanelSeed] = None,
+    ) -> Dict[str, Any]:
+        """Run parameter optimization.
+
+        Args:
+            split_train_ratio: quando informado (ex.: 0.7), a otimização roda
+                somente no treino (fração mais antiga dos candles) e o resultado
+                final inclui métricas do holdout (período mais recente) com
+                veredito GO/NO-GO (walk-forward gate, card #470). None mantém o
+                comportamento legado (período inteiro, sem gate).
+            walk_forward_folds: com 2 ou mais, troca o split único por um
+                walk-forward em k folds (``walk_forward_mode`` "rolling" ou
+                "anchored"; proporção treino/teste de ``split_train_ratio``,
+                padrão 0.7). Os folds são otimizados em paralelo no mesmo pool
+                e o veredito agrega as métricas de todos eles.
+            executor: pool de processos compartilhado entre otimizações (batch
+                em painel). None cria um pool próprio para esta execução.
+            panel_seed: candles e primeiro estágio da rodada 1 já avaliados em
+                painel (``evaluate_first_stage_panel``); a otimização segue
+                direto para os estágios e rodadas que divergem por símbolo.
+        """
+        if direction not in ("long", "short"):
+            direction = "long"
+
+        optimization_start_time = time.time()
+        # If data_source is omitted, infer based on symbol:
+        # - symbols without "/" are treated as US tickers -> stooq
+        # - symbols with "/" are treated as crypto pairs -> ccxt
+        inferred = data_source
+        if inferred is None or str(inferred).strip() == "":
+            inferred = resolve_data_source_for_symbol(symbol, None)
+
+        selected_data_source = validate_data_source_timeframe(inferred, timeframe)
+
+        # Generate stages
+        fixed_timeframe = timeframe if timeframe else None
+        stages = self.generate_stages(
+            template_name=template_name,
+            symbol=symbol,
+            fixed_timeframe=fixed_timeframe,
+            custom_ranges=custom_ranges,
+        )
+
+        # Get template metadata ONCE for workers
+        template_metadata = self.combo_service.get_template_metadata(template_name)
+
+        multi_fold = walk_forward_folds is not None and int(walk_forward_folds) >= 2
+        if panel_seed is not None and multi_fold:
+            raise ValueError("panel_seed não se aplica a walk_forward_folds")
+        data = (
+            panel_seed.data
+            if panel_seed is not None
+            else self._prepare_optimization_data(
+                symbol,
+                timeframe,
+                selected_data_source,
+                start_date,
+                end_date,
+                deep_backtest,
+                split_train_ratio,
+                multi_fold,
+            )
+        )
+        provider = data["provider"]
+        start_date = data["start_date"]
+        end_date = data["end_date"]
+        df = data["df"]
+        df_holdout = data["df_holdout"]
+        df_train_tail_for_warmup = data["df_train_tail_for_warmup"]
+        deep_backtest = data["deep_backtest"]
+
+        if multi_fold:
+            return self._run_walk_forward_folds(
+                template_name=template_name,
+                symbol=symbol,
+                timeframe=timeframe,
+                data_source=selected_data_source,
+                stages=stages,
+                template_metadata=template_metadata,
+                df=df,
+                start_date=start_date,
+                end_date=end_date,
+                deep_backtest=deep_backtest,
+                direction=direction,
+                folds=int(walk_forward_folds),
+                mode=walk_forward_mode,
+                train_ratio=float(split_train_ratio) if split_train_ratio is not None else 0.7,
+                job_id=job_id,
+                executor=executor,
+            )
+
         # Initialize best parameters (direction is fixed for the whole optimization)
         best_params = {"direction": direction}
         best_metrics = None
@@ -1715,11 +2296,12 @@ class ComboOptimizer:
         round_num = 1
         converged = False
 
+        # Primeiro estágio da rodada 1 já avaliado em painel (batch): igual para todos os símbolos.
+        first_stage_results = panel_seed.first_stage_results if panel_seed is not None else None
+
         # Reuse a single executor across all stages/rounds in this optimization.
         # This drastically reduces process spawn overhead and enables per-worker caches (e.g. 15m data).
-        with concurrent.futures.ProcessPoolExecutor(
-            max_workers=max_workers, initializer=_init_worker_logging
-        ) as executor:
+        with _optimization_pool(executor, max_workers) as executor:
             if has_grid_search and has_adaptive:
                 # -------------------------------------------------------------
                 # 4D ADAPTIVE OPTIMIZATION (MULTI-BRANCH)
@@ -1786,6 +2368,7 @@ class ComboOptimizer:
                             df,
                             return_top_n=return_n,
                             executor=executor,
+                            first_stage_results=first_stage_results if round_num == 1 else None,
                         )
 
                         if round_num == 1:
@@ -1903,6 +2486,7 @@ class ComboOptimizer:
                         template_metadata,
                         df,
                         executor=executor,
+                        first_stage_results=first_stage_results if round_num == 1 else None,
                     )
 
                     # End of Round Analysis
@@ -1942,30 +2526,7 @@ class ComboOptimizer:
                     logging.warning("Final backtest split skipped: %s", exc)
 
             # Enrich df_final with regime for heavy metrics calculation
-            if "regime" not in df_final.columns:
-                try:
-                    df_final = ensure_ta_lib_context_columns(df_final)
-
-                    # Use SMA_50 as fallback for better coverage (SMA_200 has more warmup NaNs)
-                    if "SMA_50" not in df_final.columns and "SMA_200" in df_final.columns:
-                        df_final["SMA_50"] = df_final["SMA_200"]
-
-                    sma_col = "SMA_50" if "SMA_50" in df_final.columns else "SMA_200"
-                    if sma_col in df_final.columns:
-                        # Create regime with proper NaN handling
-                        df_final["regime"] = "Unknown"
-                        mask_bull = df_final["close"] > df_final[sma_col]
-                        mask_bear = df_final["close"] < df_final[sma_col]
-                        df_final.loc[mask_bull, "regime"] = "Bull"
-                        df_final.loc[mask_bear, "regime"] = "Bear"
-
-                        # Log regime distribution for debugging
-                        regime_counts = df_final["regime"].value_counts()
-                        logging.info(
-                            f"Regime distribution using {sma_col}: {regime_counts.to_dict()}"
-                        )
-                except Exception as e:
-                    logging.warning(f"Failed to enrich final DF with regime: {e}")
+            df_final = _add_regime_column(df_final)
 
             # Create strategy with best parameters
             strategy = self.combo_service.create_strategy(
@@ -1980,7 +2541,7 @@ class ComboOptimizer:
             direction = best_params.get("direction", "long")
             if direction not in ("long", "short"):
                 direction = "long"
-            trades, execution_mode = extract_trades_with_mode(
+            extracted, execution_mode = extract_trades_with_mode(
                 df_with_signals,
                 stop_loss,
                 deep_backtest=deep_backtest,
@@ -1989,12 +2550,16 @@ class ComboOptimizer:
                 until_str=end_date,
                 direction=direction,
                 return_mode=True,
+                as_array=True,
             )
+            # Metrics consume the columns; dicts are only built for the response payload
+            trade_array = as_trade_array(extracted)
+            trades = trade_array.to_dicts()
 
             # Recompute core metrics from final backtest trades (same set as returned to frontend)
             # Fixes Total Return / Win Rate mismatch vs. "List of trades" / Cumulative P&L
             core_from_final = _metrics_from_trades(
-                trades, initial_capital=100, context_params=best_params
+                trade_array, initial_capital=100, context_params=best_params
             )
             if best_metrics is not None:
                 best_metrics.update(core_from_final)
@@ -2010,7 +2575,7 @@ class ComboOptimizer:
                         f"Regime values in signals df: {df_with_signals['regime'].value_counts().to_dict()}"
                     )
 
-                heavy = _calculate_heavy_metrics(df_with_signals, trades)
+                heavy = _calculate_heavy_metrics(df_with_signals, trade_array)
                 if best_metrics:
                     best_metrics.update(heavy)
                     logging.info(f"Heavy metrics calculated: {heavy}")
@@ -2022,7 +2587,7 @@ class ComboOptimizer:
 
             if split_train_ratio is None and best_metrics is not None:
                 _enrich_ranking_metrics(
-                    trades,
+                    trade_array,
                     df_final["close"] if df_final is not None and not df_final.empty else None,
                     best_metrics,
                     legacy_zero_trade_ranking=False,
@@ -2086,6 +2651,7 @@ class ComboOptimizer:
 
         except Exception as e:
             logging.error(f"Final backtest failed: {e}")
+            trade_array = TradeArray.empty()
             trades = []
             candles = []
             indicator_data = {}
@@ -2096,133 +2662,20 @@ class ComboOptimizer:
         oos_metrics: Optional[Dict[str, Any]] = None
         oos_verdict: Optional[Dict[str, Any]] = None
         if split_train_ratio is not None and df_holdout is not None and not df_holdout.empty:
-            try:
-                strategy_holdout = self.combo_service.create_strategy(
-                    template_name=template_name, parameters=best_params
-                )
-                # Burn-in: concatena a cauda do treino para warmup de indicadores;
-                # trades com entry fora do holdout são descartados da avaliação.
-                holdout_eval_start = df_holdout.index.min()
-                holdout_frame = df_holdout
-                if df_train_tail_for_warmup is not None and not df_train_tail_for_warmup.empty:
-                    holdout_frame = pd.concat([df_train_tail_for_warmup, df_holdout])
-                df_holdout_signals = strategy_holdout.generate_signals(holdout_frame.copy())
-                stop_loss = best_params.get("stop_loss", 0.0)
-                direction = best_params.get("direction", "long")
-                if direction not in ("long", "short"):
-                    direction = "long"
-                holdout_trades_raw, holdout_mode = extract_trades_with_mode(
-                    df_holdout_signals,
-                    stop_loss,
-                    deep_backtest=deep_backtest,
-                    symbol=symbol,
-                    since_str=(
-                        str(holdout_frame.index.min().date()) if len(holdout_frame) else start_date
-                    ),
-                    until_str=(
-                        str(holdout_frame.index.max().date()) if len(holdout_frame) else end_date
-                    ),
-                    direction=direction,
-                    return_mode=True,
-                )
-                holdout_trades = []
-                for trade in holdout_trades_raw:
-                    entry = trade.get("entry_time")
-                    if not entry:
-                        continue
-                    try:
-                        if pd.Timestamp(entry) >= holdout_eval_start:
-                            holdout_trades.append(trade)
-                    except Exception:
-                        holdout_trades.append(trade)
-                oos_metrics = _metrics_from_trades(
-                    holdout_trades, initial_capital=100, context_params=best_params
-                )
-                try:
-                    heavy_holdout = _calculate_heavy_metrics(df_holdout_signals, holdout_trades)
-                    if oos_metrics:
-                        oos_metrics.update(heavy_holdout)
-                except Exception as exc:
-                    logging.warning("Holdout heavy metrics failed: %s", exc)
-                # CAGR / Calmar / benchmark sobre o holdout (gate GO/NO-GO precisa
-                # dessas métricas; _metrics_from_trades não as produz).
-                try:
-                    from app.metrics.performance import calculate_cagr
-                    from app.metrics.benchmark import calculate_buy_and_hold
-                    from app.metrics.risk_adjusted import calculate_calmar_ratio
-
-                    equity = pd.Series([100.0])
-                    cap = 100.0
-                    for trade in sorted(
-                        holdout_trades,
-                        key=lambda t: pd.Timestamp(t.get("entry_time") or 0),
-                    ):
-                        cap *= 1.0 + float(trade.get("profit") or 0.0)
-                        equity = pd.concat([equity, pd.Series([cap])])
-                    if len(equity) >= 2 and len(holdout_trades) > 0:
-                        oos_cagr = calculate_cagr(equity)
-                    else:
-                        oos_cagr = 0.0
-                    close_series = df_holdout["close"]
-                    bh = calculate_buy_and_hold(close_series, 100.0)
-                    oos_calmar = calculate_calmar_ratio(
-                        oos_cagr, float(oos_metrics.get("max_drawdown") or 0.0)
-                    )
-                    if oos_metrics is not None:
-                        oos_metrics["cagr"] = oos_cagr
-                        oos_metrics["calmar_ratio"] = oos_calmar
-                        oos_metrics["benchmark"] = bh
-                except Exception as exc:
-                    logging.warning("Holdout CAGR/benchmark metrics failed: %s", exc)
-                from app.metrics.criteria import evaluate_walk_forward
-
-                # O segmento IS (Treino) precisa das mesmas métricas que o
-                # evaluate_go_nogo exige (CAGR, Calmar, benchmark); o bloco do
-                # holdout acima enriquece apenas o OOS, e `best_metrics` vem de
-                # _metrics_from_trades sem essas chaves.
-                try:
-                    if best_metrics is not None and "cagr" not in best_metrics:
-                        is_close = df["close"] if df is not None and not df.empty else None
-                        _enrich_ranking_metrics(
-                            trades,
-                            is_close,
-                            best_metrics,
-                            legacy_zero_trade_ranking=True,
-                        )
-                except Exception as exc:
-                    logging.warning("Treino (IS) CAGR/benchmark metrics failed: %s", exc)
-
-                # Gate combinado walk-forward (card #503): IS (Treino) usa os
-                # critérios globais, OOS (Holdout) usa perfil próprio e exige
-                # retenção de ao menos 50% do Sharpe IS. `oos_verdict` legado
-                # passa a carregar o veredito final combinado; as razões
-                # identificam o segmento.
-                criteria_result = evaluate_walk_forward(best_metrics or {}, oos_metrics or {})
-                oos_verdict = {
-                    "status": criteria_result.status,
-                    "reasons": criteria_result.reasons,
-                    "warnings": criteria_result.warnings,
-                    "holdout_trades": len(holdout_trades),
-                    "execution_mode": holdout_mode,
-                    "split_train_ratio": float(split_train_ratio),
-                }
-                logging.info(
-                    "Walk-forward holdout verdict: %s (%d trades, %d reasons)",
-                    criteria_result.status,
-                    len(holdout_trades),
-                    len(criteria_result.reasons),
-                )
-            except Exception as exc:
-                logging.error("Walk-forward holdout backtest failed: %s", exc)
-                oos_metrics = None
-                oos_verdict = {
-                    "status": "ERROR",
-                    "reasons": [f"Holdout backtest falhou: {exc}"],
-                    "warnings": [],
-                    "holdout_trades": 0,
-                    "execution_mode": "holdout_error",
-                    "split_train_ratio": float(split_train_ratio),
-                }
+            oos_metrics, oos_verdict = self._evaluate_holdout(
+                template_name,
+                best_params,
+                df_holdout,
+                df_train_tail_for_warmup,
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                deep_backtest=deep_backtest,
+                split_train_ratio=float(split_train_ratio),
+                is_metrics=best_metrics,
+                is_trade_array=trade_array,
+                is_close=df["close"] if df is not None and not df.empty else None,
+            )
 
         # COMPLETION SUMMARY (after final backtest so metrics match returned trades)
         logging.info("=" * 80)
@@ -2273,6 +2726,630 @@ class ComboOptimizer:
             ),
         }
 
+    def _run_fold_tasks(
+        self,
+        executor,
+        max_workers: int,
+        tasks: Dict[str, Dict[str, Any]],
+        template_metadata: Dict[str, Any],
+        df: pd.DataFrame,
+        *,
+        deep_backtest: bool,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        with_trades: bool = False,
+    ) -> Dict[str, Dict[Any, Dict[str, Any]]]:
+        """Submit walk-forward tasks (one per distinct parameter set, each with
+        all the fold windows that test it) and return key -> window results."""
+        keys = list(tasks)
+        args = [
+            (
+                template_metadata,
+                tasks[key]["params"],
+                df,
+                tasks[key]["windows"],
+                deep_backtest,
+                symbol,
+                start_date,
+                end_date,
+                with_trades,
+            )
+            for key in keys
+        ]
+        # Small batches keep every worker busy when a stage only has a few values.
+        batch_size = max(1, min(200, -(-len(args) // (max_workers * 4))))
+        futures = {
+            executor.submit(_worker_run_fold_batch, args[i : i + batch_size]): keys[
+                i : i + batch_size
+            ]
+            for i in range(0, len(args), batch_size)
+        }
+        results: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                batch_results = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logging.warning(f"⚠️ Walk-forward batch falhou: {e}")
+                continue
+            for key, result in zip(futures[future], batch_results):
+                if result.get("success"):
+                    results[key] = result["windows"]
+                else:
+                    logging.debug("Walk-forward task failed for %s: %s", key, result.get("error"))
+        return results
+
+    def _run_walk_forward_folds(
+        self,
+        *,
+        template_name: str,
+        symbol: str,
+        timeframe: str,
+        data_source: str,
+        stages: List[Dict[str, Any]],
+        template_metadata: Dict[str, Any],
+        df: pd.DataFrame,
+        start_date: str,
+        end_date: str,
+        deep_backtest: bool,
+        direction: str,
+        folds: int,
+        mode: str,
+        train_ratio: float,
+        job_id: Optional[str] = None,
+        executor: Optional[concurrent.futures.ProcessPoolExecutor] = None,
+    ) -> Dict[str, Any]:
+        """Walk-forward em k folds (rolling/anchored) executado em paralelo.
+
+        Cada estágio é avaliado para todos os folds ao mesmo tempo no mesmo
+        pool: conjuntos de parâmetros iguais entre folds viram uma única tarefa
+        que calcula os sinais uma vez sobre a série inteira e fatia cada janela
+        de treino. Cada fold segue seu próprio caminho guloso pelos estágios
+        (uma rodada, sem refinamento adaptativo); no fim, treino e teste de
+        todos os folds são avaliados juntos. O veredito agrega os folds (média
+        do IS, OOS encadeado dos testes e fração mínima de folds GO).
+        """
+        from app.metrics.criteria import evaluate_walk_forward, evaluate_walk_forward_folds
+
+        optimization_start_time = time.time()
+        # Colunas de contexto (SMA/ATR/ADX + regime) calculadas uma vez sobre a série.
+        df = _add_regime_column(df.sort_index().copy())
+        windows = walk_forward_fold_windows(len(df), folds, train_ratio=train_ratio, mode=mode)
+        fold_params = [{"direction": direction} for _ in windows]
+        max_workers = max(1, (os.cpu_count() or 2) - 1)
+        logging.info(
+            "Walk-forward %s: %d folds, train_ratio=%.2f, %d candles",
+            mode,
+            len(windows),
+            train_ratio,
+            len(df),
+        )
+
+        def _param_key(params: Dict[str, Any]) -> str:
+            return json.dumps(params, sort_keys=True, default=str)
+
+        task_kwargs = dict(
+            deep_backtest=deep_backtest, symbol=symbol, start_date=start_date, end_date=end_date
+        )
+        with _optimization_pool(executor, max_workers) as executor:
+            for stage in stages:
+                tasks: Dict[str, Dict[str, Any]] = {}
+                fold_candidates = []
+                for window in windows:
+                    candidates = []
+                    for test_params, _ in self._stage_param_sets(
+                        stage, fold_params[window["fold"]]
+                    ):
+                        key = _param_key(test_params)
+                        task = tasks.setdefault(key, {"params": test_params, "windows": []})
+                        task["windows"].append((window["fold"], *window["train"]))
+                        candidates.append((key, test_params))
+                    fold_candidates.append(candidates)
+                if not tasks:
+                    continue
+                logging.info(
+                    f"🔢 Walk-forward stage {stage['parameter']}: {len(tasks)} tarefas "
+                    f"para {len(windows)} folds"
+                )
+                results = self._run_fold_tasks(
+                    executor, max_workers, tasks, template_metadata, df, **task_kwargs
+                )
+                for window, candidates in zip(windows, fold_candidates):
+                    fold = window["fold"]
+                    ranked = _rank_stage_results(
+                        [
+                            {"params": params, "metrics": results[key][fold]["metrics"]}
+                            for key, params in candidates
+                            if key in results
+                        ]
+                    )
+                    if ranked:
+                        fold_params[fold] = ranked[0]["params"]
+
+            # Treino e teste de cada fold com seus melhores parâmetros, em paralelo.
+            final_tasks: Dict[str, Dict[str, Any]] = {}
+            for window in windows:
+                params = fold_params[window["fold"]]
+                task = final_tasks.setdefault(_param_key(params), {"params": params, "windows": []})
+                task["windows"].extend(
+                    [
+                        (("train", window["fold"]), *window["train"]),
+                        (("test", window["fold"]), *window["test"]),
+                    ]
+                )
+            final = self._run_fold_tasks(
+                executor,
+                max_workers,
+                final_tasks,
+                template_metadata,
+                df,
+                with_trades=True,
+                **task_kwargs,
+            )
+
+        def _iso(position: int) -> str:
+            return pd.Timestamp(df.index[position]).isoformat()
+
+        fold_reports = []
+        oos_segments = []
+        execution_modes = set()
+        for window in windows:
+            fold = window["fold"]
+            params = fold_params[fold]
+            evaluated = final.get(_param_key(params), {})
+            train_result = evaluated.get(("train", fold))
+            test_result = evaluated.get(("test", fold))
+            (train_start, train_end), (test_start, test_end) = window["train"], window["test"]
+            report = {
+                "fold": fold,
+                "train_start": _iso(train_start),
+                "train_end": _iso(train_end - 1),
+                "test_start": _iso(test_start),
+                "test_end": _iso(test_end - 1),
+                "parameters": params,
+            }
+            if train_result is None or test_result is None:
+                report["verdict"] = {"status": "ERROR", "reasons": ["Backtest do fold falhou"]}
+                fold_reports.append(report)
+                continue
+            train_frame = df.iloc[train_start:train_end]
+            test_frame = df.iloc[test_start:test_end]
+            is_metrics = dict(train_result["metrics"])
+            is_metrics.update(_calculate_heavy_metrics(train_frame, train_result["trades"]))
+            _enrich_ranking_metrics(
+                train_result["trades"],
+                train_frame["close"],
+                is_metrics,
+                legacy_zero_trade_ranking=True,
+            )
+            oos_metrics = _holdout_metrics(
+                test_result["trades"], test_frame, test_frame["close"], params
+            )
+            criteria_result = evaluate_walk_forward(is_metrics, oos_metrics)
+            report.update(
+                {
+                    "is_metrics": is_metrics,
+                    "oos_metrics": oos_metrics,
+                    "verdict": {
+                        "status": criteria_result.status,
+                        "reasons": criteria_result.reasons,
+                        "holdout_trades": len(test_result["trades"]),
+                    },
+                }
+            )
+            fold_reports.append(report)
+            oos_segments.append(test_result["trades"])
+            execution_modes.add(test_result["execution_mode"])
+
+        # OOS encadeado: os testes são contíguos, então formam um único período fora da amostra.
+        oos_trades = TradeArray.concat(oos_segments)
+        oos_start = windows[0]["test"][0]
+        oos_metrics = _holdout_metrics(
+            oos_trades, df.iloc[oos_start:], df["close"].iloc[oos_start:], None
+        )
+        is_metrics = _mean_fold_metrics(
+            [r["is_metrics"] for r in fold_reports if "is_metrics" in r]
+        )
+        criteria_result = evaluate_walk_forward_folds(
+            is_metrics, oos_metrics, [r["verdict"]["status"] for r in fold_reports]
+        )
+        go_folds = sum(1 for r in fold_reports if r["verdict"]["status"] == "GO")
+        execution_mode = "fast_1d"
+        if execution_modes:
+            execution_mode = execution_modes.pop() if len(execution_modes) == 1 else "mixed"
+        oos_verdict = {
+            "status": criteria_result.status,
+            "reasons": criteria_result.reasons,
+            "warnings": [
+                *criteria_result.warnings,
+                "OOS encadeado: cada janela de teste usa os parâmetros do próprio fold; "
+                "os parâmetros finais só foram testados no último fold.",
+            ],
+            "holdout_trades": len(oos_trades),
+            "execution_mode": execution_mode,
+            "split_train_ratio": float(train_ratio),
+            "walk_forward_mode": mode,
+            "folds": len(windows),
+            "go_folds": go_folds,
+            "per_fold_parameters": True,
+        }
+        # Os parâmetros do fold mais recente são os candidatos a operar.
+        best_params = fold_params[-1]
+        best_metrics = fold_reports[-1].get("is_metrics") or {}
+        total_time = time.time() - optimization_start_time
+        logging.info(
+            "Walk-forward %s verdict: %s (%d/%d folds GO, %d OOS trades) em %.1fs",
+            mode,
+            criteria_result.status,
+            go_folds,
+            len(windows),
+            len(oos_trades),
+            total_time,
+        )
+
+        return {
+            "job_id": job_id or "combo_opt_" + str(hash(template_name + symbol)),
+            "template_name": template_name,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "stages": stages,
+            "best_parameters": best_params,
+            "best_metrics": best_metrics,
+            "oos_metrics": oos_metrics,
+            "oos_verdict": oos_verdict,
+            "walk_forward": {
+                "mode": mode,
+                "train_ratio": float(train_ratio),
+                "folds": fold_reports,
+                "aggregated_is_metrics": is_metrics,
+            },
+            "total_stages": len(stages),
+            "trades": oos_trades.to_dicts(),
+            "candles": [],
+            "indicator_data": {},
+            "parameters": best_params,
+            "direction": best_params.get("direction", "long"),
+            "data_source": data_source,
+            "execution_mode": execution_mode,
+            "strategy_transparency": self._build_strategy_transparency_result(
+                template_name=template_name,
+                timeframe=timeframe,
+                parameters=best_params,
+                dataframe=None,
+            ),
+        }
+
+    def _prefetch_intraday(
+        self,
+        symbol: str,
+        since_str: str,
+        until_str: str,
+        *,
+        allow_large_backfill: bool = False,
+    ) -> None:
+        """Prepare the 15m cache used by deep backtests (best-effort).
+
+        Workers only READ the parquet slice (read_only=True), so the cache is
+        written here; afterwards its tail is extended up to ``until_str`` when it
+        lags behind (self-healing for stale caches or partial prefetch failures).
+        """
+        try:
+            self.loader.fetch_intraday_data(
+                symbol=symbol,
+                timeframe="15m",
+                since_str=since_str,
+                until_str=until_str,
+                read_only=False,
+                allow_large_backfill=allow_large_backfill,
+            )
+        except Exception as e:
+            logging.warning(
+                "Prefetch 15m failed for %s (%s..%s): %s. Deep backtest will fall back to fast mode.",
+                symbol,
+                since_str,
+                until_str,
+                e,
+            )
+        try:
+            from datetime import datetime as _dt, timedelta
+
+            info = self.loader.check_intraday_availability(symbol, "15m")
+            end_dt = _dt.strptime(until_str, "%Y-%m-%d")
+            need_tail = False
+            if not info.get("available") or not info.get("coverage"):
+                need_tail = True  # No cache or empty: try last 30 days only
+            else:
+                cache_end_str = info["coverage"].get("end")
+                if cache_end_str:
+                    cache_end = pd.Timestamp(cache_end_str)
+                    if getattr(cache_end, "tz", None) is None:
+                        cache_end = cache_end.tz_localize("UTC")
+                    if cache_end.date() < end_dt.date():
+                        need_tail = True
+            if need_tail:
+                tail_since = (end_dt - timedelta(days=30)).strftime("%Y-%m-%d")
+                logging.info(
+                    "15m cache lags behind end_date; updating tail for %s (%s to %s)",
+                    symbol,
+                    tail_since,
+                    until_str,
+                )
+                self.loader.fetch_intraday_data(
+                    symbol=symbol,
+                    timeframe="15m",
+                    since_str=tail_since,
+                    until_str=until_str,
+                    read_only=False,
+                    allow_large_backfill=False,
+                )
+        except Exception as e2:
+            logging.debug("15m tail update check failed: %s", e2)
+
+    def _evaluate_holdout(
+        self,
+        template_name: str,
+        params: Dict[str, Any],
+        df_holdout: pd.DataFrame,
+        df_warmup: Optional[pd.DataFrame],
+        *,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        deep_backtest: bool,
+        split_train_ratio: float,
+        is_metrics: Optional[Dict[str, Any]],
+        is_trade_array: TradeArray,
+        is_close: Optional[pd.Series],
+        strategy: Any = None,
+        df_15m_cache: Optional[pd.DataFrame] = None,
+    ) -> tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Backtest ``params`` on the holdout and compute the walk-forward verdict.
+
+        ``is_metrics`` (train segment) is enriched in place with CAGR/Calmar/
+        benchmark when missing. Returns ``(oos_metrics, oos_verdict)``; a failing
+        holdout backtest yields an ``ERROR`` verdict instead of raising.
+        """
+        try:
+            strategy_holdout = strategy or self.combo_service.create_strategy(
+                template_name=template_name, parameters=params
+            )
+            # Burn-in: concatena a cauda do treino para warmup de indicadores;
+            # trades com entry fora do holdout são descartados da avaliação.
+            holdout_eval_start = df_holdout.index.min()
+            holdout_frame = df_holdout
+            if df_warmup is not None and not df_warmup.empty:
+                holdout_frame = pd.concat([df_warmup, df_holdout])
+            df_holdout_signals = strategy_holdout.generate_signals(holdout_frame.copy())
+            stop_loss = params.get("stop_loss", 0.0)
+            direction = params.get("direction", "long")
+            if direction not in ("long", "short"):
+                direction = "long"
+            holdout_extracted, holdout_mode = extract_trades_with_mode(
+                df_holdout_signals,
+                stop_loss,
+                deep_backtest=deep_backtest,
+                symbol=symbol,
+                since_str=(
+                    str(holdout_frame.index.min().date()) if len(holdout_frame) else start_date
+                ),
+                until_str=(
+                    str(holdout_frame.index.max().date()) if len(holdout_frame) else end_date
+                ),
+                df_15m_cache=df_15m_cache,
+                direction=direction,
+                return_mode=True,
+                as_array=True,
+            )
+            holdout_trade_array = as_trade_array(holdout_extracted)
+            holdout_trades = holdout_trade_array.select(
+                holdout_trade_array.entry_ns >= pd.Timestamp(holdout_eval_start).value
+            )
+            oos_metrics = _holdout_metrics(
+                holdout_trades, df_holdout_signals, df_holdout["close"], params
+            )
+            from app.metrics.criteria import evaluate_walk_forward
+
+            # O segmento IS (Treino) precisa das mesmas métricas que o
+            # evaluate_go_nogo exige (CAGR, Calmar, benchmark); o bloco do
+            # holdout acima enriquece apenas o OOS, e `is_metrics` vem de
+            # _metrics_from_trades sem essas chaves.
+            try:
+                if is_metrics is not None and "cagr" not in is_metrics:
+                    _enrich_ranking_metrics(
+                        is_trade_array,
+                        is_close,
+                        is_metrics,
+                        legacy_zero_trade_ranking=True,
+                    )
+            except Exception as exc:
+                logging.warning("Treino (IS) CAGR/benchmark metrics failed: %s", exc)
+
+            # Gate combinado walk-forward (card #503): IS (Treino) usa os
+            # critérios globais, OOS (Holdout) usa perfil próprio e exige
+            # retenção de ao menos 50% do Sharpe IS. `oos_verdict` legado
+            # passa a carregar o veredito final combinado; as razões
+            # identificam o segmento.
+            criteria_result = evaluate_walk_forward(is_metrics or {}, oos_metrics or {})
+            oos_verdict = {
+                "status": criteria_result.status,
+                "reasons": criteria_result.reasons,
+                "warnings": criteria_result.warnings,
+                "holdout_trades": len(holdout_trades),
+                "execution_mode": holdout_mode,
+                "split_train_ratio": float(split_train_ratio),
+            }
+            logging.info(
+                "Walk-forward holdout verdict: %s (%d trades, %d reasons)",
+                criteria_result.status,
+                len(holdout_trades),
+                len(criteria_result.reasons),
+            )
+            return oos_metrics, oos_verdict
+        except Exception as exc:
+            logging.error("Walk-forward holdout backtest failed: %s", exc)
+            return None, {
+                "status": "ERROR",
+                "reasons": [f"Holdout backtest falhou: {exc}"],
+                "warnings": [],
+                "holdout_trades": 0,
+                "execution_mode": "holdout_error",
+                "split_train_ratio": float(split_train_ratio),
+            }
+
+    def load_walk_forward_data(
+        self,
+        symbol: str,
+        timeframe: str,
+        *,
+        start_date: str,
+        end_date: str,
+        data_source: Optional[str] = None,
+        split_train_ratio: float = 0.7,
+        deep_backtest: bool = True,
+    ) -> WalkForwardData:
+        """Load and split one window for fixed-parameter evaluations.
+
+        Candles, context columns and (ccxt only) the 15m intraday frame are read
+        once here, so every ``evaluate_fixed_parameters`` call on the returned
+        data skips data loading entirely.
+        """
+        inferred = data_source
+        if inferred is None or str(inferred).strip() == "":
+            inferred = resolve_data_source_for_symbol(symbol, None)
+        selected_data_source = validate_data_source_timeframe(inferred, timeframe)
+
+        provider = get_market_data_provider(selected_data_source)
+        df = provider.fetch_ohlcv(
+            symbol=symbol, timeframe=timeframe, since_str=start_date, until_str=end_date
+        )
+        holdout = warmup = None
+        train = df
+        try:
+            train, holdout = split_train_holdout(df, float(split_train_ratio))
+            burnin = max(50, int(os.getenv("WALK_FORWARD_BURNIN_CANDLES", "250")))
+            warmup = train.iloc[-burnin:].copy()
+        except ValueError as exc:
+            logging.warning("Walk-forward split skipped: %s (evaluating the full window)", exc)
+        train = _add_regime_column(train.copy() if train is not None else train)
+
+        intraday = None
+        deep_backtest = bool(deep_backtest) and selected_data_source == "ccxt"
+        if deep_backtest:
+            self._prefetch_intraday(symbol, start_date, end_date)
+            try:
+                intraday = self.loader.fetch_intraday_data(
+                    symbol=symbol,
+                    timeframe="15m",
+                    since_str=start_date,
+                    until_str=end_date,
+                    read_only=True,
+                )
+            except Exception as exc:
+                logging.warning("15m load failed for %s: %s. Using fast mode.", symbol, exc)
+            if intraday is None:
+                # Empty cache -> extract_trades_with_mode falls back to fast mode
+                # without fetching the 15m frame again for each evaluation.
+                intraday = pd.DataFrame()
+
+        return WalkForwardData(
+            symbol=symbol,
+            timeframe=timeframe,
+            data_source=selected_data_source,
+            start_date=start_date,
+            end_date=end_date,
+            split_train_ratio=float(split_train_ratio),
+            train=train,
+            holdout=holdout,
+            warmup=warmup,
+            deep_backtest=deep_backtest,
+            intraday=intraday,
+        )
+
+    def evaluate_fixed_parameters(
+        self,
+        template_name: str,
+        parameters: Dict[str, Any],
+        data: WalkForwardData,
+        *,
+        direction: str = "long",
+    ) -> Dict[str, Any]:
+        """Backtest one fixed parameter set on a train/holdout split.
+
+        Same metrics and walk-forward verdict as ``run_optimization(...,
+        split_train_ratio=...)`` with single-value ranges, without stage
+        generation, worker pools or data loading: one backtest on the train
+        segment and one on the holdout.
+        """
+        if direction not in ("long", "short"):
+            direction = "long"
+        params = {key: value for key, value in parameters.items() if key != "data_source"}
+        params["direction"] = direction
+
+        strategy = self.combo_service.create_strategy(
+            template_name=template_name, parameters=params
+        )
+        df_with_signals = strategy.generate_signals(data.train.copy())
+        extracted, execution_mode = extract_trades_with_mode(
+            df_with_signals,
+            params.get("stop_loss", 0.0),
+            deep_backtest=data.deep_backtest,
+            symbol=data.symbol,
+            since_str=data.start_date,
+            until_str=data.end_date,
+            df_15m_cache=data.intraday,
+            direction=direction,
+            return_mode=True,
+            as_array=True,
+        )
+        trade_array = as_trade_array(extracted)
+        metrics = _metrics_from_trades(trade_array, initial_capital=100, context_params=params)
+        try:
+            metrics.update(_calculate_heavy_metrics(df_with_signals, trade_array))
+        except Exception as e:
+            logging.error(f"Failed to calculate heavy metrics: {e}")
+
+        oos_metrics: Optional[Dict[str, Any]] = None
+        oos_verdict: Optional[Dict[str, Any]] = None
+        if data.holdout is not None and not data.holdout.empty:
+            oos_metrics, oos_verdict = self._evaluate_holdout(
+                template_name,
+                params,
+                data.holdout,
+                data.warmup,
+                symbol=data.symbol,
+                start_date=data.start_date,
+                end_date=data.end_date,
+                deep_backtest=data.deep_backtest,
+                split_train_ratio=data.split_train_ratio,
+                is_metrics=metrics,
+                is_trade_array=trade_array,
+                is_close=data.train["close"] if not data.train.empty else None,
+                strategy=strategy,
+                df_15m_cache=data.intraday,
+            )
+        else:
+            _enrich_ranking_metrics(
+                trade_array,
+                data.train["close"] if not data.train.empty else None,
+                metrics,
+                legacy_zero_trade_ranking=False,
+            )
+
+        return {
+            "template_name": template_name,
+            "symbol": data.symbol,
+            "timeframe": data.timeframe,
+            "data_source": data.data_source,
+            "parameters": params,
+            "direction": direction,
+            "best_metrics": metrics,
+            "oos_metrics": oos_metrics,
+            "oos_verdict": oos_verdict,
+            "execution_mode": execution_mode,
+        }
+
     def _build_strategy_transparency_result(
         self,
         *,
@@ -2316,11 +3393,16 @@ def _enrich_ranking_metrics(
 
     try:
         if trades:
-            equity = pd.Series([100.0])
-            cap = 100.0
-            for trade in sorted(trades, key=lambda t: pd.Timestamp(t.get("entry_time") or 0)):
-                cap *= 1.0 + float(trade.get("profit") or 0.0)
-                equity = pd.concat([equity, pd.Series([cap])])
+            if isinstance(trades, TradeArray):
+                returns = np.nan_to_num(trades.profit, nan=0.0)
+                order = order_by_entry(trades.entry_ns, len(trades))
+            else:
+                returns = np.array([float(t.get("profit") or 0.0) for t in trades], dtype=float)
+                order = order_by_entry(
+                    entry_times_to_ns(t.get("entry_time") for t in trades), len(trades)
+                )
+            # Positional index (not dates), as the ranking CAGR has always been computed
+            equity = pd.Series(compounded_equity(returns[order], 100.0))
             if len(equity) >= 2:
                 cagr = calculate_cagr(equity)
             elif legacy_zero_trade_ranking:
@@ -2366,208 +3448,78 @@ def _metrics_from_trades(
     Single source of truth for all metrics derived from a trade list.
     Used by _run_backtest_logic (optimization scoring) and final backtest.
     Ensures Sharpe, Total Return, Win Rate, etc. are always computed the same way.
+    trades: list of trade dicts or a TradeArray (optimizer hot path, no parsing).
     context_params: opcional; se fornecido, é logado nos warnings "profit fora do range" (médias, stop, etc.).
     """
-    import numpy as np
-
-    out = {
-        # --- Core ---
-        "total_trades": 0,
-        "win_rate": 0.0,
-        "total_return": 0.0,  # decimal (e.g. 0.35 = +35%)
-        "total_return_pct": 0.0,  # percent (e.g. 35.0)
-        "avg_profit": 0.0,  # mean return per trade (decimal)
-        # --- Risk / ratios ---
-        "sharpe_ratio": 0.0,
-        "sortino_ratio": None,  # may be None when degenerate
-        "sortino_status": None,  # ok|degenerate|invalid
-        "downside_deviation": None,  # downside std (same units as returns)
-        "neg_return_count": 0,
-        "return_series_kind": "per_trade",
-        # --- PnL / trade stats ---
-        "profit_factor": 0.0,
-        "max_loss": 0.0,
-        "max_consecutive_losses": 0,
-        # Drawdown: keep both decimal + pct (avoid unit confusion)
-        "max_drawdown": 0.0,  # decimal (0..1)
-        "max_drawdown_pct": 0.0,  # percent (0..100)
-        # Expectancy: provide multiple units explicitly
-        "expectancy": 0.0,  # decimal per trade (same unit as avg_profit)
-        "expectancy_pct": 0.0,  # percent per trade
-        "expectancy_usd_10k": 0.0,  # legacy-style (assumes $10k notional)
-    }
     if not trades:
-        return out
-
-    # Ordenar por entry_time (mesma ordem do frontend / Cumulative P&L)
-    def _ts(t):
-        et = t.get("entry_time")
-        if et is None:
-            return 0
-        try:
-            return pd.Timestamp(et).timestamp()
-        except Exception:
-            return 0
-
-    sorted_trades = sorted(trades, key=_ts)
+        return empty_trade_metrics()
+    if isinstance(trades, TradeArray):
+        return metrics_from_returns(trades.profit, trades.entry_ns, initial_capital)
 
-    # Coletar returns válidos; ignorar apenas trades com profit None
     # profit é decimal: 0.05 = 5%, 1.66 = 166%, 16.32 = 1632% — ganhos >100% são válidos (ex.: TradingView)
-    returns = []
-    for t in sorted_trades:
-        p = t.get("profit")
-        if p is None:
-            continue
-        returns.append(float(p))
-
-    n = len(returns)
-    if n == 0:
-        out["total_trades"] = len(trades)
-        return out
-
-    wins = sum(1 for r in returns if r > 0)
-    out["total_trades"] = n
-    out["win_rate"] = wins / n
-
-    # Compounding (equity curve)
-    cap = float(initial_capital)
-    equity_curve = [cap]
-    for r in returns:
-        cap *= 1.0 + r
-        equity_curve.append(cap)
-
-    total_return_pct = (cap / initial_capital - 1) * 100.0
-    total_return = total_return_pct / 100.0
-    out["total_return"] = float(total_return)
-    out["total_return_pct"] = float(total_return_pct)
-
-    # avg_profit = mean return per trade (decimal)
-    out["avg_profit"] = float(np.mean(np.array(returns, dtype=float))) if n else 0.0
-
-    # Sharpe (per-trade return series; not annualized)
-    arr = np.array(returns, dtype=float)
-    std_dev = float(np.std(arr))
-    out["sharpe_ratio"] = float(np.mean(arr) / std_dev) if std_dev > 0 else 0.0
-
-    # Sortino (downside deviation) with guardrails
-    neg = arr[arr < 0]
-    out["neg_return_count"] = int(len(neg))
-
-    # Note: with very few negatives or near-zero downside deviation, Sortino is degenerate.
-    # Returning a huge number is misleading; we return None + status instead.
-    eps = 1e-9
-    if len(neg) < 2:
-        out["sortino_ratio"] = None
-        out["downside_deviation"] = 0.0
-        out["sortino_status"] = "degenerate"
-    else:
-        down_std = float(np.std(neg))
-        out["downside_deviation"] = down_std
-        if down_std < eps:
-            out["sortino_ratio"] = None
-            out["sortino_status"] = "degenerate"
-        else:
-            out["sortino_ratio"] = float(np.mean(arr) / down_std)
-            out["sortino_status"] = "ok"
-
-    # Profit factor (USD com compounding)
-    cap2 = float(initial_capital)
-    gross_profit_usd = 0.0
-    gross_loss_usd = 0.0
-    for r in returns:
-        pnl = cap2 * r
-        if r > 0:
-            gross_profit_usd += pnl
-        else:
-            gross_loss_usd += abs(pnl)
-        cap2 *= 1.0 + r
-    out["profit_factor"] = (
-        gross_profit_usd / gross_loss_usd
-        if gross_loss_usd > 0
-        else (999.0 if gross_profit_usd > 0 else 0.0)
+    # Trades com profit None viram NaN e são ignorados; a ordem segue entry_time (como o frontend)
+    returns = np.array(
+        [np.nan if t.get("profit") is None else float(t.get("profit")) for t in trades],
+        dtype=float,
     )
+    entry_ns = entry_times_to_ns(t.get("entry_time") for t in trades)
+    return metrics_from_returns(returns, entry_ns, initial_capital, total_trades=len(trades))
 
-    out["max_loss"] = float(np.min(arr))
-
-    # Expectancy: keep units explicit
-    mean_r = float(np.mean(arr))
-    out["expectancy"] = mean_r
-    out["expectancy_pct"] = mean_r * 100.0
-    out["expectancy_usd_10k"] = mean_r * 10000.0  # legacy: assumes $10k notional
-
-    # Max consecutive losses
-    streak = 0
-    max_streak = 0
-    for r in returns:
-        if r < 0:
-            streak += 1
-            max_streak = max(max_streak, streak)
-        else:
-            streak = 0
-    out["max_consecutive_losses"] = max_streak
-
-    # Max drawdown (equity curve em valor absoluto)
-    peak = float(initial_capital)
-    max_dd = 0.0
-    for eq in equity_curve:
-        if eq > peak:
-            peak = eq
-        dd = (peak - eq) / peak if peak > 0 else 0
-        max_dd = max(max_dd, float(dd))
 
-    # IMPORTANT: store drawdown as decimal + pct (avoid mixing units elsewhere)
-    out["max_drawdown"] = float(max_dd)  # 0..1
-    out["max_drawdown_pct"] = float(max_dd) * 100.0
+def _holdout_metrics(
+    trades: TradeArray,
+    df_signals: pd.DataFrame,
+    close_series: pd.Series,
+    context_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Métricas OOS de um holdout: núcleo + heavy metrics + CAGR/Calmar/benchmark.
 
-    return out
+    O gate GO/NO-GO precisa de CAGR, Calmar e benchmark, que
+    ``_metrics_from_trades`` não produz.
+    """
+    metrics = _metrics_from_trades(trades, initial_capital=100, context_params=context_params)
+    try:
+        heavy = _calculate_heavy_metrics(df_signals, trades)
+        if metrics:
+            metrics.update(heavy)
+    except Exception as exc:
+        logging.warning("Holdout heavy metrics failed: %s", exc)
+    try:
+        from app.metrics.performance import calculate_cagr
+        from app.metrics.benchmark import calculate_buy_and_hold
+        from app.metrics.risk_adjusted import calculate_calmar_ratio
+
+        order = order_by_entry(trades.entry_ns, len(trades))
+        equity = pd.Series(compounded_equity(np.nan_to_num(trades.profit[order], nan=0.0), 100.0))
+        if len(equity) >= 2 and len(trades) > 0:
+            cagr = calculate_cagr(equity)
+        else:
+            cagr = 0.0
+        bh = calculate_buy_and_hold(close_series, 100.0)
+        calmar = calculate_calmar_ratio(cagr, float(metrics.get("max_drawdown") or 0.0))
+        metrics["cagr"] = cagr
+        metrics["calmar_ratio"] = calmar
+        metrics["benchmark"] = bh
+    except Exception as exc:
+        logging.warning("Holdout CAGR/benchmark metrics failed: %s", exc)
+    return metrics
 
 
 def _calculate_heavy_metrics(df, trades):
     metrics = {}
     try:
         if "regime" in df.columns and trades:
-            bull_wins = 0
-            bull_count = 0
-            bear_wins = 0
-            bear_count = 0
-            import pandas as pd
-
-            for t in trades:
-                et = t.get("entry_time")
-                if et:
-                    try:
-                        if isinstance(et, str):
-                            et = pd.to_datetime(et)
-
-                        # Normalize Timezone to match DataFrame index
-                        # If Index is Aware but ET is Naive -> Localize to UTC (assumption)
-                        if df.index.tz is not None and et.tz is None:
-                            et = et.tz_localize("UTC")
-                        # If Index is Naive but ET is Aware -> Convert ET to Naive
-                        elif df.index.tz is None and et.tz is not None:
-                            et = et.tz_convert(None)
-
-                        idx_match = df.index.asof(et)
-                        if idx_match is not None:
-                            # Verify if match is "close enough" (optional, but asof finds PREVIOUS)
-                            # Logic assumes daily/intraday continuity.
-
-                            r_val = df.loc[idx_match]["regime"]
-                            if isinstance(r_val, pd.Series):
-                                r_val = r_val.iloc[0]
-                            is_win = t.get("profit", 0) > 0
-                            if r_val == "Bull":
-                                bull_count += 1
-                                if is_win:
-                                    bull_wins += 1
-                            elif r_val == "Bear":
-                                bear_count += 1
-                                if is_win:
-                                    bear_wins += 1
-                    except Exception:
-                        pass
-            metrics["win_rate_bull"] = (bull_wins / bull_count) if bull_count > 0 else 0
-            metrics["win_rate_bear"] = (bear_wins / bear_count) if bear_count > 0 else 0
+            # Regime da vela de entrada de cada trade, numa única passada ordenada.
+            if isinstance(trades, TradeArray):
+                entry_times, profits = trades.entry_index(), trades.profit
+            else:
+                entry_times = [t.get("entry_time") or None for t in trades]
+                profits = [t.get("profit", 0) for t in trades]
+            stats = segment_trades_by_regime(df["regime"], entry_times, profits)
+            bull = stats.get("Bull", {})
+            bear = stats.get("Bear", {})
+            metrics["win_rate_bull"] = (bull["wins"] / bull["count"]) if bull else 0
+            metrics["win_rate_bear"] = (bear["wins"] / bear["count"]) if bear else 0
     except Exception as e:
         pass
     return metrics
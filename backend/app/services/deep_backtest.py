@@ -9,11 +9,25 @@ daily OHLC data.
 import pandas as pd
 import numpy as np
 import logging
+import threading
+import weakref
+from collections import OrderedDict
 from typing import Dict, List, Optional
 
+from app.metrics.trade_arrays import (
+    DIRECTION_LONG,
+    DIRECTION_SHORT,
+    REASON_SIGNAL_15M,
+    REASON_STOP_LOSS_15M,
+    TradeArray,
+    trade_returns,
+)
+
 logger = logging.getLogger(__name__)
 
 TRADING_FEE = 0.00075  # Binance 0.075%
+# Frames 15m com índice/sparse tables em cache (o worker reaproveita o mesmo frame)
+INTRADAY_INDEX_CACHE_SIZE = 8
 
 
 def simulate_execution_with_15m(
@@ -37,126 +51,201 @@ def simulate_execution_with_15m(
     Returns:
         List of trade dictionaries with accurate entry/exit times and prices
     """
-    trades = []
-    stop_loss_pct = float(stop_loss) if stop_loss is not None else 0.0
-    is_short = (direction or "long").lower() == "short"
+    return simulate_execution_with_15m_array(
+        df_daily_signals, df_15m, stop_loss, direction=direction
+    ).to_dicts()
+
+
+def _index_ns(index: pd.Index, tz=None) -> np.ndarray:
+    """DatetimeIndex como int64 ns; índice naive é localizado em ``tz`` (regra do loop legado)."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is None and tz is not None:
+        index = index.tz_localize(tz)
+    return index.as_unit("ns").asi8
+
+
+def _grow_min_levels(levels: List[np.ndarray], max_span: int) -> List[np.ndarray]:
+    """Estende a sparse table de mínimos (in place) até cobrir blocos de ``max_span``."""
+    while (1 << len(levels)) <= max_span and len(levels[-1]) > (1 << (len(levels) - 1)):
+        prev = levels[-1]
+        half = 1 << (len(levels) - 1)
+        levels.append(np.fmin(prev[:-half], prev[half:]))
+    return levels
+
+
+def _first_hit_indices(
+    values: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    threshold: np.ndarray,
+    levels: Optional[List[np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Primeiro índice ``j`` em ``[lo, hi)`` com ``values[j] <= threshold``, para todos os trades.
 
-    if df_15m.empty:
-        times_15m = np.array([])
-        lows_15m = np.array([])
-        highs_15m = np.array([])
-    else:
-        times_15m = df_15m.index
-        lows_15m = df_15m["low"].values
-        highs_15m = df_15m["high"].values
+    Sparse table de mínimos (``fmin``: NaN nunca dispara) + busca binária por
+    saltos de potência de 2, vetorizada sobre os trades candidatos. ``levels``
+    reaproveita uma sparse table já construída para ``values`` (ver
+    ``_IntradayIndex``). Retorna ``hi`` quando não há toque no intervalo.
+    """
+    pos = lo.astype(np.intp, copy=True)
+    hi = hi.astype(np.intp, copy=False)
+    if values.size == 0 or pos.size == 0:
+        return hi.copy()
+
+    max_span = int(np.max(hi - pos, initial=0))
+    levels = _grow_min_levels(levels if levels is not None else [values], max_span)
+
+    for k in range(len(levels) - 1, -1, -1):
+        table = levels[k]
+        step = 1 << k
+        can_jump = pos + step <= hi
+        idx = np.flatnonzero(can_jump)
+        if idx.size == 0:
+            continue
+        # Bloco [pos, pos + step) sem toque → pula o bloco inteiro
+        no_hit = ~(table[pos[idx]] <= threshold[idx])
+        pos[idx[no_hit]] += step
+    return pos
 
-    # Pre-calculate entry signals
-    entry_signals = df_daily_signals[df_daily_signals["signal"] == 1]
 
-    # Pre-calculate ALL exit signals (signal == -1) to avoid repeated filtering
-    exit_signals = df_daily_signals[df_daily_signals["signal"] == -1]
-    exit_times = exit_signals.index
-    # Exit executes at OPEN of daily candle (signal detected at CLOSE of previous candle → execute at OPEN of next day)
-    exit_prices = exit_signals["open"].values
+class _IntradayIndex:
+    """
+    Índice de busca (int64 ns) e sparse tables de low / -high de um frame 15m.
 
-    last_exit_time = None
+    Construído uma vez por frame e guardado em ``_intraday_index``; as sparse
+    tables crescem sob demanda até o maior intervalo já consultado.
+    """
 
-    for entry_time, entry_row in entry_signals.iterrows():
-        # 1. Skip if we are still in a position (simulated strictly sequential trades)
-        if last_exit_time is not None and entry_time < last_exit_time:
-            continue
+    def __init__(self, df_15m: pd.DataFrame, tz=None):
+        self.times = _index_ns(df_15m.index, tz)
+        self._levels = {
+            "long": [df_15m["low"].to_numpy(dtype=float)],
+            # short: high >= stop  ⇔  -high <= -stop
+            "short": [-df_15m["high"].to_numpy(dtype=float)],
+        }
+        self._lock = threading.Lock()
+
+    def values(self, side: str) -> np.ndarray:
+        return self._levels[side][0]
+
+    def levels(self, side: str, max_span: int) -> List[np.ndarray]:
+        with self._lock:
+            return list(_grow_min_levels(self._levels[side], max_span))
+
+
+_INTRADAY_INDEXES: "OrderedDict[tuple, tuple[weakref.ref, _IntradayIndex]]" = OrderedDict()
+_INTRADAY_LOCK = threading.Lock()
+
+
+def _intraday_index(df_15m: pd.DataFrame, tz=None) -> _IntradayIndex:
+    """``_IntradayIndex`` do frame (LRU por identidade; o weakref evita reuso de ``id``)."""
+    key = (id(df_15m), len(df_15m), str(tz))
+    with _INTRADAY_LOCK:
+        cached = _INTRADAY_INDEXES.get(key)
+        if cached is not None and cached[0]() is df_15m:
+            _INTRADAY_INDEXES.move_to_end(key)
+            return cached[1]
+    index = _IntradayIndex(df_15m, tz)
+    with _INTRADAY_LOCK:
+        _INTRADAY_INDEXES[key] = (weakref.ref(df_15m), index)
+        _INTRADAY_INDEXES.move_to_end(key)
+        while len(_INTRADAY_INDEXES) > INTRADAY_INDEX_CACHE_SIZE:
+            _INTRADAY_INDEXES.popitem(last=False)
+    return index
+
+
+def simulate_execution_with_15m_array(
+    df_daily_signals: pd.DataFrame, df_15m: pd.DataFrame, stop_loss: float, direction: str = "long"
+) -> TradeArray:
+    """
+    Same simulation as ``simulate_execution_with_15m``, returning a ``TradeArray``.
 
-        entry_price = float(entry_row["open"])
-        if is_short:
-            exact_stop_price = entry_price * (1 + stop_loss_pct)  # short: stop above entry
-        else:
-            exact_stop_price = entry_price * (1 - stop_loss_pct)  # long: stop below entry
-
-        next_exit_idx = exit_times.searchsorted(entry_time, side="right")
-        if next_exit_idx < len(exit_times):
-            signal_exit_time = exit_times[next_exit_idx]
-            signal_exit_price = float(exit_prices[next_exit_idx])
-            reason_end = "signal"
-        else:
-            signal_exit_time = df_daily_signals.index[-1] + pd.Timedelta(days=1)
-            signal_exit_price = float(df_daily_signals.iloc[-1]["close"])
-            reason_end = "end_of_period"
-
-        # 3. PRIORIDADE 1: Intraday stop loss check (high for short, low for long)
-        if len(times_15m) > 0:
-            start_idx = times_15m.searchsorted(entry_time)
-            end_idx = times_15m.searchsorted(signal_exit_time)
-            if is_short:
-                chunk_ohlc = highs_15m[start_idx:end_idx]
-                hit_stop = (
-                    stop_loss_pct > 0
-                    and chunk_ohlc.size > 0
-                    and np.any(chunk_ohlc >= exact_stop_price)
-                )
-            else:
-                chunk_ohlc = lows_15m[start_idx:end_idx]
-                hit_stop = (
-                    stop_loss_pct > 0
-                    and chunk_ohlc.size > 0
-                    and np.any(chunk_ohlc <= exact_stop_price)
-                )
-
-            if hit_stop and stop_loss_pct > 0 and chunk_ohlc.size > 0:
-                if is_short:
-                    hit_indices = np.where(chunk_ohlc >= exact_stop_price)[0]
-                else:
-                    hit_indices = np.where(chunk_ohlc <= exact_stop_price)[0]
-                if hit_indices.size > 0:
-                    hit_offset = hit_indices[0]
-                    first_hit_time = times_15m[start_idx + hit_offset]
-                    final_exit_time = pd.Timestamp(first_hit_time)
-                    if final_exit_time.tz is None and entry_time.tz is not None:
-                        final_exit_time = final_exit_time.tz_localize(entry_time.tz)
-                    final_exit_price = exact_stop_price
-                    exit_reason = "stop_loss"
-                else:
-                    final_exit_time = signal_exit_time
-                    final_exit_price = signal_exit_price
-                    exit_reason = reason_end
-            else:
-                final_exit_time = signal_exit_time
-                final_exit_price = signal_exit_price
-                exit_reason = reason_end
-        else:
-            final_exit_time = signal_exit_time
-            final_exit_price = signal_exit_price
-            exit_reason = reason_end
-
-        # An open position is not a completed trade.  The old implementation
-        # fabricated an exit on the day after the last candle, which could be
-        # cached and exposed as a future sell signal by the monitor.
-        if exit_reason == "end_of_period":
-            continue
+    Every entry signal is resolved at once: next exit signal and 15m window via
+    ``searchsorted`` on int64 arrays, first stop touch via ``_first_hit_indices``.
+    Only the cheap "skip entries while in a position" pass stays sequential.
+    """
+    stop_loss_pct = float(stop_loss) if stop_loss is not None else 0.0
+    is_short = (direction or "long").lower() == "short"
+    tz = getattr(df_daily_signals.index, "tz", None)
+
+    signal_col = df_daily_signals["signal"].to_numpy()
+    entry_mask = signal_col == 1
+    if df_daily_signals.empty or not entry_mask.any():
+        return TradeArray.empty(tz=tz)
+
+    daily_ns = _index_ns(df_daily_signals.index)
+    entry_ns = daily_ns[entry_mask]
+    entry_prices = df_daily_signals["open"].to_numpy(dtype=float)[entry_mask]
+    if is_short:
+        stop_prices = entry_prices * (1 + stop_loss_pct)  # short: stop above entry
+    else:
+        stop_prices = entry_prices * (1 - stop_loss_pct)  # long: stop below entry
 
-        last_exit_time = final_exit_time
-        if is_short:
-            profit = (
-                entry_price * (1 - TRADING_FEE) - float(final_exit_price) * (1 + TRADING_FEE)
-            ) / (entry_price * (1 - TRADING_FEE))
-        else:
-            profit = (
-                (final_exit_price * (1 - TRADING_FEE)) - (entry_price * (1 + TRADING_FEE))
-            ) / (entry_price * (1 + TRADING_FEE))
-
-        signal_type = "Stop" if exit_reason == "stop_loss" else "Close entry(s) order..."
-        trades.append(
-            {
-                "entry_time": entry_time.isoformat(),
-                "entry_price": entry_price,
-                "type": "short" if is_short else "long",
-                "exit_time": final_exit_time.isoformat(),
-                "exit_price": float(final_exit_price),
-                "profit": profit,
-                "exit_reason": "stop_loss_15m" if exit_reason == "stop_loss" else "signal_15m",
-                "signal_type": signal_type,
-                "entry_signal_type": "Vender" if is_short else "Comprar",
-            }
+    # Exit executes at OPEN of daily candle (signal detected at CLOSE of previous candle → execute at OPEN of next day)
+    exit_mask = signal_col == -1
+    exit_signal_ns = daily_ns[exit_mask]
+    exit_signal_prices = df_daily_signals["open"].to_numpy(dtype=float)[exit_mask]
+
+    next_exit = np.searchsorted(exit_signal_ns, entry_ns, side="right")
+    has_signal_exit = next_exit < len(exit_signal_ns)
+    safe_next = np.minimum(next_exit, max(len(exit_signal_ns) - 1, 0))
+    end_of_period_ns = daily_ns[-1] + pd.Timedelta(days=1).value
+    if len(exit_signal_ns):
+        window_end_ns = np.where(has_signal_exit, exit_signal_ns[safe_next], end_of_period_ns)
+        exit_price = np.where(has_signal_exit, exit_signal_prices[safe_next], np.nan)
+    else:
+        window_end_ns = np.full(len(entry_ns), end_of_period_ns, dtype=np.int64)
+        exit_price = np.full(len(entry_ns), np.nan)
+    exit_ns = window_end_ns.copy()
+    reason = np.full(len(entry_ns), REASON_SIGNAL_15M, dtype=np.int8)
+
+    # PRIORIDADE 1: Intraday stop loss check (high for short, low for long)
+    if stop_loss_pct > 0 and not df_15m.empty:
+        intraday = _intraday_index(df_15m, tz)
+        times_15m = intraday.times
+        side = "short" if is_short else "long"
+        threshold = -stop_prices if is_short else stop_prices
+        start_idx = np.searchsorted(times_15m, entry_ns, side="left")
+        end_idx = np.searchsorted(times_15m, window_end_ns, side="left")
+        max_span = int(np.max(end_idx - start_idx, initial=0))
+        hit_idx = _first_hit_indices(
+            intraday.values(side),
+            start_idx,
+            end_idx,
+            threshold,
+            levels=intraday.levels(side, max_span),
         )
-
-    # logger.info(f"Deep Backtest complete: {len(trades)} trades extracted")
-    return trades
+        hit = hit_idx < end_idx
+        exit_ns[hit] = times_15m[hit_idx[hit]]
+        exit_price[hit] = stop_prices[hit]
+        reason[hit] = REASON_STOP_LOSS_15M
+        has_signal_exit = has_signal_exit | hit
+
+    # An open position is not a completed trade.  The old implementation
+    # fabricated an exit on the day after the last candle, which could be
+    # cached and exposed as a future sell signal by the monitor.
+    candidates = np.flatnonzero(has_signal_exit)
+
+    # Strictly sequential trades: skip entries while still in a position
+    taken: List[int] = []
+    last_exit_ns = None
+    for i in candidates.tolist():
+        if last_exit_ns is not None and entry_ns[i] < last_exit_ns:
+            continue
+        taken.append(i)
+        last_exit_ns = exit_ns[i]
+
+    chosen = np.asarray(taken, dtype=np.intp)
+    entry_prices_arr = entry_prices[chosen]
+    exit_prices_arr = exit_price[chosen]
+    return TradeArray.from_columns(
+        entry_ns=entry_ns[chosen],
+        exit_ns=exit_ns[chosen],
+        entry_price=entry_prices_arr,
+        exit_price=exit_prices_arr,
+        profit=trade_returns(entry_prices_arr, exit_prices_arr, is_short, TRADING_FEE),
+        reason=reason[chosen],
+        direction=DIRECTION_SHORT if is_short else DIRECTION_LONG,
+        tz=tz,
+    )
@@ -9,6 +9,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+from app.services.binance_market_universe import get_market_universe
+
 
 class ExchangeService:
     """Service to interact with cryptocurrency exchanges via ccxt."""
@@ -65,11 +67,18 @@ class ExchangeService:
 
     def _fetch_from_api(self) -> List[str]:
         """Fetch symbols from Binance API and filter for USDT pairs."""
-        print("📡 Fetching symbols from Binance API...")
-        markets = self.exchange.load_markets()
-
-        # Filter for USDT pairs only
-        usdt_symbols = [symbol for symbol in markets.keys() if symbol.endswith("/USDT")]
+        try:
+            # Shared symbol universe: no extra exchangeInfo download when it is warm.
+            pairs = get_market_universe().spot_pairs("USDT")
+            usdt_symbols = [f"{pair['baseAsset']}/USDT" for pair in pairs if pair.get("baseAsset")]
+        except RuntimeError:
+            usdt_symbols = []
+        if not usdt_symbols:
+            print("📡 Fetching symbols from Binance API...")
+            markets = self.exchange.load_markets()
+
+            # Filter for USDT pairs only
+            usdt_symbols = [symbol for symbol in markets.keys() if symbol.endswith("/USDT")]
 
         print(f"✅ Found {len(usdt_symbols)} USDT trading pairs")
         return sorted(usdt_symbols)
@@ -10,12 +10,12 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
-import httpx
 import pandas as pd
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
 from app.models import AutoBacktestRun, FavoriteStrategy
+from app.services.binance_market_universe import get_market_universe
 from app.services.combo_optimizer import ComboOptimizer
 from app.services.market_data_providers import (
     CCXT_SOURCE,
@@ -37,7 +37,6 @@ DEFAULT_REFRESH_MAX_FAVORITES = 12
 DEFAULT_REFRESH_INITIAL_DELAY_SECONDS = 300
 DEFAULT_REFRESH_DELETE_DELISTED_BINANCE = True
 DEFAULT_BINANCE_EXCHANGE_INFO_TTL_SECONDS = 3600
-BINANCE_EXCHANGE_INFO_URL = "https://api.binance.com/api/v3/exchangeInfo"
 
 
 def _utcnow() -> datetime:
@@ -123,18 +122,7 @@ def _binance_symbol_code(symbol: str) -> str:
 
 
 def _fetch_binance_trading_symbols() -> set[str]:
-    response = httpx.get(
-        os.getenv("BINANCE_EXCHANGE_INFO_URL", BINANCE_EXCHANGE_INFO_URL),
-        timeout=float(os.getenv("BINANCE_EXCHANGE_INFO_TIMEOUT_SECONDS", "20")),
-    )
-    response.raise_for_status()
-    payload = response.json()
-    symbols = payload.get("symbols") if isinstance(payload, dict) else []
-    return {
-        str(item.get("symbol") or "").upper()
-        for item in symbols
-        if isinstance(item, dict) and item.get("status") == "TRADING"
-    }
+    return get_market_universe().trading_symbols()
 
 
 def _parse_candle_timestamp(value: Any) -> datetime | None:
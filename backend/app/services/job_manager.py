@@ -2,7 +2,7 @@
 import threading
 import uuid
 from datetime import datetime
-from typing import Dict, Optional, List, Any
+from typing import Dict, Iterator, Optional, List, Any, Tuple
 import logging
 from pathlib import Path
 
@@ -220,6 +220,38 @@ class JobManager:
             # Fallback to reading from old JSON format
             return self._get_results_from_json(job_id, page, limit)
 
+    def iter_indexed_results(
+        self, job_id: str, below: int, page_size: int = 1000
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Yield stored ``(result_index, result)`` pairs with ``result_index < below``.
+
+        Reads one keyset page at a time so resuming a large job never loads every
+        persisted row at once.
+        """
+        last_index = -1
+        while True:
+            with self._session_factory() as db:
+                rows = (
+                    db.query(
+                        OptimizationResult.result_index,
+                        OptimizationResult.params_json,
+                        OptimizationResult.metrics_json,
+                    )
+                    .filter(
+                        OptimizationResult.job_id == job_id,
+                        OptimizationResult.result_index > last_index,
+                        OptimizationResult.result_index < below,
+                    )
+                    .order_by(OptimizationResult.result_index.asc())
+                    .limit(page_size)
+                    .all()
+                )
+            for index, params, metrics in rows:
+                yield index, {"params": params or {}, "metrics": metrics or {}}
+            if len(rows) < page_size:
+                return
+            last_index = rows[-1][0]
+
     def _get_results_from_json(self, job_id: str, page: int, limit: int) -> Dict:
         """Fallback: Read results from old JSON format for backward compatibility"""
         state = self.load_state(job_id)
@@ -243,12 +275,19 @@ class JobManager:
 
     def save_results_batch(self, job_id: str, results: List[Dict], start_index: int):
         """Save multiple optimization results in a single transaction for better performance"""
-        if not results:
+        self.save_indexed_results(
+            job_id, [(start_index + i, result) for i, result in enumerate(results)]
+        )
+
+    def save_indexed_results(self, job_id: str, indexed_results: List[Tuple[int, Dict]]):
+        """Save (result_index, result) pairs that need not be contiguous in one transaction."""
+        if not indexed_results:
             return
 
+        results = [result for _, result in indexed_results]
         try:
             with self._session_factory() as db:
-                indexes = [start_index + i for i in range(len(results))]
+                indexes = [idx for idx, _ in indexed_results]
                 existing_rows = (
                     db.query(OptimizationResult)
                     .filter(
@@ -259,8 +298,7 @@ class JobManager:
                 )
                 existing_by_index = {row.result_index: row for row in existing_rows}
 
-                for i, result in enumerate(results):
-                    idx = start_index + i
+                for idx, result in zip(indexes, results):
                     row = existing_by_index.get(idx)
                     if row is None:
                         row = OptimizationResult(job_id=job_id, result_index=idx)
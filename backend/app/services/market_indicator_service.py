@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import json
 import logging
 import threading
@@ -12,7 +13,7 @@ import talib
 from sqlalchemy import text
 
 from app.database import engine
-from app.services.chart_pattern_service import detect_chart_patterns
+from app.services.chart_pattern_service import detect_chart_patterns, rescan_start
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +56,66 @@ PIVOT_LEVEL_COLUMNS = (
     "resistance_3",
 )
 
+# Values compared against the stored row: unchanged rows are not rewritten.
+INDICATOR_VALUE_COLUMNS = (
+    "ema_9",
+    "ema_21",
+    "sma_20",
+    "sma_50",
+    "rsi_14",
+    "macd_line",
+    "macd_signal",
+    "macd_histogram",
+    *ADVANCED_INDICATOR_COLUMNS,
+    "chart_patterns",
+    *PIVOT_LEVEL_COLUMNS,
+)
+_NUMERIC_VALUE_COLUMNS = tuple(
+    column for column in INDICATOR_VALUE_COLUMNS if column != "chart_patterns"
+)
+_WRITE_COLUMNS = (
+    "symbol",
+    "timeframe",
+    "ts",
+    *INDICATOR_VALUE_COLUMNS,
+    "source",
+    "provider",
+    "source_window",
+    "row_count",
+    "is_recomputed",
+    "updated_at",
+)
+_STAGING_TABLE = "market_indicator_staging"
+_INSERT_COLUMNS_SQL = ",\n".join(_WRITE_COLUMNS)
+_CONFLICT_UPDATE_SQL = """
+ON CONFLICT (symbol, timeframe, ts)
+DO UPDATE SET
+{updates}
+WHERE ({stored}) IS DISTINCT FROM ({incoming})
+""".format(
+    updates=",\n".join(f"{column} = EXCLUDED.{column}" for column in _WRITE_COLUMNS[3:]),
+    stored=", ".join(f"market_indicator.{column}" for column in INDICATOR_VALUE_COLUMNS),
+    incoming=", ".join(f"EXCLUDED.{column}" for column in INDICATOR_VALUE_COLUMNS),
+)
+_UPSERT_VALUES_SQL = (
+    f"INSERT INTO market_indicator (\n{_INSERT_COLUMNS_SQL}\n)\n"
+    f"VALUES (\n{', '.join(f':{column}' for column in _WRITE_COLUMNS)}\n)"
+    f"{_CONFLICT_UPDATE_SQL}"
+)
+_CREATE_STAGING_SQL = (
+    f"CREATE TEMP TABLE {_STAGING_TABLE} ON COMMIT DROP AS "
+    f"SELECT {', '.join(_WRITE_COLUMNS)} FROM market_indicator WITH NO DATA"
+)
+_COPY_STAGING_SQL = (
+    f"COPY {_STAGING_TABLE} ({', '.join(_WRITE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+)
+# Staging columns come from market_indicator itself, so the COPYed text is cast on load.
+_MERGE_STAGING_SQL = (
+    f"INSERT INTO market_indicator (\n{_INSERT_COLUMNS_SQL}\n)\n"
+    f"SELECT {', '.join(_WRITE_COLUMNS)} FROM {_STAGING_TABLE}"
+    f"{_CONFLICT_UPDATE_SQL}"
+)
+
 
 def _normalize_timeframe(value: str) -> str:
     return str(value or "").strip().lower()
@@ -85,10 +146,6 @@ def _required_interval(tf: str) -> timedelta:
     return MAX_LOOKBACK_LOOKUP.get(_normalize_timeframe(tf), timedelta(hours=1))
 
 
-def _nullable_float(value: Any) -> float | None:
-    return None if pd.isna(value) else float(value)
-
-
 def _json_or_none(value: Any) -> str | None:
     if value is None:
         return None
@@ -124,6 +181,52 @@ def _classic_pivot_levels(
     }
 
 
+def _json_column(values: pd.Series, serialize) -> pd.Series:
+    """Serialize an object column, once per distinct object (``source_window`` is shared)."""
+    serialized: dict[int, str | None] = {}
+
+    def _cached(value: Any) -> str | None:
+        key = id(value)
+        if key not in serialized:
+            serialized[key] = serialize(value)
+        return serialized[key]
+
+    return values.map(_cached)
+
+
+def _indicator_write_frame(rows: pd.DataFrame, *, is_recomputed: bool) -> pd.DataFrame:
+    """Column-wise ``market_indicator`` rows in ``_WRITE_COLUMNS`` order (NaN means NULL)."""
+    frame = pd.DataFrame(index=rows.index)
+    frame["symbol"] = rows["symbol"]
+    frame["timeframe"] = rows["timeframe"]
+    frame["ts"] = pd.to_datetime(rows["ts"], utc=True)
+    for column in _NUMERIC_VALUE_COLUMNS:
+        frame[column] = pd.to_numeric(rows[column], errors="coerce").astype(float)
+    if "chart_patterns" in rows.columns:
+        frame["chart_patterns"] = _json_column(rows["chart_patterns"], _json_or_none)
+    else:
+        frame["chart_patterns"] = None
+    frame["source"] = rows["source"]
+    frame["provider"] = rows["provider"]
+    frame["source_window"] = _json_column(rows["source_window"], json.dumps)
+    frame["row_count"] = rows["row_count"].astype(int)
+    frame["is_recomputed"] = bool(is_recomputed)
+    frame["updated_at"] = _utcnow()
+    return frame[list(_WRITE_COLUMNS)]
+
+
+def _copy_cursor(conn: Any) -> Any | None:
+    """DB-API cursor able to ``COPY`` (psycopg2) on the connection, if there is one."""
+    raw = getattr(getattr(conn, "connection", None), "dbapi_connection", None)
+    if raw is None:
+        return None
+    cursor = raw.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        return None
+    return cursor
+
+
 class MarketIndicatorService:
     def __init__(self) -> None:
         self._lock = threading.RLock()
@@ -292,7 +395,9 @@ class MarketIndicatorService:
             return _utcnow() - timedelta(days=365 * 2)
         return base_ts - (_required_interval(timeframe) * LOOKBACK_BARS)
 
-    def _compute_indicators(self, df: pd.DataFrame, timeframe: str, symbol: str) -> pd.DataFrame:
+    def _compute_indicators(
+        self, df: pd.DataFrame, timeframe: str, symbol: str, *, pattern_start: int = 0
+    ) -> pd.DataFrame:
         if df.empty:
             return df.copy()
 
@@ -357,7 +462,7 @@ class MarketIndicatorService:
         out["ichimoku_chikou_26"] = ichimoku_chikou
         for column, values in pivot_levels.items():
             out[column] = values
-        out["chart_patterns"] = detect_chart_patterns(out)
+        out["chart_patterns"] = detect_chart_patterns(out, start_pos=pattern_start)
         out["symbol"] = _normalize_symbol(symbol)
         out["timeframe"] = _normalize_timeframe(timeframe)
         out["source"] = "technical"
@@ -404,156 +509,26 @@ class MarketIndicatorService:
         if rows.empty:
             return
 
-        write_rows = []
-        for _, row in rows.iterrows():
-            write_rows.append(
-                {
-                    "symbol": row["symbol"],
-                    "timeframe": row["timeframe"],
-                    "ts": row["ts"].to_pydatetime(),
-                    "ema_9": _nullable_float(row["ema_9"]),
-                    "ema_21": _nullable_float(row["ema_21"]),
-                    "sma_20": _nullable_float(row["sma_20"]),
-                    "sma_50": _nullable_float(row["sma_50"]),
-                    "rsi_14": _nullable_float(row["rsi_14"]),
-                    "macd_line": _nullable_float(row["macd_line"]),
-                    "macd_signal": _nullable_float(row["macd_signal"]),
-                    "macd_histogram": _nullable_float(row["macd_histogram"]),
-                    **{
-                        column: _nullable_float(row[column])
-                        for column in ADVANCED_INDICATOR_COLUMNS
-                    },
-                    **{column: _nullable_float(row[column]) for column in PIVOT_LEVEL_COLUMNS},
-                    "chart_patterns": _json_or_none(row.get("chart_patterns")),
-                    "source": row["source"],
-                    "provider": row["provider"],
-                    "source_window": json.dumps(row["source_window"]),
-                    "row_count": int(row["row_count"]),
-                    "is_recomputed": bool(is_recomputed),
-                    "updated_at": _utcnow(),
-                }
-            )
-
+        frame = _indicator_write_frame(rows, is_recomputed=is_recomputed)
         with engine.begin() as conn:
-            conn.execute(
-                text("""
-                    INSERT INTO market_indicator (
-                        symbol,
-                        timeframe,
-                        ts,
-                        ema_9,
-                        ema_21,
-                        sma_20,
-                        sma_50,
-                        rsi_14,
-                        macd_line,
-                        macd_signal,
-                        macd_histogram,
-                        bb_upper_20_2,
-                        bb_middle_20_2,
-                        bb_lower_20_2,
-                        atr_14,
-                        stoch_k_14_3_3,
-                        stoch_d_14_3_3,
-                        obv,
-                        ichimoku_tenkan_9,
-                        ichimoku_kijun_26,
-                        ichimoku_senkou_a_9_26_52,
-                        ichimoku_senkou_b_9_26_52,
-                        ichimoku_chikou_26,
-                        chart_patterns,
-                        pivot_point,
-                        support_1,
-                        support_2,
-                        support_3,
-                        resistance_1,
-                        resistance_2,
-                        resistance_3,
-                        source,
-                        provider,
-                        source_window,
-                        row_count,
-                        is_recomputed,
-                        updated_at
-                    )
-                    VALUES (
-                        :symbol,
-                        :timeframe,
-                        :ts,
-                        :ema_9,
-                        :ema_21,
-                        :sma_20,
-                        :sma_50,
-                        :rsi_14,
-                        :macd_line,
-                        :macd_signal,
-                        :macd_histogram,
-                        :bb_upper_20_2,
-                        :bb_middle_20_2,
-                        :bb_lower_20_2,
-                        :atr_14,
-                        :stoch_k_14_3_3,
-                        :stoch_d_14_3_3,
-                        :obv,
-                        :ichimoku_tenkan_9,
-                        :ichimoku_kijun_26,
-                        :ichimoku_senkou_a_9_26_52,
-                        :ichimoku_senkou_b_9_26_52,
-                        :ichimoku_chikou_26,
-                        :chart_patterns,
-                        :pivot_point,
-                        :support_1,
-                        :support_2,
-                        :support_3,
-                        :resistance_1,
-                        :resistance_2,
-                        :resistance_3,
-                        :source,
-                        :provider,
-                        :source_window,
-                        :row_count,
-                        :is_recomputed,
-                        :updated_at
-                    )
-                    ON CONFLICT (symbol, timeframe, ts)
-                    DO UPDATE SET
-                        ema_9 = EXCLUDED.ema_9,
-                        ema_21 = EXCLUDED.ema_21,
-                        sma_20 = EXCLUDED.sma_20,
-                        sma_50 = EXCLUDED.sma_50,
-                        rsi_14 = EXCLUDED.rsi_14,
-                        macd_line = EXCLUDED.macd_line,
-                        macd_signal = EXCLUDED.macd_signal,
-                        macd_histogram = EXCLUDED.macd_histogram,
-                        bb_upper_20_2 = EXCLUDED.bb_upper_20_2,
-                        bb_middle_20_2 = EXCLUDED.bb_middle_20_2,
-                        bb_lower_20_2 = EXCLUDED.bb_lower_20_2,
-                        atr_14 = EXCLUDED.atr_14,
-                        stoch_k_14_3_3 = EXCLUDED.stoch_k_14_3_3,
-                        stoch_d_14_3_3 = EXCLUDED.stoch_d_14_3_3,
-                        obv = EXCLUDED.obv,
-                        ichimoku_tenkan_9 = EXCLUDED.ichimoku_tenkan_9,
-                        ichimoku_kijun_26 = EXCLUDED.ichimoku_kijun_26,
-                        ichimoku_senkou_a_9_26_52 = EXCLUDED.ichimoku_senkou_a_9_26_52,
-                        ichimoku_senkou_b_9_26_52 = EXCLUDED.ichimoku_senkou_b_9_26_52,
-                        ichimoku_chikou_26 = EXCLUDED.ichimoku_chikou_26,
-                        chart_patterns = EXCLUDED.chart_patterns,
-                        pivot_point = EXCLUDED.pivot_point,
-                        support_1 = EXCLUDED.support_1,
-                        support_2 = EXCLUDED.support_2,
-                        support_3 = EXCLUDED.support_3,
-                        resistance_1 = EXCLUDED.resistance_1,
-                        resistance_2 = EXCLUDED.resistance_2,
-                        resistance_3 = EXCLUDED.resistance_3,
-                        source = EXCLUDED.source,
-                        provider = EXCLUDED.provider,
-                        source_window = EXCLUDED.source_window,
-                        row_count = EXCLUDED.row_count,
-                        is_recomputed = EXCLUDED.is_recomputed,
-                        updated_at = EXCLUDED.updated_at
-                    """),
-                write_rows,
-            )
+            cursor = _copy_cursor(conn)
+            if cursor is None:
+                conn.execute(
+                    text(_UPSERT_VALUES_SQL),
+                    frame.astype(object).where(frame.notna(), None).to_dict("records"),
+                )
+                return
+
+            # One COPY into a transaction-scoped staging table, then a single merge.
+            conn.execute(text(_CREATE_STAGING_SQL))
+            buffer = io.StringIO()
+            frame.to_csv(buffer, index=False, header=False, na_rep="")
+            buffer.seek(0)
+            try:
+                cursor.copy_expert(_COPY_STAGING_SQL, buffer)
+            finally:
+                cursor.close()
+            conn.execute(text(_MERGE_STAGING_SQL))
 
     def _estimated_bars(self, symbol: str, timeframe: str) -> int:
         with engine.begin() as conn:
@@ -602,8 +577,17 @@ class MarketIndicatorService:
                 if since is not None and len(ohlcv_df) > MAX_HISTORY_BARS:
                     ohlcv_df = ohlcv_df.tail(MAX_HISTORY_BARS).copy()
 
-                output = self._compute_indicators(ohlcv_df, timeframe, normalized_symbol)
-                self._upsert_indicators(output, is_recomputed=not force_full)
+                # Incremental runs only rescan and rewrite the tail: earlier rows are
+                # warmup context whose indicators and patterns are already stored.
+                pattern_start = 0
+                if since is not None:
+                    new_rows = (ohlcv_df["ts"] > last_indicator_ts).to_numpy()
+                    first_new = int(new_rows.argmax()) if new_rows.any() else len(ohlcv_df)
+                    pattern_start = rescan_start(first_new)
+                output = self._compute_indicators(
+                    ohlcv_df, timeframe, normalized_symbol, pattern_start=pattern_start
+                )
+                self._upsert_indicators(output.iloc[pattern_start:], is_recomputed=not force_full)
 
                 self._jobs[job_id]["processed_timeframes"] = (
                     self._jobs[job_id].get("processed_timeframes", 0) + 1
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import copy
 import logging
 import os
 import random
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import ccxt
+import httpx
 import pandas as pd
 from requests.exceptions import RequestException
 
 from app.config import get_settings
+from app.services.binance_http import WeightBudget, endpoint_weight, get_gateway
 from app.services.ohlcv_storage import SUPPORTED_OHLCV_TIMEFRAMES, MarketOhlcvRepository
+from app.services.ohlcv_derived_timeframes import derived_base_for, materialize_derived_candles
 from app.services.canonical_candle_service import candle_writer_enabled
 from app.services.binance_symbol_universe import resolve_binance_ohlcv_symbols
 from app.services.market_data_providers import (
@@ -32,6 +38,10 @@ logger = logging.getLogger(__name__)
 DEFAULT_BACKFILL_TIMEFRAMES = ["15m", "1d"]
 _WINDOW_YEAR_DAYS = 365
 _MAX_RETRIES = 4
+_MAX_JOB_EVENTS = 60
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_PROGRESS_PERSIST_SECONDS = 2.0
+DEFAULT_PROVIDER_REQUESTS_PER_MINUTE = 60
 _LOOKBACK_TF_SECONDS = {
     "1m": 60,
     "5m": 60,
@@ -186,6 +196,157 @@ def _is_retriable_error(error: BaseException) -> bool:
     return isinstance(error, RequestException)
 
 
+def _is_rate_limited(error: BaseException) -> bool:
+    """429/418 by HTTP status or ccxt's typed rate-limit errors; never by message text."""
+    if isinstance(error, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+        return True
+    for holder in (error, getattr(error, "response", None)):
+        status = getattr(holder, "status_code", getattr(holder, "status", None))
+        if isinstance(status, int) and status in (418, 429):
+            return True
+    return False
+
+
+def _provider_response_headers(provider: Any) -> httpx.Headers | None:
+    """Headers of the provider's last HTTP response (ccxt keeps them on the exchange)."""
+    exchange = getattr(getattr(provider, "loader", None), "exchange", None)
+    raw = getattr(exchange, "last_response_headers", None)
+    if not raw:
+        return None
+    try:
+        return httpx.Headers({str(key): str(value) for key, value in dict(raw).items()})
+    except (TypeError, ValueError):
+        return None
+
+
+_PROVIDER_BUDGETS: dict[str, WeightBudget] = {}
+_PROVIDER_BUDGETS_LOCK = threading.Lock()
+
+
+def _request_budget(source: str) -> tuple[WeightBudget, int]:
+    """Process-wide request budget and per-page cost for a data source.
+
+    Binance pages (ccxt) draw from the REST gateway's weight bucket, so backfill
+    shares one limit with every other Binance caller in the process and follows
+    the used-weight headers and 429 bans that any of them observe.
+    """
+    if source == CCXT_SOURCE:
+        return get_gateway().budget, endpoint_weight("/api/v3/klines")
+    with _PROVIDER_BUDGETS_LOCK:
+        budget = _PROVIDER_BUDGETS.get(source)
+        if budget is None:
+            per_minute = _parse_int(
+                os.getenv("BACKFILL_PROVIDER_REQUESTS_PER_MINUTE"),
+                default=DEFAULT_PROVIDER_REQUESTS_PER_MINUTE,
+            )
+            budget = WeightBudget(weight_per_minute=max(1, per_minute), safety_ratio=1.0)
+            _PROVIDER_BUDGETS[source] = budget
+        return budget, 1
+
+
+def _retry_after_seconds(provider: Any, default: float) -> float:
+    headers = _provider_response_headers(provider)
+    raw = headers.get("Retry-After") if headers is not None else None
+    try:
+        return max(0.0, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+class _JobProgress:
+    """Progress of a running job, kept in memory and persisted on a cadence.
+
+    Timeframe workers update their state and buffer events here; ``persist``
+    writes the states, totals and events in one store update and picks up
+    cancellations requested from other processes.
+    """
+
+    def __init__(self, store: OhlcvBackfillStore, job: dict[str, Any], persist_seconds: float):
+        self._store = store
+        self.job = job
+        self.job_id = job["job_id"]
+        self._persist_seconds = max(0.0, persist_seconds)
+        self._lock = threading.Lock()
+        # Serializes the job read-modify-write so concurrent timeframe threads can
+        # neither drop each other's events nor store an older state snapshot.
+        self._persist_lock = threading.Lock()
+        self._states: dict[str, dict[str, Any]] = copy.deepcopy(job.get("timeframe_states") or {})
+        self._events: list[dict[str, Any]] = []
+        self._changes: dict[str, Any] = {}
+        self._stop_status: str | None = None
+        self._last_persist = time.monotonic()
+
+    @property
+    def stop_status(self) -> str | None:
+        """``cancelled``/``failed`` once the job must stop, ``missing`` if it was deleted."""
+        return self._stop_status
+
+    def stop(self, status: str) -> None:
+        with self._lock:
+            if self._stop_status is None:
+                self._stop_status = status
+
+    def state(self, timeframe: str) -> dict[str, Any] | None:
+        with self._lock:
+            state = self._states.get(timeframe)
+            return dict(state) if state is not None else None
+
+    def states(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return copy.deepcopy(self._states)
+
+    def set_state(self, timeframe: str, state: dict[str, Any], **changes: Any) -> None:
+        with self._lock:
+            self._states[timeframe] = dict(state)
+            self._changes.update(changes)
+
+    def event(self, payload: dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append(payload)
+
+    def _totals(self, states: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        processed = written = duplicates = estimated_total = 0
+        for state in states.values():
+            processed += _parse_int(state.get("processed"), default=0)
+            written += _parse_int(state.get("written"), default=0)
+            duplicates += _parse_int(state.get("duplicates"), default=0)
+            estimated_total += _parse_int(state.get("estimated_total"), default=0)
+        return {
+            "processed": processed,
+            "written": written,
+            "duplicates": duplicates,
+            "estimated_total": estimated_total or None,
+            "percent": self._store.calculate_percent(processed, estimated_total or None),
+            "eta_seconds": self._store.estimate_eta_seconds(
+                self.job.get("started_at"), processed, estimated_total or None
+            ),
+        }
+
+    def maybe_persist(self) -> None:
+        if time.monotonic() - self._last_persist >= self._persist_seconds:
+            self.persist()
+
+    def persist(self, **changes: Any) -> None:
+        with self._persist_lock:
+            with self._lock:
+                states = copy.deepcopy(self._states)
+                events, self._events = self._events, []
+                pending, self._changes = self._changes, {}
+                self._last_persist = time.monotonic()
+            job = self._store.get_job(self.job_id)
+            if job is None:
+                self.stop("missing")
+                return
+            if job.get("cancel_requested") or _coerce_status(job.get("status")) == "cancelled":
+                self.stop("cancelled")
+            payload: dict[str, Any] = {"timeframe_states": states, **self._totals(states)}
+            if events:
+                payload["events"] = [*(job.get("events") or []), *events][-_MAX_JOB_EVENTS:]
+            payload.update(pending)
+            payload.update(changes)
+            self._store.update_job(self.job_id, **payload)
+
+
 class OhlcvBackfillService:
     _instance: "OhlcvBackfillService | None" = None
     _instance_lock = threading.Lock()
@@ -210,7 +371,14 @@ class OhlcvBackfillService:
         self._scheduler_stop = threading.Event()
         self._scheduler_thread: threading.Thread | None = None
         self._throttle_lock = threading.Lock()
-        self._next_request_time: float | None = None
+        self._next_request_times: dict[str, float] = {}
+        self._active_jobs: dict[str, _JobProgress] = {}
+        self._fetch_slots = threading.BoundedSemaphore(
+            max(
+                1,
+                _parse_int(os.getenv("BACKFILL_MAX_CONCURRENCY"), default=DEFAULT_MAX_CONCURRENCY),
+            )
+        )
 
     @staticmethod
     def _default_symbols() -> list[str]:
@@ -224,20 +392,19 @@ class OhlcvBackfillService:
         ]
         return filtered or [*DEFAULT_BACKFILL_TIMEFRAMES]
 
-    def _sleep_for_rate_limit(self, max_requests_per_minute: int) -> None:
-        max_rpm = _parse_int(max_requests_per_minute, default=60)
+    def _sleep_for_rate_limit(self, max_requests_per_minute: int, job_id: str = "") -> None:
+        """Optional per-job cap on top of the shared request budget (0 disables it)."""
+        max_rpm = _parse_int(max_requests_per_minute, default=0)
         if max_rpm <= 0:
             return
 
         interval = 60.0 / max_rpm
         with self._throttle_lock:
             now = time.monotonic()
-            if self._next_request_time is None:
-                self._next_request_time = now
-                return
-            if now < self._next_request_time:
-                time.sleep(self._next_request_time - now)
-            self._next_request_time = time.monotonic() + interval
+            next_at = self._next_request_times.get(job_id, now)
+            self._next_request_times[job_id] = max(now, next_at) + interval
+        if now < next_at:
+            time.sleep(next_at - now)
 
     def _record_event(
         self, job_id: str, message: str, *, level: str = "info", timeframe: str | None = None
@@ -248,6 +415,10 @@ class OhlcvBackfillService:
             "timeframe": timeframe,
             "message": message,
         }
+        progress = self._active_jobs.get(job_id)
+        if progress is not None:
+            progress.event(payload)
+            return
         self._store.record_event(job_id, payload)
 
     def _resolve_job_source(self, symbol: str, requested_source: str | None) -> str:
@@ -256,36 +427,6 @@ class OhlcvBackfillService:
             return resolve_data_source_for_symbol(symbol, requested_source)
         return resolve_data_source_for_symbol(symbol)
 
-    def _refresh_totals(self, job_id: str) -> None:
-        job = self._store.get_job(job_id)
-        if not job:
-            return
-        timeframe_states = job.get("timeframe_states") or {}
-
-        processed = 0
-        written = 0
-        duplicates = 0
-        estimated_total = 0
-        for state in timeframe_states.values():
-            processed += _parse_int(state.get("processed"), default=0)
-            written += _parse_int(state.get("written"), default=0)
-            duplicates += _parse_int(state.get("duplicates"), default=0)
-            estimated_total += _parse_int(state.get("estimated_total"), default=0)
-
-        percent = self._store.calculate_percent(processed, estimated_total or None)
-        eta_seconds = self._store.estimate_eta_seconds(
-            job.get("started_at"), processed, estimated_total or None
-        )
-        self._store.update_job(
-            job_id,
-            processed=processed,
-            written=written,
-            duplicates=duplicates,
-            estimated_total=estimated_total or None,
-            percent=percent,
-            eta_seconds=eta_seconds,
-        )
-
     def _needs_job(self, symbol: str, timeframes: list[str], history_years: int) -> bool:
         if not self._repo.enabled:
             return False
@@ -381,24 +522,35 @@ class OhlcvBackfillService:
         max_retries: int,
         job_id: str,
         timeframe_state: dict[str, Any],
+        source: str | None = None,
     ) -> pd.DataFrame:
+        budget, cost = _request_budget(source or getattr(provider, "source", CCXT_SOURCE))
         attempt = 0
         max_attempts = max(1, max_retries)
         while True:
             attempt += 1
-            self._sleep_for_rate_limit(max_requests_per_minute)
+            self._sleep_for_rate_limit(max_requests_per_minute, job_id)
+            budget.take(cost)
 
             try:
-                return _invoke_provider_fetch(
-                    provider,
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    since_str=since.isoformat(),
-                    until_str=until.isoformat(),
-                    limit=limit,
-                )
+                # Hold a process-wide fetch slot only for the provider call itself, never
+                # through the throttle, budget or backoff waits around it.
+                with self._fetch_slots:
+                    frame = _invoke_provider_fetch(
+                        provider,
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        since_str=since.isoformat(),
+                        until_str=until.isoformat(),
+                        limit=limit,
+                    )
+                headers = _provider_response_headers(provider)
+                if headers is not None:
+                    budget.observe(headers)
+                return frame
             except Exception as exc:
-                if attempt >= max_attempts or not _is_retriable_error(exc):
+                rate_limited = _is_rate_limited(exc)
+                if attempt >= max_attempts or not (rate_limited or _is_retriable_error(exc)):
                     raise
 
                 timeframe_state["retries"] = (
@@ -412,28 +564,62 @@ class OhlcvBackfillService:
                 )
 
                 backoff = min(30.0, 1.0 * (2 ** (attempt - 1)))
+                if rate_limited:
+                    # Pause every backfill worker (and Binance caller) sharing the budget.
+                    budget.block_for(_retry_after_seconds(provider, backoff))
+                    continue
                 jitter = random.uniform(0.4, 1.2)
                 time.sleep(backoff * jitter)
 
     def _run_timeframe_backfill(self, job_id: str, timeframe: str, source: str) -> bool:
+        progress = self._active_jobs.get(job_id)
+        if progress is not None:
+            return self._backfill_timeframe(progress, timeframe, source)
+
+        # Standalone run (outside ``_run_job``): track progress for this call only.
         job = self._store.get_job(job_id)
         if not job:
             return False
+        progress = self._track_job(job)
+        try:
+            return self._backfill_timeframe(progress, timeframe, source)
+        finally:
+            self._untrack_job(job_id)
+
+    def _track_job(self, job: dict[str, Any]) -> _JobProgress:
+        progress = _JobProgress(
+            self._store,
+            job,
+            persist_seconds=float(
+                os.getenv("BACKFILL_PROGRESS_PERSIST_SECONDS", DEFAULT_PROGRESS_PERSIST_SECONDS)
+            ),
+        )
+        with self._jobs_lock:
+            self._active_jobs[job["job_id"]] = progress
+        return progress
 
+    def _untrack_job(self, job_id: str) -> None:
+        with self._jobs_lock:
+            self._active_jobs.pop(job_id, None)
+        with self._throttle_lock:
+            self._next_request_times.pop(job_id, None)
+
+    def _backfill_timeframe(self, progress: _JobProgress, timeframe: str, source: str) -> bool:
+        job = progress.job
+        job_id = progress.job_id
+        symbol = job["symbol"]
         requested_window = job.get("requested_window") or {}
         window_start = _parse_iso(requested_window.get("start"))
         window_end = _parse_iso(requested_window.get("end"))
         page_size = _parse_int(job.get("page_size"), default=1000)
-        max_requests_per_minute = _parse_int(job.get("max_requests_per_minute"), default=60)
+        max_requests_per_minute = _parse_int(job.get("max_requests_per_minute"), default=0)
         max_retries = _parse_int(job.get("max_retries"), default=_MAX_RETRIES)
-        timeframe_states = job.get("timeframe_states") or {}
-        state = timeframe_states.get(timeframe)
+        state = progress.state(timeframe)
         if state is None:
             estimate_total = _estimate_total_for_range(window_start, window_end, timeframe)
             state = self._store.build_timeframe_state(
                 timeframe, window_start.isoformat(), estimate_total
             )
-            timeframe_states[timeframe] = state
 
         interval_seconds = _TIMEFRAME_INTERVAL_SECONDS.get(_normalize_timeframe(timeframe), 60)
         checkpoint_raw = (
@@ -446,9 +632,8 @@ class OhlcvBackfillService:
         if source == STOOQ_SOURCE and timeframe != "1d":
             state["status"] = "completed"
             state["checkpoint"] = _to_iso(window_end)
-            timeframe_states[timeframe] = state
-            job = self._store.get_job(job_id) or job
-            self._store.update_job(job_id, timeframe_states=timeframe_states)
+            progress.set_state(timeframe, state)
+            progress.persist()
             return True
 
         provider = get_market_data_provider(source)
@@ -460,39 +645,33 @@ class OhlcvBackfillService:
         state["duplicates"] = _parse_int(state.get("duplicates"), default=0)
         state["last_error"] = None
 
+        def _finish(status: str, *, event: str | None = None, **changes: Any) -> bool:
+            state["status"] = status
+            progress.set_state(timeframe, state)
+            if event:
+                self._record_event(job_id, event, level="warning", timeframe=timeframe)
+            progress.persist(**changes)
+            return status == "completed"
+
         while True:
-            job = self._store.get_job(job_id) or job
-            if not job:
-                return False
-            if _coerce_status(job.get("status")) in {"cancelled", "failed"}:
-                state["status"] = _coerce_status(job.get("status"))
-                timeframe_states[timeframe] = state
-                self._store.update_job(job_id, timeframe_states=timeframe_states)
+            stop_status = progress.stop_status
+            if stop_status == "missing":
                 return False
-            if job.get("cancel_requested"):
-                state["status"] = "cancelled"
-                timeframe_states[timeframe] = state
-                self._store.update_job(
-                    job_id,
-                    status="cancelled",
-                    timeframe_states=timeframe_states,
-                    last_error="Cancelado pelo operador.",
+            if stop_status == "cancelled":
+                return _finish(
+                    "cancelled", status="cancelled", last_error="Cancelado pelo operador."
                 )
-                return False
+            if stop_status == "failed":
+                return _finish("failed")
 
             if checkpoint >= window_end:
-                state["status"] = "completed"
                 state["checkpoint"] = _to_iso(checkpoint)
-                timeframe_states[timeframe] = state
-                self._store.update_job(
-                    job_id, timeframe_states=timeframe_states, current_timeframe=timeframe
-                )
-                return True
+                return _finish("completed", current_timeframe=timeframe)
 
             try:
                 frame = self._fetch_with_retries(
                     provider=provider,
-                    symbol=job["symbol"],
+                    symbol=symbol,
                     timeframe=timeframe,
                     since=checkpoint,
                     until=window_end,
@@ -501,47 +680,34 @@ class OhlcvBackfillService:
                     max_retries=max_retries,
                     job_id=job_id,
                     timeframe_state=state,
+                    source=source,
                 )
             except Exception as exc:
-                state["status"] = "failed"
                 state["errors"] += 1
                 state["last_error"] = str(exc)
                 state["retries"] = _parse_int(state.get("retries"), default=0) + 1
-                timeframe_states[timeframe] = state
-                self._store.update_job(
-                    job_id,
-                    status="failed",
-                    timeframe_states=timeframe_states,
-                    current_timeframe=timeframe,
-                    last_error=str(exc),
-                )
+                progress.stop("failed")
                 self._record_event(
                     job_id,
-                    f"Falha permanente em {job['symbol']}/{timeframe} (tentativa {state['errors']}/{max_retries}): {exc}",
+                    f"Falha permanente em {symbol}/{timeframe} (tentativa {state['errors']}/{max_retries}): {exc}",
                     level="error",
                     timeframe=timeframe,
                 )
-                self._refresh_totals(job_id)
-                return False
+                return _finish(
+                    "failed",
+                    status="failed",
+                    current_timeframe=timeframe,
+                    last_error=str(exc),
+                )
 
             if frame is None or frame.empty:
-                state["status"] = "partial_complete" if checkpoint < window_end else "completed"
                 state["current_lookback_to"] = _to_iso(checkpoint)
-                timeframe_states[timeframe] = state
-                self._store.update_job(
-                    job_id,
-                    timeframe_states=timeframe_states,
+                return _finish(
+                    "partial_complete" if checkpoint < window_end else "completed",
+                    event=f"Sem novos candles para {symbol}/{timeframe} a partir de {checkpoint.isoformat()}",
                     current_timeframe=timeframe,
-                    current_lookback_to=state.get("current_lookback_to"),
-                )
-                self._record_event(
-                    job_id,
-                    f"Sem novos candles para {job['symbol']}/{timeframe} a partir de {checkpoint.isoformat()}",
-                    level="warning",
-                    timeframe=timeframe,
+                    current_lookback_to=state["current_lookback_to"],
                 )
-                self._refresh_totals(job_id)
-                return state["status"] == "completed"
 
             if "timestamp_utc" not in frame.columns:
                 if frame.index.name == "timestamp_utc":
@@ -566,23 +732,13 @@ class OhlcvBackfillService:
                 & (normalized["timestamp_utc"] <= pd.Timestamp(window_end))
             ]
             if windowed.empty:
-                state["status"] = "partial_complete" if checkpoint < window_end else "completed"
                 state["current_lookback_to"] = _to_iso(checkpoint)
-                timeframe_states[timeframe] = state
-                self._store.update_job(
-                    job_id,
-                    timeframe_states=timeframe_states,
+                return _finish(
+                    "partial_complete" if checkpoint < window_end else "completed",
+                    event=f"Janela vazia após filtro para {symbol}/{timeframe}",
                     current_timeframe=timeframe,
-                    current_lookback_to=state.get("current_lookback_to"),
+                    current_lookback_to=state["current_lookback_to"],
                 )
-                self._record_event(
-                    job_id,
-                    f"Janela vazia após filtro para {job['symbol']}/{timeframe}",
-                    level="warning",
-                    timeframe=timeframe,
-                )
-                self._refresh_totals(job_id)
-                return state["status"] == "completed"
 
             latest_ts = pd.to_datetime(windowed["timestamp_utc"].iloc[-1]).to_pydatetime()
             if latest_ts.tzinfo is None:
@@ -591,7 +747,7 @@ class OhlcvBackfillService:
                 latest_ts = latest_ts.astimezone(UTC)
 
             written, duplicates = self._repo.write_candles(
-                job["symbol"],
+                symbol,
                 timeframe,
                 job.get("provider") or provider.source,
                 windowed,
@@ -608,48 +764,97 @@ class OhlcvBackfillService:
             state["duplicates"] += duplicates
             state["latest_ingested"] = _to_iso(latest_ts)
             state["checkpoint"] = _to_iso(latest_ts + timedelta(seconds=interval_seconds))
-            timeframe_states[timeframe] = state
             checkpoint = _parse_iso(state["checkpoint"])
 
-            self._store.update_job(
-                job_id,
-                timeframe_states=timeframe_states,
+            progress.set_state(
+                timeframe,
+                state,
                 current_timeframe=timeframe,
                 current_lookback_to=state["checkpoint"],
                 last_error=None,
             )
             self._record_event(
                 job_id,
-                f"{job['symbol']}/{timeframe}: lote={received} recebidos, {written} gravados, {duplicates} duplicados",
+                f"{symbol}/{timeframe}: lote={received} recebidos, {written} gravados, {duplicates} duplicados",
                 timeframe=timeframe,
             )
-            self._refresh_totals(job_id)
 
-            if state["checkpoint"] and _parse_iso(state["checkpoint"]) >= window_end:
-                state["status"] = "completed"
-                timeframe_states[timeframe] = state
-                self._store.update_job(
-                    job_id, timeframe_states=timeframe_states, current_timeframe=timeframe
-                )
-                return True
+            if checkpoint >= window_end:
+                return _finish("completed", current_timeframe=timeframe)
 
             if received < page_size:
                 # Provider returned fewer rows than requested before reaching the requested window end:
                 # usually means no more historical window available.
-                state["status"] = (
-                    "partial_complete"
-                    if _parse_iso(state["checkpoint"]) < window_end
-                    else "completed"
-                )
-                timeframe_states[timeframe] = state
-                self._store.update_job(
-                    job_id,
-                    timeframe_states=timeframe_states,
+                return _finish(
+                    "partial_complete" if checkpoint < window_end else "completed",
                     current_timeframe=timeframe,
                     current_lookback_to=state["checkpoint"],
                 )
-                self._refresh_totals(job_id)
-                return state["status"] == "completed"
+            progress.maybe_persist()
+
+    @staticmethod
+    def _derived_base(timeframe: str, timeframes: list[str], source: str) -> str | None:
+        """Base timeframe of the same job that ``timeframe`` is aggregated from."""
+        if source != CCXT_SOURCE:
+            return None
+        return derived_base_for(timeframe, timeframes)
+
+    def _derive_timeframe(
+        self, progress: _JobProgress, timeframe: str, base_timeframe: str, source: str
+    ) -> bool:
+        job = progress.job
+        requested_window = job.get("requested_window") or {}
+        window_start = _parse_iso(requested_window.get("start"))
+        window_end = _parse_iso(requested_window.get("end"))
+        state = progress.state(timeframe) or self._store.build_timeframe_state(
+            timeframe,
+            window_start.isoformat(),
+            _estimate_total_for_range(window_start, window_end, timeframe),
+        )
+        base_status = _coerce_status((progress.state(base_timeframe) or {}).get("status"))
+        if base_status not in {"completed", "partial_complete"}:
+            state["status"] = base_status if base_status == "failed" else "partial_complete"
+            progress.set_state(timeframe, state)
+            return False
+
+        stats = materialize_derived_candles(
+            self._repo,
+            job["symbol"],
+            base_timeframe,
+            timeframe,
+            job.get("provider") or source,
+            since=window_start,
+            until=window_end,
+        )
+        state.update(
+            status=base_status,
+            processed=stats["buckets"],
+            written=stats["written"],
+            derived_from=base_timeframe,
+            checkpoint=_to_iso(window_end),
+            latest_ingested=(progress.state(base_timeframe) or {}).get("latest_ingested"),
+        )
+        progress.set_state(timeframe, state, current_timeframe=timeframe)
+        self._record_event(
+            progress.job_id,
+            f"{job['symbol']}/{timeframe}: {stats['buckets']} candles agregados de {base_timeframe}",
+            timeframe=timeframe,
+        )
+        progress.persist()
+        return base_status == "completed"
+
+    def _run_timeframe_safely(self, job_id: str, timeframe: str, source: str) -> bool:
+        try:
+            return self._run_timeframe_backfill(job_id=job_id, timeframe=timeframe, source=source)
+        except Exception as exc:
+            logger.exception("Backfill worker failed for %s [%s]", job_id, timeframe)
+            progress = self._active_jobs.get(job_id)
+            if progress is not None:
+                state = progress.state(timeframe) or {}
+                progress.set_state(timeframe, {**state, "status": "failed", "last_error": str(exc)})
+                progress.stop("failed")
+                progress.persist(status="failed", last_error=str(exc))
+            return False
 
     def _run_job(self, job_id: str) -> None:
         job = self._store.get_job(job_id)
@@ -680,70 +885,72 @@ class OhlcvBackfillService:
         if not job:
             return
 
-        timeframe_states = job.get("timeframe_states") or {}
-        all_complete = True
-        partial_found = False
-        failed = False
-
-        for timeframe in job.get("timeframes", []):
-            if self._store.get_job(job_id) is None:
-                return
-            if _coerce_status(job.get("status")) != "running":
-                break
-
-            state = timeframe_states.get(timeframe) or {}
-            state_status = _coerce_status(state.get("status"))
-            state["status"] = state_status
-
-            checkpoint = _parse_iso(state.get("checkpoint"))
-            if checkpoint > datetime.fromtimestamp(0, tz=UTC):
-                self._record_event(
-                    job_id,
-                    f"Retomando {job['symbol']}/{timeframe} em {checkpoint.isoformat()}",
-                    timeframe=timeframe,
-                    level="info",
-                )
-            if state_status == "completed":
-                continue
-            self._store.update_job(job_id, current_timeframe=timeframe)
+        progress = self._track_job(job)
+        try:
+            timeframes = list(job.get("timeframes", []))
+            pending: list[str] = []
+            for timeframe in timeframes:
+                state = progress.state(timeframe) or {}
+                checkpoint = _parse_iso(state.get("checkpoint"))
+                if checkpoint > datetime.fromtimestamp(0, tz=UTC):
+                    self._record_event(
+                        job_id,
+                        f"Retomando {job['symbol']}/{timeframe} em {checkpoint.isoformat()}",
+                        timeframe=timeframe,
+                        level="info",
+                    )
+                if _coerce_status(state.get("status")) != "completed":
+                    pending.append(timeframe)
+
+            derived = {
+                timeframe: base
+                for timeframe in pending
+                if (base := self._derived_base(timeframe, timeframes, source)) is not None
+            }
+            fetched = [timeframe for timeframe in pending if timeframe not in derived]
+            if fetched:
+                # Timeframes run side by side; pages of every job share the fetch slots
+                # and the process-wide request budget.
+                with ThreadPoolExecutor(
+                    max_workers=len(fetched), thread_name_prefix=f"ohlcv-backfill-{job_id}"
+                ) as pool:
+                    list(
+                        pool.map(
+                            lambda timeframe: self._run_timeframe_safely(job_id, timeframe, source),
+                            fetched,
+                        )
+                    )
+            for timeframe, base in derived.items():
+                if progress.stop_status is not None:
+                    break
+                try:
+                    self._derive_timeframe(progress, timeframe, base, source)
+                except Exception as exc:
+                    logger.warning("Backfill could not derive %s [%s]: %s", job_id, timeframe, exc)
+                    state = progress.state(timeframe) or {}
+                    progress.set_state(
+                        timeframe, {**state, "status": "failed", "last_error": str(exc)}
+                    )
 
-            result = self._run_timeframe_backfill(job_id=job_id, timeframe=timeframe, source=source)
-            job = self._store.get_job(job_id) or job
-            if not job:
+            if progress.stop_status == "missing":
                 return
+            states = progress.states()
+            statuses = [_coerce_status((states.get(tf) or {}).get("status")) for tf in timeframes]
+            if progress.stop_status == "cancelled":
+                final_status = "cancelled"
+            elif progress.stop_status == "failed" or "failed" in statuses:
+                final_status = "failed"
+            elif any(value != "completed" for value in statuses):
+                final_status = "partial_complete"
+            else:
+                final_status = "completed"
 
-            state = (job.get("timeframe_states") or {}).get(timeframe) or {}
-            new_status = _coerce_status(state.get("status"))
-            if new_status == "failed":
-                failed = True
-                break
-            if new_status == "partial_complete":
-                partial_found = True
-                all_complete = False
-            elif new_status in {"pending", "running"}:
-                partial_found = True
-                all_complete = False
-
-            if new_status == "completed":
-                continue
-
-        if failed or _coerce_status(job.get("status")) == "cancelled":
-            final_status = (
-                "cancelled" if _coerce_status(job.get("status")) == "cancelled" else "failed"
+            self._record_event(
+                job_id, f"Backfill finalizado com status {final_status}", level="info"
             )
-        elif partial_found or not all_complete:
-            final_status = "partial_complete"
-        else:
-            final_status = "completed"
-
-        self._store.update_job(
-            job_id,
-            status=final_status,
-            current_timeframe=None,
-            finished_at=_to_iso(),
-        )
-        self._refresh_totals(job_id)
-        self._record_event(job_id, f"Backfill finalizado com status {final_status}", level="info")
+            progress.persist(status=final_status, current_timeframe=None, finished_at=_to_iso())
+        finally:
+            self._untrack_job(job_id)
 
     def start_job(
         self,
@@ -753,7 +960,7 @@ class OhlcvBackfillService:
         data_source: str | None = None,
         history_window_years: int = 2,
         page_size: int = 1000,
-        max_requests_per_minute: int = 60,
+        max_requests_per_minute: int = 0,
         max_retries: int = _MAX_RETRIES,
     ) -> str:
         normalized_symbol = _normalize_symbol(symbol)
@@ -798,7 +1005,8 @@ class OhlcvBackfillService:
         )
         initial["requested_source"] = data_source
         initial["page_size"] = _parse_int(page_size, default=1000)
-        initial["max_requests_per_minute"] = _parse_int(max_requests_per_minute, default=60)
+        # 0 = no per-job cap; pages are paced by the shared request budget only.
+        initial["max_requests_per_minute"] = _parse_int(max_requests_per_minute, default=0)
         initial["max_retries"] = _parse_int(max_retries, default=_MAX_RETRIES)
 
         self._store.init_job(initial)
@@ -833,6 +1041,9 @@ class OhlcvBackfillService:
             finished_at=_to_iso() if job.get("status") == "pending" else None,
             last_error="Cancelamento solicitado.",
         )
+        progress = self._active_jobs.get(job_id)
+        if progress is not None:
+            progress.stop("cancelled")
         self._record_event(job_id, "Cancelamento solicitado pelo operador.", level="warning")
         return True
 
@@ -0,0 +1,183 @@
+"""Coarser ``market_ohlcv`` timeframes aggregated from a stored base timeframe.
+
+Opt-in with ``MARKET_OHLCV_BASE_TIMEFRAME`` (e.g. ``15m``): ingestion and
+backfill then download only the base series of Binance symbols and build the
+other configured timeframes (``1h``, ``4h``, ``1d``...) from it, so every
+timeframe of a symbol comes from the same candles.
+
+Buckets are aligned to the UTC epoch, like Binance klines, and aggregated
+exactly (first open, max high, min low, last close, summed volume). Only closed,
+complete buckets are written: a bucket is emitted once its end is in the past,
+the base series reaches it and every base candle inside it is stored. Buckets
+with gaps are skipped rather than stored as real candles; a later backfill of
+the base range fills them in. Materialization is incremental and restarts from
+the latest derived bucket.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_INTERVALS = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "4h": timedelta(hours=4),
+    "1d": timedelta(days=1),
+}
+# Base candles read per query while materializing long ranges (aligned to whole days).
+MATERIALIZE_CHUNK = timedelta(days=30)
+_OHLCV_COLUMNS = ["timestamp_utc", "open", "high", "low", "close", "volume"]
+
+
+def configured_base_timeframe() -> str | None:
+    raw = str(os.getenv("MARKET_OHLCV_BASE_TIMEFRAME", "")).strip().lower()
+    return raw if raw in TIMEFRAME_INTERVALS else None
+
+
+def can_derive(base_timeframe: str, target_timeframe: str) -> bool:
+    """True when ``target`` buckets are whole multiples of ``base`` candles."""
+    base = TIMEFRAME_INTERVALS.get(base_timeframe)
+    target = TIMEFRAME_INTERVALS.get(target_timeframe)
+    if base is None or target is None or target <= base:
+        return False
+    return target % base == timedelta(0) and timedelta(days=1) % target == timedelta(0)
+
+
+def derived_base_for(target_timeframe: str, available_timeframes: list[str]) -> str | None:
+    """Configured base timeframe for ``target`` when it is fetched alongside it."""
+    base = configured_base_timeframe()
+    if base is None or base not in available_timeframes:
+        return None
+    return base if can_derive(base, target_timeframe) else None
+
+
+def floor_to_bucket(value: datetime, timeframe: str) -> datetime:
+    interval = TIMEFRAME_INTERVALS[timeframe]
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return epoch + ((value.astimezone(timezone.utc) - epoch) // interval) * interval
+
+
+def aggregate_candles(
+    frame: pd.DataFrame,
+    base_timeframe: str,
+    target_timeframe: str,
+    *,
+    closed_before: datetime,
+    include_incomplete: bool = False,
+) -> pd.DataFrame:
+    """Aggregate base candles into closed ``target`` buckets.
+
+    ``closed_before`` is the instant up to which the base series is known to be
+    final (base coverage capped at "now"); buckets ending after it are still
+    forming and are left out. Buckets missing base candles are dropped unless
+    ``include_incomplete`` is set; ``base_candles`` counts the candles per bucket.
+    """
+    if not can_derive(base_timeframe, target_timeframe):
+        raise ValueError(f"{target_timeframe} cannot be derived from {base_timeframe}")
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=[*_OHLCV_COLUMNS, "base_candles"])
+
+    data = frame.reset_index() if "timestamp_utc" not in frame.columns else frame
+    data = data[_OHLCV_COLUMNS].copy()
+    data["timestamp_utc"] = pd.to_datetime(data["timestamp_utc"], utc=True, errors="coerce")
+    data = (
+        data.dropna(subset=["timestamp_utc", "open", "high", "low", "close"])
+        .drop_duplicates(subset="timestamp_utc", keep="last")
+        .sort_values("timestamp_utc")
+    )
+    data["volume"] = pd.to_numeric(data["volume"], errors="coerce").fillna(0.0)
+    target_interval = TIMEFRAME_INTERVALS[target_timeframe]
+    # Flooring nanoseconds since epoch gives UTC-aligned buckets (00:00, 04:00, ...).
+    buckets = data["timestamp_utc"].dt.floor(pd.Timedelta(target_interval))
+    aggregated = data.groupby(buckets, sort=True).agg(
+        open=("open", "first"),
+        high=("high", "max"),
+        low=("low", "min"),
+        close=("close", "last"),
+        volume=("volume", "sum"),
+        base_candles=("close", "size"),
+    )
+    aggregated.index.name = "timestamp_utc"
+    bucket_end = aggregated.index + pd.Timedelta(target_interval)
+    aggregated = aggregated[bucket_end <= pd.Timestamp(closed_before)]
+    if not include_incomplete:
+        expected = target_interval // TIMEFRAME_INTERVALS[base_timeframe]
+        aggregated = aggregated[aggregated["base_candles"] >= expected]
+    return aggregated.reset_index()
+
+
+def materialize_derived_candles(
+    repo: Any,
+    symbol: str,
+    base_timeframe: str,
+    target_timeframe: str,
+    source: str,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    now: datetime | None = None,
+) -> dict[str, int]:
+    """Write closed, complete ``target`` buckets built from the stored base series.
+
+    Without ``since`` the run restarts at the latest derived bucket (rewritten,
+    in case base candles changed after it was built) or at the start of the
+    base series. Returns ``{"written", "buckets", "gapped_buckets"}``, where
+    ``buckets`` counts every closed bucket seen and ``gapped_buckets`` the ones
+    skipped for missing base candles.
+    """
+    stats = {"written": 0, "buckets": 0, "gapped_buckets": 0}
+    base_latest = repo.get_latest_candle_time(symbol, base_timeframe)
+    if base_latest is None:
+        return stats
+    now = now or datetime.now(timezone.utc)
+    closed_before = min(now, base_latest + TIMEFRAME_INTERVALS[base_timeframe])
+    if until is not None:
+        closed_before = min(closed_before, until)
+
+    start = since
+    if start is None:
+        start = repo.get_latest_candle_time(symbol, target_timeframe)
+    if start is None:
+        start = repo.get_earliest_candle_time(symbol, base_timeframe)
+    if start is None:
+        return stats
+    start = floor_to_bucket(start, target_timeframe)
+
+    expected = TIMEFRAME_INTERVALS[target_timeframe] // TIMEFRAME_INTERVALS[base_timeframe]
+    while start < closed_before:
+        chunk_end = min(start + MATERIALIZE_CHUNK, closed_before)
+        rows = repo.read_candles_between(symbol, base_timeframe, start, chunk_end)
+        aggregated = aggregate_candles(
+            pd.DataFrame(rows, columns=_OHLCV_COLUMNS) if rows else pd.DataFrame(),
+            base_timeframe,
+            target_timeframe,
+            closed_before=chunk_end,
+            include_incomplete=True,
+        )
+        complete = aggregated[aggregated["base_candles"] >= expected]
+        stats["buckets"] += len(aggregated)
+        stats["gapped_buckets"] += len(aggregated) - len(complete)
+        if not complete.empty:
+            stats["written"] += int(
+                repo.write_candles(symbol, target_timeframe, source, complete) or 0
+            )
+        start = chunk_end
+
+    if stats["gapped_buckets"]:
+        logger.debug(
+            "Derived %s %s from %s; skipped %s incomplete buckets",
+            symbol,
+            target_timeframe,
+            base_timeframe,
+            stats["gapped_buckets"],
+        )
+    return stats
@@ -0,0 +1,262 @@
+"""Binance kline WebSocket ingestion for ``market_ohlcv``.
+
+Streaming alternative to the REST poll loop of ``OhlcvIngestionService``. Each
+connection subscribes to ``<symbol>@kline_<interval>`` combined streams; closed
+candles are buffered and written in batches, and REST is only used to repair
+the gap left by a (re)connect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+from typing import Any, Callable
+
+import pandas as pd
+import websockets
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAMS_PER_CONNECTION = 200
+DEFAULT_FLUSH_SECONDS = 2.0
+DEFAULT_MAX_BUFFERED_ROWS = 500
+_RECONNECT_MAX_SECONDS = 30.0
+_STREAM_SYMBOL_PATTERN = re.compile(r"^[A-Z0-9]{4,32}$")
+
+
+def stream_symbol(symbol: str) -> str | None:
+    """``BTC/USDT`` -> ``BTCUSDT`` (None when it cannot be a Binance Spot stream)."""
+    compact = str(symbol or "").replace("/", "").strip().upper()
+    return compact if _STREAM_SYMBOL_PATTERN.fullmatch(compact) else None
+
+
+def parse_closed_kline(message: str | bytes) -> tuple[str, str, dict[str, Any]] | None:
+    """Return ``(stream_symbol, interval, row)`` for a closed kline event, else None."""
+    try:
+        payload = json.loads(message)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else payload
+    kline = data.get("k")
+    if data.get("e") != "kline" or not isinstance(kline, dict) or kline.get("x") is not True:
+        return None
+    try:
+        row = {
+            "timestamp_utc": pd.Timestamp(int(kline["t"]), unit="ms", tz="UTC"),
+            "open": float(kline["o"]),
+            "high": float(kline["h"]),
+            "low": float(kline["l"]),
+            "close": float(kline["c"]),
+            "volume": float(kline.get("v") or 0.0),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    return str(kline.get("s") or data.get("s") or "").upper(), str(kline.get("i") or ""), row
+
+
+class KlineStreamIngestor:
+    """Buffers closed klines from combined streams and flushes them in batches."""
+
+    def __init__(
+        self,
+        *,
+        symbols: list[str],
+        timeframes: list[str],
+        write_candles: Callable[[str, str, pd.DataFrame], Any],
+        repair_gap: Callable[[str, str], Any],
+        ws_base_url: str,
+        streams_per_connection: int = DEFAULT_STREAMS_PER_CONNECTION,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        max_buffered_rows: int = DEFAULT_MAX_BUFFERED_ROWS,
+    ) -> None:
+        self._write_candles = write_candles
+        self._repair_gap = repair_gap
+        self._ws_base_url = str(ws_base_url).rstrip("/")
+        self._streams_per_connection = max(1, min(1024, int(streams_per_connection)))
+        self._flush_seconds = max(0.1, float(flush_seconds))
+        self._max_buffered_rows = max(1, int(max_buffered_rows))
+
+        # (stream symbol, interval) -> (stored symbol, timeframe)
+        self._targets: dict[tuple[str, str], tuple[str, str]] = {}
+        for symbol in symbols:
+            compact = stream_symbol(symbol)
+            if compact is None:
+                continue
+            for timeframe in timeframes:
+                self._targets[(compact, timeframe)] = (symbol, timeframe)
+        self._streams = {
+            f"{compact.lower()}@kline_{timeframe}": target
+            for (compact, timeframe), target in self._targets.items()
+        }
+
+        self._buffer: dict[tuple[str, str], dict[int, dict[str, Any]]] = {}
+        self._buffered_rows = 0
+        self._flush_requested: asyncio.Event | None = None
+        self._stopping: asyncio.Event | None = None
+        self._stats = {
+            "connections": 0,
+            "messages": 0,
+            "closed_candles": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+            "write_errors": 0,
+            "reconnects": 0,
+            "gap_repairs": 0,
+        }
+
+    @property
+    def streams(self) -> list[str]:
+        return list(self._streams)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "streams": len(self._streams),
+            "buffered_rows": self._buffered_rows,
+        }
+
+    # -- buffering ---------------------------------------------------------
+    def handle_message(self, message: str | bytes) -> None:
+        self._stats["messages"] += 1
+        parsed = parse_closed_kline(message)
+        if parsed is None:
+            return
+        compact, interval, row = parsed
+        target = self._targets.get((compact, interval))
+        if target is None:
+            return
+        self._stats["closed_candles"] += 1
+        rows = self._buffer.setdefault(target, {})
+        key = int(row["timestamp_utc"].value)
+        if key not in rows:
+            self._buffered_rows += 1
+        rows[key] = row
+        if self._buffered_rows >= self._max_buffered_rows and self._flush_requested is not None:
+            self._flush_requested.set()
+
+    def _take_buffer(self) -> dict[tuple[str, str], dict[int, dict[str, Any]]]:
+        batch, self._buffer = self._buffer, {}
+        self._buffered_rows = 0
+        return batch
+
+    def _write_batch(self, batch: dict[tuple[str, str], dict[int, dict[str, Any]]]) -> list:
+        """Write each (symbol, timeframe) group; return the groups that failed."""
+        failed = []
+        for (symbol, timeframe), rows in batch.items():
+            frame = pd.DataFrame([rows[key] for key in sorted(rows)])
+            try:
+                self._write_candles(symbol, timeframe, frame)
+            except Exception as exc:
+                logger.warning("Kline batch write failed for %s [%s]: %s", symbol, timeframe, exc)
+                self._stats["write_errors"] += 1
+                failed.append(((symbol, timeframe), rows))
+                continue
+            self._stats["rows_flushed"] += len(rows)
+        self._stats["flushes"] += 1
+        return failed
+
+    async def flush(self) -> None:
+        batch = self._take_buffer()
+        if not batch:
+            return
+        failed = await asyncio.to_thread(self._write_batch, batch)
+        # Keep failed rows for the next flush; newer ticks for the same candle win.
+        for target, rows in failed:
+            current = self._buffer.setdefault(target, {})
+            for key, row in rows.items():
+                if key not in current:
+                    current[key] = row
+                    self._buffered_rows += 1
+
+    # -- connections -------------------------------------------------------
+    def _repair_streams(self, streams: list[str]) -> None:
+        for stream in streams:
+            if self._stopping is not None and self._stopping.is_set():
+                return
+            symbol, timeframe = self._streams[stream]
+            try:
+                self._repair_gap(symbol, timeframe)
+                self._stats["gap_repairs"] += 1
+            except Exception as exc:
+                logger.warning("Kline gap repair failed for %s [%s]: %s", symbol, timeframe, exc)
+
+    def _schedule_repair(self, previous: asyncio.Task | None, streams: list[str]) -> asyncio.Task:
+        """Repair ``streams`` in a worker thread, after any repair still running."""
+
+        async def _repair() -> None:
+            if previous is not None and not previous.done():
+                try:
+                    await asyncio.wait([previous])
+                except asyncio.CancelledError:
+                    previous.cancel()
+                    raise
+            await asyncio.to_thread(self._repair_streams, streams)
+
+        return asyncio.create_task(_repair())
+
+    async def _run_connection(self, streams: list[str]) -> None:
+        url = f"{self._ws_base_url}/stream?streams={'/'.join(streams)}"
+        backoff = 1.0
+        repair: asyncio.Task | None = None
+        try:
+            while not self._stopping.is_set():
+                try:
+                    async with websockets.connect(
+                        url, ping_interval=15, ping_timeout=20, close_timeout=5
+                    ) as websocket:
+                        self._stats["connections"] += 1
+                        # Subscribed before repairing, so candles closing meanwhile are not
+                        # lost. The REST repair runs next to the read loop: the socket keeps
+                        # being drained (and pings answered) however long it takes.
+                        repair = self._schedule_repair(repair, streams)
+                        backoff = 1.0
+                        async for message in websocket:
+                            self.handle_message(message)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.warning("Kline stream disconnected: %s; retrying in %.1fs", exc, backoff)
+                if self._stopping.is_set():
+                    return
+                self._stats["reconnects"] += 1
+                await asyncio.sleep(backoff + random.uniform(0.0, 0.5))
+                backoff = min(backoff * 2, _RECONNECT_MAX_SECONDS)
+        finally:
+            if repair is not None and not repair.done():
+                repair.cancel()
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self._flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def run(self, stop_event: threading.Event) -> None:
+        """Consume until ``stop_event`` is set, then flush what is still buffered."""
+        self._stopping = asyncio.Event()
+        self._flush_requested = asyncio.Event()
+        streams = self.streams
+        size = self._streams_per_connection
+        tasks = [
+            asyncio.create_task(self._run_connection(streams[i : i + size]))
+            for i in range(0, len(streams), size)
+        ]
+        tasks.append(asyncio.create_task(self._flush_loop()))
+        try:
+            while not stop_event.is_set():
+                await asyncio.sleep(0.5)
+        finally:
+            self._stopping.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.flush()
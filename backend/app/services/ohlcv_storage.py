@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import json
@@ -12,6 +13,7 @@ from typing import Any
 import pandas as pd
 from sqlalchemy import bindparam, text
 
+from app.config import get_settings
 from app.database import DB_URL, engine
 from app.services.market_data_providers import (
     CCXT_SOURCE,
@@ -21,6 +23,12 @@ from app.services.market_data_providers import (
 )
 from app.services.canonical_candle_service import candle_writer_enabled
 from app.services.binance_symbol_universe import resolve_binance_ohlcv_symbols
+from app.services.ohlcv_derived_timeframes import (
+    configured_base_timeframe,
+    derived_base_for,
+    materialize_derived_candles,
+)
+from app.services.ohlcv_kline_stream import KlineStreamIngestor, stream_symbol
 
 logger = logging.getLogger(__name__)
 
@@ -544,6 +552,63 @@ class MarketOhlcvRepository:
         _METRICS.record_query_latency(elapsed)
         return candles
 
+    def read_candles_between(
+        self, symbol: str, timeframe: str, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Candles with ``start <= candle_time < end``, oldest first."""
+        if not self.enabled:
+            return []
+
+        normalized_symbol = _normalize_symbol(symbol)
+        normalized_timeframe = _normalize_timeframe(timeframe)
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            rows = (
+                conn.execute(
+                    text("""
+                    SELECT candle_time, open, high, low, close, volume, source
+                    FROM market_ohlcv
+                    WHERE symbol = :symbol
+                      AND timeframe = :timeframe
+                      AND candle_time >= :start
+                      AND candle_time < :end
+                    ORDER BY candle_time ASC
+                    """),
+                    {
+                        "symbol": normalized_symbol,
+                        "timeframe": normalized_timeframe,
+                        "start": start,
+                        "end": end,
+                    },
+                )
+                .mappings()
+                .all()
+            )
+
+        candles: list[dict[str, Any]] = []
+        for row in rows:
+            candle_time = row["candle_time"]
+            if not isinstance(candle_time, datetime):
+                parsed = _to_utc_datetime(candle_time)
+                if parsed is None:
+                    continue
+                candle_time = parsed
+
+            candles.append(
+                {
+                    "timestamp_utc": candle_time.isoformat(),
+                    "open": float(row["open"]),
+                    "high": float(row["high"]),
+                    "low": float(row["low"]),
+                    "close": float(row["close"]),
+                    "volume": float(row["volume"] or 0.0),
+                    "source": row["source"],
+                }
+            )
+
+        _METRICS.record_query_latency(time.perf_counter() - started)
+        return candles
+
     def write_candles(
         self,
         symbol: str,
@@ -694,6 +759,8 @@ class OhlcvIngestionService:
         self._initialized = True
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
+        self._stream_thread: threading.Thread | None = None
+        self._stream: KlineStreamIngestor | None = None
         self._repo = MarketOhlcvRepository()
         self._timeframes = self._resolve_timeframes()
         self._symbols = self._resolve_symbols()
@@ -719,6 +786,18 @@ class OhlcvIngestionService:
         enabled = enabled.strip().lower()
         return enabled not in {"0", "false", "no", "off"}
 
+    @staticmethod
+    def _ingestion_mode() -> str:
+        mode = os.getenv("MARKET_OHLCV_INGESTION_MODE", "poll").strip().lower()
+        return mode if mode in {"poll", "stream"} else "poll"
+
+    @staticmethod
+    def _env_number(name: str, default: float) -> float:
+        try:
+            return float(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
     @staticmethod
     def _timeframe_interval_seconds(timeframe: str) -> float:
         normalized = _normalize_timeframe(timeframe)
@@ -748,6 +827,39 @@ class OhlcvIngestionService:
             return CCXT_SOURCE
         return source
 
+    def _ordered_timeframes(self) -> list[str]:
+        """Supported timeframes, the derived-mode base first so it is fresh for the others."""
+        base = configured_base_timeframe()
+        supported = [tf for tf in self._timeframes if tf in SUPPORTED_OHLCV_TIMEFRAMES]
+        return sorted(supported, key=lambda timeframe: timeframe != base)
+
+    def _derived_base(self, timeframe: str, source: str) -> str | None:
+        """Base timeframe ``timeframe`` is aggregated from, or None to download it."""
+        if source != CCXT_SOURCE:
+            return None
+        return derived_base_for(timeframe, self._timeframes)
+
+    def _materialize_derived(
+        self, symbol: str, base_timeframe: str, timeframe: str, source: str
+    ) -> None:
+        try:
+            stats = materialize_derived_candles(
+                self._repo, symbol, base_timeframe, timeframe, source
+            )
+        except Exception as exc:
+            logger.warning(
+                "Failed to derive %s [%s] from %s: %s", symbol, timeframe, base_timeframe, exc
+            )
+            return
+        if stats["written"]:
+            logger.debug(
+                "Derived %s candles for %s [%s] from %s",
+                stats["written"],
+                symbol,
+                timeframe,
+                base_timeframe,
+            )
+
     def _resolve_since(self, symbol: str, timeframe: str) -> datetime:
         latest = self._repo.get_latest_candle_time(symbol, timeframe)
         now = datetime.now(timezone.utc)
@@ -794,6 +906,12 @@ class OhlcvIngestionService:
         if source == STOOQ_SOURCE and timeframe != "1d":
             return
 
+        base_timeframe = self._derived_base(timeframe, source)
+        if base_timeframe is not None:
+            # Aggregated from stored base candles: no provider request.
+            self._materialize_derived(normalized_symbol, base_timeframe, timeframe, source)
+            return
+
         if timeframe == "1d" and source == STOOQ_SOURCE:
             try:
                 logger.debug(
@@ -879,8 +997,9 @@ class OhlcvIngestionService:
                 exc,
             )
 
-    def _run_loop(self) -> None:
-        next_runs = {tf: 0.0 for tf in self._timeframes if tf in SUPPORTED_OHLCV_TIMEFRAMES}
+    def _run_loop(self, symbols: list[str] | None = None) -> None:
+        symbols = self._symbols if symbols is None else symbols
+        next_runs = {tf: 0.0 for tf in self._ordered_timeframes()}
 
         while not self._stop_event.is_set():
             now = time.time()
@@ -889,7 +1008,7 @@ class OhlcvIngestionService:
             for timeframe in next_runs:
                 if not next_runs[timeframe] or now >= next_runs[timeframe]:
                     try:
-                        for symbol in self._symbols:
+                        for symbol in symbols:
                             if self._stop_event.is_set():
                                 break
                             self._ingest_symbol(symbol, timeframe)
@@ -905,15 +1024,61 @@ class OhlcvIngestionService:
 
             self._stop_event.wait(timeout=next_wait)
 
+    def _split_streamable(self) -> tuple[list[str], list[str]]:
+        """Binance symbols go to the kline stream; other sources keep polling."""
+        streamed: list[str] = []
+        polled: list[str] = []
+        for symbol in self._symbols:
+            normalized = _normalize_symbol(symbol)
+            is_binance = all(
+                self._resolve_source(normalized, timeframe) == CCXT_SOURCE
+                for timeframe in self._timeframes
+            )
+            if is_binance and stream_symbol(normalized):
+                streamed.append(normalized)
+            else:
+                polled.append(symbol)
+        return streamed, polled
+
+    def _write_stream_candles(self, symbol: str, timeframe: str, df: pd.DataFrame) -> None:
+        self._repo.write_candles(symbol, timeframe, CCXT_SOURCE, df)
+        for derived in self._timeframes:
+            if self._derived_base(derived, CCXT_SOURCE) == timeframe:
+                self._materialize_derived(symbol, timeframe, derived, CCXT_SOURCE)
+
+    def _run_stream(self, symbols: list[str]) -> None:
+        self._stream = KlineStreamIngestor(
+            symbols=symbols,
+            timeframes=[
+                tf
+                for tf in self._ordered_timeframes()
+                if self._derived_base(tf, CCXT_SOURCE) is None
+            ],
+            write_candles=self._write_stream_candles,
+            # REST only fills what was missed while (re)connecting.
+            repair_gap=self._ingest_symbol,
+            ws_base_url=get_settings().binance_ws_base_url,
+            streams_per_connection=int(
+                self._env_number("MARKET_OHLCV_STREAMS_PER_CONNECTION", 200)
+            ),
+            flush_seconds=self._env_number("MARKET_OHLCV_STREAM_FLUSH_SECONDS", 2.0),
+            max_buffered_rows=int(self._env_number("MARKET_OHLCV_STREAM_MAX_BUFFERED_ROWS", 500)),
+        )
+        try:
+            asyncio.run(self._stream.run(self._stop_event))
+        except Exception as exc:
+            logger.warning("[ohlcv] kline stream ingestion stopped: %s", exc)
+
+    def stream_status(self) -> dict[str, Any] | None:
+        return self._stream.stats() if self._stream is not None else None
+
     def run_once(self) -> int:
         if not self._repo.enabled:
             logger.info("[ohlcv] storage is disabled; skipping one-shot ingestion")
             return 0
 
         runs = 0
-        for timeframe in self._timeframes:
-            if timeframe not in SUPPORTED_OHLCV_TIMEFRAMES:
-                continue
+        for timeframe in self._ordered_timeframes():
             for symbol in self._symbols:
                 self._ingest_symbol(symbol, timeframe)
                 runs += 1
@@ -928,22 +1093,43 @@ class OhlcvIngestionService:
             logger.info("[ohlcv] storage is disabled; skipping ingestion thread")
             return
 
-        if self._thread is not None and self._thread.is_alive():
+        if (self._thread is not None and self._thread.is_alive()) or (
+            self._stream_thread is not None and self._stream_thread.is_alive()
+        ):
             return
 
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run_loop, name="ohlcv-ingestion", daemon=True)
+        polled = self._symbols
+        if self._ingestion_mode() == "stream":
+            streamed, polled = self._split_streamable()
+            if streamed:
+                self._stream_thread = threading.Thread(
+                    target=self._run_stream,
+                    args=(streamed,),
+                    name="ohlcv-kline-stream",
+                    daemon=True,
+                )
+                self._stream_thread.start()
+                logger.info("[ohlcv] kline stream ingestion started for %s symbols", len(streamed))
+            if not polled:
+                return
+
+        self._thread = threading.Thread(
+            target=self._run_loop, args=(polled,), name="ohlcv-ingestion", daemon=True
+        )
         self._thread.start()
         logger.info("[ohlcv] background ingestion started")
 
     def stop(self) -> None:
         self._stop_event.set()
-        thread = self._thread
-        if thread is None:
+        threads = [thread for thread in (self._thread, self._stream_thread) if thread is not None]
+        if not threads:
             return
 
-        thread.join(timeout=5.0)
+        for thread in threads:
+            thread.join(timeout=5.0)
         self._thread = None
+        self._stream_thread = None
         logger.info("[ohlcv] background ingestion stopped")
 
 
@@ -963,4 +1149,8 @@ def run_ohlcv_ingestion_once() -> int:
 
 
 def get_ohlcv_metrics() -> dict[str, Any]:
-    return _METRICS.snapshot()
+    metrics = _METRICS.snapshot()
+    stream = _INGESTION_SERVICE.stream_status()
+    if stream is not None:
+        metrics["stream"] = stream
+    return metrics
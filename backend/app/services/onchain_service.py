@@ -7,18 +7,29 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
+import os
+import threading
 import time
 import uuid
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
 
 import httpx
 from httpx import AsyncClient, Limits
+from redis.exceptions import RedisError
 
 from app.database import SessionLocal
 from app.models_onchain import OnchainSignal, OnchainSignalHistory, sao_paulo_now
+from app.services.binance_market_universe import get_market_universe
+from app.services.redis_store import get_redis_client
+
+logger = logging.getLogger(__name__)
 
 # Shared async client with dedicated connection pool for onchain metrics
 # This avoids starvation when the signal_feed_snapshot_worker is busy with Binance calls
@@ -73,8 +84,6 @@ NORM_RANGES: dict[str, tuple[float, float]] = {
 }
 
 HTTP_TIMEOUT = 5
-BINANCE_EXCHANGE_INFO_URL = "https://api.binance.com/api/v3/exchangeInfo"
-BINANCE_24HR_TICKER_URL = "https://api.binance.com/api/v3/ticker/24hr"
 MAX_SNAPSHOT_PAIRS = 60
 EXCLUDED_BASE_ASSETS = {
     "USDT",
@@ -125,23 +134,176 @@ TOKEN_CHAIN_HINTS: dict[str, str] = {
 }
 
 # ---------------------------------------------------------------------------
-# In-memory cache (5-min TTL)
+# Cache (5-min TTL, bounded, mirrored to Redis, stale-serve on upstream errors)
 # ---------------------------------------------------------------------------
 
-_cache: dict[str, tuple[float, dict]] = {}  # key → (expires_at, data)
+CACHE_KEY_PREFIX = "onchain:cache:"
 
 
-def _cache_get(key: str) -> dict | None:
-    if key in _cache:
-        expires, data = _cache[key]
-        if time.time() < expires:
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        return int(raw) if raw else default
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r; using %s", name, raw, default)
+        return default
+
+
+CACHE_MAX_ENTRIES = _env_int("ONCHAIN_CACHE_MAX_ENTRIES", 512)
+# How long an expired entry may still be served when the upstream call fails.
+CACHE_STALE_SECONDS = _env_int("ONCHAIN_CACHE_STALE_SECONDS", 3600)
+
+
+class _OnchainCache:
+    """LRU of at most ``max_entries`` items; Redis keeps them across restarts/workers.
+
+    Redis round trips run in a worker thread so they never block the event loop.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[float, Any]] = (
+            OrderedDict()
+        )  # key → (fresh_until, data)
+        self._lock = threading.Lock()
+        self._redis: Any = None
+        self._redis_resolved = False
+
+    def _client(self):
+        if not self._redis_resolved:
+            self._redis = get_redis_client()
+            self._redis_resolved = True
+        return self._redis
+
+    def _redis_failed(self, exc: Exception) -> None:
+        logger.warning("Onchain cache Redis unavailable, using memory only: %s", exc)
+        self._redis = None
+
+    def _remember(self, key: str, fresh_until: float, data: Any) -> None:
+        with self._lock:
+            self._entries[key] = (fresh_until, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _load_shared(self, key: str) -> tuple[float, Any] | None:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(f"{CACHE_KEY_PREFIX}{key}")
+        except RedisError as exc:
+            self._redis_failed(exc)
+            return None
+        if not raw:
+            return None
+        try:
+            stored = json.loads(raw)
+            return float(stored["fresh_until"]), stored["data"]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _save_shared(self, key: str, fresh_until: float, data: Any, ttl: int) -> None:
+        client = self._client()
+        if client is None:
+            return
+        payload = json.dumps({"fresh_until": fresh_until, "data": data}, separators=(",", ":"))
+        try:
+            client.set(f"{CACHE_KEY_PREFIX}{key}", payload, ex=ttl + CACHE_STALE_SECONDS)
+        except RedisError as exc:
+            self._redis_failed(exc)
+
+    async def get(self, key: str, *, allow_stale: bool = False) -> Any | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self._client() is not None:
+            entry = await asyncio.to_thread(self._load_shared, key)
+            if entry is not None:
+                self._remember(key, *entry)
+        if entry is None:
+            return None
+        fresh_until, data = entry
+        if now < fresh_until or (allow_stale and now < fresh_until + CACHE_STALE_SECONDS):
             return data
-        del _cache[key]
-    return None
+        return None
+
+    async def set(self, key: str, data: Any, ttl: int = 300) -> None:
+        fresh_until = time.time() + ttl
+        self._remember(key, fresh_until, data)
+        if self._client() is not None:
+            await asyncio.to_thread(self._save_shared, key, fresh_until, data, ttl)
+
+    def clear(self) -> None:
+        """Drop the in-process copy (the shared Redis entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _OnchainCache()
+
+
+async def _cache_get(key: str) -> dict | None:
+    return await _cache.get(key)
+
+
+async def _cache_set(key: str, data: dict, ttl: int = 300) -> None:
+    await _cache.set(key, data, ttl)
+
+
+# Concurrent requests allowed per upstream host (DeFiLlama and GitHub rate-limit per IP).
+HOST_CONCURRENCY = {"api.llama.fi": 4, "api.github.com": 4}
+_DEFAULT_HOST_CONCURRENCY = 4
+# Semaphores and in-flight tasks are bound to the event loop that created them.
+_loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, dict]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
-def _cache_set(key: str, data: dict, ttl: int = 300) -> None:
-    _cache[key] = (time.time() + ttl, data)
+def _state_for_loop() -> dict[str, dict]:
+    loop = asyncio.get_running_loop()
+    state = _loop_state.get(loop)
+    if state is None:
+        state = {"semaphores": {}, "inflight": {}}
+        _loop_state[loop] = state
+    return state
+
+
+async def _get(url: str, **kwargs: Any):
+    """GET through the shared client, limited per host."""
+    host = urlsplit(url).hostname or ""
+    semaphores = _state_for_loop()["semaphores"]
+    semaphore = semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(HOST_CONCURRENCY.get(host, _DEFAULT_HOST_CONCURRENCY))
+        semaphores[host] = semaphore
+    async with semaphore:
+        return await _get_onchain_client().get(url, **kwargs)
+
+
+async def _cached_fetch(key: str, fetch: Callable[[], Awaitable[Any]], ttl: int = 300) -> Any:
+    """Fresh cache hit, else one shared upstream call per key; stale data if it fails."""
+    cached = await _cache.get(key)
+    if cached is not None:
+        return cached
+    inflight = _state_for_loop()["inflight"]
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    try:
+        data = await asyncio.shield(task)
+    except Exception as e:
+        stale = await _cache.get(key, allow_stale=True)
+        logger.warning(
+            "[onchain] %s fetch failed (%s); serving %s", key, e, "stale" if stale else "nothing"
+        )
+        return stale
+    await _cache.set(key, data, ttl)
+    return data
 
 
 # ---------------------------------------------------------------------------
@@ -187,33 +349,34 @@ class RankedPair:
 # ---------------------------------------------------------------------------
 
 
+async def _fetch_defillama_chains() -> list[dict[str, Any]]:
+    resp = await _get("https://api.llama.fi/chains")
+    resp.raise_for_status()
+    chains_data = resp.json()
+    if not isinstance(chains_data, list):
+        raise ValueError("unexpected /chains payload")
+    keys = ("name", "tvl", "chain_bridge_count")
+    return [
+        {key: item[key] for key in keys if key in item}
+        for item in chains_data
+        if isinstance(item, dict)
+    ]
+
+
 async def _defillama_tvl(chain: str) -> tuple[float | None, float | None]:
     """Return (tvl, active_addresses_estimate) for a chain from DeFiLlama."""
-    cached = _cache_get(f"defillama_{chain}")
-    if cached:
-        return cached["tvl"], cached.get("active_addresses")
-
     meta = CHAIN_META.get(chain.lower(), {})
     dl_chain = meta.get("defillama", chain.lower())
 
-    url = f"https://api.llama.fi/chains"
-    try:
-        client = _get_onchain_client()
-        resp = await client.get(url)
-        resp.raise_for_status()
-        chains_data = resp.json()
-        if isinstance(chains_data, list):
-            for item in chains_data:
-                if isinstance(item, dict) and item.get("name", "").lower() == dl_chain.lower():
-                    tvl = item.get("tvl")
-                    # DeFiLlama doesn't expose active addresses directly;
-                    # use a proxy: TVL per chain as proxy for ecosystem size
-                    active_addresses = item.get("chain_bridge_count", tvl)
-                    result = {"tvl": tvl, "active_addresses": active_addresses}
-                    _cache_set(f"defillama_{chain}", result)
-                    return tvl, active_addresses
-    except Exception as e:
-        print(f"[onchain] DeFiLlama error for {chain}: {e}")
+    # One /chains download serves every chain in a snapshot.
+    chains_data = await _cached_fetch("defillama_chains", _fetch_defillama_chains)
+    for item in chains_data or []:
+        if str(item.get("name") or "").lower() == dl_chain.lower():
+            tvl = item.get("tvl")
+            # DeFiLlama doesn't expose active addresses directly;
+            # use a proxy: TVL per chain as proxy for ecosystem size
+            active_addresses = item.get("chain_bridge_count", tvl)
+            return tvl, active_addresses
 
     return None, None
 
@@ -222,73 +385,61 @@ async def _defillama_exchange_flow(chain: str) -> float | None:
     """Return exchange flow (inflow - outflow) for a chain. Positive = net inflow (sell pressure)."""
     # DeFiLlama public API doesn't expose real-time flow data.
     # For MVP: use 7-day change in TVL as proxy for net flow direction.
-    cached = _cache_get(f"defillama_flow_{chain}")
-    if cached:
-        return cached.get("flow")
-
     meta = CHAIN_META.get(chain.lower(), {})
     dl_chain = meta.get("defillama", chain.lower())
 
-    url = f"https://api.llama.fi/charts/{dl_chain}"
-    try:
-        client = _get_onchain_client()
-        resp = await client.get(url)
+    async def _fetch() -> dict[str, Any]:
+        resp = await _get(f"https://api.llama.fi/charts/{dl_chain}")
         resp.raise_for_status()
         data = resp.json()
-        if isinstance(data, list) and len(data) >= 2:
-            current_tvl = data[-1].get("tvl", 0)
-            older_tvl = data[0].get("tvl", 0)
-            flow = current_tvl - older_tvl if current_tvl and older_tvl else 0
-            result = {"flow": flow}
-            _cache_set(f"defillama_flow_{chain}", result)
-            return flow
-    except Exception as e:
-        print(f"[onchain] DeFiLlama flow error for {chain}: {e}")
+        if not (isinstance(data, list) and len(data) >= 2):
+            raise ValueError("not enough TVL history")
+        current_tvl = data[-1].get("tvl", 0)
+        older_tvl = data[0].get("tvl", 0)
+        return {"flow": current_tvl - older_tvl if current_tvl and older_tvl else 0}
 
-    return None
+    cached = await _cached_fetch(f"defillama_flow_{chain}", _fetch)
+    return cached.get("flow") if cached else None
 
 
 async def _github_metrics(repo: str) -> dict[str, int | None]:
-    """Return {stars, issues, prs, commits_30d} from GitHub public API."""
-    cached = _cache_get(f"github_{repo}")
-    if cached:
-        return cached
+    """Return {stars, issues, prs, commits_30d} from GitHub public API.
 
+    A failed or non-200 response is not cached: the previous copy (or all-None
+    metrics) is served and the next snapshot asks GitHub again.
+    """
     headers = {"Accept": "application/vnd.github.v3+json"}
-    result: dict[str, int | None] = {
-        "stars": None,
-        "issues": None,
-        "prs": None,
-        "commits_30d": None,
-    }
-
-    client = _get_onchain_client()
-    # Repo metadata
-    url = f"https://api.github.com/repos/{repo}"
-    try:
-        resp = await client.get(url, headers=headers)
-        if resp.status_code == 200:
-            data = resp.json()
-            result["stars"] = data.get("stargazers_count")
-            result["issues"] = data.get("open_issues_count")
-    except Exception as e:
-        print(f"[onchain] GitHub metadata error for {repo}: {e}")
 
-    # Commit activity (last 4 weeks)
-    commits_url = f"https://api.github.com/repos/{repo}/commits"
-    try:
-        resp = await client.get(
-            commits_url,
-            headers=headers,
-            params={"since": (datetime.now(timezone.utc).timestamp() - 30 * 86400)},
+    async def _fetch() -> dict[str, int | None]:
+        result: dict[str, int | None] = {
+            "stars": None,
+            "issues": None,
+            "prs": None,
+            "commits_30d": None,
+        }
+        # Repo metadata and commit activity (last 4 weeks), requested together.
+        meta_resp, commits_resp = await asyncio.gather(
+            _get(f"https://api.github.com/repos/{repo}", headers=headers),
+            _get(
+                f"https://api.github.com/repos/{repo}/commits",
+                headers=headers,
+                params={"since": (datetime.now(timezone.utc).timestamp() - 30 * 86400)},
+            ),
+            return_exceptions=True,
         )
-        if resp.status_code == 200:
-            result["commits_30d"] = len(resp.json())
-    except Exception as e:
-        print(f"[onchain] GitHub commits error for {repo}: {e}")
+        for name, resp in (("metadata", meta_resp), ("commits", commits_resp)):
+            if isinstance(resp, Exception):
+                raise RuntimeError(f"GitHub {name} error: {resp}") from resp
+            if resp.status_code != 200:
+                raise RuntimeError(f"GitHub {name} returned HTTP {resp.status_code}")
+        data = meta_resp.json()
+        result["stars"] = data.get("stargazers_count")
+        result["issues"] = data.get("open_issues_count")
+        result["commits_30d"] = len(commits_resp.json())
+        return result
 
-    _cache_set(f"github_{repo}", result)
-    return result
+    cached = await _cached_fetch(f"github_{repo}", _fetch)
+    return cached or {"stars": None, "issues": None, "prs": None, "commits_30d": None}
 
 
 def _to_float(value: Any) -> float | None:
@@ -325,58 +476,35 @@ def _is_supported_spot_pair(symbol_meta: dict[str, Any]) -> bool:
 
 async def _fetch_binance_ranked_pairs(limit: int = MAX_SNAPSHOT_PAIRS) -> list[RankedPair]:
     cache_key = f"binance_ranked_pairs_{limit}"
-    cached = _cache_get(cache_key)
+    cached = await _cache_get(cache_key)
     if cached:
         return [RankedPair(**item) for item in cached.get("pairs", [])]
 
-    client = _get_onchain_client()
-    exchange_info_response, ticker_response = await asyncio.gather(
-        client.get(BINANCE_EXCHANGE_INFO_URL),
-        client.get(BINANCE_24HR_TICKER_URL),
-    )
-    exchange_info_response.raise_for_status()
-    ticker_response.raise_for_status()
-
-    exchange_info = exchange_info_response.json()
-    ticker_data = ticker_response.json()
-    valid_symbols = {
-        str(item.get("symbol") or "").upper(): item
-        for item in exchange_info.get("symbols", [])
-        if isinstance(item, dict) and _is_supported_spot_pair(item)
-    }
-
+    rows = await asyncio.to_thread(get_market_universe().ranked_by_volume, "USDT")
     ranked_pairs: list[RankedPair] = []
-    for ticker in ticker_data:
-        if not isinstance(ticker, dict):
-            continue
-        symbol = str(ticker.get("symbol") or "").upper()
-        meta = valid_symbols.get(symbol)
-        if not meta:
-            continue
-
-        token = str(meta.get("baseAsset") or "").upper()
-        quote_volume = _to_float(ticker.get("quoteVolume"))
-        if quote_volume is None or quote_volume <= 0:
+    for row in rows:
+        if not _is_supported_spot_pair(row):
             continue
 
+        token = str(row.get("baseAsset") or "").upper()
         chain = _resolve_chain_for_token(token)
         if not chain:
             continue
 
         ranked_pairs.append(
             RankedPair(
-                symbol=symbol,
+                symbol=row["symbol"],
                 token=token,
                 chain=chain,
-                quote_volume=quote_volume,
-                trade_count=int(_to_float(ticker.get("count")) or 0),
-                last_price=_to_float(ticker.get("lastPrice")),
+                quote_volume=float(row["quoteVolume"]),
+                trade_count=int(row.get("count") or 0),
+                last_price=row.get("lastPrice"),
             )
         )
 
     ranked_pairs.sort(key=lambda item: (-item.quote_volume, -item.trade_count, item.symbol))
     limited_pairs = ranked_pairs[: max(1, min(limit, MAX_SNAPSHOT_PAIRS))]
-    _cache_set(
+    await _cache_set(
         cache_key,
         {"pairs": [pair.__dict__ for pair in limited_pairs]},
         ttl=300,
@@ -388,14 +516,10 @@ async def _fetch_chain_metrics(chain: str) -> dict[str, Any]:
     meta = CHAIN_META.get(chain.lower(), {})
     github_repo = meta.get("github", "")
 
-    tvl_task = _defillama_tvl(chain)
-    flow_task = _defillama_exchange_flow(chain)
-    github_task = _github_metrics(github_repo) if github_repo else {}
-
     tvl_result, exchange_flow, github = await asyncio.gather(
-        tvl_task,
-        flow_task,
-        github_task if github_repo else _immediate_result({}),
+        _defillama_tvl(chain),
+        _defillama_exchange_flow(chain),
+        _github_metrics(github_repo) if github_repo else _immediate_result({}),
     )
     tvl, active_addresses = tvl_result
     return {
@@ -482,20 +606,15 @@ def _compose_signal(metrics: OnchainMetrics) -> SignalResult:
 async def fetch_onchain_metrics(token: str, chain: str) -> OnchainMetrics:
     """Fetch all onchain metrics for a given token+chain."""
     chain = chain.lower()
-    meta = CHAIN_META.get(chain, {})
-    github_repo = meta.get("github", "")
-
-    tvl, active_addresses = await _defillama_tvl(chain)
-    exchange_flow = await _defillama_exchange_flow(chain)
-
-    github = await _github_metrics(github_repo) if github_repo else {}
+    metrics_row = await _fetch_chain_metrics(chain)
+    github = metrics_row.get("github") or {}
 
     return OnchainMetrics(
         token=token.upper(),
         chain=chain,
-        tvl=tvl,
-        active_addresses=active_addresses,
-        exchange_flow=exchange_flow,
+        tvl=metrics_row.get("tvl"),
+        active_addresses=metrics_row.get("active_addresses"),
+        exchange_flow=metrics_row.get("exchange_flow"),
         github_commits=github.get("commits_30d"),
         github_stars=github.get("stars"),
         github_prs=github.get("prs"),
@@ -10,7 +10,7 @@ from datetime import datetime, timedelta
 
 from sqlalchemy import func
 
-from app.strategies.combos.proximity_analyzer import ProximityAnalyzer
+from app.strategies.combos.proximity_analyzer import ProximityAnalyzer, compile_logic
 from app.strategies.combos.combo_strategy import ComboStrategy
 from app.services.combo_service import ComboService
 from app.services.asset_classification import classify_asset_type
@@ -1032,6 +1032,39 @@ class OpportunityService:
             source_label="catalog",
         )
 
+    def _entry_analyses(self, prepared: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Entry proximity of each prepared favorite, analyzing favorites that share an
+        entry logic (template) in one ``analyze_many`` call.
+
+        The distance uses the LAST CLOSED candle so the % matches TradingView; a SIGNAL
+        on the closed candles (stable signals only) overrides the status.
+        """
+        groups: Dict[str, List[int]] = {}
+        for position, item in enumerate(prepared):
+            groups.setdefault(item["strategy"].entry_logic, []).append(position)
+
+        analyses: List[Dict[str, Any]] = [{} for _ in prepared]
+        for entry_logic, positions in groups.items():
+            last_rows = []
+            for position in positions:
+                last_rows.append(prepared[position]["df_for_distance"].tail(2))
+                last_rows.append(prepared[position]["df_closed"].tail(2))
+            results = self.analyzer.analyze_many(compile_logic(entry_logic), last_rows)
+            for offset, position in enumerate(positions):
+                analysis, signal_analysis = results[2 * offset], results[2 * offset + 1]
+                if (
+                    not prepared[position]["df_closed"].empty
+                    and signal_analysis.get("status") == "SIGNAL"
+                ):
+                    # Signal confirmed on closed candle, but use current distance
+                    analysis["status"] = "SIGNAL"
+                    analysis["badge"] = "success"
+                    analysis["message"] = "Signal Active"
+                    analysis["distance"] = 0.0
+                analyses[position] = analysis
+        return analyses
+
     def _calculate_opportunities(
         self,
         favorites: List[Dict[str, Any]],
@@ -1174,6 +1207,25 @@ class OpportunityService:
                                 f"Market fetch timed out after {fetch_timeout_seconds:.2f}s",
                             )
 
+        def _skip_failed_favorite(fav: Dict[str, Any], exc: Exception) -> None:
+            import traceback
+
+            logger.error(
+                f"Error analyzing favorite {fav.get('id', 'unknown')} ({fav.get('symbol', 'unknown')} {fav.get('timeframe', 'unknown')}): {exc}"
+            )
+            logger.error(traceback.format_exc())
+            skipped_strategies.append(
+                {
+                    "id": fav.get("id", "unknown"),
+                    "symbol": fav.get("symbol", "unknown"),
+                    "timeframe": fav.get("timeframe", "unknown"),
+                    "reason": f"Exception: {str(exc)}",
+                }
+            )
+
+        # Favorites are prepared (data, indicators, frames) first so the entry proximity of
+        # favorites sharing a template can be analyzed together before building each card.
+        prepared: list[dict[str, Any]] = []
         for fav in favorites:
             try:
                 symbol = fav["symbol"]
@@ -1459,18 +1511,61 @@ class OpportunityService:
                     long_val = current_row["long"]
                     short_above_long = short_val > long_val
 
-                # Analyze proximity using LAST CLOSED candle so distance % matches TradingView
-                analysis = self.analyzer.analyze(df_for_distance, strategy.entry_logic)
+                prepared.append(
+                    {
+                        "fav": fav,
+                        "symbol": symbol,
+                        "template_name": template_name,
+                        "params": params,
+                        "normalized_tf": normalized_tf,
+                        "df": df,
+                        "meta": meta,
+                        "template_data": template_data,
+                        "final_indicators": final_indicators,
+                        "sl_param": sl_param,
+                        "entry_logic": entry_logic,
+                        "exit_logic": exit_logic,
+                        "strategy_direction": strategy_direction,
+                        "strategy": strategy,
+                        "df_with_inds": df_with_inds,
+                        "df_current": df_current,
+                        "df_closed": df_closed,
+                        "df_for_distance": df_for_distance,
+                        "current_row": current_row,
+                        "short_above_medium": short_above_medium,
+                        "short_above_long": short_above_long,
+                    }
+                )
+            except Exception as e:
+                _skip_failed_favorite(fav, e)
+                continue
+
+        # 5b. Entry proximity for every prepared favorite, one batched pass per entry logic
+        entry_analyses = self._entry_analyses(prepared)
 
-                # But verify signal on closed candles (stable signals only)
-                if not df_closed.empty:
-                    signal_analysis = self.analyzer.analyze(df_closed, strategy.entry_logic)
-                    if signal_analysis.get("status") == "SIGNAL":
-                        # Signal confirmed on closed candle, but use current distance
-                        analysis["status"] = "SIGNAL"
-                        analysis["badge"] = "success"
-                        analysis["message"] = "Signal Active"
-                        analysis["distance"] = 0.0
+        for prepared_fav, analysis in zip(prepared, entry_analyses):
+            fav = prepared_fav["fav"]
+            try:
+                symbol = prepared_fav["symbol"]
+                template_name = prepared_fav["template_name"]
+                params = prepared_fav["params"]
+                normalized_tf = prepared_fav["normalized_tf"]
+                df = prepared_fav["df"]
+                meta = prepared_fav["meta"]
+                template_data = prepared_fav["template_data"]
+                final_indicators = prepared_fav["final_indicators"]
+                sl_param = prepared_fav["sl_param"]
+                entry_logic = prepared_fav["entry_logic"]
+                exit_logic = prepared_fav["exit_logic"]
+                strategy_direction = prepared_fav["strategy_direction"]
+                strategy = prepared_fav["strategy"]
+                df_with_inds = prepared_fav["df_with_inds"]
+                df_current = prepared_fav["df_current"]
+                df_closed = prepared_fav["df_closed"]
+                df_for_distance = prepared_fav["df_for_distance"]
+                current_row = prepared_fav["current_row"]
+                short_above_medium = prepared_fav["short_above_medium"]
+                short_above_long = prepared_fav["short_above_long"]
 
                 # Debug: Log analysis result for SOL
                 if symbol == "SOL/USDT":
@@ -2108,20 +2203,7 @@ class OpportunityService:
                 )
 
             except Exception as e:
-                import traceback
-
-                logger.error(
-                    f"Error analyzing favorite {fav.get('id', 'unknown')} ({fav.get('symbol', 'unknown')} {fav.get('timeframe', 'unknown')}): {e}"
-                )
-                logger.error(traceback.format_exc())
-                skipped_strategies.append(
-                    {
-                        "id": fav.get("id", "unknown"),
-                        "symbol": fav.get("symbol", "unknown"),
-                        "timeframe": fav.get("timeframe", "unknown"),
-                        "reason": f"Exception: {str(e)}",
-                    }
-                )
+                _skip_failed_favorite(fav, e)
                 continue
 
         # Sort by distance to next status (closest first)
@@ -0,0 +1,136 @@
+"""Streaming aggregation of grid-search optimization results.
+
+The single-strategy optimizer receives results chunk by chunk from the worker
+pool.  Instead of persisting everything and reading it back to find the best
+combinations, the driver keeps a bounded top-K heap in memory and hands the
+database writes to a background writer.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10000
+PERSIST_ALL = "all"
+PERSIST_TOP_K = "top_k"
+
+
+def result_total_pnl(result: Dict[str, Any]) -> float:
+    """Ranking key used by the optimizer (errors and missing metrics sort last)."""
+    metrics = result.get("metrics") or {}
+    try:
+        value = float(metrics.get("total_pnl", float("-inf")))
+    except (TypeError, ValueError):
+        return float("-inf")
+    return float("-inf") if math.isnan(value) else value
+
+
+class TopKResults:
+    """Bounded min-heap keeping the ``k`` results with the highest ``total_pnl``.
+
+    Ties are broken by combination index (lower index ranks first), matching a
+    stable descending sort over results stored in index order.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K):
+        self.k = max(1, int(k))
+        self._heap: List[Tuple[float, int, int, bool, Dict[str, Any]]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, result: Dict[str, Any], index: int, persist: bool = True) -> None:
+        # ``_seq`` keeps heap entries comparable without ever comparing dicts.
+        entry = (result_total_pnl(result), -int(index), self._seq, persist, result)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, results: List[Dict[str, Any]], start_index: int) -> None:
+        for offset, result in enumerate(results):
+            self.push(result, start_index + offset)
+
+    def ranked(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return results best-first."""
+        ordered = sorted(self._heap, key=lambda e: (-e[0], -e[1]))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [entry[4] for entry in ordered]
+
+    def pending_persistence(self, below: Optional[int] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """Hand out (index, result) pairs pushed live and not yet stored.
+
+        Returned entries are marked as stored, so repeated checkpoints only
+        write what is new. ``below`` limits the hand-off to combination indexes
+        under a resume watermark.
+        """
+        pending = []
+        for position, entry in enumerate(self._heap):
+            if entry[3] and (below is None or -entry[1] < below):
+                pending.append((-entry[1], entry[4]))
+                # Same ordering key, so the heap invariant is untouched.
+                self._heap[position] = entry[:3] + (False,) + entry[4:]
+        return sorted(pending, key=lambda pair: pair[0])
+
+
+class ChunkWatermark:
+    """Combination index below which every chunk has finished.
+
+    Chunks complete out of order in the worker pool, so the number of finished
+    chunks says nothing about which combinations are done. The watermark only
+    advances over a contiguous run of finished chunks, which makes it a safe
+    resume point: everything below it is persisted, anything above may not be.
+    """
+
+    def __init__(self, start_index: int, chunk_size: int, total: int):
+        self.start_index = int(start_index)
+        self.chunk_size = int(chunk_size)
+        self.total = int(total)
+        self._finished: Set[int] = set()
+        self._contiguous = 0
+
+    @property
+    def value(self) -> int:
+        return min(self.start_index + self._contiguous * self.chunk_size, self.total)
+
+    def complete(self, chunk_idx: int) -> int:
+        """Mark ``chunk_idx`` finished and return the (possibly advanced) watermark."""
+        self._finished.add(int(chunk_idx))
+        while self._contiguous in self._finished:
+            self._finished.discard(self._contiguous)
+            self._contiguous += 1
+        return self.value
+
+
+class BackgroundResultWriter:
+    """Single-thread writer so result persistence never blocks the driver loop."""
+
+    def __init__(self, write_fn: Callable[..., Any]):
+        self._write_fn = write_fn
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="opt-results")
+        self._pending: List[Future] = []
+
+    def submit(self, *args: Any) -> None:
+        self._pending.append(self._executor.submit(self._write_fn, *args))
+
+    def flush(self) -> None:
+        """Block until every submitted write has finished."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            try:
+                future.result()
+            except Exception as exc:
+                logger.error(f"Background result write failed: {exc}")
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown(wait=True)
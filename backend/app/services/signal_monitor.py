@@ -1,38 +1,113 @@
 """Background price monitor that closes BUY signals when target/stop is hit."""
 
-import asyncio
+import json
 import logging
 import threading
 import time
 from typing import Any
 
 import httpx
+import numpy as np
 
 from app.database import SessionLocal
 from app.models_signal_history import SignalHistory, sao_paulo_now
+from app.services.binance_http import env_base_url, get_gateway
+from app.services.binance_market_universe import get_market_universe
+from app.services.binance_realtime_connector import read_external_snapshot
 
 logger = logging.getLogger(__name__)
 
-BINANCE_TICKER_URL = "https://api.binance.com/api/v3/ticker/price"
+BINANCE_TICKER_PATH = "/api/v3/ticker/price"
 REQUEST_TIMEOUT = 8.0
 CHECK_INTERVAL_SECONDS = 60.0
-_MAX_CONCURRENT_PRICEFETCH = 15
+# Symbols per bulk ticker request (keeps the query string short; weight is flat).
+_BULK_TICKER_CHUNK = 100
 
 
-async def _fetch_price(asset: str) -> float | None:
-    """Fetch current price for an asset from Binance."""
-    params = {"symbol": asset}
-    timeout = httpx.Timeout(REQUEST_TIMEOUT)
+def _snapshot_prices(assets: list[str]) -> dict[str, float]:
+    """Prices already held by the realtime connector (empty when it is not running)."""
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(BINANCE_TICKER_URL, params=params)
-            if response.status_code == 429:
-                return None
-            response.raise_for_status()
-            data = response.json()
-            return float(data.get("price"))
-    except Exception:
-        return None
+        payload = read_external_snapshot(assets)
+    except Exception as exc:
+        logger.debug("[signal_monitor] Realtime snapshot unavailable: %s", exc)
+        return {}
+    prices: dict[str, float] = {}
+    for item in (payload or {}).get("prices") or []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            prices[str(item["symbol"]).upper()] = float(item["price"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return prices
+
+
+def _tradable(assets: list[str]) -> list[str]:
+    """Drop symbols Binance does not list; an unknown one fails the whole bulk request."""
+    try:
+        listed = get_market_universe().trading_symbols()
+    except Exception as exc:
+        logger.debug("[signal_monitor] Symbol universe unavailable: %s", exc)
+        return assets
+    return [asset for asset in assets if asset in listed]
+
+
+def _request_prices(url: str, params: dict[str, str]) -> dict[str, float]:
+    response = get_gateway().request("GET", url, params=params, timeout_s=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    payload = response.json()
+    prices: dict[str, float] = {}
+    for item in payload if isinstance(payload, list) else [payload]:
+        try:
+            prices[str(item["symbol"]).upper()] = float(item["price"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return prices
+
+
+def _fetch_bulk_prices(assets: list[str]) -> dict[str, float]:
+    """One ``ticker/price?symbols=[...]`` request per chunk instead of one per asset.
+
+    A chunk rejected with 400 (e.g. -1121 for a symbol delisted since the universe
+    was cached) falls back to per-symbol requests so one bad asset cannot hide the
+    prices of the rest of the chunk.
+    """
+    url = f"{env_base_url()}{BINANCE_TICKER_PATH}"
+    assets = _tradable(assets)
+    prices: dict[str, float] = {}
+    for i in range(0, len(assets), _BULK_TICKER_CHUNK):
+        chunk = assets[i : i + _BULK_TICKER_CHUNK]
+        try:
+            prices.update(
+                _request_prices(url, {"symbols": json.dumps(chunk, separators=(",", ":"))})
+            )
+            continue
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 400 or len(chunk) == 1:
+                logger.warning("[signal_monitor] Bulk ticker request failed: %s", exc)
+                continue
+        except Exception as exc:
+            logger.warning("[signal_monitor] Bulk ticker request failed: %s", exc)
+            continue
+        for asset in chunk:
+            try:
+                prices.update(_request_prices(url, {"symbol": asset}))
+            except Exception as exc:
+                logger.warning("[signal_monitor] Ticker request for %s failed: %s", asset, exc)
+    return prices
+
+
+def _fetch_prices(assets: list[str]) -> dict[str, float]:
+    """Connector snapshot first, then a bulk ticker request for whatever is missing."""
+    prices = _snapshot_prices(assets)
+    missing = [asset for asset in assets if asset not in prices]
+    if missing:
+        prices.update(_fetch_bulk_prices(missing))
+    return prices
+
+
+def _as_float_array(values: list[Any]) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
 
 
 def _check_and_update_signals() -> None:
@@ -52,57 +127,44 @@ def _check_and_update_signals() -> None:
             db.close()
             return
 
-        assets = list({s.asset for s in signals})
-
-        async def _fetch_all_prices():
-            semaphore = asyncio.Semaphore(_MAX_CONCURRENT_PRICEFETCH)
-
-            async def _sem_fetch(asset: str) -> tuple[str, float | None]:
-                async with semaphore:
-                    price = await _fetch_price(asset)
-                    return asset, price
+        assets = sorted({s.asset for s in signals})
 
-            results = await asyncio.gather(*[_sem_fetch(a) for a in assets])
-            return dict(results)
-
-        price_map: dict[str, float | None] = {}
         try:
-            price_map = asyncio.run(_fetch_all_prices())
+            price_map = _fetch_prices(assets)
         except Exception as e:
             logger.warning("[signal_monitor] Failed to fetch prices: %s", e)
             db.close()
             return
 
-        updated_count = 0
-        for signal in signals:
-            current_price = price_map.get(signal.asset)
-            if current_price is None:
-                continue
+        # One pass over all open signals; only triggered rows touch the ORM objects.
+        current = _as_float_array([price_map.get(s.asset) for s in signals])
+        entry = _as_float_array([s.entry_price for s in signals])
+        target = _as_float_array([s.target_price for s in signals])
+        stop = _as_float_array([s.stop_loss for s in signals])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            hit_target = current >= target
+            hit_stop = ~hit_target & (current <= stop)
+            exit_prices = np.where(hit_target, target, stop)
+            pnl_pct = (exit_prices - entry) / entry * 100
+        triggered = (hit_target | hit_stop) & np.isfinite(pnl_pct)
 
-            exit_price: float | None = None
-            triggered = False
-
-            if current_price >= signal.target_price:
-                exit_price = signal.target_price
-                triggered = True
-            elif current_price <= signal.stop_loss:
-                exit_price = signal.stop_loss
-                triggered = True
-
-            if triggered and exit_price is not None:
-                pnl_pct = ((exit_price - signal.entry_price) / signal.entry_price) * 100
-                signal.status = "disparado"
-                signal.exit_price = exit_price
-                signal.pnl = round(pnl_pct, 4)
-                signal.updated_at = sao_paulo_now()
-                updated_count += 1
-                logger.info(
-                    "[signal_monitor] Signal %s triggered: entry=%.4f exit=%.4f pnl=%.4f%%",
-                    signal.asset,
-                    signal.entry_price,
-                    exit_price,
-                    pnl_pct,
-                )
+        updated_count = 0
+        for idx in np.flatnonzero(triggered):
+            signal = signals[idx]
+            exit_price = float(exit_prices[idx])
+            pnl = float(pnl_pct[idx])
+            signal.status = "disparado"
+            signal.exit_price = exit_price
+            signal.pnl = round(pnl, 4)
+            signal.updated_at = sao_paulo_now()
+            updated_count += 1
+            logger.info(
+                "[signal_monitor] Signal %s triggered: entry=%.4f exit=%.4f pnl=%.4f%%",
+                signal.asset,
+                signal.entry_price,
+                exit_price,
+                pnl,
+            )
 
         if updated_count > 0:
             db.commit()
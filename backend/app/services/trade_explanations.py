@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import math
 from copy import deepcopy
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
 from typing import Any, Iterable
 
@@ -50,33 +51,81 @@ def _rule(manifest: StrategyTransparency, participation: str) -> StrategyLogicBl
     )
 
 
-def _event_timestamps(
-    manifest: StrategyTransparency,
-    participation: str,
-    direction: str,
-) -> list[datetime]:
-    timestamps: set[datetime] = set()
-    for indicator in manifest.indicators:
-        if participation not in indicator.participation:
-            continue
-        for point in indicator.series:
+def _market_key(participation: str, direction: str) -> str:
+    if participation != "risk":
+        return "close"
+    return "high" if direction == "short" else "low"
+
+
+_MARKET_LABELS = {
+    "close": "Fechamento do candle",
+    "low": "Mínima do candle",
+    "high": "Máxima do candle",
+}
+
+
+class _TimedSeries:
+    """Points of one series sorted by parsed timestamp (first point wins on ties)."""
+
+    __slots__ = ("times", "points")
+
+    def __init__(self, points: Iterable[Any]):
+        by_time: dict[datetime, Any] = {}
+        for point in points:
             parsed = _parse_timestamp(point.timestamp_utc)
-            if parsed is not None:
-                timestamps.add(parsed)
-    market_key = (
-        "high"
-        if participation == "risk" and direction == "short"
-        else "low" if participation == "risk" else "close"
-    )
-    for point in manifest.market_series.get(market_key, []):
-        parsed = _parse_timestamp(point.timestamp_utc)
-        if parsed is not None:
-            timestamps.add(parsed)
-    return sorted(timestamps)
+            if parsed is not None and parsed not in by_time:
+                by_time[parsed] = point
+        self.times = sorted(by_time)
+        self.points = [by_time[timestamp] for timestamp in self.times]
+
+    def at_or_before(self, moment: datetime) -> tuple[datetime, Any] | None:
+        position = bisect_right(self.times, moment)
+        if position == 0:
+            return None
+        return self.times[position - 1], self.points[position - 1]
+
+
+class _ManifestTimeIndex:
+    """Time-indexed view of a manifest, built once and shared by every trade explained."""
+
+    def __init__(self, manifest: StrategyTransparency):
+        self.manifest = manifest
+        self._market: dict[str, _TimedSeries] = {}
+        self._indicators: list[_TimedSeries | None] = [None] * len(manifest.indicators)
+        self._events: dict[tuple[str, str], list[datetime]] = {}
+
+    def market(self, key: str) -> _TimedSeries:
+        series = self._market.get(key)
+        if series is None:
+            series = _TimedSeries(self.manifest.market_series.get(key, []))
+            self._market[key] = series
+        return series
+
+    def indicators(self, participation: str) -> Iterable[tuple[Any, _TimedSeries]]:
+        for position, indicator in enumerate(self.manifest.indicators):
+            if participation not in indicator.participation:
+                continue
+            series = self._indicators[position]
+            if series is None:
+                series = _TimedSeries(indicator.series)
+                self._indicators[position] = series
+            yield indicator, series
+
+    def event_timestamps(self, participation: str, direction: str) -> list[datetime]:
+        market_key = _market_key(participation, direction)
+        cache_key = (participation, market_key)
+        timestamps = self._events.get(cache_key)
+        if timestamps is None:
+            merged: set[datetime] = set(self.market(market_key).times)
+            for _, series in self.indicators(participation):
+                merged.update(series.times)
+            timestamps = sorted(merged)
+            self._events[cache_key] = timestamps
+        return timestamps
 
 
 def _decision_candle(
-    manifest: StrategyTransparency,
+    index: _ManifestTimeIndex,
     *,
     participation: str,
     execution_time: Any,
@@ -86,18 +135,16 @@ def _decision_candle(
     execution = _parse_timestamp(execution_time)
     if execution is None:
         return None
-    candidates = _event_timestamps(manifest, participation, direction)
-    if same_candle:
-        eligible = [candidate for candidate in candidates if candidate <= execution]
-    else:
-        eligible = [candidate for candidate in candidates if candidate < execution]
-        if not eligible:
-            eligible = [candidate for candidate in candidates if candidate <= execution]
-    return eligible[-1] if eligible else None
+    candidates = index.event_timestamps(participation, direction)
+    position = bisect_left(candidates, execution)
+    if same_candle or position == 0:
+        # Fall back to the execution candle itself when nothing precedes it.
+        position = bisect_right(candidates, execution)
+    return candidates[position - 1] if position else None
 
 
 def _evidence_at(
-    manifest: StrategyTransparency,
+    index: _ManifestTimeIndex,
     *,
     participation: str,
     decision_time: datetime | None,
@@ -108,44 +155,27 @@ def _evidence_at(
         return []
 
     evidence: list[TradeEvidenceItem] = []
-    market_key = (
-        "high"
-        if participation == "risk" and direction == "short"
-        else "low" if participation == "risk" else "close"
-    )
-    market_labels = {
-        "close": "Fechamento do candle",
-        "low": "Mínima do candle",
-        "high": "Máxima do candle",
-    }
-    market_candidates = []
-    for point in manifest.market_series.get(market_key, []):
-        timestamp = _parse_timestamp(point.timestamp_utc)
-        if timestamp is not None and timestamp <= decision_time:
-            market_candidates.append((timestamp, point))
-    if market_candidates:
-        timestamp, point = max(market_candidates, key=lambda item: item[0])
+    market_key = _market_key(participation, direction)
+    market_point = index.market(market_key).at_or_before(decision_time)
+    if market_point is not None:
+        timestamp, point = market_point
         evidence.append(
             TradeEvidenceItem(
                 key=market_key,
-                label=market_labels[market_key],
+                label=_MARKET_LABELS[market_key],
                 value=point.value,
                 timestamp_utc=timestamp.isoformat(),
                 state=state,
             )
         )
     seen: set[str] = set()
-    for indicator in manifest.indicators:
-        if participation not in indicator.participation or indicator.key in seen:
+    for indicator, series in index.indicators(participation):
+        if indicator.key in seen:
             continue
-        point_candidates = []
-        for point in indicator.series:
-            timestamp = _parse_timestamp(point.timestamp_utc)
-            if timestamp is not None and timestamp <= decision_time:
-                point_candidates.append((timestamp, point))
-        if not point_candidates:
+        found = series.at_or_before(decision_time)
+        if found is None:
             continue
-        timestamp, point = max(point_candidates, key=lambda item: item[0])
+        timestamp, point = found
         evidence.append(
             TradeEvidenceItem(
                 key=indicator.key,
@@ -183,7 +213,7 @@ def _unavailable(
 
 
 def _event_explanation(
-    manifest: StrategyTransparency,
+    index: _ManifestTimeIndex,
     *,
     direction: str,
     timeframe: str | None,
@@ -192,6 +222,7 @@ def _event_explanation(
     execution_time: Any,
     execution_price: Any,
 ) -> TradeExplanation:
+    manifest = index.manifest
     is_entry = participation == "entry"
     action = (
         "Venda/Short"
@@ -213,14 +244,14 @@ def _event_explanation(
 
     is_stop = trigger == "stop_loss"
     decision = _decision_candle(
-        manifest,
+        index,
         participation="risk" if is_stop else participation,
         execution_time=execution_time,
         same_candle=is_stop,
         direction=direction,
     )
     evidence = _evidence_at(
-        manifest,
+        index,
         participation="risk" if is_stop else participation,
         decision_time=decision,
         state="confirmed",
@@ -277,23 +308,24 @@ def _exit_trigger(reason: Any) -> str:
 
 
 def _latest_series_time(
-    manifest: StrategyTransparency, participation: str, direction: str
+    index: _ManifestTimeIndex, participation: str, direction: str
 ) -> datetime | None:
-    timestamps = _event_timestamps(manifest, participation, direction)
+    timestamps = index.event_timestamps(participation, direction)
     return timestamps[-1] if timestamps else None
 
 
 def _open_position_explanation(
-    manifest: StrategyTransparency,
+    index: _ManifestTimeIndex,
     *,
     direction: str,
     timeframe: str | None,
 ) -> TradeExplanation:
+    manifest = index.manifest
     action = "Venda/Short ativa" if direction == "short" else "Compra ativa"
     rule = _rule(manifest, "exit")
-    decision = _latest_series_time(manifest, "exit", direction)
+    decision = _latest_series_time(index, "exit", direction)
     evidence = _evidence_at(
-        manifest,
+        index,
         participation="exit",
         decision_time=decision,
         state="pending",
@@ -354,13 +386,14 @@ def explain_trades(
     """Return copies of trades enriched with safe entry/exit/current-state explanations."""
 
     normalized_direction = _direction(direction)
+    index = _ManifestTimeIndex(manifest)
     explained: list[dict[str, Any]] = []
     for raw_trade in trades:
         if not isinstance(raw_trade, dict):
             continue
         trade = deepcopy(raw_trade)
         trade["entry_explanation"] = _event_explanation(
-            manifest,
+            index,
             direction=normalized_direction,
             timeframe=timeframe,
             participation="entry",
@@ -370,7 +403,7 @@ def explain_trades(
         ).model_dump(mode="json")
         if trade.get("exit_time") is not None or trade.get("exit_price") is not None:
             trade["exit_explanation"] = _event_explanation(
-                manifest,
+                index,
                 direction=normalized_direction,
                 timeframe=timeframe,
                 participation="exit",
@@ -382,7 +415,7 @@ def explain_trades(
         else:
             trade["exit_explanation"] = None
             trade["current_state_explanation"] = _open_position_explanation(
-                manifest,
+                index,
                 direction=normalized_direction,
                 timeframe=timeframe,
             ).model_dump(mode="json")
@@ -398,6 +431,7 @@ def explain_signal_history(
     timeframe: str | None,
 ) -> list[dict[str, Any]]:
     normalized_direction = _direction(direction)
+    index = _ManifestTimeIndex(manifest)
     explained: list[dict[str, Any]] = []
     for raw_item in history:
         if not isinstance(raw_item, dict):
@@ -405,7 +439,7 @@ def explain_signal_history(
         item = deepcopy(raw_item)
         is_entry = str(item.get("type") or "").lower() == "entry"
         item["explanation"] = _event_explanation(
-            manifest,
+            index,
             direction=normalized_direction,
             timeframe=timeframe,
             participation="entry" if is_entry else "exit",
@@ -426,9 +460,10 @@ def explain_current_position(
     is_holding: bool,
 ) -> TradeExplanation | None:
     normalized_direction = _direction(direction)
+    index = _ManifestTimeIndex(manifest)
     if is_holding:
         return _open_position_explanation(
-            manifest,
+            index,
             direction=normalized_direction,
             timeframe=timeframe,
         )
@@ -437,7 +472,7 @@ def explain_current_position(
         return None
     is_entry = str(latest.get("type") or "").lower() == "entry"
     return _event_explanation(
-        manifest,
+        index,
         direction=normalized_direction,
         timeframe=timeframe,
         participation="entry" if is_entry else "exit",
@@ -3,10 +3,17 @@
 Roda a regra walk-forward (split treino/holdout + gate GO/NO-GO) na janela
 recente de favoritos existentes e atualiza os dados persistidos de revalidação
 (`metrics.revalidation*`), sem alterar parâmetros nem `auto_refresh_status`.
+
+Os parâmetros do favorito são avaliados diretamente
+(`ComboOptimizer.evaluate_fixed_parameters`: um backtest no treino e um no
+holdout), sem o pipeline de otimização. Em lote, os favoritos são agrupados por
+símbolo/timeframe e compartilham candles, colunas de contexto e o 15m do deep
+backtest (`RevalidationDataCache`).
 """
 
 from __future__ import annotations
 
+import json
 import logging
 from datetime import datetime, timedelta
 from typing import Any
@@ -15,13 +22,13 @@ from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
 from app.models import FavoriteStrategy
-from app.services.combo_optimizer import ComboOptimizer
-from app.services.favorite_backtest_refresh_service import _fixed_optimization_ranges
+from app.services.combo_optimizer import ComboOptimizer, WalkForwardData
 from app.services.market_data_providers import resolve_data_source_for_symbol
 
 logger = logging.getLogger(__name__)
 
 REVALIDATION_WINDOW_DAYS = 90
+REVALIDATION_SPLIT_TRAIN_RATIO = 0.7
 
 
 def oos_gate_decision(
@@ -65,15 +72,82 @@ def _revalidation_window(favorite: FavoriteStrategy) -> tuple[str, str]:
     return start_date, end_date
 
 
+class RevalidationDataCache:
+    """Dados de mercado compartilhados entre revalidações (card #470).
+
+    Mantém apenas o grupo corrente (símbolo, timeframe, fonte e janela): o lote
+    é processado agrupado, então cada grupo é carregado uma única vez. Avaliações
+    idênticas no grupo (mesma estratégia, parâmetros e direção, ex.: cópias do
+    curated catalog) também são reaproveitadas.
+    """
+
+    def __init__(self, optimizer: ComboOptimizer | None = None):
+        self._optimizer = optimizer
+        self._key: tuple | None = None
+        self._data: WalkForwardData | None = None
+        self._evaluations: dict[tuple, dict[str, Any]] = {}
+
+    @property
+    def optimizer(self) -> ComboOptimizer:
+        if self._optimizer is None:
+            self._optimizer = ComboOptimizer()
+        return self._optimizer
+
+    def data(
+        self, symbol: str, timeframe: str, data_source: str, start: str, end: str
+    ) -> WalkForwardData:
+        key = (symbol, timeframe, data_source, start, end)
+        if key != self._key or self._data is None:
+            self._key, self._data, self._evaluations = None, None, {}
+            self._data = self.optimizer.load_walk_forward_data(
+                symbol,
+                timeframe,
+                start_date=start,
+                end_date=end,
+                data_source=data_source,
+                split_train_ratio=REVALIDATION_SPLIT_TRAIN_RATIO,
+                deep_backtest=True,
+            )
+            self._key = key
+        return self._data
+
+    def evaluate(
+        self,
+        template_name: str,
+        parameters: dict[str, Any],
+        direction: str,
+        *,
+        symbol: str,
+        timeframe: str,
+        data_source: str,
+        start: str,
+        end: str,
+    ) -> dict[str, Any]:
+        data = self.data(symbol, timeframe, data_source, start, end)
+        evaluation_key = (
+            template_name,
+            direction,
+            json.dumps(parameters, sort_keys=True, default=str),
+        )
+        if evaluation_key not in self._evaluations:
+            self._evaluations[evaluation_key] = self.optimizer.evaluate_fixed_parameters(
+                template_name, parameters, data, direction=direction
+            )
+        return self._evaluations[evaluation_key]
+
+
 def revalidate_favorite(
     favorite: FavoriteStrategy,
     *,
     db: Session | None = None,
     start_date: str | None = None,
     end_date: str | None = None,
+    market_data: RevalidationDataCache | None = None,
 ) -> dict[str, Any]:
     """Roda o backtest do favorito na janela recente com split walk-forward e
-    grava `metrics.revalidation*` no favorito (sem alterar parâmetros)."""
+    grava `metrics.revalidation*` no favorito (sem alterar parâmetros).
+
+    `market_data` permite reaproveitar candles já carregados (lote)."""
     parameters = favorite.parameters if isinstance(favorite.parameters, dict) else {}
     direction = _favorite_direction(parameters)
     data_source = parameters.get("data_source") or resolve_data_source_for_symbol(
@@ -83,18 +157,15 @@ def revalidate_favorite(
     start = start_date or window_start
     end = end_date or window_end
 
-    optimizer = ComboOptimizer()
-    result = optimizer.run_optimization(
-        template_name=favorite.strategy_name,
+    result = (market_data or RevalidationDataCache()).evaluate(
+        favorite.strategy_name,
+        parameters,
+        direction,
         symbol=favorite.symbol,
         timeframe=favorite.timeframe,
         data_source=data_source,
-        start_date=start,
-        end_date=end,
-        custom_ranges=_fixed_optimization_ranges(parameters),
-        deep_backtest=True,
-        direction=direction,
-        split_train_ratio=0.7,
+        start=start,
+        end=end,
     )
 
     best_metrics = result.get("best_metrics") or {}
@@ -170,33 +241,47 @@ def revalidate_all_favorites(
         "no_go": 0,
         "results": [],
     }
-    for row in rows:
+    results: list[dict[str, Any] | None] = [None] * len(rows)
+    market_data = RevalidationDataCache()
+    # Agrupado por símbolo/timeframe: cada grupo carrega candles uma única vez;
+    # os resultados mantêm a ordem por id.
+    ordered = sorted(
+        range(len(rows)),
+        key=lambda idx: (
+            str(getattr(rows[idx], "symbol", "") or ""),
+            str(getattr(rows[idx], "timeframe", "") or ""),
+            idx,
+        ),
+    )
+    for position in ordered:
+        row = rows[position]
         # Session própria por favorito evita PendingRollbackError compartilhada
         # quando um commit falha no meio do lote.
         per_item_db = None
         if db is None:
             per_item_db = SessionLocal()
         try:
-            result = revalidate_favorite(row, db=per_item_db)
+            result = revalidate_favorite(row, db=per_item_db, market_data=market_data)
             summary["revalidated"] += 1
             if result.get("verdict") == "GO":
                 summary["go"] += 1
             elif result.get("verdict") == "NO-GO":
                 summary["no_go"] += 1
-            summary["results"].append(
-                {
-                    "favorite_id": row.id,
-                    "symbol": row.symbol,
-                    "verdict": result.get("verdict"),
-                }
-            )
+            results[position] = {
+                "favorite_id": row.id,
+                "symbol": row.symbol,
+                "verdict": result.get("verdict"),
+            }
         except Exception as exc:
             summary["failures"] += 1
             logger.warning("Revalidation failed for favorite %s: %s", row.id, exc)
-            summary["results"].append(
-                {"favorite_id": row.id, "symbol": row.symbol, "error": str(exc)[:300]}
-            )
+            results[position] = {
+                "favorite_id": row.id,
+                "symbol": row.symbol,
+                "error": str(exc)[:300],
+            }
         finally:
             if per_item_db is not None:
                 per_item_db.close()
+    summary["results"] = results
     return summary
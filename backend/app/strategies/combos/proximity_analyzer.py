@@ -1,8 +1,142 @@
 import pandas as pd
 import numpy as np
 import re
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
+logger = logging.getLogger(__name__)
+
+_CROSSOVER_RX = re.compile(r"crossover\(\s*(\w+)\s*,\s*(\w+)\s*\)")
+_CROSSUNDER_RX = re.compile(r"crossunder\(\s*(\w+)\s*,\s*(\w+)\s*\)")
+_COMPARISON_RX = re.compile(r"(\w+)\s*(>|<|>=|<=|==)\s*(\w+)")
+_CROSS_OPS = ("CROSS_UP", "CROSS_DOWN")
+
+
+@dataclass(frozen=True)
+class CompiledLogic:
+    """
+    Entry/exit logic parsed once per template.
+
+    crossover()/crossunder() calls are replaced by placeholder names that are
+    bound to the crossing state of the last two rows at evaluation time, so the
+    expression compiles to a single code object.
+    """
+
+    logic: str
+    code: Any
+    error: Optional[Exception]
+    crosses: tuple  # (placeholder, op, left, right)
+    comparisons: tuple  # (left, op, right)
+
+    def evaluate(self, df: pd.DataFrame, last_row: pd.Series) -> Any:
+        if self.error is not None:
+            raise self.error
+        context = last_row.to_dict()
+        prev_row = df.iloc[-2] if len(df) >= 2 else None
+        for placeholder, op, left, right in self.crosses:
+            context[placeholder] = _crossed(prev_row, last_row, op, left, right)
+        return eval(self.code, {}, context)
+
+
+@lru_cache(maxsize=512)
+def compile_logic(logic: str) -> CompiledLogic:
+    """Parse and compile a logic string (cached: templates are shared by many favorites)."""
+    crosses = []
+
+    def _placeholder(op):
+        def _replace(match):
+            name = f"__cross_{len(crosses)}"
+            crosses.append((name, op, match.group(1), match.group(2)))
+            return name
+
+        return _replace
+
+    processed = _CROSSOVER_RX.sub(_placeholder("CROSS_UP"), logic)
+    processed = _CROSSUNDER_RX.sub(_placeholder("CROSS_DOWN"), processed)
+    code, error = None, None
+    try:
+        code = compile(processed, "<string>", "eval")
+    except Exception as exc:  # surfaced as "Logic Eval Error" on evaluation, as eval() did
+        error = exc
+
+    comparisons = tuple(_extract_comparisons(logic))
+    if "crossover" in logic.lower():
+        logger.info(
+            f"ProximityAnalyzer - Extracted {len(comparisons)} conditions from entry_logic: {logic}"
+        )
+        for i, cond in enumerate(comparisons):
+            logger.info(f"  Condition {i+1}: {cond}")
+    return CompiledLogic(
+        logic=logic,
+        code=code,
+        error=error,
+        crosses=tuple(crosses),
+        comparisons=comparisons,
+    )
+
+
+def _crossed(prev_row, curr_row, op: str, left: str, right: str) -> bool:
+    if prev_row is None:
+        return False
+    try:
+        if left not in curr_row or right not in curr_row:
+            return False
+        if op == "CROSS_UP":
+            # Crossover: Prev A <= Prev B  AND  Curr A > Curr B
+            return bool((prev_row[left] <= prev_row[right]) and (curr_row[left] > curr_row[right]))
+        # Crossunder: Prev A >= Prev B  AND  Curr A < Curr B
+        return bool((prev_row[left] >= prev_row[right]) and (curr_row[left] < curr_row[right]))
+    except:
+        return False
+
+
+def _condition_values(conditions: tuple, df: pd.DataFrame, last_row: pd.Series) -> Optional[list]:
+    """(left, right, prev_left, prev_right) per condition, or None when any operand
+    is missing, non-numeric or not finite (left to the scalar path's fallbacks)."""
+    prev_row = df.iloc[-2] if len(df) >= 2 else None
+    row_values = []
+    for left, op, right in conditions:
+        try:
+            val_left = float(last_row[left]) if left in last_row else float(left)
+            val_right = float(last_row[right]) if right in last_row else float(right)
+            prev_left = prev_right = float("nan")
+            if op in _CROSS_OPS and prev_row is not None:
+                prev_left = float(prev_row[left]) if left in prev_row else float(left)
+                prev_right = float(prev_row[right]) if right in prev_row else float(right)
+                if not np.isfinite([prev_left, prev_right]).all():
+                    return None
+        except Exception:
+            return None
+        if not np.isfinite([val_left, val_right]).all():
+            return None
+        row_values.append((val_left, val_right, prev_left, prev_right))
+    return row_values
+
+
+def _extract_comparisons(logic: str) -> List[tuple]:
+    results = []
+
+    # 1. Capture crossover(A, B) -> CROSS_UP
+    for match in _CROSSOVER_RX.finditer(logic):
+        results.append((match.group(1), "CROSS_UP", match.group(2)))
+
+    # 1b. Capture crossunder(A, B) -> CROSS_DOWN
+    for match in _CROSSUNDER_RX.finditer(logic):
+        results.append((match.group(1), "CROSS_DOWN", match.group(2)))
+
+    # 2. Standard Comparisons
+    clean_logic = logic.replace("(", "").replace(")", "")
+    parts = re.split(r"\s+(?:AND|OR|&|\|)\s+", clean_logic, flags=re.IGNORECASE)
+
+    for p in parts:
+        match = _COMPARISON_RX.search(p.strip())
+        if match:
+            results.append(match.groups())
+
+    return results
+
 
 class ProximityAnalyzer:
     """
@@ -41,66 +175,15 @@ class ProximityAnalyzer:
                 "details": "No Data",
             }
 
-        # Pre-process 'crossover(a, b)' function calls
-        crossover_rx = re.compile(r"crossover\(\s*(\w+)\s*,\s*(\w+)\s*\)")
-        crossunder_rx = re.compile(r"crossunder\(\s*(\w+)\s*,\s*(\w+)\s*\)")
-
-        def replace_crossover(match):
-            v1, v2 = match.groups()
-            if len(df) < 2:
-                return "False"
-            try:
-                curr, prev = df.iloc[-1], df.iloc[-2]
-                if v1 not in curr or v2 not in curr:
-                    return "False"
-                crossed = (prev[v1] <= prev[v2]) and (curr[v1] > curr[v2])
-                return str(crossed)
-            except:
-                return "False"
-
-        def replace_crossunder(match):
-            v1, v2 = match.groups()
-            if len(df) < 2:
-                return "False"
-            try:
-                curr, prev = df.iloc[-1], df.iloc[-2]
-                if v1 not in curr or v2 not in curr:
-                    return "False"
-                # Crossunder: Prev A >= Prev B  AND  Curr A < Curr B
-                crossed = (prev[v1] >= prev[v2]) and (curr[v1] < curr[v2])
-                return str(crossed)
-            except:
-                return "False"
-
-        # Apply replacements
-        processed_logic = crossover_rx.sub(replace_crossover, entry_logic)
-        processed_logic = crossunder_rx.sub(replace_crossunder, processed_logic)
+        compiled = compile_logic(entry_logic)
 
         # Get latest row
         last_row = df.iloc[-1]
 
         # 1. Check if SIGNAL is Active NOW
-        # We wrap the logic in try/except because eval can fail
-        try:
-            # Evaluate logic on the Series (row) - requires variables in local scope
-            # We convert row to dict for eval context
-            context = last_row.to_dict()
-            is_signal = eval(processed_logic, {}, context)
-
-            if is_signal:
-                return {
-                    "status": "SIGNAL",
-                    "badge": "success",
-                    "message": "Signal Active",
-                    "distance": 0.0,
-                }
-        except Exception as e:
-            return {
-                "status": "ERROR",
-                "badge": "error",
-                "message": f"Logic Eval Error: {str(e)}",
-                "distance": 0.0,
-            }
+        signal = self._signal_result(compiled, df, last_row)
+        if signal is not None:
+            return signal
 
         # 2. Check Proximity (Heuristic Parsing)
         # We look for Simple Comparisons: A > B or A < B
@@ -108,18 +191,7 @@ class ProximityAnalyzer:
         # We ignore complex AND/OR for proximity for now, focusing on the first failed condition?
         # A simple approach: Parse all comparisons, find the 'closest' one that is FALSE.
 
-        conditions = self._extract_comparisons(entry_logic)
-
-        # Debug: Log all extracted conditions for entry_logic with crossovers
-        if "crossover" in entry_logic.lower():
-            import logging
-
-            debug_logger = logging.getLogger(__name__)
-            debug_logger.info(
-                f"ProximityAnalyzer - Extracted {len(conditions)} conditions from entry_logic: {entry_logic}"
-            )
-            for i, cond in enumerate(conditions):
-                debug_logger.info(f"  Condition {i+1}: {cond}")
+        conditions = compiled.comparisons
 
         min_distance = float("inf")
         nearest_condition = None
@@ -170,10 +242,7 @@ class ProximityAnalyzer:
 
                 # Debug logging for crossovers involving short (both long and medium)
                 if "short" in str(left).lower() and (op == "CROSS_UP" or op == "CROSS_DOWN"):
-                    import logging
-
-                    debug_logger = logging.getLogger(__name__)
-                    debug_logger.info(
+                    logger.info(
                         f"ProximityAnalyzer - Condition: {left} {op} {right}, values: {val_left:.4f} vs {val_right:.4f}, is_met={is_met}"
                     )
 
@@ -184,10 +253,7 @@ class ProximityAnalyzer:
                         # Left must rise to cross right. Distance = (right - left) / min = (high - low) / low
                         if val_left >= val_right:
                             if "short" in str(left).lower():
-                                import logging
-
-                                debug_logger = logging.getLogger(__name__)
-                                debug_logger.info(
+                                logger.info(
                                     f"ProximityAnalyzer - Skipping {left} {op} {right} (already above: {val_left:.4f} >= {val_right:.4f}), continuing to check other conditions"
                                 )
                             continue
@@ -214,19 +280,7 @@ class ProximityAnalyzer:
 
                     if dist < min_distance:
                         min_distance = dist
-                        # Format message based on OP
-                        if op == "CROSS_UP":
-                            nearest_condition = (
-                                f"{left}: {val_left:.4f} crossing UP {right}: {val_right:.4f}"
-                            )
-                        elif op == "CROSS_DOWN":
-                            nearest_condition = (
-                                f"{left}: {val_left:.4f} crossing DOWN {right}: {val_right:.4f}"
-                            )
-                        else:
-                            nearest_condition = (
-                                f"{left}: {val_left:.4f} {op} {right}: {val_right:.4f}"
-                            )
+                        nearest_condition = self._condition_text(cond, val_left, val_right)
                     # Prefer distance involving "long" for display (matches TradingView short-long gap)
                     if right == "long":
                         distance_involving_long = dist
@@ -234,6 +288,117 @@ class ProximityAnalyzer:
             except Exception:
                 continue  # Skip unparseable (e.g. strict boolean columns)
 
+        return self._proximity_result(min_distance, nearest_condition, distance_involving_long)
+
+    def analyze_many(
+        self, compiled: CompiledLogic, last_rows: List[pd.DataFrame]
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze the latest candle of several DataFrames sharing one compiled logic.
+
+        Each entry of ``last_rows`` holds the last candles of one frame (the last
+        two are all ``analyze`` reads). Equivalent to
+        ``[self.analyze(df, compiled.logic) for df in last_rows]``: the distances
+        of every frame whose operands are plain finite numbers are computed as
+        arrays, one column per frame. Frames with missing/NaN operands go through
+        ``analyze`` for its exact fallbacks.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(last_rows)
+        batch: List[int] = []
+        values: List[List[tuple]] = []
+        for idx, df in enumerate(last_rows):
+            if df.empty:
+                results[idx] = self.analyze(df, compiled.logic)
+                continue
+            last_row = df.iloc[-1]
+            signal = self._signal_result(compiled, df, last_row)
+            if signal is not None:
+                results[idx] = signal
+                continue
+            row_values = _condition_values(compiled.comparisons, df, last_row)
+            if row_values is None:
+                results[idx] = self.analyze(df, compiled.logic)
+                continue
+            batch.append(idx)
+            values.append(row_values)
+
+        if batch:
+            for idx, result in zip(batch, self._batch_distances(compiled.comparisons, values)):
+                results[idx] = result
+        return results
+
+    def _batch_distances(
+        self, conditions: tuple, values: List[List[tuple]]
+    ) -> List[Dict[str, Any]]:
+        """Vectorized step 2/3 of ``analyze`` over rows of (left, right, prev_left, prev_right)."""
+        rows = len(values)
+        if not conditions:
+            return [self._proximity_result(float("inf"), None, None) for _ in range(rows)]
+
+        # Shape (conditions, rows, 4); prev values are NaN when the frame has one candle.
+        data = np.asarray(values, dtype=float).transpose(1, 0, 2)
+        left, right, prev_left, prev_right = (data[:, :, i] for i in range(4))
+        distances = np.full((len(conditions), rows), np.inf)
+        considered = np.zeros((len(conditions), rows), dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k, (_, op, _) in enumerate(conditions):
+                l, r = left[k], right[k]
+                denom = np.minimum(l, r)
+                if op == "CROSS_UP":
+                    met = (prev_left[k] <= prev_right[k]) & (l > r)
+                    # Already above: nothing to approach for this condition.
+                    usable = ~met & (l < r) & (denom > 0)
+                    dist = (r - l) / denom
+                elif op == "CROSS_DOWN":
+                    met = (prev_left[k] >= prev_right[k]) & (l < r)
+                    usable = ~met
+                    dist = np.where((l <= r) | (denom <= 0), 0.0, (l - r) / denom)
+                else:
+                    met = self._check_condition(l, op, r)
+                    if met is False:
+                        met = np.zeros(rows, dtype=bool)
+                    usable = ~met
+                    dist = np.where(r == 0, 0.0, np.abs(l - r) / np.abs(r))
+                distances[k] = np.where(usable, dist, np.inf)
+                considered[k] = usable
+
+        nearest = distances.argmin(axis=0)
+        min_distance = distances[nearest, np.arange(rows)]
+        long_distance = np.full(rows, np.nan)
+        has_long = np.zeros(rows, dtype=bool)
+        for k, (_, _, right_name) in enumerate(conditions):
+            if right_name == "long":
+                long_distance = np.where(considered[k], distances[k], long_distance)
+                has_long |= considered[k]
+
+        results = []
+        for row in range(rows):
+            best = float(min_distance[row])
+            condition = None
+            if best != float("inf"):
+                k = int(nearest[row])
+                condition = self._condition_text(
+                    conditions[k], float(left[k, row]), float(right[k, row])
+                )
+            display = float(long_distance[row]) if has_long[row] else None
+            results.append(self._proximity_result(best, condition, display))
+        return results
+
+    @staticmethod
+    def _condition_text(condition: tuple, val_left: float, val_right: float) -> str:
+        left, op, right = condition
+        if op == "CROSS_UP":
+            return f"{left}: {val_left:.4f} crossing UP {right}: {val_right:.4f}"
+        if op == "CROSS_DOWN":
+            return f"{left}: {val_left:.4f} crossing DOWN {right}: {val_right:.4f}"
+        return f"{left}: {val_left:.4f} {op} {right}: {val_right:.4f}"
+
+    def _proximity_result(
+        self,
+        min_distance: float,
+        nearest_condition: Optional[str],
+        distance_involving_long: Optional[float],
+    ) -> Dict[str, Any]:
         # 3. Determine Status and displayed distance
         # Use distance involving "long" when present so % matches TradingView (short-long gap)
         display_distance = (
@@ -264,29 +429,31 @@ class ProximityAnalyzer:
         Returns list of (left, operator, right).
         Also handles "crossover(A, B)" by mapping to special operator 'CROSS_UP'.
         """
-        results = []
-
-        # 1. Capture crossover(A, B) -> CROSS_UP
-        co_rx = re.compile(r"crossover\(\s*(\w+)\s*,\s*(\w+)\s*\)")
-        for match in co_rx.finditer(logic):
-            results.append((match.group(1), "CROSS_UP", match.group(2)))
+        return list(compile_logic(logic).comparisons)
 
-        # 1b. Capture crossunder(A, B) -> CROSS_DOWN
-        cu_rx = re.compile(r"crossunder\(\s*(\w+)\s*,\s*(\w+)\s*\)")
-        for match in cu_rx.finditer(logic):
-            results.append((match.group(1), "CROSS_DOWN", match.group(2)))
-
-        # 2. Standard Comparisons
-        clean_logic = logic.replace("(", "").replace(")", "")
-        parts = re.split(r"\s+(?:AND|OR|&|\|)\s+", clean_logic, flags=re.IGNORECASE)
-        rx = re.compile(r"(\w+)\s*(>|<|>=|<=|==)\s*(\w+)")
-
-        for p in parts:
-            match = rx.search(p.strip())
-            if match:
-                results.append(match.groups())
-
-        return results
+    @staticmethod
+    def _signal_result(
+        compiled: CompiledLogic, df: pd.DataFrame, last_row: pd.Series
+    ) -> Optional[Dict[str, Any]]:
+        """SIGNAL/ERROR result when the logic is True (or fails) on the last row, else None."""
+        # We wrap the logic in try/except because eval can fail
+        try:
+            is_signal = compiled.evaluate(df, last_row)
+            if is_signal:
+                return {
+                    "status": "SIGNAL",
+                    "badge": "success",
+                    "message": "Signal Active",
+                    "distance": 0.0,
+                }
+        except Exception as e:
+            return {
+                "status": "ERROR",
+                "badge": "error",
+                "message": f"Logic Eval Error: {str(e)}",
+                "distance": 0.0,
+            }
+        return None
 
     def _check_condition(self, val_left, op, val_right):
         if op == ">":
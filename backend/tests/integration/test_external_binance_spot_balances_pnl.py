@@ -23,7 +23,7 @@ def test_balances_snapshot_includes_avg_cost_and_pnl(monkeypatch):
 
     # Import modules fresh so env vars are picked up.
     binance_spot = importlib.import_module("app.services.binance_spot")
-    binance_trades = importlib.import_module("app.services.binance_trades")
+    binance_trade_history = importlib.import_module("app.services.binance_trade_history")
 
     def fake_signed_get(base_url, api_key, api_secret, path, params, *, timeout_s: int):
         assert path == "/api/v3/account"
@@ -40,27 +40,25 @@ def test_balances_snapshot_includes_avg_cost_and_pnl(monkeypatch):
     def fake_compute_usdt_price(asset, symbol_prices):
         return 2.5
 
-    def fake_fetch_my_trades(
-        symbol: str,
-        *,
-        limit: int = 1000,
-        lookback_days=None,
-        api_key=None,
-        api_secret=None,
-        base_url=None,
-    ):
+    def fake_fetch_page(symbol: str, from_id):
         assert symbol in {"ABCUSDT", "ABCUSDC"}
-        assert limit
+        assert from_id is None
         if symbol == "ABCUSDT":
             return [
-                {"isBuyer": True, "qty": "2", "price": "2"},
+                {"id": 1, "isBuyer": True, "qty": "2", "price": "2"},
             ]
         return []
 
+    def fake_history_store(**kwargs):
+        store = binance_trade_history.TradeHistoryStore(fetch_page=fake_fetch_page, **kwargs)
+        store._redis = None
+        return store
+
     monkeypatch.setattr(binance_spot, "_signed_get", fake_signed_get)
     monkeypatch.setattr(binance_spot, "fetch_all_binance_prices", fake_fetch_all_prices)
     monkeypatch.setattr(binance_spot, "compute_usdt_price_for_asset", fake_compute_usdt_price)
-    monkeypatch.setattr(binance_trades, "fetch_my_trades", fake_fetch_my_trades)
+    monkeypatch.setattr(binance_trade_history, "_MEMORY_HISTORY", {})
+    monkeypatch.setattr(binance_spot, "get_trade_history_store", fake_history_store)
 
     out = binance_spot.fetch_spot_balances_snapshot()
     assert "balances" in out
@@ -1600,14 +1600,14 @@ def test_revalidate_favorite_updates_metrics_without_touching_parameters(
     from app.services import walk_forward_revalidation as wfr
 
     class FakeOptimizer:
-        def run_optimization(self, **_kwargs):
+        def load_walk_forward_data(self, *_args, **_kwargs):
+            return object()
+
+        def evaluate_fixed_parameters(self, *_args, **_kwargs):
             return {
                 "best_metrics": {"total_return_pct": 9.0, "total_trades": 20},
                 "oos_metrics": {"total_trades": 5, "sharpe_ratio": 0.9},
                 "oos_verdict": {"status": "NO-GO", "reasons": ["Poucos trades"]},
-                "trades": [],
-                "candles": [],
-                "indicator_data": {},
                 "execution_mode": "fast_1d",
             }
 
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import pytest
 
-from app.services import onchain_service
+from app.services import binance_market_universe, onchain_service
+from app.services.binance_market_universe import MarketUniverse
 
 
 class _FakeResponse:
@@ -49,91 +50,94 @@ async def test_defillama_tvl_matches_chain_by_name(monkeypatch):
 @pytest.mark.asyncio
 async def test_fetch_binance_ranked_pairs_filters_and_sorts(monkeypatch):
     onchain_service._cache.clear()
+    payload_by_path = {
+        "exchangeInfo": {
+            "symbols": [
+                {
+                    "symbol": "ETHUSDT",
+                    "baseAsset": "ETH",
+                    "quoteAsset": "USDT",
+                    "status": "TRADING",
+                    "isSpotTradingAllowed": True,
+                },
+                {
+                    "symbol": "SOLUSDT",
+                    "baseAsset": "SOL",
+                    "quoteAsset": "USDT",
+                    "status": "TRADING",
+                    "isSpotTradingAllowed": True,
+                },
+                {
+                    "symbol": "XRPUSDT",
+                    "baseAsset": "XRP",
+                    "quoteAsset": "USDT",
+                    "status": "TRADING",
+                    "isSpotTradingAllowed": True,
+                },
+                {
+                    "symbol": "ADAUSDT",
+                    "baseAsset": "ADA",
+                    "quoteAsset": "USDT",
+                    "status": "TRADING",
+                    "isSpotTradingAllowed": True,
+                },
+                {
+                    "symbol": "DOTUSDT",
+                    "baseAsset": "DOT",
+                    "quoteAsset": "USDT",
+                    "status": "TRADING",
+                    "isSpotTradingAllowed": True,
+                },
+                {
+                    "symbol": "USDCUSDT",
+                    "baseAsset": "USDC",
+                    "quoteAsset": "USDT",
+                    "status": "TRADING",
+                    "isSpotTradingAllowed": True,
+                },
+                {
+                    "symbol": "FOOUSDT",
+                    "baseAsset": "FOO",
+                    "quoteAsset": "USDT",
+                    "status": "TRADING",
+                    "isSpotTradingAllowed": True,
+                },
+            ]
+        },
+        "ticker/24hr": [
+            {"symbol": "SOLUSDT", "quoteVolume": "1200", "count": "50", "lastPrice": "150"},
+            {"symbol": "XRPUSDT", "quoteVolume": "1800", "count": "65", "lastPrice": "0.6"},
+            {
+                "symbol": "ADAUSDT",
+                "quoteVolume": "1700",
+                "count": "55",
+                "lastPrice": "0.45",
+            },
+            {"symbol": "DOTUSDT", "quoteVolume": "1600", "count": "45", "lastPrice": "8.1"},
+            {
+                "symbol": "ETHUSDT",
+                "quoteVolume": "2500",
+                "count": "75",
+                "lastPrice": "3200",
+            },
+            {"symbol": "FOOUSDT", "quoteVolume": "2400", "count": "70", "lastPrice": "1.2"},
+            {
+                "symbol": "USDCUSDT",
+                "quoteVolume": "999999",
+                "count": "99",
+                "lastPrice": "1",
+            },
+        ],
+    }
     monkeypatch.setattr(
         onchain_service,
-        "_get_onchain_client",
-        lambda: _FakeClient(
-            {
-                "https://api.binance.com/api/v3/exchangeInfo": {
-                    "symbols": [
-                        {
-                            "symbol": "ETHUSDT",
-                            "baseAsset": "ETH",
-                            "quoteAsset": "USDT",
-                            "status": "TRADING",
-                            "isSpotTradingAllowed": True,
-                        },
-                        {
-                            "symbol": "SOLUSDT",
-                            "baseAsset": "SOL",
-                            "quoteAsset": "USDT",
-                            "status": "TRADING",
-                            "isSpotTradingAllowed": True,
-                        },
-                        {
-                            "symbol": "XRPUSDT",
-                            "baseAsset": "XRP",
-                            "quoteAsset": "USDT",
-                            "status": "TRADING",
-                            "isSpotTradingAllowed": True,
-                        },
-                        {
-                            "symbol": "ADAUSDT",
-                            "baseAsset": "ADA",
-                            "quoteAsset": "USDT",
-                            "status": "TRADING",
-                            "isSpotTradingAllowed": True,
-                        },
-                        {
-                            "symbol": "DOTUSDT",
-                            "baseAsset": "DOT",
-                            "quoteAsset": "USDT",
-                            "status": "TRADING",
-                            "isSpotTradingAllowed": True,
-                        },
-                        {
-                            "symbol": "USDCUSDT",
-                            "baseAsset": "USDC",
-                            "quoteAsset": "USDT",
-                            "status": "TRADING",
-                            "isSpotTradingAllowed": True,
-                        },
-                        {
-                            "symbol": "FOOUSDT",
-                            "baseAsset": "FOO",
-                            "quoteAsset": "USDT",
-                            "status": "TRADING",
-                            "isSpotTradingAllowed": True,
-                        },
-                    ]
-                },
-                "https://api.binance.com/api/v3/ticker/24hr": [
-                    {"symbol": "SOLUSDT", "quoteVolume": "1200", "count": "50", "lastPrice": "150"},
-                    {"symbol": "XRPUSDT", "quoteVolume": "1800", "count": "65", "lastPrice": "0.6"},
-                    {
-                        "symbol": "ADAUSDT",
-                        "quoteVolume": "1700",
-                        "count": "55",
-                        "lastPrice": "0.45",
-                    },
-                    {"symbol": "DOTUSDT", "quoteVolume": "1600", "count": "45", "lastPrice": "8.1"},
-                    {
-                        "symbol": "ETHUSDT",
-                        "quoteVolume": "2500",
-                        "count": "75",
-                        "lastPrice": "3200",
-                    },
-                    {"symbol": "FOOUSDT", "quoteVolume": "2400", "count": "70", "lastPrice": "1.2"},
-                    {
-                        "symbol": "USDCUSDT",
-                        "quoteVolume": "999999",
-                        "count": "99",
-                        "lastPrice": "1",
-                    },
-                ],
-            }
+        "get_market_universe",
+        lambda: MarketUniverse(
+            fetch_exchange_info=lambda: payload_by_path["exchangeInfo"],
+            fetch_tickers=lambda: payload_by_path["ticker/24hr"],
         ),
     )
+    monkeypatch.setattr(binance_market_universe, "get_redis_client", lambda: None)
 
     pairs = await onchain_service._fetch_binance_ranked_pairs(limit=10)
 
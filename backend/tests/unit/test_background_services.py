@@ -103,6 +103,10 @@ def test_job_manager_state_listing_and_result_persistence(monkeypatch, isolated_
     assert persisted["pagination"] == {"page": 1, "limit": 2, "total": 3, "pages": 2}
     assert persisted["results"][0]["params"] == {"fast": 10}
     assert persisted["results"][1]["metrics"] == {"pnl": 3.5}
+    assert [
+        (index, result["params"])
+        for index, result in manager.iter_indexed_results(job_id, below=2, page_size=1)
+    ] == [(0, {"fast": 10}), (1, {"fast": 11})]
 
     legacy_state = manager.load_state(job_id)
     legacy_state["results"] = [
@@ -159,45 +163,101 @@ class _FakeSignalDB:
         self.close_calls += 1
 
 
-@pytest.mark.asyncio
-async def test_signal_monitor_fetch_price_handles_success_rate_limit_and_errors(monkeypatch):
+def test_signal_monitor_prices_come_from_snapshot_then_one_bulk_request(monkeypatch):
     class FakeResponse:
-        def __init__(self, status_code, payload=None, error=None):
-            self.status_code = status_code
-            self._payload = payload or {}
-            self._error = error
+        def __init__(self, payload):
+            self._payload = payload
 
         def raise_for_status(self):
-            if self._error is not None:
-                raise self._error
+            return None
 
         def json(self):
             return self._payload
 
-    responses = [
-        FakeResponse(200, {"price": "123.45"}),
-        FakeResponse(429, {"price": "0"}),
-        FakeResponse(500, error=httpx.HTTPStatusError("boom", request=None, response=None)),
-    ]
-
-    class FakeAsyncClient:
-        def __init__(self, timeout=None):
-            self.timeout = timeout
+    requests: list[dict] = []
 
-        async def __aenter__(self):
-            return self
+    class FakeGateway:
+        def request(self, method, url, *, params=None, timeout_s=None):
+            requests.append(params)
+            return FakeResponse(
+                [
+                    {"symbol": "ETHUSDT", "price": "2000.5"},
+                    {"symbol": "SOLUSDT", "price": "bad"},
+                ]
+            )
 
-        async def __aexit__(self, exc_type, exc, tb):
-            return False
+    monkeypatch.setattr(
+        signal_monitor_service,
+        "read_external_snapshot",
+        lambda symbols: {"prices": [{"symbol": "BTCUSDT", "price": 123.45}]},
+    )
+    monkeypatch.setattr(signal_monitor_service, "get_gateway", lambda: FakeGateway())
+    monkeypatch.setattr(
+        signal_monitor_service,
+        "get_market_universe",
+        lambda: SimpleNamespace(trading_symbols=lambda: {"BTCUSDT", "ETHUSDT", "SOLUSDT"}),
+    )
 
-        async def get(self, url, params=None):
-            return responses.pop(0)
+    prices = signal_monitor_service._fetch_prices(["BTCUSDT", "ETHUSDT", "SOLUSDT"])
+
+    assert prices == {"BTCUSDT": 123.45, "ETHUSDT": 2000.5}
+    assert requests == [{"symbols": '["ETHUSDT","SOLUSDT"]'}]
+
+    class FailingGateway:
+        def request(self, *args, **kwargs):
+            raise httpx.ConnectError("down")
+
+    monkeypatch.setattr(signal_monitor_service, "read_external_snapshot", lambda symbols: None)
+    monkeypatch.setattr(signal_monitor_service, "get_gateway", lambda: FailingGateway())
+    assert signal_monitor_service._fetch_prices(["BTCUSDT"]) == {}
+
+
+def test_signal_monitor_bulk_prices_survive_an_invalid_symbol(monkeypatch):
+    url = "https://api.binance.test/api/v3/ticker/price"
+    requests: list[dict] = []
+
+    class FakeGateway:
+        def request(self, method, request_url, *, params=None, timeout_s=None):
+            requests.append(params)
+            symbols = json.loads(params["symbols"]) if "symbols" in params else [params["symbol"]]
+            if "DEADUSDT" in symbols:
+                return httpx.Response(
+                    400,
+                    json={"code": -1121, "msg": "Invalid symbol."},
+                    request=httpx.Request("GET", url),
+                )
+            return httpx.Response(
+                200,
+                json=[{"symbol": symbol, "price": "1.5"} for symbol in symbols],
+                request=httpx.Request("GET", url),
+            )
+
+    monkeypatch.setattr(signal_monitor_service, "get_gateway", lambda: FakeGateway())
+    monkeypatch.setattr(
+        signal_monitor_service,
+        "get_market_universe",
+        lambda: SimpleNamespace(trading_symbols=lambda: {"BTCUSDT", "ETHUSDT"}),
+    )
 
-    monkeypatch.setattr(signal_monitor_service.httpx, "AsyncClient", FakeAsyncClient)
+    # Symbols missing from the exchange index never reach the bulk request.
+    assert signal_monitor_service._fetch_bulk_prices(["BTCUSDT", "GONEUSDT", "ETHUSDT"]) == {
+        "BTCUSDT": 1.5,
+        "ETHUSDT": 1.5,
+    }
+    assert requests == [{"symbols": '["BTCUSDT","ETHUSDT"]'}]
 
-    assert await signal_monitor_service._fetch_price("BTCUSDT") == 123.45
-    assert await signal_monitor_service._fetch_price("BTCUSDT") is None
-    assert await signal_monitor_service._fetch_price("BTCUSDT") is None
+    # A stale index lets one through: the rejected chunk is retried symbol by symbol.
+    requests.clear()
+    monkeypatch.setattr(
+        signal_monitor_service,
+        "get_market_universe",
+        lambda: SimpleNamespace(trading_symbols=lambda: {"BTCUSDT", "DEADUSDT", "ETHUSDT"}),
+    )
+    assert signal_monitor_service._fetch_bulk_prices(["BTCUSDT", "DEADUSDT", "ETHUSDT"]) == {
+        "BTCUSDT": 1.5,
+        "ETHUSDT": 1.5,
+    }
+    assert requests[1:] == [{"symbol": "BTCUSDT"}, {"symbol": "DEADUSDT"}, {"symbol": "ETHUSDT"}]
 
 
 def test_signal_monitor_updates_signals_and_handles_failures(monkeypatch):
@@ -239,14 +299,18 @@ def test_signal_monitor_updates_signals_and_handles_failures(monkeypatch):
     ]
     db = _FakeSignalDB(signals)
 
-    async def fake_fetch_price(asset):
-        return {"BTCUSDT": 112.0, "ETHUSDT": 175.0, "SOLUSDT": None}[asset]
+    fetched: list[list[str]] = []
+
+    def fake_fetch_prices(assets):
+        fetched.append(assets)
+        return {"BTCUSDT": 112.0, "ETHUSDT": 175.0}
 
     monkeypatch.setattr(signal_monitor_service, "SessionLocal", lambda: db)
-    monkeypatch.setattr(signal_monitor_service, "_fetch_price", fake_fetch_price)
+    monkeypatch.setattr(signal_monitor_service, "_fetch_prices", fake_fetch_prices)
     monkeypatch.setattr(signal_monitor_service, "sao_paulo_now", lambda: now_sp)
     signal_monitor_service._check_and_update_signals()
 
+    assert fetched == [["BTCUSDT", "ETHUSDT", "SOLUSDT"]]
     assert db.commit_calls == 1
     assert db.close_calls == 1
     assert signals[0].status == "disparado"
@@ -261,15 +325,10 @@ def test_signal_monitor_updates_signals_and_handles_failures(monkeypatch):
     failing_db = _FakeSignalDB(signals)
     monkeypatch.setattr(signal_monitor_service, "SessionLocal", lambda: failing_db)
 
-    def fail_asyncio_run(coro):
-        coro.close()
+    def fail_fetch_prices(assets):
         raise RuntimeError("network down")
 
-    monkeypatch.setattr(
-        signal_monitor_service.asyncio,
-        "run",
-        fail_asyncio_run,
-    )
+    monkeypatch.setattr(signal_monitor_service, "_fetch_prices", fail_fetch_prices)
     signal_monitor_service._check_and_update_signals()
     assert failing_db.commit_calls == 0
     assert failing_db.close_calls == 1
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import concurrent.futures
 import json
+import threading
+from concurrent.futures.process import BrokenProcessPool
 from types import SimpleNamespace
 
 import pytest
 from redis.exceptions import RedisError
 
 from app.routes import combo_routes
-from app.services import batch_backtest_queue
+from app.services import batch_backtest_queue, batch_backtest_service, combo_optimizer
 from app.services.batch_backtest_service import _metrics_with_source_trades
 from app.services.batch_backtest_store import BatchBacktestStore, get_batch_backtest_store
 from app.services.redis_store import get_redis_client
@@ -249,3 +252,223 @@ async def test_start_batch_backtest_returns_503_when_enqueue_fails(monkeypatch):
 
     assert response.status_code == 503
     assert response.json()["detail"] == "Batch queue is unavailable"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("multi_fold", [False, True])
+async def test_optimize_issues_promotion_proof_only_for_single_split(monkeypatch, multi_fold):
+    result = {
+        "job_id": "opt-1",
+        "template_name": "ema_rsi",
+        "symbol": "BTC/USDT",
+        "timeframe": "1d",
+        "stages": [],
+        "best_parameters": {"ema_fast": 9},
+        "best_metrics": {"sharpe_ratio": 1.0},
+        "oos_metrics": {"total_trades": 40},
+        "oos_verdict": {"status": "GO", "reasons": []},
+    }
+    if multi_fold:
+        result["walk_forward"] = {"mode": "rolling", "folds": [{"fold": 0}, {"fold": 1}]}
+
+    class _Optimizer:
+        def run_optimization(self, **_kwargs):
+            return dict(result)
+
+    monkeypatch.setattr(combo_routes, "ComboOptimizer", _Optimizer)
+    request = combo_routes.ComboOptimizationRequest(
+        template_name="ema_rsi", symbol="BTC/USDT", timeframe="1d", direction="long"
+    )
+
+    response = await combo_routes.optimize_combo_strategy(request, _admin_user_id="admin")
+
+    assert (response.oos_proof is None) is multi_fold
+    assert (response.promotion_metrics is None) is multi_fold
+
+
+class _FavoritesSession:
+    def __init__(self, rows, saved, queries):
+        self._rows = rows
+        self._saved = saved
+        self._queries = queries
+
+    def query(self, *columns):
+        self._queries.append(columns)
+        return self
+
+    def filter(self, *_criteria):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+    def add(self, favorite):
+        self._saved.append(favorite)
+
+    def commit(self):
+        return None
+
+    def refresh(self, favorite):
+        favorite.id = len(self._saved)
+
+    def close(self):
+        return None
+
+
+def test_run_batch_backtest_runs_symbols_as_a_panel(monkeypatch):
+    store = BatchBacktestStore()
+    store._redis = None
+    store.init_job("job-7", 5)
+    monkeypatch.setattr(batch_backtest_service, "get_batch_backtest_store", lambda: store)
+    monkeypatch.setenv("BATCH_BACKTEST_PANEL_SIZE", "2")
+
+    saved: list = []
+    queries: list = []
+    existing_rows = [("ETH/USDT", {"direction": "long"}), ("SOL/USDT", {"direction": "short"})]
+    monkeypatch.setattr(
+        batch_backtest_service,
+        "SessionLocal",
+        lambda: _FavoritesSession(existing_rows, saved, queries),
+    )
+    monkeypatch.setattr(
+        "app.services.favorite_uniqueness.lock_and_find_duplicate", lambda *_a, **_k: False
+    )
+    monkeypatch.setattr(batch_backtest_service, "_is_unsupported_symbol", lambda s: "LUNA" in s)
+    monkeypatch.setattr(
+        batch_backtest_service.concurrent.futures,
+        "ProcessPoolExecutor",
+        concurrent.futures.ThreadPoolExecutor,
+    )
+    monkeypatch.setattr(batch_backtest_service, "_init_worker_logging", lambda: None)
+
+    # BTC and XRP only get past the barrier while both are in flight.
+    both_running = threading.Barrier(2, timeout=5)
+    executors: list = []
+    cohorts: list = []
+    seeds: dict = {}
+
+    class _PanelOptimizer:
+        def evaluate_first_stage_panel(self, *, symbols, executor, **_kwargs):
+            cohorts.append(list(symbols))
+            executors.append(executor)
+            return {symbol: f"seed-{symbol}" for symbol in symbols if symbol != "SOL/USDT"}
+
+        def run_optimization(self, *, symbol, executor, panel_seed, **_kwargs):
+            executors.append(executor)
+            seeds[symbol] = panel_seed
+            if symbol == "SOL/USDT":
+                raise RuntimeError("no candles")
+            both_running.wait()
+            verdict = {"status": "GO" if symbol == "BTC/USDT" else "NO-GO", "reasons": ["dd"]}
+            return {
+                "best_parameters": {"ema": 9},
+                "best_metrics": {"total_trades": 3},
+                "trades": [],
+                "oos_verdict": verdict,
+                "oos_metrics": {"sharpe_ratio": 1.0},
+            }
+
+    monkeypatch.setattr(batch_backtest_service, "ComboOptimizer", _PanelOptimizer)
+
+    batch_backtest_service.run_batch_backtest(
+        "job-7",
+        {
+            "template_name": "ema_rsi",
+            "symbols": ["BTC/USDT", "ETH/USDT", "LUNA/USDT", "XRP/USDT", "SOL/USDT"],
+            "timeframe": "1d",
+            "user_id": "user-123",
+        },
+    )
+
+    job = store.get_job("job-7")
+    assert job["status"] == "completed"
+    assert (job["succeeded"], job["failed"], job["skipped"]) == (1, 1, 3)
+    assert job["errors"] == [{"symbol": "SOL/USDT", "error": "no candles"}]
+    assert [row["symbol"] for row in job["skipped_reasons"]] == ["XRP/USDT"]
+    assert [favorite.symbol for favorite in saved] == ["BTC/USDT"]
+    assert saved[0].parameters == {"ema": 9, "direction": "long", "data_source": "ccxt"}
+    assert saved[0].metrics["oos_verdict"]["status"] == "GO"
+    # One duplicate lookup for the whole batch; one process pool shared by every symbol.
+    assert len(queries) == 1
+    assert len(executors) == 5 and len(set(map(id, executors))) == 1
+    # The first stage runs once per cohort; symbols it could not load get no seed.
+    assert cohorts == [["BTC/USDT", "XRP/USDT"], ["SOL/USDT"]]
+    assert seeds == {"BTC/USDT": "seed-BTC/USDT", "XRP/USDT": "seed-XRP/USDT", "SOL/USDT": None}
+
+
+def test_worker_crash_rebuilds_the_pool_and_requeues_the_symbol(monkeypatch):
+    store = BatchBacktestStore()
+    store._redis = None
+    store.init_job("job-8", 2)
+    monkeypatch.setattr(batch_backtest_service, "get_batch_backtest_store", lambda: store)
+    monkeypatch.setenv("BATCH_BACKTEST_PANEL_SIZE", "1")
+    saved: list = []
+    monkeypatch.setattr(
+        batch_backtest_service, "SessionLocal", lambda: _FavoritesSession([], saved, [])
+    )
+    monkeypatch.setattr(
+        "app.services.favorite_uniqueness.lock_and_find_duplicate", lambda *_a, **_k: False
+    )
+    monkeypatch.setattr(batch_backtest_service, "_is_unsupported_symbol", lambda s: False)
+    pools: list = []
+
+    def _pool(**kwargs):
+        pool = concurrent.futures.ThreadPoolExecutor(**kwargs)
+        pools.append(pool)
+        return pool
+
+    monkeypatch.setattr(batch_backtest_service.concurrent.futures, "ProcessPoolExecutor", _pool)
+    monkeypatch.setattr(batch_backtest_service, "_init_worker_logging", lambda: None)
+    calls: list = []
+
+    class _CrashingOptimizer:
+        def evaluate_first_stage_panel(self, **_kwargs):
+            return {}
+
+        def run_optimization(self, *, symbol, executor, **_kwargs):
+            calls.append((symbol, pools.index(executor)))
+            # BTC kills a worker once; DOGE kills one every time.
+            if symbol == "DOGE/USDT" or len(calls) == 1:
+                raise BrokenProcessPool("a worker died")
+            return {"best_parameters": {"ema": 9}, "best_metrics": {}, "trades": []}
+
+    monkeypatch.setattr(batch_backtest_service, "ComboOptimizer", _CrashingOptimizer)
+
+    batch_backtest_service.run_batch_backtest(
+        "job-8",
+        {
+            "template_name": "ema_rsi",
+            "symbols": ["BTC/USDT", "DOGE/USDT"],
+            "timeframe": "1d",
+            "user_id": "user-123",
+        },
+    )
+
+    job = store.get_job("job-8")
+    assert job["status"] == "completed"
+    assert (job["succeeded"], job["failed"]) == (1, 1)
+    assert job["errors"] == [{"symbol": "DOGE/USDT", "error": "worker crash: a worker died"}]
+    # Each crash retires the pool; the crashed symbol reruns on the new one, once.
+    assert calls == [("BTC/USDT", 0), ("BTC/USDT", 1), ("DOGE/USDT", 1), ("DOGE/USDT", 2)]
+
+
+def test_worker_15m_cache_keeps_one_frame_per_symbol_of_overlapping_cohorts(monkeypatch):
+    loads: list = []
+
+    class _Loader:
+        def fetch_intraday_data(self, *, symbol, **_kwargs):
+            loads.append(symbol)
+            return SimpleNamespace(symbol=symbol)
+
+    monkeypatch.setattr(combo_optimizer, "IncrementalLoader", _Loader)
+    monkeypatch.setattr(combo_optimizer, "_WORKER_15M_CACHE", combo_optimizer.OrderedDict())
+    monkeypatch.setattr(combo_optimizer, "WORKER_15M_CACHE_SIZE", 4)
+    batch_backtest_service._init_panel_worker(2)
+
+    # A cohort's panel (SOL, XRP) interleaves with the previous cohort's refinement (BTC, ETH).
+    for symbol in ["BTC", "ETH", "SOL", "XRP"] * 3:
+        combo_optimizer._worker_get_15m_cache(symbol, "2024-01-01", "2024-06-01")
+    combo_optimizer._worker_get_15m_cache("ADA", "2024-01-01", "2024-06-01")
+    combo_optimizer._worker_get_15m_cache("BTC", "2024-01-01", "2024-06-01")
+
+    assert loads == ["BTC", "ETH", "SOL", "XRP", "ADA", "BTC"]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import urllib.parse
+
+import httpx
+import pytest
+
+import app.services.binance_http as binance_http
+from app.services.binance_http import BinanceGateway, WeightBudget, endpoint_weight
+
+
+def _gateway(handler, **kwargs) -> BinanceGateway:
+    return BinanceGateway(
+        transport=httpx.MockTransport(handler),
+        async_transport=httpx.MockTransport(handler),
+        http2=False,
+        **kwargs,
+    )
+
+
+def test_endpoint_weights_follow_binance_rules() -> None:
+    assert endpoint_weight("https://api.binance.com/api/v3/account") == 20
+    assert endpoint_weight("/api/v3/ticker/price") == 4
+    assert endpoint_weight("/api/v3/ticker/price", {"symbol": "BTCUSDT"}) == 2
+    assert endpoint_weight("/api/v3/myTrades", {"orderId": 1}) == 5
+    assert endpoint_weight("/sapi/v1/simple-earn/flexible/position") == 1
+
+
+def test_budget_waits_for_refill_and_tracks_reported_weight(monkeypatch) -> None:
+    now = [100.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(binance_http.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(binance_http.time, "sleep", fake_sleep)
+    budget = WeightBudget(weight_per_minute=100, safety_ratio=0.6)  # 60 tokens, 1/s
+
+    budget.take(40)
+    budget.take(20)
+    assert sleeps == []
+    budget.take(10)
+    assert sleeps == [pytest.approx(10.0)]
+
+    fresh = WeightBudget(weight_per_minute=100, safety_ratio=0.6)
+    fresh.observe(httpx.Headers({"X-MBX-USED-WEIGHT-1M": "55", "X-MBX-WEIGHT-1M": "100"}))
+    assert fresh.last_used_weight == 55
+    assert fresh.tokens == pytest.approx(5.0)
+
+
+def test_rate_limited_get_is_retried_after_pausing_all_callers(monkeypatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr(binance_http.time, "sleep", sleeps.append)
+    monotonic = iter(range(1000))
+    monkeypatch.setattr(binance_http.time, "monotonic", lambda: float(next(monotonic)))
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "3"}),
+        httpx.Response(200, json={"ok": True}, headers={"X-MBX-USED-WEIGHT-1M": "7"}),
+    ]
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.method)
+        return responses.pop(0)
+
+    gateway = _gateway(handler)
+    response = gateway.request("GET", "https://example.invalid/api/v3/klines")
+
+    assert response.json() == {"ok": True}
+    assert seen == ["GET", "GET"]
+    assert gateway.budget.last_used_weight == 7
+
+
+def test_rate_limited_order_submit_is_not_retried() -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        return httpx.Response(429, headers={"Retry-After": "1"})
+
+    gateway = _gateway(handler)
+    response = gateway.signed_request(
+        "POST",
+        "https://example.invalid/api/v3/order",
+        api_key="k",
+        api_secret="s",
+        params={"symbol": "BTCUSDT"},
+    )
+
+    assert response.status_code == 429
+    assert calls == ["POST"]
+
+
+def test_signed_request_signs_query_and_sends_api_key() -> None:
+    captured: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.append(request)
+        return httpx.Response(200, json=[])
+
+    _gateway(handler).signed_request(
+        "GET",
+        "https://example.invalid/api/v3/myTrades",
+        api_key="key",
+        api_secret="secret",
+        params={"symbol": "ETHUSDT", "fromId": 5},
+    )
+
+    request = captured[0]
+    query = urllib.parse.parse_qs(request.url.query.decode())
+    assert query["symbol"] == ["ETHUSDT"] and query["fromId"] == ["5"]
+    assert "timestamp" in query and "signature" in query
+    unsigned, signature = request.url.query.decode().split("&signature=")
+    expected = hmac.new(b"secret", unsigned.encode(), hashlib.sha256).hexdigest()
+    assert signature == expected
+    assert request.headers["X-MBX-APIKEY"] == "key"
+
+
+def test_async_requests_reuse_one_client_per_event_loop() -> None:
+    gateway = _gateway(lambda request: httpx.Response(200, json={"price": "1.5"}))
+
+    async def fetch_twice() -> tuple[float, bool]:
+        first = await gateway.arequest("GET", "https://example.invalid/api/v3/ticker/price")
+        client = gateway._loop_client()
+        await gateway.arequest("GET", "https://example.invalid/api/v3/ticker/price")
+        return float(first.json()["price"]), client is gateway._loop_client()
+
+    assert asyncio.run(fetch_twice()) == (1.5, True)
+    # A fresh loop gets its own client instead of reusing one bound to a closed loop.
+    assert asyncio.run(fetch_twice()) == (1.5, True)
+
+
+def test_rate_limit_pause_never_outlasts_the_callers_timeout(monkeypatch) -> None:
+    now = [0.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(binance_http.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(binance_http.time, "sleep", fake_sleep)
+    # No Retry-After header: a bounded default pause, not a one-minute stall.
+    gateway = _gateway(lambda request: httpx.Response(418))
+    assert gateway.request("GET", "https://example.invalid/api/v3/klines").status_code == 418
+
+    with pytest.raises(binance_http.BinanceRateLimitError) as raised:
+        gateway.request("GET", "https://example.invalid/api/v3/klines", timeout_s=2.0)
+    assert raised.value.retry_after == pytest.approx(binance_http.DEFAULT_RETRY_AFTER_SECONDS)
+    assert sleeps == []
+
+    gateway.budget.block_for(1.0)
+    with pytest.raises(binance_http.BinanceRateLimitError):
+        asyncio.run(gateway.budget.take_async(1, timeout_s=0.5))
+    assert binance_http._retry_after_seconds(
+        httpx.Response(429, headers={"Retry-After": "86400"})
+    ) == (binance_http.MAX_BLOCK_SECONDS)
+
+
+def test_async_clients_are_closed_with_their_event_loop() -> None:
+    gateway = _gateway(lambda request: httpx.Response(200, json={}))
+    clients: list[httpx.AsyncClient] = []
+
+    async def fetch() -> None:
+        await gateway.arequest("GET", "https://example.invalid/api/v3/ticker/price")
+        clients.append(gateway._loop_client())
+
+    asyncio.run(fetch())
+    assert clients[0].is_closed
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(fetch())
+        assert not clients[1].is_closed
+        gateway.close()
+        assert clients[1].is_closed
+    finally:
+        loop.close()
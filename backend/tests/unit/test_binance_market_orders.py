@@ -3,12 +3,11 @@ from __future__ import annotations
 from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from io import BytesIO
 import json
 from types import SimpleNamespace
-from urllib.error import HTTPError
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 from fastapi import HTTPException
 
@@ -17,7 +16,7 @@ from app.routes import monitor_spot_market
 from app.services import binance_market_orders as market
 from app.services import monitor_spot_market_orders as workflow
 from app.services.binance_spot_orders import BinanceOrderError
-from app.services import binance_spot_orders
+from app.services import binance_http, binance_spot_orders
 
 SYMBOL_INFO = {
     "symbol": "ETHUSDT",
@@ -455,18 +454,22 @@ def test_eligibility_rejects_usdc_strategy_pairs(public_get):
     assert "USDT" in (results[0]["reason"] or "")
 
 
-def test_public_exchange_info_error_preserves_invalid_symbol_code():
-    error = HTTPError(
-        "https://api.binance.com/api/v3/exchangeInfo",
-        400,
-        "error",
-        {},
-        BytesIO(b'{"code":-1121,"msg":"Invalid symbol."}'),
+def _install_gateway(monkeypatch, status_code: int, body: bytes) -> None:
+    monkeypatch.setattr(
+        binance_http,
+        "_GATEWAY",
+        binance_http.BinanceGateway(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(status_code, content=body)
+            ),
+            http2=False,
+        ),
     )
-    with (
-        patch("app.services.binance_spot_orders.urllib.request.urlopen", side_effect=error),
-        pytest.raises(BinanceOrderError) as raised,
-    ):
+
+
+def test_public_exchange_info_error_preserves_invalid_symbol_code(monkeypatch):
+    _install_gateway(monkeypatch, 400, b'{"code":-1121,"msg":"Invalid symbol."}')
+    with pytest.raises(BinanceOrderError) as raised:
         binance_spot_orders.public_get("/api/v3/exchangeInfo", {"symbol": "NONEUSDT"})
     assert raised.value.code == -1121
 
@@ -478,12 +481,9 @@ def test_public_exchange_info_error_preserves_invalid_symbol_code():
         (400, b'{"code":-1006,"msg":"Unexpected response"}'),
     ],
 )
-def test_submit_timeout_errors_are_classified_as_unknown_outcomes(status_code, body):
-    error = HTTPError("https://api.binance.com", status_code, "error", {}, BytesIO(body))
-    with (
-        patch("app.services.binance_spot_orders.urllib.request.urlopen", side_effect=error),
-        pytest.raises(BinanceOrderError) as raised,
-    ):
+def test_submit_timeout_errors_are_classified_as_unknown_outcomes(monkeypatch, status_code, body):
+    _install_gateway(monkeypatch, status_code, body)
+    with pytest.raises(BinanceOrderError) as raised:
         binance_spot_orders.signed_request(
             method="POST",
             path="/api/v3/order",
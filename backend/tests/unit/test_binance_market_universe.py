@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+from redis.exceptions import RedisError
+
+import app.services.binance_market_universe as universe_module
+from app.services import binance_http
+from app.services.binance_market_universe import (
+    UNIVERSE_META_KEY,
+    UNIVERSE_SYMBOLS_KEY,
+    MarketUniverse,
+)
+
+
+class _HashRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.hset_fields: list[list[str]] = []
+        self.hdel_fields: list[list[str]] = []
+        self.down = False
+
+    def get(self, key):
+        if self.down:
+            raise RedisError("connection refused")
+        return self.values.get(key)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.hashes.pop(key, None)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def hset(self, key, mapping):
+        self._ops.append(lambda: self._hset(key, mapping))
+
+    def hdel(self, key, *fields):
+        self._ops.append(lambda: self._hdel(key, fields))
+
+    def set(self, key, value):
+        self._ops.append(lambda: self._redis.values.__setitem__(key, value))
+
+    def _hset(self, key, mapping):
+        self._redis.hset_fields.append(sorted(mapping))
+        self._redis.hashes.setdefault(key, {}).update(mapping)
+
+    def _hdel(self, key, fields):
+        self._redis.hdel_fields.append(sorted(fields))
+        for field in fields:
+            self._redis.hashes.get(key, {}).pop(field, None)
+
+    def execute(self):
+        for op in self._ops:
+            op()
+
+
+def _symbol(name, base, quote="USDT", status="TRADING", spot=True):
+    return {
+        "symbol": name,
+        "baseAsset": base,
+        "quoteAsset": quote,
+        "status": status,
+        "isSpotTradingAllowed": spot,
+        "filters": [{"filterType": "LOT_SIZE"}],
+        "extra": "dropped",
+    }
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = _HashRedis()
+    monkeypatch.setattr(universe_module, "get_redis_client", lambda: client)
+    return client
+
+
+def _universe(listing, tickers=None, calls=None, **kwargs):
+    calls = calls if calls is not None else []
+
+    def _exchange_info():
+        calls.append("exchangeInfo")
+        return {"symbols": list(listing)}
+
+    def _tickers():
+        calls.append("ticker")
+        return list(tickers or [])
+
+    return MarketUniverse(fetch_exchange_info=_exchange_info, fetch_tickers=_tickers, **kwargs)
+
+
+def test_views_are_served_from_memory_until_the_listing_expires(redis):
+    calls = []
+    universe = _universe(
+        [
+            _symbol("ETHUSDT", "ETH"),
+            _symbol("BTCUSDT", "BTC"),
+            _symbol("BTCBUSD", "BTC", quote="BUSD"),
+            _symbol("LUNAUSDT", "LUNA", status="BREAK"),
+        ],
+        calls=calls,
+    )
+
+    assert [row["symbol"] for row in universe.spot_pairs("USDT")] == ["BTCUSDT", "ETHUSDT"]
+    assert universe.trading_symbols() == {"BTCUSDT", "ETHUSDT", "BTCBUSD"}
+    assert calls == ["exchangeInfo"]
+    shared_row = json.loads(redis.hgetall(UNIVERSE_SYMBOLS_KEY)["BTCUSDT"])
+    assert shared_row["filters"] == [{"filterType": "LOT_SIZE"}] and "extra" not in shared_row
+
+
+def test_refresh_writes_only_the_rows_that_changed(redis):
+    listing = [_symbol("BTCUSDT", "BTC"), _symbol("ETHUSDT", "ETH"), _symbol("XYZUSDT", "XYZ")]
+    # Expired on every call, as after BINANCE_EXCHANGE_INFO_TTL_SECONDS.
+    universe = _universe(listing, listing_ttl_seconds=0)
+    universe.trading_symbols()
+
+    listing[:] = [
+        _symbol("BTCUSDT", "BTC"),
+        _symbol("ETHUSDT", "ETH", status="HALT"),
+        _symbol("NEWUSDT", "NEW"),
+    ]
+    assert universe.trading_symbols() == {"BTCUSDT", "NEWUSDT"}
+
+    assert redis.hset_fields[-1] == ["ETHUSDT", "NEWUSDT"]
+    assert redis.hdel_fields == [["XYZUSDT"]]
+    assert universe.last_diff == {
+        "added": ["NEWUSDT"],
+        "removed": ["XYZUSDT"],
+        "changed": ["ETHUSDT"],
+    }
+    assert set(redis.hgetall(UNIVERSE_SYMBOLS_KEY)) == {"BTCUSDT", "ETHUSDT", "NEWUSDT"}
+
+
+def test_other_workers_load_the_shared_copy_instead_of_fetching(redis):
+    _universe([_symbol("BTCUSDT", "BTC")]).trading_symbols()
+    assert redis.get(UNIVERSE_META_KEY)
+
+    calls = []
+    assert _universe([], calls=calls).trading_symbols() == {"BTCUSDT"}
+    assert calls == []
+
+
+def test_volume_ranking_fetches_tickers_lazily_and_keeps_listing(redis):
+    calls = []
+    universe = _universe(
+        [_symbol("BTCUSDT", "BTC"), _symbol("ETHUSDT", "ETH"), _symbol("DOGEUSDT", "DOGE")],
+        tickers=[
+            {"symbol": "ETHUSDT", "quoteVolume": "500", "count": "5", "lastPrice": "3000"},
+            {"symbol": "BTCUSDT", "quoteVolume": "900", "count": "9", "lastPrice": "60000"},
+            {"symbol": "DOGEUSDT", "quoteVolume": "0", "count": "0", "lastPrice": "0.1"},
+            {"symbol": "GONEUSDT", "quoteVolume": "999", "count": "1", "lastPrice": "1"},
+        ],
+        calls=calls,
+    )
+    universe.spot_pairs()
+    assert calls == ["exchangeInfo"]
+
+    ranked = universe.ranked_by_volume()
+
+    assert [row["symbol"] for row in ranked] == ["BTCUSDT", "ETHUSDT"]
+    assert ranked[0]["lastPrice"] == 60000.0 and ranked[0]["count"] == 9
+    assert calls == ["exchangeInfo", "ticker"]
+
+
+def test_failed_refresh_keeps_serving_previous_rows(monkeypatch):
+    monkeypatch.setattr(universe_module, "get_redis_client", lambda: None)
+    responses = [{"symbols": [_symbol("BTCUSDT", "BTC")]}]
+
+    def _exchange_info():
+        if not responses:
+            raise RuntimeError("HTTP 503")
+        return responses.pop()
+
+    universe = MarketUniverse(fetch_exchange_info=_exchange_info, fetch_tickers=list)
+    assert universe.trading_symbols() == {"BTCUSDT"}
+
+    universe._listing_at = 0.0
+    assert universe.trading_symbols() == {"BTCUSDT"}
+
+    cold = MarketUniverse(fetch_exchange_info=_exchange_info, fetch_tickers=list)
+    with pytest.raises(RuntimeError):
+        cold.trading_symbols()
+
+
+def test_invalidate_drops_the_shared_copy_and_reloads(redis):
+    calls = []
+    universe = _universe([_symbol("BTCUSDT", "BTC")], calls=calls)
+    assert universe.get("btcusdt")["filters"] == [{"filterType": "LOT_SIZE"}]
+    assert _universe([], calls=calls).get("BTCUSDT") is not None
+    assert calls == ["exchangeInfo"]
+
+    universe.invalidate()
+
+    assert redis.values == {} and redis.hashes == {}
+    assert universe.get("BTCUSDT") is not None
+    assert calls == ["exchangeInfo", "exchangeInfo"]
+
+
+def test_redis_errors_pause_the_shared_copy_for_a_cooldown(redis, monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(universe_module.time, "time", lambda: now[0])
+    calls = []
+    universe = _universe([_symbol("BTCUSDT", "BTC")], calls=calls, listing_ttl_seconds=0)
+    redis.down = True
+    universe.trading_symbols()
+    redis.down = False
+
+    now[0] += 1
+    universe.trading_symbols()
+    assert calls == ["exchangeInfo", "exchangeInfo"]
+    assert redis.get(UNIVERSE_META_KEY) is None  # still cooling down: nothing written
+
+    now[0] += universe_module.REDIS_RETRY_AFTER_SECONDS
+    universe.trading_symbols()
+    assert redis.get(UNIVERSE_META_KEY)
+
+
+def test_default_fetch_honours_exchange_info_overrides(redis, monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append((str(request.url), request.extensions["timeout"]["read"]))
+        return httpx.Response(200, json={"symbols": [_symbol("BTCUSDT", "BTC")]})
+
+    monkeypatch.setattr(
+        binance_http,
+        "_GATEWAY",
+        binance_http.BinanceGateway(transport=httpx.MockTransport(handler), http2=False),
+    )
+    monkeypatch.setenv("BINANCE_EXCHANGE_INFO_URL", "https://mirror.test/api/v3/exchangeInfo")
+    monkeypatch.setenv("BINANCE_EXCHANGE_INFO_TIMEOUT_SECONDS", "7")
+
+    assert MarketUniverse().trading_symbols() == {"BTCUSDT"}
+    assert seen == [("https://mirror.test/api/v3/exchangeInfo", 7.0)]
+
+    # Other base URLs (e.g. testnet) keep their own endpoint and shared copy.
+    seen.clear()
+    MarketUniverse(base_url="https://testnet.binance.vision").trading_symbols()
+    assert seen[0][0] == "https://testnet.binance.vision/api/v3/exchangeInfo"
+    assert len(redis.values) == 2 and UNIVERSE_META_KEY in redis.values
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from collections import deque
 from types import SimpleNamespace
 
@@ -305,29 +306,32 @@ async def test_sync_prices_from_rest_prunes_stale_symbols(monkeypatch):
     assert c._prices["BTCUSDT"].source == "rest-sync"
 
 
+def test_build_shards_spreads_top_pairs_round_robin():
+    pairs = [f"P{i:02d}USDT" for i in range(7)]
+    shards = connector._build_shards(pairs, 3)
+
+    assert [shard.pairs for shard in shards] == [
+        ("P00USDT", "P03USDT", "P06USDT"),
+        ("P01USDT", "P04USDT"),
+        ("P02USDT", "P05USDT"),
+    ]
+    assert connector._build_shards([], 3) == []
+    assert len(connector._build_shards(pairs, 50)) == 1
+
+
 @pytest.mark.asyncio
-async def test_ws_loop_and_consume_stream_pathways(monkeypatch):
-    c = _build_connector(monkeypatch)
-    c._pairs = ["BTCUSDT"]
-    c._reconnect_base_seconds = 1.0
-    c._reconnect_max_seconds = 1.0
-    c._pair_ttl_seconds = 10
+async def test_ws_loop_runs_one_connection_per_shard_and_rebuilds_on_pair_change(monkeypatch):
+    c = _build_connector(
+        monkeypatch, binance_ws_stream_limit=5, binance_ws_streams_per_connection=2
+    )
+    c._pairs = ["AAAUSDT", "BBBUSDT", "CCCUSDT", "DDDUSDT", "EEEUSDT", "FFFUSDT"]
 
     async def sync_passthrough(_symbols):
         return None
 
     c._sync_prices_from_rest = sync_passthrough
-
-    async def current_pairs_once():
-        return ["BTCUSDT"]
-
-    async def consume_once(_ws):
-        c._pairs_changed.set()
-
-    c._current_pairs = current_pairs_once
-    c._consume_ws_stream = consume_once
-
-    connection_calls: list[str] = []
+    urls: list[str] = []
+    consumed: list[tuple[int, ...]] = []
 
     class _FakeConnect:
         async def __aenter__(self):
@@ -336,47 +340,56 @@ async def test_ws_loop_and_consume_stream_pathways(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             return False
 
-    def fake_connect(*_a, **_k):
-        connection_calls.append("connect")
+    def fake_connect(url, **_k):
+        urls.append(url)
         return _FakeConnect()
 
-    c._shutdown.clear()
+    async def consume(_ws, shard):
+        consumed.append(shard.pairs)
+        assert shard.connected is True
+        if len(consumed) == 3:
+            c._pairs = ["AAAUSDT"]
+            c._pairs_changed.set()
+        elif len(consumed) == 4:
+            c._shutdown.set()
+        await asyncio.sleep(3600)
+
     monkeypatch.setattr(connector.websockets, "connect", fake_connect)
-    monkeypatch.setattr(connector.time, "time", lambda: 200.0)
-    shutdown_calls = {"count": 0}
+    c._consume_ws_stream = consume
+    await asyncio.wait_for(c._ws_loop(), timeout=5)
+
+    assert len(urls) == 4
+    assert "aaausdt@ticker/dddusdt@ticker" in urls[0]
+    assert sorted(consumed[:3]) == [("AAAUSDT", "DDDUSDT"), ("BBBUSDT", "EEEUSDT"), ("CCCUSDT",)]
+    assert consumed[3] == ("AAAUSDT",)
+    assert [shard.connected for shard in c._shards] == [False]
+
+
+@pytest.mark.asyncio
+async def test_shard_reconnect_resyncs_only_its_pairs(monkeypatch):
+    c = _build_connector(monkeypatch)
+    c._reconnect_base_seconds = 0.5
+    shard = connector._build_shards(["BTCUSDT", "ETHUSDT"], 50)[0]
+    synced: list[list[str]] = []
 
-    async def current_pairs_second():
-        shutdown_calls["count"] += 1
-        if shutdown_calls["count"] == 1:
-            return ["BTCUSDT"]
+    async def fake_sync(symbols):
+        synced.append(symbols)
         c._shutdown.set()
-        return ["BTCUSDT"]
 
-    c._current_pairs = current_pairs_second
-    await c._ws_loop()
-    assert connection_calls == ["connect"]
-    assert c._pairs_changed.is_set()
-    c._pairs_changed.clear()
-    c._shutdown.clear()
+    async def no_sleep(_seconds):
+        return None
 
     def fake_connect_error(*_a, **_k):
         raise RuntimeError("ws failed")
 
-    reconnect_calls = {"count": 0}
+    c._sync_prices_from_rest = fake_sync
     monkeypatch.setattr(connector.websockets, "connect", fake_connect_error)
+    monkeypatch.setattr(connector.asyncio, "sleep", no_sleep)
+    await c._run_shard(shard)
 
-    async def fake_current_pairs():
-        return ["BTCUSDT"]
-
-    c._current_pairs = fake_current_pairs
-
-    async def fake_sync(symbols):
-        reconnect_calls["count"] += 1
-        c._shutdown.set()
-
-    c._sync_prices_from_rest = fake_sync
-    await c._ws_loop()
-    assert reconnect_calls["count"] == 1
+    assert synced == [["BTCUSDT", "ETHUSDT"]]
+    assert (shard.disconnects, shard.reconnects) == (1, 1)
+    assert c._ws_reconnect_count == 1
 
 
 @pytest.mark.asyncio
@@ -413,28 +426,63 @@ async def test_consume_stream_handles_timeout_invalid_and_fallback_message(monke
 
     await c._consume_ws_stream(_ClosedSocket())
     assert c._ws_disconnect_count == 2
+    assert "BTCUSDT" not in c._prices
+    await c._merge_shard_prices()
     assert "BTCUSDT" in c._prices
 
-    await c._handle_ws_message("not-json")
-    await c._handle_ws_message("123")
+    c._handle_ws_message("not-json")
+    c._handle_ws_message("123")
     c._pairs = []
-    await c._handle_ws_message(
+    c._handle_ws_message(
         '{"data":{"s":"ETHUSDT","c":"3000","b":"2999","a":"3001","P":"-0.5","E":2000}}'
     )
+    c._handle_ws_message(b'{"s":"XRPUSDT","c":"3500","b":"3490","a":"3510","P":"0.1","E":2000}')
+    await c._merge_shard_prices()
     assert "ETHUSDT" in c._prices
-
-    c._pairs = []
-    await c._handle_ws_message(
-        '{"s":"XRPUSDT","c":"3500","b":"3490","a":"3510","P":"0.1","E":2000}'
-    )
     assert "XRPUSDT" in c._prices
 
     c._pairs = ["ETHUSDT"]
     before = set(c._prices)
-    await c._handle_ws_message('{"s":"BTCUSDT","c":"100"}')
+    c._handle_ws_message('{"s":"BTCUSDT","c":"100"}')
+    await c._merge_shard_prices()
     assert set(c._prices) == before
 
 
+@pytest.mark.asyncio
+async def test_shard_counters_track_drops_coalescing_and_lag(monkeypatch):
+    c = _build_connector(monkeypatch)
+    monkeypatch.setattr(connector.time, "time", lambda: 10.0)
+    c._shards = connector._build_shards(["BTCUSDT"], 50)
+    shard = c._shards[0]
+    c._last_ws_message_at = 10.0
+
+    c._handle_ws_message('{"s":"BTCUSDT","c":"1","E":9500}', shard)
+    c._handle_ws_message('{"s":"BTCUSDT","c":"2","E":9900}', shard)
+    c._handle_ws_message('{"s":"ETHUSDT","c":"3","E":9900}', shard)
+    c._handle_ws_message("{bad", shard)
+
+    status = await c.get_status()
+    assert status["ws_shard_count"] == 1
+    assert status["ws_dropped_messages"] == 2
+    assert status["ws_shards"][0] == {
+        "index": 0,
+        "pairs": 1,
+        "connected": False,
+        "messages": 4,
+        "dropped": 2,
+        "coalesced": 1,
+        "pending": 1,
+        "reconnects": 0,
+        "disconnects": 0,
+        "lag_ms": 100.0,
+        "last_message_age_seconds": 0.0,
+    }
+
+    prices, _, _ = await c.get_latest_prices(["BTCUSDT"])
+    assert prices[0]["price"] == 2.0
+    assert shard.pending == {}
+
+
 @pytest.mark.asyncio
 async def test_fallback_prices_and_latest_prices_ordered_with_stale_flags(monkeypatch):
     c = _build_connector(monkeypatch)
@@ -479,7 +527,7 @@ async def test_fallback_prices_and_latest_prices_ordered_with_stale_flags(monkey
 async def test_public_accessors_use_singleton_connector(monkeypatch):
     c = _build_connector(monkeypatch)
     c._pairs = ["BTCUSDT"]
-    monkeypatch.setattr(connector, "_read_external_snapshot", lambda: None)
+    monkeypatch.setattr(connector, "read_external_snapshot", lambda symbols=(): None)
 
     class _DummyConnector:
         def __init__(self, delegate):
@@ -602,7 +650,7 @@ async def test_snapshot_payload_and_external_snapshot_accessors(monkeypatch):
             raise AssertionError("should use external snapshot")
 
     monkeypatch.setattr(connector, "_connector", _ExternalOnlyConnector())
-    monkeypatch.setattr(connector, "read_snapshot", lambda: external_payload)
+    monkeypatch.setattr(connector, "read_snapshot", lambda symbols=None: external_payload)
     monkeypatch.setattr(connector, "snapshot_is_fresh", lambda payload: True)
 
     assert connector.is_running() is True
@@ -664,13 +712,18 @@ async def test_snapshot_helper_branches_and_worker_runner(monkeypatch):
     monkeypatch.setattr(connector, "_connector", dummy)
     monkeypatch.setattr(connector, "snapshot_is_fresh", lambda payload: bool(payload))
 
-    monkeypatch.setattr(connector, "read_snapshot", lambda: {"running": False})
-    assert connector._read_external_snapshot() is None
+    monkeypatch.setattr(connector, "read_snapshot", lambda symbols=None: {"running": False})
+    assert connector.read_external_snapshot() is None
 
     monkeypatch.setattr(
         connector,
         "read_snapshot",
-        lambda: {"running": True, "top_pairs": "bad", "status": "bad", "prices": "bad"},
+        lambda symbols=None: {
+            "running": True,
+            "top_pairs": "bad",
+            "status": "bad",
+            "prices": "bad",
+        },
     )
     assert await connector.get_top_pairs() == {
         "pairs": [],
@@ -689,7 +742,7 @@ async def test_snapshot_helper_branches_and_worker_runner(monkeypatch):
     }
     assert await connector.get_market_latest_prices(["BTCUSDT"]) == ([], None, True)
 
-    monkeypatch.setattr(connector, "read_snapshot", lambda: None)
+    monkeypatch.setattr(connector, "read_snapshot", lambda symbols=None: None)
     assert await connector.get_top_pairs() == await dummy.get_top_pairs()
     assert await connector.get_connector_status() == await dummy.get_status()
     assert await connector.get_market_latest_prices(["BTCUSDT"]) == fallback_prices
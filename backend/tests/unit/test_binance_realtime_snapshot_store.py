@@ -3,9 +3,16 @@ from __future__ import annotations
 import time
 from types import SimpleNamespace
 
+import pytest
+
 import app.services.binance_realtime_snapshot_store as snapshot_store
 
 
+@pytest.fixture(autouse=True)
+def _file_transport(monkeypatch):
+    monkeypatch.setattr(snapshot_store, "get_redis_client", lambda: None)
+
+
 def test_snapshot_store_round_trip_and_freshness(monkeypatch, tmp_path):
     snapshot_path = tmp_path / "runtime" / "snapshot.json"
     monkeypatch.setattr(
@@ -52,3 +59,145 @@ def test_snapshot_store_env_default_and_invalid_payloads(monkeypatch, tmp_path):
     assert snapshot_store.snapshot_is_fresh({"heartbeat_ts": 100.0, "now_ts": 103.5}) is False
     monkeypatch.setattr(time, "time", lambda: 101.0)
     assert snapshot_store.snapshot_is_fresh({"heartbeat_ts": 100.0}) is True
+
+
+class _HashRedis:
+    """Just enough of redis-py for the snapshot transport (pipeline runs on execute)."""
+
+    def __init__(self):
+        self.values: dict = {}
+        self.hashes: dict = {}
+        self.calls: list[str] = []
+
+    def get(self, key):
+        self.calls.append("get")
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key) or 0) + 1)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def hgetall(self, key):
+        self.calls.append("hgetall")
+        return dict(self.hashes.get(key, {}))
+
+    def hmget(self, key, fields):
+        self.calls.append(f"hmget:{','.join(fields)}")
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self, transaction=True):
+        redis = self
+        queued = []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: queued.append((name, args, kwargs))
+
+            def execute(self):
+                for name, args, kwargs in queued:
+                    getattr(redis, name)(*args, **kwargs)
+
+        return _Pipe()
+
+
+def _use_redis(monkeypatch, redis, tmp_path):
+    monkeypatch.setattr(
+        snapshot_store,
+        "get_settings",
+        lambda: SimpleNamespace(
+            binance_realtime_snapshot_path=str(tmp_path / "snapshot.json"),
+            binance_realtime_snapshot_max_age_seconds=15.0,
+            binance_realtime_snapshot_transport="redis",
+        ),
+    )
+    monkeypatch.setattr(snapshot_store, "get_redis_client", lambda: redis)
+    monkeypatch.setattr(snapshot_store, "_redis_retry_at", 0.0)
+    monkeypatch.setattr(snapshot_store, "_written_prices", {})
+    monkeypatch.setattr(
+        snapshot_store,
+        "_read_cache",
+        {"version": None, "meta": None, "prices": {}, "complete": False},
+    )
+
+
+def _payload(heartbeat: float, prices: dict[str, float]) -> dict:
+    return {
+        "running": True,
+        "heartbeat_ts": heartbeat,
+        "now_ts": heartbeat,
+        "status": {"running": True},
+        "prices": [{"symbol": symbol, "price": price} for symbol, price in sorted(prices.items())],
+    }
+
+
+def test_redis_transport_writes_only_changed_symbols_and_reads_requested(monkeypatch, tmp_path):
+    redis = _HashRedis()
+    _use_redis(monkeypatch, redis, tmp_path)
+
+    snapshot_store.write_snapshot(_payload(100.0, {"BTCUSDT": 1.0, "ETHUSDT": 2.0}))
+    written: list[dict] = []
+    real_hset = redis.hset
+    monkeypatch.setattr(
+        redis, "hset", lambda key, mapping: (written.append(mapping), real_hset(key, mapping))
+    )
+    snapshot_store.write_snapshot(_payload(101.0, {"BTCUSDT": 1.5, "SOLUSDT": 3.0}))
+
+    assert [sorted(m) for m in written] == [["BTCUSDT", "SOLUSDT"]]
+    assert sorted(redis.hashes[snapshot_store.SNAPSHOT_PRICES_KEY]) == ["BTCUSDT", "SOLUSDT"]
+    assert not (tmp_path / "snapshot.json").exists()
+
+    payload = snapshot_store.read_snapshot(["solusdt", "ETHUSDT"])
+    assert payload["heartbeat_ts"] == 101.0
+    assert payload["prices"] == [{"symbol": "SOLUSDT", "price": 3.0}]
+    assert [p["symbol"] for p in snapshot_store.read_snapshot()["prices"]] == [
+        "BTCUSDT",
+        "SOLUSDT",
+    ]
+    assert snapshot_store.read_snapshot([])["prices"] == []
+
+
+def test_redis_reader_skips_reload_while_version_is_unchanged(monkeypatch, tmp_path):
+    redis = _HashRedis()
+    _use_redis(monkeypatch, redis, tmp_path)
+    snapshot_store.write_snapshot(_payload(100.0, {"BTCUSDT": 1.0, "ETHUSDT": 2.0}))
+
+    snapshot_store.read_snapshot(["BTCUSDT"])
+    snapshot_store.read_snapshot(["BTCUSDT"])
+    assert redis.calls == ["get", "get", "hmget:BTCUSDT", "get"]
+
+    snapshot_store.write_snapshot(_payload(102.0, {"BTCUSDT": 9.0, "ETHUSDT": 2.0}))
+    assert snapshot_store.read_snapshot(["BTCUSDT"])["prices"][0]["price"] == 9.0
+
+
+def test_redis_transport_falls_back_to_file_when_unreachable(monkeypatch, tmp_path):
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    class _DownRedis(_HashRedis):
+        def get(self, key):
+            raise RedisConnectionError("down")
+
+        def set(self, key, value):
+            raise RedisConnectionError("down")
+
+    _use_redis(monkeypatch, _DownRedis(), tmp_path)
+    snapshot_store.write_snapshot(_payload(100.0, {"BTCUSDT": 1.0, "ETHUSDT": 2.0}))
+
+    assert (tmp_path / "snapshot.json").exists()
+    assert snapshot_store._redis_client() is None
+    payload = snapshot_store.read_snapshot(["ETHUSDT"])
+    assert payload["prices"] == [{"symbol": "ETHUSDT", "price": 2.0}]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+from statistics import mean, pstdev
+
+import pytest
+
+import app.services.binance_service as binance_service
+from app.schemas.signal import RiskProfile
+
+
+@pytest.fixture(autouse=True)
+def _empty_indicator_cache(monkeypatch):
+    monkeypatch.setattr(binance_service, "_INDICATOR_CACHE", OrderedDict())
+
+
+def _candles(closes: list[float]) -> list[dict]:
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    return [
+        {"open_time": start + timedelta(hours=idx), "close": close}
+        for idx, close in enumerate(closes)
+    ]
+
+
+def _series(seed: int, length: int = 120) -> list[float]:
+    price = 100.0 + seed
+    closes = []
+    for idx in range(length):
+        price *= 1 + ((idx * 7 + seed * 13) % 11 - 5) / 500
+        closes.append(price)
+    return closes
+
+
+def _ema(values: list[float], window: int) -> list[float]:
+    out = [mean(values[:window])]
+    for value in values[window:]:
+        out.append((value - out[-1]) * 2 / (window + 1) + out[-1])
+    return out
+
+
+def test_stacked_indicators_match_scalar_formulas():
+    series = {f"A{seed}USDT": _series(seed) for seed in range(3)}
+
+    indicators = binance_service._compute_indicators(
+        {asset: _candles(closes) for asset, closes in series.items()}
+    )
+
+    for asset, closes in series.items():
+        deltas = [b - a for a, b in zip(closes[-15:-1], closes[-14:])]
+        gain = sum(d for d in deltas if d > 0) / 14
+        loss = sum(-d for d in deltas if d < 0) / 14
+        ema12, ema26 = _ema(closes, 12), _ema(closes, 26)
+        macd = [a - b for a, b in zip(ema12[len(ema12) - len(ema26) :], ema26)]
+        signal = _ema(macd, 9)[-1]
+
+        result = indicators[asset]
+        assert result.rsi == pytest.approx(100 - 100 / (1 + gain / loss))
+        assert result.macd_line == pytest.approx(macd[-1])
+        assert result.signal_line == pytest.approx(signal)
+        assert result.bands.middle == pytest.approx(mean(closes[-20:]))
+        assert result.bands.upper - result.bands.middle == pytest.approx(2 * pstdev(closes[-20:]))
+
+
+def test_indicators_are_cached_per_series_until_the_last_candle_changes(monkeypatch):
+    calls = []
+    compute_rows = binance_service._compute_indicator_rows
+
+    def _counting(closes, *args, **kwargs):
+        calls.append(closes.shape)
+        return compute_rows(closes, *args, **kwargs)
+
+    monkeypatch.setattr(binance_service, "_compute_indicator_rows", _counting)
+    snapshots = {
+        "BTCUSDT": {"candles": _candles(_series(1))},
+        "ETHUSDT": {"candles": _candles(_series(2))},
+    }
+
+    for risk_profile in RiskProfile:
+        binance_service._build_signals_for_profile(
+            risk_profile=risk_profile, snapshots_by_asset=snapshots, sentiment_score=None
+        )
+    assert calls == [(2, 120)]
+
+    moved = _series(1)
+    moved[-1] *= 1.01
+    snapshots["BTCUSDT"] = {"candles": _candles(moved)}
+    binance_service._compute_indicators({k: v["candles"] for k, v in snapshots.items()})
+    assert calls == [(2, 120), (1, 120)]
+
+
+def test_indicator_cache_evicts_the_least_recently_used_series(monkeypatch):
+    monkeypatch.setattr(binance_service, "INDICATOR_CACHE_MAX_ENTRIES", 2)
+    candles = {asset: _candles(_series(seed)) for seed, asset in enumerate(["A", "B", "C"])}
+
+    binance_service._compute_indicators({"A": candles["A"], "B": candles["B"]})
+    binance_service._compute_indicators({"A": candles["A"]})  # refreshes A
+    binance_service._compute_indicators({"C": candles["C"]})
+
+    assert list(binance_service._INDICATOR_CACHE) == [("A", "1h"), ("C", "1h")]
+
+
+def test_short_series_are_skipped_without_failing_the_batch():
+    snapshots = {
+        "BTCUSDT": {"candles": _candles(_series(1))},
+        "NEWUSDT": {"candles": _candles(_series(2, length=10))},
+    }
+
+    signals = binance_service._build_signals_for_profile(
+        risk_profile=RiskProfile.moderate, snapshots_by_asset=snapshots, sentiment_score=None
+    )
+
+    assert [signal.asset for signal in signals] == ["BTCUSDT"]
+    with pytest.raises(ValueError):
+        binance_service._build_signal(
+            asset="NEWUSDT",
+            risk_profile=RiskProfile.moderate,
+            candles=snapshots["NEWUSDT"]["candles"],
+        )
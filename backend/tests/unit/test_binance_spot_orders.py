@@ -1,16 +1,17 @@
 from __future__ import annotations
 
-import io
-import json
 from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 from fastapi import HTTPException
 
 from app.routes import monitor_spot_stop
+from app.services import binance_http, binance_market_universe
 from app.services import binance_spot_orders as orders
+from app.services.binance_market_universe import get_market_universe
 
 SYMBOL_INFO = {
     "symbol": "ETHUSDT",
@@ -24,6 +25,12 @@ SYMBOL_INFO = {
 }
 
 
+@pytest.fixture(autouse=True)
+def _fresh_symbol_index(monkeypatch):
+    monkeypatch.setattr(binance_market_universe, "get_redis_client", lambda: None)
+    monkeypatch.setattr(binance_market_universe, "_UNIVERSES", {})
+
+
 def test_build_client_order_id_is_stable_and_prefixed():
     a = orders.build_client_order_id(user_id="u1", symbol="ethusdt", opportunity_id="42")
     b = orders.build_client_order_id(user_id="u1", symbol="ETHUSDT", opportunity_id="42")
@@ -301,55 +308,142 @@ def test_fetch_free_balance_and_list_open_orders(signed_request):
     assert orders.list_open_orders(api_key="k", api_secret="s", symbol="ETHUSDT") == []
 
 
-@patch("app.services.binance_spot_orders.public_get")
-def test_get_symbol_info(public_get):
-    public_get.return_value = {"symbols": [SYMBOL_INFO]}
+def _exchange_info_gateway(monkeypatch, listed, calls=None):
+    """Bulk exchangeInfo returns ``listed``; ``?symbol=`` lookups return NEWUSDT only."""
+
+    def handler(request):
+        symbol = request.url.params.get("symbol")
+        if calls is not None:
+            calls.append(symbol)
+        if symbol is None:
+            return httpx.Response(200, json={"symbols": listed})
+        rows = [{**SYMBOL_INFO, "symbol": "NEWUSDT"}] if symbol == "NEWUSDT" else []
+        return httpx.Response(200, json={"symbols": rows})
+
+    _install_gateway(monkeypatch, handler)
+
+
+def test_get_symbol_info(monkeypatch):
+    _exchange_info_gateway(monkeypatch, [SYMBOL_INFO])
     assert orders.get_symbol_info("ETHUSDT")["baseAsset"] == "ETH"
-    public_get.return_value = {"symbols": []}
     with pytest.raises(orders.BinanceOrderError, match="não encontrado"):
-        orders.get_symbol_info("ETHUSDT")
+        orders.get_symbol_info("BTCUSDT")
+
+
+def test_get_symbol_info_serves_bulk_index_and_fetches_new_listings(monkeypatch):
+    calls = []
+    _exchange_info_gateway(monkeypatch, [SYMBOL_INFO, {**SYMBOL_INFO, "symbol": "BTCUSDT"}], calls)
+    assert orders.get_symbol_info("ethusdt")["filters"] == SYMBOL_INFO["filters"]
+    assert orders.get_symbol_info("BTCUSDT")["symbol"] == "BTCUSDT"
+    assert calls == [None]
+
+    assert orders.get_symbol_info("NEWUSDT")["symbol"] == "NEWUSDT"
+    assert orders.get_symbol_info("NEWUSDT")["symbol"] == "NEWUSDT"
+    assert calls == [None, "NEWUSDT"]
+    # Order lookups and the feed/favorites views share one exchangeInfo index.
+    assert orders._symbol_index() is get_market_universe()
+    assert get_market_universe().get("NEWUSDT")["symbol"] == "NEWUSDT"
+
+
+def test_get_symbol_info_reloads_after_ttl(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(binance_market_universe.time, "time", lambda: now[0])
+    calls = []
+    _exchange_info_gateway(monkeypatch, [SYMBOL_INFO], calls)
+    orders.get_symbol_info("ETHUSDT")
+    now[0] += binance_market_universe.DEFAULT_LISTING_TTL_SECONDS - 1
+    orders.get_symbol_info("ETHUSDT")
+    assert len(calls) == 1
+    now[0] += 2
+    orders.get_symbol_info("ETHUSDT")
+    assert len(calls) == 2
+
+
+def test_filter_failure_on_order_invalidates_symbol_index(monkeypatch):
+    exchange_info_calls = []
+
+    def handler(request):
+        if request.url.path == "/api/v3/exchangeInfo":
+            exchange_info_calls.append(1)
+            return httpx.Response(200, json={"symbols": [SYMBOL_INFO]})
+        return httpx.Response(400, json={"code": -1013, "msg": "Filter failure: LOT_SIZE"})
+
+    _install_gateway(monkeypatch, handler)
+    orders.get_symbol_info("ETHUSDT")
+    orders.get_symbol_info("ETHUSDT")
+    with pytest.raises(orders.BinanceOrderError, match="Filter failure") as exc:
+        orders.signed_request(method="POST", path="/api/v3/order", api_key="k", api_secret="s")
+    assert exc.value.code == -1013 and exc.value.outcome_unknown is False
+
+    orders.get_symbol_info("ETHUSDT")
+    assert len(exchange_info_calls) == 2
+
+
+def _install_gateway(monkeypatch, handler) -> None:
+    monkeypatch.setattr(
+        binance_http,
+        "_GATEWAY",
+        binance_http.BinanceGateway(transport=httpx.MockTransport(handler), http2=False),
+    )
 
 
-@patch("urllib.request.urlopen")
-def test_signed_request_success_and_http_errors(urlopen):
-    ok = MagicMock()
-    ok.read.return_value = b'{"ok": true}'
-    ok.__enter__.return_value = ok
-    ok.__exit__.return_value = False
-    urlopen.return_value = ok
+def test_signed_request_success_and_http_errors(monkeypatch):
+    _install_gateway(monkeypatch, lambda request: httpx.Response(200, json={"ok": True}))
     assert orders.signed_request(
         method="GET", path="/api/v3/account", api_key="k", api_secret="s"
     ) == {"ok": True}
 
-    err = type("E", (Exception,), {})()
-    # HTTPError path
-    import urllib.error
-
-    http_err = urllib.error.HTTPError(
-        url="http://x",
-        code=400,
-        msg="bad",
-        hdrs=None,
-        fp=io.BytesIO(json.dumps({"code": -2015, "msg": "Invalid API-key"}).encode()),
+    _install_gateway(
+        monkeypatch,
+        lambda request: httpx.Response(400, json={"code": -2015, "msg": "Invalid API-key"}),
     )
-    urlopen.side_effect = http_err
     with pytest.raises(orders.BinanceOrderError, match="Spot Trading"):
         orders.signed_request(method="POST", path="/api/v3/order", api_key="k", api_secret="s")
 
-    urlopen.side_effect = RuntimeError("boom")
+    def boom(request):
+        raise RuntimeError("boom")
+
+    _install_gateway(monkeypatch, boom)
     with pytest.raises(orders.BinanceOrderError, match="Falha ao falar"):
         orders.signed_request(method="GET", path="/api/v3/account", api_key="k", api_secret="s")
 
 
-@patch("urllib.request.urlopen")
-def test_public_get(urlopen):
-    ok = MagicMock()
-    ok.read.return_value = b'{"symbols": []}'
-    ok.__enter__.return_value = ok
-    ok.__exit__.return_value = False
-    urlopen.return_value = ok
+def test_order_blocked_by_local_weight_budget_is_a_known_non_execution(monkeypatch):
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(200, json={"orderId": 1})
+
+    budget = binance_http.WeightBudget(weight_per_minute=600)
+    budget.block_for(30)
+    monkeypatch.setattr(
+        binance_http,
+        "_GATEWAY",
+        binance_http.BinanceGateway(
+            transport=httpx.MockTransport(handler), http2=False, budget=budget
+        ),
+    )
+
+    with pytest.raises(orders.BinanceOrderError) as exc:
+        orders.signed_request(
+            method="POST", path="/api/v3/order", api_key="k", api_secret="s", timeout_s=1
+        )
+
+    assert exc.value.status_code == 429
+    assert exc.value.outcome_unknown is False
+    assert 0 < exc.value.retry_after <= 30
+    assert sent == []
+
+
+def test_public_get(monkeypatch):
+    _install_gateway(monkeypatch, lambda request: httpx.Response(200, json={"symbols": []}))
     assert orders.public_get("/api/v3/exchangeInfo") == {"symbols": []}
-    urlopen.side_effect = RuntimeError("x")
+
+    def broken(request):
+        raise RuntimeError("x")
+
+    _install_gateway(monkeypatch, broken)
     with pytest.raises(orders.BinanceOrderError, match="exchangeInfo"):
         orders.public_get("/api/v3/exchangeInfo")
 
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import app.services.binance_spot as binance_spot
+import app.services.binance_trade_history as history_module
+from app.services.binance_trade_history import (
+    MY_TRADES_PAGE_LIMIT,
+    BinanceRequestError,
+    TradeHistoryStore,
+)
+from app.services.binance_trades import compute_avg_buy_cost_usdt
+
+
+@pytest.fixture(autouse=True)
+def _memory_history(monkeypatch):
+    monkeypatch.setattr(history_module, "_MEMORY_HISTORY", {})
+    monkeypatch.setattr(history_module, "get_redis_client", lambda: None)
+
+
+def _trade(trade_id: int, *, buy: bool, price: float, time_ms: int) -> dict:
+    return {"id": trade_id, "isBuyer": buy, "qty": "1", "price": str(price), "time": time_ms}
+
+
+def _store(fetch_page) -> TradeHistoryStore:
+    return TradeHistoryStore(
+        api_key="key",
+        api_secret="secret",
+        base_url="https://example.invalid",
+        timeout_s=5,
+        fetch_page=fetch_page,
+    )
+
+
+def test_sync_reads_newest_page_first_then_pages_forward_from_cursor() -> None:
+    calls: list[tuple[str, int | None]] = []
+    pages = {
+        None: [_trade(10, buy=True, price=100.0, time_ms=1_000)],
+        11: [
+            _trade(11 + i, buy=(i == 3), price=120.0 + i, time_ms=2_000 + i)
+            for i in range(MY_TRADES_PAGE_LIMIT)
+        ],
+        11 + MY_TRADES_PAGE_LIMIT: [_trade(5_000, buy=False, price=130.0, time_ms=9_000)],
+    }
+
+    def fetch_page(symbol, from_id):
+        calls.append((symbol, from_id))
+        return pages.get(from_id, [])
+
+    store = _store(fetch_page)
+    assert store.latest_buy_trade("ethusdt")["price"] == "100.0"
+
+    # A new store instance reuses the persisted cursor (same account).
+    store = _store(fetch_page)
+    assert store.latest_buy_trade("ETHUSDT")["price"] == "123.0"
+    assert calls == [("ETHUSDT", None), ("ETHUSDT", 11), ("ETHUSDT", 11 + MY_TRADES_PAGE_LIMIT)]
+
+    store.latest_buy_trade("ETHUSDT")
+    assert calls[-1] == ("ETHUSDT", 5_001)
+
+
+def test_invalid_symbol_is_remembered_and_other_errors_keep_the_cache() -> None:
+    calls: list[str] = []
+
+    def fetch_page(symbol, from_id):
+        calls.append(symbol)
+        if symbol == "ABCUSDC":
+            raise BinanceRequestError("bad symbol", status_code=400, code=-1121)
+        if len(calls) > 2:
+            raise BinanceRequestError("timeout")
+        return [_trade(1, buy=True, price=2.0, time_ms=1_000)]
+
+    store = _store(fetch_page)
+    assert compute_avg_buy_cost_usdt("ABC", history=store) == 2.0
+    assert compute_avg_buy_cost_usdt("ABC", history=store) == 2.0
+    assert calls.count("ABCUSDC") == 1
+
+
+def test_lookback_filters_the_cached_latest_buy(monkeypatch) -> None:
+    monkeypatch.setattr(history_module.time, "time", lambda: 1_700_000_000.0)
+    old_ms = int((1_700_000_000.0 - 10 * 86_400) * 1000)
+    store = _store(lambda symbol, from_id: [_trade(1, buy=True, price=5.0, time_ms=old_ms)])
+
+    assert store.latest_buy_trade("XUSDT", lookback_days=30)["price"] == "5.0"
+    assert store.latest_buy_trade("XUSDT", lookback_days=7) is None
+
+
+def test_snapshot_looks_up_every_asset_concurrently(monkeypatch) -> None:
+    assets = ["AAA", "BBB", "CCC", "DDD"]
+    barrier = threading.Barrier(len(assets), timeout=5)
+    seen: list[str] = []
+
+    def fake_signed_get(base_url, api_key, api_secret, path, params, *, timeout_s):
+        if path == "/api/v3/account":
+            return {"balances": [{"asset": a, "free": "1", "locked": "0"} for a in assets]}
+        return {"rows": []}
+
+    def fake_avg(asset, **kwargs):
+        assert isinstance(kwargs["history"], TradeHistoryStore)
+        barrier.wait()  # only passes if all lookups are in flight at once
+        seen.append(asset)
+        return 50.0
+
+    monkeypatch.setenv("BINANCE_TRADE_LOOKUP_CONCURRENCY", "4")
+    monkeypatch.setattr(binance_spot, "_signed_get", fake_signed_get)
+    monkeypatch.setattr(binance_spot, "fetch_all_binance_prices", lambda: {})
+    monkeypatch.setattr(binance_spot, "compute_usdt_price_for_asset", lambda asset, _p: 100.0)
+    monkeypatch.setattr(binance_spot, "compute_avg_buy_cost_usdt", fake_avg)
+
+    out = binance_spot.fetch_spot_balances_snapshot(api_key="k", api_secret="s")
+
+    assert sorted(seen) == assets
+    assert all(row["pnl_pct"] == pytest.approx(100.0) for row in out["balances"])
@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import pandas as pd
 
-from app.services.chart_pattern_service import ChartPatternConfig, detect_chart_patterns
+from app.services.chart_pattern_service import (
+    ChartPatternConfig,
+    detect_chart_patterns,
+    rescan_start,
+)
 
 
 def _events(df: pd.DataFrame, config: ChartPatternConfig | None = None) -> list[dict]:
@@ -89,3 +93,28 @@ def test_detects_confirmed_double_bottom() -> None:
     assert 0 <= event["confidence"] <= 100
     assert event["metadata"]["neckline"] == 17.0
     assert event["reference_price"] == 18.2
+
+
+def test_tail_rescan_matches_the_full_scan_from_the_rescan_start() -> None:
+    rows = 400
+    # Triangle wave with a slight drift: a moving-average cross every 12 bars.
+    close = pd.Series([108.0 - 8.0 * abs(idx % 24 - 12) / 12 + idx * 0.01 for idx in range(rows)])
+    df = pd.DataFrame(
+        {
+            "ts": pd.date_range("2026-01-01", periods=rows, freq="h", tz="UTC"),
+            "high": close + 0.5,
+            "low": close - 0.5,
+            "close": close,
+        }
+    )
+    df["sma_20"] = close.rolling(20).mean()
+    df["sma_50"] = close.rolling(50).mean()
+
+    full = detect_chart_patterns(df).tolist()
+    start = rescan_start(rows - 30)
+    tail = detect_chart_patterns(df, start_pos=start).tolist()
+
+    assert start == rows - 30 - ChartPatternConfig().pivot_window
+    assert sum(len(row_events) for row_events in full[start:]) > 0
+    assert tail[:start] == [[] for _ in range(start)]
+    assert tail[start:] == full[start:]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import pandas as pd
+import pytest
 
 from app.services import combo_optimizer
 
@@ -376,3 +377,346 @@ def test_optimizer_split_produces_holdout_verdict_with_go_metrics(monkeypatch):
     assert "benchmark" in result["best_metrics"]
     assert result["oos_verdict"]["status"] == "GO"
     assert any("GO walk-forward" in r for r in result["oos_verdict"]["reasons"])
+
+
+def test_fixed_parameter_evaluation_matches_optimizer_split(monkeypatch):
+    """Revalidação (card #470): a avaliação de parâmetros fixos reproduz as
+    métricas e o veredito do run_optimization com split, sem estágios nem pool."""
+    n_candles = 300
+    dates = pd.date_range("2025-01-01", periods=n_candles, freq="D")
+    full_df = pd.DataFrame(
+        {
+            "open": [100.0 + (i % 7) for i in range(n_candles)],
+            "high": [110.0 + (i % 7) for i in range(n_candles)],
+            "low": [95.0 + (i % 5) for i in range(n_candles)],
+            "close": [100.0 + i * 0.3 + (i % 9) for i in range(n_candles)],
+            "volume": [10.0] * n_candles,
+        },
+        index=pd.to_datetime(dates, utc=True),
+    )
+    params = {"direction": "long", "stop_loss": 0.02}
+
+    class _FullProvider:
+        def fetch_ohlcv(self, **_kwargs):
+            return full_df.copy()
+
+    class _CrossStrategy:
+        def generate_signals(self, df):
+            out = df.copy()
+            out["signal"] = [
+                1 if i % 6 == 0 else (-1 if i % 6 == 3 else 0) for i in range(len(out))
+            ]
+            return out
+
+    def _optimizer():
+        optimizer = combo_optimizer.ComboOptimizer()
+        monkeypatch.setattr(
+            optimizer.combo_service, "create_strategy", lambda **_kwargs: _CrossStrategy()
+        )
+        return optimizer
+
+    monkeypatch.setattr(
+        combo_optimizer, "get_market_data_provider", lambda _source: _FullProvider()
+    )
+    monkeypatch.setattr(combo_optimizer.concurrent.futures, "ProcessPoolExecutor", _FakeExecutor)
+
+    reference_optimizer = _optimizer()
+    monkeypatch.setattr(
+        reference_optimizer,
+        "generate_stages",
+        lambda **_kwargs: [{"param": "stop_loss", "values": [0.02]}],
+    )
+    monkeypatch.setattr(
+        reference_optimizer,
+        "_execute_opt_stages",
+        lambda *args, **_kwargs: (dict(params), {"sharpe_ratio": 0.0}),
+    )
+    monkeypatch.setattr(
+        reference_optimizer.combo_service, "get_template_metadata", lambda _name: {}
+    )
+    reference = reference_optimizer.run_optimization(
+        template_name="multi_ma_crossover",
+        symbol="AAPL",
+        timeframe="1d",
+        data_source="stooq",
+        start_date="2025-01-01",
+        end_date=str(full_df.index.max().date()),
+        deep_backtest=False,
+        split_train_ratio=0.7,
+    )
+
+    optimizer = _optimizer()
+    monkeypatch.setattr(
+        optimizer, "generate_stages", lambda **_kwargs: pytest.fail("stages generated")
+    )
+    data = optimizer.load_walk_forward_data(
+        "AAPL",
+        "1d",
+        start_date="2025-01-01",
+        end_date=str(full_df.index.max().date()),
+        data_source="stooq",
+        split_train_ratio=0.7,
+    )
+    result = optimizer.evaluate_fixed_parameters(
+        "multi_ma_crossover", params, data, direction="long"
+    )
+
+    assert (len(data.train), len(data.holdout)) == (210, 90)
+    assert data.deep_backtest is False and "regime" in data.train.columns
+    assert result["best_metrics"]["total_trades"] > 0
+    assert result["oos_verdict"]["holdout_trades"] > 0
+    assert result["oos_verdict"] == reference["oos_verdict"]
+    assert result["oos_metrics"] == reference["oos_metrics"]
+    for key in ("total_trades", "total_return", "sharpe_ratio", "cagr", "win_rate_bull"):
+        assert result["best_metrics"][key] == reference["best_metrics"][key]
+
+
+def test_walk_forward_fold_windows_tile_the_tail():
+    for n_candles in (10, 99, 100, 365, 1001):
+        train, holdout = combo_optimizer.split_train_holdout(
+            pd.DataFrame({"close": range(n_candles)}), 0.7
+        )
+        (single,) = combo_optimizer.walk_forward_fold_windows(n_candles, 1, train_ratio=0.7)
+        assert single["train"] == (0, len(train))
+        assert single["test"] == (len(train), n_candles)
+
+    rolling = combo_optimizer.walk_forward_fold_windows(500, 5, train_ratio=0.7)
+    anchored = combo_optimizer.walk_forward_fold_windows(500, 5, mode="anchored")
+
+    assert [w["test"] for w in rolling] == [w["test"] for w in anchored]
+    assert rolling[-1]["test"][1] == 500
+    for previous, current in zip(rolling, rolling[1:]):
+        assert previous["test"][1] == current["test"][0]
+    assert {w["train"][1] - w["train"][0] for w in rolling} == {rolling[0]["train"][1]}
+    assert all(w["train"] == (0, w["test"][0]) for w in anchored)
+    with pytest.raises(ValueError):
+        combo_optimizer.walk_forward_fold_windows(4, 5)
+
+
+def test_walk_forward_folds_optimize_each_fold_on_the_shared_pool(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.strategies.combos import ComboStrategy
+
+    n_candles = 360
+    dates = pd.date_range("2024-01-01", periods=n_candles, freq="D")
+    wave = [100.0 + 10 * ((i // 9) % 2) + i * 0.05 + (i % 4) for i in range(n_candles)]
+    full_df = pd.DataFrame(
+        {
+            "open": [value - 0.5 for value in wave],
+            "high": [value + 2.0 for value in wave],
+            "low": [value - 2.0 for value in wave],
+            "close": wave,
+            "volume": [10.0] * n_candles,
+        },
+        index=pd.to_datetime(dates, utc=True),
+    )
+    template = {
+        "indicators": [{"type": "ema", "alias": "trend", "params": {"length": 10}}],
+        "entry_logic": "close > trend",
+        "exit_logic": "close < trend",
+        "stop_loss": 0.05,
+        "optimization_schema": {},
+    }
+    values = [3, 8, 21]
+
+    class _FullProvider:
+        def fetch_ohlcv(self, **_kwargs):
+            return full_df.copy()
+
+    optimizer = combo_optimizer.ComboOptimizer()
+    monkeypatch.setattr(
+        optimizer,
+        "generate_stages",
+        lambda **_kwargs: [{"parameter": "trend_length", "values": list(values)}],
+    )
+    monkeypatch.setattr(optimizer.combo_service, "get_template_metadata", lambda _name: template)
+    monkeypatch.setattr(
+        combo_optimizer, "get_market_data_provider", lambda _source: _FullProvider()
+    )
+    monkeypatch.setattr(combo_optimizer, "_init_worker_logging", lambda: None)
+    monkeypatch.setattr(
+        combo_optimizer.concurrent.futures, "ProcessPoolExecutor", ThreadPoolExecutor
+    )
+    signal_runs = []
+    generate_signals = ComboStrategy.generate_signals
+
+    def counting_generate_signals(self, df):
+        signal_runs.append(len(df))
+        return generate_signals(self, df)
+
+    monkeypatch.setattr(ComboStrategy, "generate_signals", counting_generate_signals)
+
+    result = optimizer.run_optimization(
+        template_name="ema_trend",
+        symbol="AAPL",
+        timeframe="1d",
+        data_source="stooq",
+        start_date="2024-01-01",
+        end_date=str(full_df.index.max().date()),
+        deep_backtest=False,
+        walk_forward_folds=3,
+    )
+
+    folds = result["walk_forward"]["folds"]
+    assert len(folds) == 3 and result["oos_verdict"]["folds"] == 3
+    # Indicators run once per distinct parameter set over the full series, not per fold.
+    assert len(signal_runs) <= 2 * len(values)
+    assert set(signal_runs) == {n_candles}
+    assert result["oos_verdict"]["holdout_trades"] == sum(
+        fold["verdict"]["holdout_trades"] for fold in folds
+    )
+    assert result["best_parameters"] == folds[-1]["parameters"]
+    assert result["oos_verdict"]["per_fold_parameters"] is True
+
+    regime_df = combo_optimizer._add_regime_column(full_df.copy())
+    windows = combo_optimizer.walk_forward_fold_windows(n_candles, 3)
+    for window, fold in zip(windows, folds):
+        ranked = combo_optimizer._rank_stage_results(
+            [
+                {
+                    "params": {"direction": "long", "trend_length": value},
+                    "metrics": combo_optimizer._evaluate_fold_windows(
+                        template,
+                        {"direction": "long", "trend_length": value},
+                        regime_df.iloc[: window["train"][1]],
+                        [("train", window["train"][0], window["train"][1])],
+                        False,
+                        "AAPL",
+                        None,
+                        None,
+                    )["train"]["metrics"],
+                }
+                for value in values
+            ]
+        )
+        assert fold["parameters"] == ranked[0]["params"]
+
+
+def test_first_stage_panel_matches_per_symbol_stages_and_seeds_the_refinement(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _frame(n_candles, start, period):
+        wave = [100.0 + 10 * ((i // period) % 2) + i * 0.05 + (i % 4) for i in range(n_candles)]
+        return pd.DataFrame(
+            {
+                "open": [value - 0.5 for value in wave],
+                "high": [value + 2.0 for value in wave],
+                "low": [value - 2.0 for value in wave],
+                "close": wave,
+                "volume": [10.0] * n_candles,
+            },
+            index=pd.date_range(start, periods=n_candles, freq="D", tz="UTC"),
+        )
+
+    # Different histories: the panel aligns them on the union of both indexes.
+    frames = {"AAPL": _frame(360, "2024-01-01", 9), "MSFT": _frame(300, "2024-03-01", 6)}
+    template = {
+        "indicators": [{"type": "ema", "alias": "trend", "params": {"length": 10}}],
+        "entry_logic": "close > trend",
+        "exit_logic": "close < trend",
+        "stop_loss": 0.05,
+        "optimization_schema": {},
+    }
+    values = [3, 8, 21]
+
+    class _PanelProvider:
+        def fetch_ohlcv(self, *, symbol, **_kwargs):
+            return frames[symbol].copy()
+
+    optimizer = combo_optimizer.ComboOptimizer()
+    monkeypatch.setattr(
+        optimizer,
+        "generate_stages",
+        lambda **_kwargs: [{"parameter": "trend_length", "values": list(values)}],
+    )
+    monkeypatch.setattr(optimizer.combo_service, "get_template_metadata", lambda _name: template)
+    monkeypatch.setattr(
+        combo_optimizer, "get_market_data_provider", lambda _source: _PanelProvider()
+    )
+    monkeypatch.setattr(combo_optimizer, "_init_worker_logging", lambda: None)
+    monkeypatch.setattr(
+        combo_optimizer.concurrent.futures, "ProcessPoolExecutor", ThreadPoolExecutor
+    )
+    panel_tasks = []
+    run_panel = combo_optimizer._worker_run_panel
+
+    def counting_run_panel(task):
+        panel_tasks.append(task)
+        return run_panel(task)
+
+    monkeypatch.setattr(combo_optimizer, "_worker_run_panel", counting_run_panel)
+    window = {"start_date": "2024-01-01", "end_date": "2024-12-25"}
+
+    seeds = optimizer.evaluate_first_stage_panel(
+        "ema_trend",
+        ["AAPL", "MSFT"],
+        timeframe="1d",
+        data_source="stooq",
+        deep_backtest=False,
+        split_train_ratio=0.7,
+        **window,
+    )
+
+    # One task covers every parameter set on both symbols.
+    assert len(panel_tasks) == 1 and set(panel_tasks[0][3]) == {"AAPL", "MSFT"}
+    for symbol, full_df in frames.items():
+        train, _ = combo_optimizer.split_train_holdout(full_df, 0.7)
+        stage_df = combo_optimizer._add_stage_regime_column(train)
+        expected = combo_optimizer._worker_run_batch(
+            [
+                (
+                    template,
+                    {"direction": "long", "trend_length": value},
+                    stage_df,
+                    "trend_length",
+                    value,
+                    False,
+                    symbol,
+                    window["start_date"],
+                    window["end_date"],
+                )
+                for value in values
+            ]
+        )
+        seed = seeds[symbol]
+        pd.testing.assert_frame_equal(seed.data["df"], train)
+        assert [row["value"] for row in seed.first_stage_results] == values
+        assert [row["metrics"] for row in seed.first_stage_results] == [
+            row["metrics"] for row in expected
+        ]
+
+    # The seeded optimizer ranks the panel results instead of dispatching that stage again.
+    dispatched = []
+    run_stage_batches = optimizer._run_stage_batches
+
+    def counting_run_stage_batches(worker_args, *args):
+        dispatched.append(len(worker_args))
+        return run_stage_batches(worker_args, *args)
+
+    monkeypatch.setattr(optimizer, "_run_stage_batches", counting_run_stage_batches)
+    plain = optimizer.run_optimization(
+        template_name="ema_trend",
+        symbol="MSFT",
+        timeframe="1d",
+        data_source="stooq",
+        deep_backtest=False,
+        split_train_ratio=0.7,
+        **window,
+    )
+    plain_dispatches = len(dispatched)
+    seeded = optimizer.run_optimization(
+        template_name="ema_trend",
+        symbol="MSFT",
+        timeframe="1d",
+        data_source="stooq",
+        deep_backtest=False,
+        split_train_ratio=0.7,
+        panel_seed=seeds["MSFT"],
+        **window,
+    )
+    # Only round 1's first stage comes from the panel; later rounds still run per symbol.
+    assert len(dispatched) - plain_dispatches == plain_dispatches - 1
+    assert seeded["best_parameters"] == plain["best_parameters"]
+    assert seeded["best_metrics"] == plain["best_metrics"]
+    assert seeded["oos_verdict"] == plain["oos_verdict"]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import copy
+
+from app.services.combo_optimizer import compile_param_binding_plan
+
+TEMPLATE = [
+    {"type": "ema", "alias": "short", "params": {"length": 9}},
+    {"type": "sma", "alias": "long", "params": {"period": 50}},
+    {"type": "rsi", "params": {"length": 14}},
+    {"type": "macd", "alias": "m"},
+]
+
+
+def _bind(params: dict) -> list[dict]:
+    plan = compile_param_binding_plan(TEMPLATE, params)
+    return plan.apply(TEMPLATE, params)
+
+
+def test_binding_covers_all_override_formats() -> None:
+    bound = _bind(
+        {
+            "short_length": 12,  # alias_param
+            "sma_long": 60,  # type_alias -> existing "period"
+            "rsi_length": 21,  # type_param for indicator without alias
+            "m": 5,  # exact alias without params -> "length"
+            "stop_loss": 0.02,
+            "timeframe": "1d",
+            "direction": "short",
+        }
+    )
+
+    assert bound[0]["params"] == {"length": 12}
+    assert bound[1]["params"] == {"period": 60}
+    assert bound[2]["params"] == {"length": 21}
+    assert bound[3]["params"] == {"length": 5}
+
+
+def test_binding_never_mutates_the_template_and_shares_unbound_indicators() -> None:
+    snapshot = copy.deepcopy(TEMPLATE)
+
+    bound = _bind({"short_length": 30})
+
+    assert TEMPLATE == snapshot
+    assert bound[0] is not TEMPLATE[0]
+    assert bound[1] is TEMPLATE[1]
+
+
+def test_plan_is_reusable_across_combinations_and_tracks_added_fields() -> None:
+    plan = compile_param_binding_plan(TEMPLATE, ("m_period", "m", "unknown_key"))
+    assert plan.slots == [("m_period", 3, "period"), ("m", 3, "period")]
+
+    first = plan.apply(TEMPLATE, {"m_period": 10, "m": 11, "unknown_key": 1})
+    second = plan.apply(TEMPLATE, {"m_period": 20, "m": 22, "unknown_key": 2})
+
+    assert first[3]["params"] == {"period": 11}
+    assert second[3]["params"] == {"period": 22}
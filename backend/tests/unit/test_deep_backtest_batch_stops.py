@@ -0,0 +1,146 @@
+"""Parity tests: batch 15m stop resolution vs. the original per-entry loop."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.deep_backtest import (
+    TRADING_FEE,
+    _first_hit_indices,
+    _intraday_index,
+    simulate_execution_with_15m,
+)
+
+
+def _legacy_simulation(df_daily, df_15m, stop_loss, direction="long"):
+    """Loop implementation used before the batch kernel (iterrows + np.where per trade)."""
+    trades = []
+    stop_loss_pct = float(stop_loss) if stop_loss is not None else 0.0
+    is_short = direction == "short"
+    times_15m = df_15m.index if not df_15m.empty else np.array([])
+    values = df_15m["high" if is_short else "low"].values if not df_15m.empty else None
+    exit_signals = df_daily[df_daily["signal"] == -1]
+    exit_times, exit_prices = exit_signals.index, exit_signals["open"].values
+    last_exit_time = None
+    for entry_time, row in df_daily[df_daily["signal"] == 1].iterrows():
+        if last_exit_time is not None and entry_time < last_exit_time:
+            continue
+        entry_price = float(row["open"])
+        stop = entry_price * (1 + stop_loss_pct) if is_short else entry_price * (1 - stop_loss_pct)
+        nxt = exit_times.searchsorted(entry_time, side="right")
+        if nxt < len(exit_times):
+            exit_time, exit_price, reason = exit_times[nxt], float(exit_prices[nxt]), "signal"
+        else:
+            exit_time = df_daily.index[-1] + pd.Timedelta(days=1)
+            exit_price, reason = float(df_daily.iloc[-1]["close"]), "end_of_period"
+        if len(times_15m) > 0 and stop_loss_pct > 0:
+            chunk = values[times_15m.searchsorted(entry_time) : times_15m.searchsorted(exit_time)]
+            hits = np.where(chunk >= stop if is_short else chunk <= stop)[0]
+            if hits.size:
+                exit_time = times_15m[times_15m.searchsorted(entry_time) + hits[0]]
+                exit_price, reason = stop, "stop_loss"
+        if reason == "end_of_period":
+            continue
+        last_exit_time = exit_time
+        if is_short:
+            profit = (entry_price * (1 - TRADING_FEE) - exit_price * (1 + TRADING_FEE)) / (
+                entry_price * (1 - TRADING_FEE)
+            )
+        else:
+            profit = (exit_price * (1 - TRADING_FEE) - entry_price * (1 + TRADING_FEE)) / (
+                entry_price * (1 + TRADING_FEE)
+            )
+        trades.append(
+            {
+                "entry_time": entry_time.isoformat(),
+                "exit_time": pd.Timestamp(exit_time).isoformat(),
+                "entry_price": entry_price,
+                "exit_price": float(exit_price),
+                "profit": profit,
+                "exit_reason": "stop_loss_15m" if reason == "stop_loss" else "signal_15m",
+            }
+        )
+    return trades
+
+
+def _random_market(seed: int, days: int = 60):
+    rng = np.random.default_rng(seed)
+    daily_index = pd.date_range("2025-01-01", periods=days, freq="1D", tz="UTC")
+    intraday_index = pd.date_range("2025-01-03", periods=(days - 4) * 96, freq="15min", tz="UTC")
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.004, len(intraday_index))))
+    lows = closes * (1 - rng.uniform(0, 0.01, len(closes)))
+    highs = closes * (1 + rng.uniform(0, 0.01, len(closes)))
+    lows[rng.random(len(lows)) < 0.02] = np.nan
+    intraday = pd.DataFrame({"low": lows, "high": highs}, index=intraday_index)
+    daily = pd.DataFrame(
+        {
+            "open": 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, days))),
+            "close": 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, days))),
+            "signal": rng.choice([0, 0, 0, 1, -1], size=days),
+        },
+        index=daily_index,
+    )
+    return daily, intraday
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("direction", ["long", "short"])
+def test_batch_simulation_matches_legacy_loop(seed: int, direction: str) -> None:
+    daily, intraday = _random_market(seed)
+    stop_loss = [0.0, 0.005, 0.01, 0.03][seed % 4]
+
+    actual = simulate_execution_with_15m(daily, intraday, stop_loss, direction=direction)
+    expected = _legacy_simulation(daily, intraday, stop_loss, direction=direction)
+
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        for key, value in want.items():
+            if isinstance(value, float):
+                assert got[key] == pytest.approx(value, rel=1e-12), key
+            else:
+                assert got[key] == value, key
+
+
+def test_first_hit_indices_matches_linear_scan() -> None:
+    rng = np.random.default_rng(5)
+    values = rng.normal(size=500)
+    values[rng.random(500) < 0.1] = np.nan
+    lo = rng.integers(0, 500, size=300)
+    hi = np.minimum(lo + rng.integers(0, 200, size=300), 500)
+    threshold = rng.normal(-1.5, 0.5, size=300)
+
+    got = _first_hit_indices(values, lo, hi, threshold)
+
+    for i in range(300):
+        hits = np.flatnonzero(values[lo[i] : hi[i]] <= threshold[i])
+        assert got[i] == (lo[i] + hits[0] if hits.size else hi[i])
+
+
+def test_intraday_index_is_built_once_per_frame(monkeypatch) -> None:
+    from app.services import deep_backtest
+
+    daily, intraday = _random_market(3)
+    monkeypatch.setattr(deep_backtest, "_INTRADAY_INDEXES", type(deep_backtest._INTRADAY_INDEXES)())
+    builds = []
+    original = deep_backtest._IntradayIndex.__init__
+
+    def _counting_init(self, *args, **kwargs):
+        builds.append(1)
+        original(self, *args, **kwargs)
+
+    monkeypatch.setattr(deep_backtest._IntradayIndex, "__init__", _counting_init)
+
+    first = simulate_execution_with_15m(daily, intraday, 0.01)
+    second = simulate_execution_with_15m(daily, intraday, 0.01, direction="short")
+
+    assert len(builds) == 1
+    assert [trade["exit_time"] for trade in first] == [
+        trade["exit_time"] for trade in _legacy_simulation(daily, intraday, 0.01)
+    ]
+    assert [trade["exit_time"] for trade in second] == [
+        trade["exit_time"] for trade in _legacy_simulation(daily, intraday, 0.01, "short")
+    ]
+    # A different frame (even with equal contents) gets its own index.
+    assert _intraday_index(intraday.copy(), "UTC") is not _intraday_index(intraday, "UTC")
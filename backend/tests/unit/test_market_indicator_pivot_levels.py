@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
 import math
 from datetime import datetime, timezone
+from types import SimpleNamespace
 from typing import Any
 
 import pandas as pd
@@ -195,3 +199,100 @@ def test_get_time_series_returns_pivot_level_columns(monkeypatch: pytest.MonkeyP
     assert rows == [expected_row]
     for column in PIVOT_COLUMNS:
         assert column in rows[0]
+
+
+def test_incremental_recompute_only_rewrites_the_tail(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = MarketIndicatorService()
+    rows = _ohlcv(
+        [(f"c{idx}", 101.0 + idx % 5, 99.0 - idx % 3, 100.0 + idx % 4) for idx in range(60)]
+    )
+    last_stored = rows["ts"].iloc[54].to_pydatetime()
+    written: list[pd.DataFrame] = []
+    monkeypatch.setattr(service, "_list_symbols_and_timeframes", lambda symbol, tfs: tfs)
+    monkeypatch.setattr(service, "_fetch_existing_latest_ts", lambda symbol, tf: last_stored)
+    monkeypatch.setattr(service, "_read_ohlcv", lambda symbol, tf, since: rows)
+    monkeypatch.setattr(
+        service, "_upsert_indicators", lambda output, is_recomputed: written.append(output)
+    )
+    service._jobs["job"] = {"estimated_bars_remaining": 60}
+
+    service._run_recompute(job_id="job", symbol="btcusdt", timeframes=["1h"], force_full=False)
+
+    assert service._jobs["job"]["status"] == "completed"
+    # Rows from the new candles (55+) plus the pivot window before them.
+    assert written[0]["ts"].tolist() == rows["ts"].iloc[53:].tolist()
+
+
+def test_upsert_copies_the_frame_into_staging_and_merges_only_changes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from app.services import market_indicator_service as target
+
+    service = MarketIndicatorService()
+    output = service._compute_indicators(
+        _ohlcv([(f"c{idx}", 101.0 + idx, 99.0 + idx, 100.0 + idx) for idx in range(3)]),
+        "1h",
+        "btcusdt",
+    )
+
+    class FakeCursor:
+        def __init__(self) -> None:
+            self.copied: list[tuple[str, str]] = []
+            self.closed = False
+
+        def copy_expert(self, sql: str, buffer) -> None:
+            self.copied.append((sql, buffer.read()))
+
+        def close(self) -> None:
+            self.closed = True
+
+    class FakeConn:
+        def __init__(self) -> None:
+            self.cursor = FakeCursor()
+            # SQLAlchemy exposes the psycopg2 connection as connection.dbapi_connection.
+            self.connection = SimpleNamespace(
+                dbapi_connection=SimpleNamespace(cursor=lambda: self.cursor)
+            )
+            self.statements: list[tuple[str, Any]] = []
+
+        def execute(self, statement, params=None):
+            self.statements.append((str(statement), params))
+
+    class FakeBegin:
+        def __init__(self, conn: FakeConn) -> None:
+            self.conn = conn
+
+        def __enter__(self) -> FakeConn:
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb) -> None:
+            return None
+
+    class FakeEngine:
+        def __init__(self) -> None:
+            self.conn = FakeConn()
+
+        def begin(self) -> FakeBegin:
+            return FakeBegin(self.conn)
+
+    fake_engine = FakeEngine()
+    monkeypatch.setattr(target, "engine", fake_engine)
+
+    service._upsert_indicators(output, is_recomputed=False)
+
+    create, merge = (statement for statement, _ in fake_engine.conn.statements)
+    assert create.startswith("CREATE TEMP TABLE market_indicator_staging ON COMMIT DROP")
+    assert "FROM market_indicator_staging" in merge
+    assert "pivot_point = EXCLUDED.pivot_point" in merge
+    assert "IS DISTINCT FROM" in merge
+    ((copy_sql, payload),) = fake_engine.conn.cursor.copied
+    assert copy_sql.startswith("COPY market_indicator_staging (symbol, timeframe, ts,")
+    assert fake_engine.conn.cursor.closed
+    records = list(csv.reader(io.StringIO(payload)))
+    assert len(records) == 3
+    pivot = target._WRITE_COLUMNS.index("pivot_point")
+    # The first candle has no previous one: its pivot levels are written as NULL.
+    assert records[0][:2] == ["BTCUSDT", "1h"]
+    assert records[0][pivot] == ""
+    assert float(records[1][pivot]) == 100.0
+    assert json.loads(records[0][target._WRITE_COLUMNS.index("source_window")])["engine"] == "talib"
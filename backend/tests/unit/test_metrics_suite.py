@@ -23,7 +23,11 @@ from app.metrics import (
     evaluate_go_nogo,
 )
 from app.metrics.indicators import calculate_avg_indicators
-from app.metrics.regime import calculate_regime_classification
+from app.metrics.regime import (
+    calculate_regime_classification,
+    regime_at,
+    segment_trades_by_regime,
+)
 from app.metrics.risk import calculate_drawdown_series
 
 
@@ -180,6 +184,29 @@ def test_regime_classification_handles_empty_frames_and_missing_sma_column():
     assert list(with_sma["regime"]) == ["Bull", "Bear"]
 
 
+def test_trade_regimes_use_the_entry_candle_and_group_pnl():
+    regime = pd.Series(
+        ["Bear", "Bull", "Unknown", "Bull"],
+        index=pd.date_range("2024-01-01", periods=4, freq="D", tz="UTC"),
+    )
+    entries = [
+        "2024-01-02T12:00:00+00:00",  # asof -> 01-02 Bull
+        pd.Timestamp("2024-01-01 06:00"),  # naive, read as UTC -> Bear
+        "2023-12-31T00:00:00Z",  # before the first candle
+        None,
+        pd.Timestamp("2024-01-09", tz="America/Sao_Paulo"),  # after the last candle -> Bull
+        "2024-01-03T00:00:00+00:00",  # exact candle -> Unknown
+    ]
+
+    assert list(regime_at(regime, entries)) == ["Bull", "Bear", None, None, "Bull", "Unknown"]
+    assert segment_trades_by_regime(regime, entries, [5.0, -2.0, 9.0, 9.0, -1.0, 0.0]) == {
+        "Bull": {"count": 2, "wins": 1, "losses": 1, "pnl": 4.0},
+        "Bear": {"count": 1, "wins": 0, "losses": 1, "pnl": -2.0},
+        "Unknown": {"count": 1, "wins": 0, "losses": 0, "pnl": 0.0},
+    }
+    assert segment_trades_by_regime(regime.iloc[:0], entries, [1.0] * 6) == {}
+
+
 def test_risk_functions_cover_drawdown_duration_and_recovery_branches():
     dated = pd.Series(
         [100.0, 120.0, 90.0, 95.0, 130.0],
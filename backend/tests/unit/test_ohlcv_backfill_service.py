@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import time
 from datetime import UTC, datetime, timedelta
 
+import ccxt
+import httpx
 import pandas as pd
 from requests.exceptions import RequestException
 
@@ -194,6 +197,76 @@ def test_fetch_with_retries_supports_retry(monkeypatch):
     assert calls["count"] == 2
 
 
+def test_fetch_slot_is_released_while_backing_off(monkeypatch):
+    service = _new_service(monkeypatch)
+    service._store.record_event = lambda *args, **kwargs: None
+    monkeypatch.setattr(service, "_fetch_slots", backfill_service_module.threading.Semaphore(1))
+    slot_free_while_sleeping = []
+
+    def _sleep(_seconds):
+        free = service._fetch_slots.acquire(blocking=False)
+        slot_free_while_sleeping.append(free)
+        if free:
+            service._fetch_slots.release()
+
+    monkeypatch.setattr(backfill_service_module.time, "sleep", _sleep)
+    calls = {"count": 0}
+
+    class _Provider:
+        def fetch_ohlcv(self, **_kwargs):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise RequestException("timeout from provider")
+            return pd.DataFrame({"timestamp_utc": [datetime(2026, 1, 1, tzinfo=UTC)]})
+
+    service._fetch_with_retries(
+        provider=_Provider(),
+        symbol="BTC/USDT",
+        timeframe="1d",
+        since=datetime(2026, 1, 1, tzinfo=UTC),
+        until=datetime(2026, 1, 2, tzinfo=UTC),
+        limit=1000,
+        max_requests_per_minute=0,
+        max_retries=2,
+        job_id="job-slot",
+        timeframe_state={"retries": 0},
+    )
+
+    assert slot_free_while_sleeping == [True]
+
+
+def test_concurrent_progress_persists_keep_every_event(monkeypatch):
+    import threading
+
+    store = _FakeStore()
+    store.save_job(_default_job_state("job-events", "BTC/USDT", {}, {}, CCXT_SOURCE))
+    get_job = store.get_job
+
+    def _slow_get_job(job_id):
+        job = get_job(job_id)
+        time.sleep(0.01)  # widen the read-modify-write window
+        return job
+
+    monkeypatch.setattr(store, "get_job", _slow_get_job)
+    progress = backfill_service_module._JobProgress(
+        store, store.jobs["job-events"], persist_seconds=0
+    )
+
+    def _worker(timeframe):
+        for page in range(5):
+            progress.event({"message": f"{timeframe}-{page}"})
+            progress.persist()
+
+    threads = [threading.Thread(target=_worker, args=(tf,)) for tf in ("1d", "4h")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    messages = {event["message"] for event in store.jobs["job-events"]["events"]}
+    assert messages == {f"{tf}-{page}" for tf in ("1d", "4h") for page in range(5)}
+
+
 def test_run_timeframe_backfill_stooq_short_circuit(monkeypatch):
     service = _new_service(monkeypatch)
     service._repo = _FakeRepo()
@@ -312,11 +385,8 @@ def test_run_job_completes_and_fails(monkeypatch):
     )
 
     def _complete(job_id, timeframe, source):
-        state = service._store.get_job(job_id)["timeframe_states"][timeframe]
-        state["status"] = "completed"
-        states = service._store.get_job(job_id)["timeframe_states"]
-        states[timeframe] = state
-        service._store.update_job(job_id, timeframe_states=states)
+        progress = service._active_jobs[job_id]
+        progress.set_state(timeframe, {**progress.state(timeframe), "status": "completed"})
         return True
 
     monkeypatch.setattr(service, "_run_timeframe_backfill", _complete)
@@ -335,9 +405,8 @@ def test_run_job_completes_and_fails(monkeypatch):
     )
 
     def _fail(job_id, timeframe, source):
-        states = service._store.get_job(job_id)["timeframe_states"]
-        states[timeframe]["status"] = "failed"
-        service._store.update_job(job_id, timeframe_states=states)
+        progress = service._active_jobs[job_id]
+        progress.set_state(timeframe, {**progress.state(timeframe), "status": "failed"})
         return False
 
     monkeypatch.setattr(service, "_run_timeframe_backfill", _fail)
@@ -418,3 +487,186 @@ def test_ensure_history_job_uses_backfill_when_symbol_history_is_incomplete(monk
         history_window_years=10,
     )
     assert second is None
+
+
+def _two_timeframe_job(service, job_id: str, *, days: int = 3) -> datetime:
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    service._store.save_job(
+        _default_job_state(
+            job_id=job_id,
+            symbol="BTC/USDT",
+            timeframes_state={
+                "1d": _default_timeframe_state("1d", start.isoformat(), days),
+                "4h": _default_timeframe_state("4h", start.isoformat(), days * 6),
+            },
+            requested_window={
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=days)).isoformat(),
+            },
+            provider=CCXT_SOURCE,
+        )
+    )
+    service._store.update_job(job_id, page_size=1)
+    return start
+
+
+def test_run_job_backfills_timeframes_concurrently_and_persists_totals(monkeypatch):
+    import threading
+
+    service = _new_service(monkeypatch)
+    service._repo = _FakeRepo()
+    _two_timeframe_job(service, "job-parallel", days=2)
+    both_running = threading.Barrier(2, timeout=5)
+    seen = set()
+
+    class _Provider:
+        source = CCXT_SOURCE
+
+        def fetch_ohlcv(self, *, timeframe, since_str, **_kwargs):
+            if timeframe not in seen:
+                seen.add(timeframe)
+                both_running.wait()  # raises if the timeframes ran one after another
+            return pd.DataFrame({"timestamp_utc": [_parse_iso(since_str)], "close": [1.0]})
+
+    reads = {"count": 0}
+    get_job = service._store.get_job
+
+    def _counting_get_job(job_id):
+        reads["count"] += 1
+        return get_job(job_id)
+
+    monkeypatch.setattr(backfill_service_module, "get_market_data_provider", lambda *_: _Provider())
+    monkeypatch.setattr(service, "_resolve_job_source", lambda *_args, **_kwargs: CCXT_SOURCE)
+    monkeypatch.setattr(service._store, "get_job", _counting_get_job)
+    monkeypatch.setenv("BACKFILL_PROGRESS_PERSIST_SECONDS", "60")
+
+    service._run_job("job-parallel")
+
+    final = get_job("job-parallel")
+    assert final["status"] == "completed"
+    assert {tf: s["status"] for tf, s in final["timeframe_states"].items()} == {
+        "1d": "completed",
+        "4h": "completed",
+    }
+    assert final["written"] == service._repo.write_calls == 2 + 12
+    # Progress lives in memory: store reads scale with terminal transitions, not pages.
+    assert reads["count"] < service._repo.write_calls
+    assert "job-parallel" not in service._active_jobs
+
+
+def test_cancel_stops_running_timeframes_without_polling_the_store(monkeypatch):
+    service = _new_service(monkeypatch)
+    service._repo = _FakeRepo()
+    _two_timeframe_job(service, "job-cancel", days=30)
+    pages = {"count": 0}
+
+    class _Provider:
+        source = CCXT_SOURCE
+
+        def fetch_ohlcv(self, *, since_str, **_kwargs):
+            pages["count"] += 1
+            if pages["count"] == 3:
+                assert service.request_cancel_job("job-cancel") is True
+            return pd.DataFrame({"timestamp_utc": [_parse_iso(since_str)], "close": [1.0]})
+
+    monkeypatch.setattr(backfill_service_module, "get_market_data_provider", lambda *_: _Provider())
+    monkeypatch.setattr(service, "_resolve_job_source", lambda *_args, **_kwargs: CCXT_SOURCE)
+    monkeypatch.setattr(service, "_fetch_slots", backfill_service_module.threading.Semaphore(1))
+
+    service._run_job("job-cancel")
+
+    final = service._store.get_job("job-cancel")
+    assert final["status"] == "cancelled"
+    assert pages["count"] < 10
+    assert any("Cancelamento" in event["message"] for event in final["events"])
+
+
+def test_rate_limited_page_pauses_the_shared_budget(monkeypatch):
+    service = _new_service(monkeypatch)
+    service._store.record_event = lambda *args, **kwargs: None
+    budget = backfill_service_module.WeightBudget(weight_per_minute=6000)
+    blocked = []
+    observed = []
+    monkeypatch.setattr(budget, "block_for", blocked.append)
+    monkeypatch.setattr(budget, "observe", observed.append)
+    monkeypatch.setattr(backfill_service_module, "_request_budget", lambda _source: (budget, 2))
+
+    class _Exchange:
+        last_response_headers = {"retry-after": "7"}
+
+    class _Provider:
+        source = CCXT_SOURCE
+        loader = type("loader", (), {"exchange": _Exchange()})()
+        calls = 0
+
+        def fetch_ohlcv(self, **_kwargs):
+            _Provider.calls += 1
+            if _Provider.calls == 1:
+                raise ccxt.RateLimitExceeded("binance Too Many Requests")
+            _Exchange.last_response_headers = {"x-mbx-used-weight-1m": "1200"}
+            return pd.DataFrame({"timestamp_utc": [datetime(2026, 1, 1, tzinfo=UTC)]})
+
+    state: dict[str, int] = {"retries": 0}
+    frame = service._fetch_with_retries(
+        provider=_Provider(),
+        symbol="BTC/USDT",
+        timeframe="1d",
+        since=datetime(2026, 1, 1, tzinfo=UTC),
+        until=datetime(2026, 1, 2, tzinfo=UTC),
+        limit=1000,
+        max_requests_per_minute=0,
+        max_retries=3,
+        job_id="job-429",
+        timeframe_state=state,
+    )
+
+    assert not frame.empty
+    assert blocked == [7.0]
+    assert state["retries"] == 1
+    assert observed[-1]["X-MBX-USED-WEIGHT-1M"] == "1200"
+
+
+def test_rate_limit_is_classified_by_status_or_ccxt_type():
+    is_rate_limited = backfill_service_module._is_rate_limited
+    request = httpx.Request("GET", "https://api.binance.com/api/v3/klines")
+
+    assert is_rate_limited(ccxt.DDoSProtection("binance"))
+    assert is_rate_limited(
+        httpx.HTTPStatusError("", request=request, response=httpx.Response(418, request=request))
+    )
+    assert is_rate_limited(type("Err", (Exception,), {"status_code": 429})())
+    # Numbers in messages (prices, symbols, timestamps) are not rate limits.
+    assert not is_rate_limited(ValueError("no candles for 1000SATS/USDT since 1704294290429"))
+    assert not is_rate_limited(ccxt.BadSymbol("binance does not have market symbol 418USDT"))
+
+
+def test_run_job_aggregates_timeframes_derived_from_the_job_base(monkeypatch):
+    monkeypatch.setenv("MARKET_OHLCV_BASE_TIMEFRAME", "4h")
+    service = _new_service(monkeypatch)
+    service._repo = _FakeRepo()
+    _two_timeframe_job(service, "job-derived", days=2)
+    requested, derived = [], []
+
+    class _Provider:
+        source = CCXT_SOURCE
+
+        def fetch_ohlcv(self, *, timeframe, since_str, **_kwargs):
+            requested.append(timeframe)
+            return pd.DataFrame({"timestamp_utc": [_parse_iso(since_str)], "close": [1.0]})
+
+    def _materialize(repo, symbol, base, timeframe, source, *, since, until):
+        derived.append((symbol, base, timeframe, since, until))
+        return {"written": 2, "buckets": 2, "gapped_buckets": 0}
+
+    monkeypatch.setattr(backfill_service_module, "get_market_data_provider", lambda *_: _Provider())
+    monkeypatch.setattr(backfill_service_module, "materialize_derived_candles", _materialize)
+    monkeypatch.setattr(service, "_resolve_job_source", lambda *_args, **_kwargs: CCXT_SOURCE)
+
+    service._run_job("job-derived")
+
+    final = service._store.get_job("job-derived")
+    assert set(requested) == {"4h"}
+    assert [(base, timeframe) for _symbol, base, timeframe, *_ in derived] == [("4h", "1d")]
+    assert final["status"] == "completed"
+    assert final["timeframe_states"]["1d"]["derived_from"] == "4h"
+    assert final["timeframe_states"]["1d"]["written"] == 2
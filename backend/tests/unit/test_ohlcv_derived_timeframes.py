@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pandas as pd
+
+import app.services.ohlcv_storage as ohlcv_storage
+from app.services.market_data_providers import CCXT_SOURCE
+from app.services.ohlcv_derived_timeframes import (
+    aggregate_candles,
+    can_derive,
+    derived_base_for,
+    materialize_derived_candles,
+)
+
+START = datetime(2026, 3, 2, tzinfo=UTC)
+
+
+def _base_rows(count: int, *, start: datetime = START, step=timedelta(minutes=15)):
+    return [
+        {
+            "timestamp_utc": (start + step * idx).isoformat(),
+            "open": 100.0 + idx,
+            "high": 101.0 + idx,
+            "low": 99.0 + idx,
+            "close": 100.5 + idx,
+            "volume": 1.0,
+        }
+        for idx in range(count)
+    ]
+
+
+class _CandleRepo:
+    enabled = True
+
+    def __init__(self, base_rows=None):
+        self.rows: dict[str, dict[str, dict]] = {"15m": {}}
+        for row in base_rows or []:
+            self.rows["15m"][row["timestamp_utc"]] = row
+
+    def _times(self, timeframe):
+        return sorted(datetime.fromisoformat(ts) for ts in self.rows.get(timeframe, {}))
+
+    def get_latest_candle_time(self, _symbol, timeframe):
+        times = self._times(timeframe)
+        return times[-1] if times else None
+
+    def get_earliest_candle_time(self, _symbol, timeframe):
+        times = self._times(timeframe)
+        return times[0] if times else None
+
+    def read_candles_between(self, _symbol, timeframe, start, end):
+        return [
+            self.rows[timeframe][ts.isoformat()]
+            for ts in self._times(timeframe)
+            if start <= ts < end
+        ]
+
+    def write_candles(self, _symbol, timeframe, _source, df, return_metrics=False):
+        frame = df.reset_index() if "timestamp_utc" not in df.columns else df
+        target = self.rows.setdefault(timeframe, {})
+        for row in frame.to_dict("records"):
+            ts = pd.Timestamp(row["timestamp_utc"]).to_pydatetime().isoformat()
+            target[ts] = {**row, "timestamp_utc": ts}
+        written = len(frame)
+        return (written, 0) if return_metrics else written
+
+
+def test_buckets_are_utc_aligned_exact_and_only_closed():
+    rows = _base_rows(20, start=START + timedelta(hours=1))  # 01:00 .. 05:45
+    del rows[3]  # 01:45 missing: the 01:00 bucket is closed but gapped
+
+    hourly = aggregate_candles(
+        pd.DataFrame(rows), "15m", "1h", closed_before=START + timedelta(hours=5, minutes=30)
+    )
+    with_gaps = aggregate_candles(
+        pd.DataFrame(rows),
+        "15m",
+        "1h",
+        closed_before=START + timedelta(hours=5, minutes=30),
+        include_incomplete=True,
+    )
+    four_hour = aggregate_candles(
+        pd.DataFrame(rows), "15m", "4h", closed_before=START + timedelta(hours=8)
+    )
+
+    assert [ts.hour for ts in hourly["timestamp_utc"]] == [2, 3, 4]
+    first = hourly.iloc[0]
+    assert (first["open"], first["high"], first["low"], first["close"]) == (
+        104.0,
+        108.0,
+        103.0,
+        107.5,
+    )
+    assert list(with_gaps["base_candles"]) == [3, 4, 4, 4]
+    # 00:00-04:00 only has candles from 01:00 on and 04:00-08:00 stops at 05:45.
+    assert four_hour.empty
+    assert can_derive("15m", "4h") and not can_derive("1h", "15m")
+
+
+def test_materialize_skips_buckets_with_missing_base_candles():
+    rows = _base_rows(12)  # 00:00 .. 02:45
+    del rows[5]  # 01:15 missing
+    repo = _CandleRepo(rows)
+
+    stats = materialize_derived_candles(
+        repo, "BTC/USDT", "15m", "1h", CCXT_SOURCE, now=START + timedelta(days=1)
+    )
+
+    assert stats == {"written": 2, "buckets": 3, "gapped_buckets": 1}
+    assert sorted(repo.rows["1h"]) == [
+        START.isoformat(),
+        (START + timedelta(hours=2)).isoformat(),
+    ]
+    assert can_derive("15m", "4h") and not can_derive("1h", "15m")
+
+
+def test_materialize_resumes_from_the_latest_derived_bucket():
+    repo = _CandleRepo(_base_rows(8))  # 00:00 .. 01:45
+    now = START + timedelta(days=1)
+
+    first = materialize_derived_candles(repo, "BTC/USDT", "15m", "1h", CCXT_SOURCE, now=now)
+    assert first == {"written": 2, "buckets": 2, "gapped_buckets": 0}
+
+    for row in _base_rows(4, start=START + timedelta(hours=2)):
+        repo.rows["15m"][row["timestamp_utc"]] = row
+    second = materialize_derived_candles(repo, "BTC/USDT", "15m", "1h", CCXT_SOURCE, now=now)
+
+    # The 01:00 bucket is rebuilt, then the new 02:00 bucket is added.
+    assert second["buckets"] == 2
+    assert sorted(repo.rows["1h"]) == [
+        (START + timedelta(hours=hour)).isoformat() for hour in range(3)
+    ]
+    assert repo.rows["1h"][(START + timedelta(hours=2)).isoformat()]["close"] == 103.5
+
+
+def test_ingestion_derives_configured_timeframes_without_provider_requests(monkeypatch):
+    monkeypatch.setenv("MARKET_OHLCV_BASE_TIMEFRAME", "15m")
+    monkeypatch.setattr(ohlcv_storage.OhlcvIngestionService, "_instance", None)
+    service = ohlcv_storage.OhlcvIngestionService()
+    service._timeframes = ["15m", "1d", "1h"]
+    service._repo = _CandleRepo(_base_rows(8))
+    fetched = []
+    monkeypatch.setattr(
+        service,
+        "_fetch_provider_df",
+        lambda symbol, timeframe, source, since: fetched.append(timeframe) or pd.DataFrame(),
+    )
+
+    assert service._ordered_timeframes() == ["15m", "1d", "1h"]
+    for timeframe in service._ordered_timeframes():
+        service._ingest_symbol("BTC/USDT", timeframe)
+
+    assert fetched == ["15m"]
+    assert len(service._repo.rows["1h"]) == 2
+    assert derived_base_for("1d", service._timeframes) == "15m"
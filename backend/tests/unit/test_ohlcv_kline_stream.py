@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pandas as pd
+import websockets
+
+import app.services.ohlcv_storage as ohlcv_storage
+from app.services.ohlcv_kline_stream import (
+    KlineStreamIngestor,
+    parse_closed_kline,
+    stream_symbol,
+)
+
+
+def _kline(symbol: str, interval: str, open_ms: int, close: float, *, closed: bool = True) -> str:
+    return json.dumps(
+        {
+            "stream": f"{symbol.lower()}@kline_{interval}",
+            "data": {
+                "e": "kline",
+                "s": symbol,
+                "k": {
+                    "t": open_ms,
+                    "s": symbol,
+                    "i": interval,
+                    "o": "1.0",
+                    "h": "2.0",
+                    "l": "0.5",
+                    "c": str(close),
+                    "v": "10",
+                    "x": closed,
+                },
+            },
+        }
+    )
+
+
+def _ingestor(writes, repairs=None, **kwargs) -> KlineStreamIngestor:
+    repairs = [] if repairs is None else repairs
+
+    def _write(symbol, timeframe, frame):
+        writes.append((symbol, timeframe, frame))
+
+    return KlineStreamIngestor(
+        symbols=["BTC/USDT", "ETH/USDT"],
+        timeframes=["1m", "15m"],
+        write_candles=_write,
+        repair_gap=lambda symbol, timeframe: repairs.append((symbol, timeframe)),
+        ws_base_url="ws://unit-test",
+        **kwargs,
+    )
+
+
+def test_parse_closed_kline_ignores_open_candles_and_other_events():
+    assert parse_closed_kline(_kline("BTCUSDT", "1m", 60_000, 101.5, closed=False)) is None
+    assert parse_closed_kline(json.dumps({"e": "24hrTicker", "s": "BTCUSDT"})) is None
+    assert parse_closed_kline("not json") is None
+
+    symbol, interval, row = parse_closed_kline(_kline("BTCUSDT", "1m", 60_000, 101.5))
+    assert (symbol, interval) == ("BTCUSDT", "1m")
+    assert row["timestamp_utc"] == pd.Timestamp(60_000, unit="ms", tz="UTC")
+    assert row["close"] == 101.5 and row["volume"] == 10.0
+    assert stream_symbol("btc/usdt") == "BTCUSDT"
+    assert stream_symbol("AAPL.US") is None
+
+
+def test_ingestor_buffers_closed_candles_and_flushes_one_frame_per_series():
+    writes = []
+    ingestor = _ingestor(writes)
+    assert "btcusdt@kline_1m" in ingestor.streams and len(ingestor.streams) == 4
+
+    ingestor.handle_message(_kline("BTCUSDT", "1m", 120_000, 3.0))
+    ingestor.handle_message(_kline("BTCUSDT", "1m", 60_000, 2.0))
+    ingestor.handle_message(_kline("BTCUSDT", "1m", 60_000, 2.5))  # replayed candle
+    ingestor.handle_message(_kline("ETHUSDT", "15m", 0, 7.0))
+    ingestor.handle_message(_kline("SOLUSDT", "1m", 0, 9.0))  # not subscribed
+    assert ingestor.stats()["buffered_rows"] == 3
+
+    asyncio.run(ingestor.flush())
+
+    by_series = {(symbol, tf): frame for symbol, tf, frame in writes}
+    assert set(by_series) == {("BTC/USDT", "1m"), ("ETH/USDT", "15m")}
+    btc = by_series[("BTC/USDT", "1m")]
+    assert list(btc["close"]) == [2.5, 3.0]
+    assert list(btc.columns) == ["timestamp_utc", "open", "high", "low", "close", "volume"]
+    stats = ingestor.stats()
+    assert stats["buffered_rows"] == 0 and stats["rows_flushed"] == 3 and stats["flushes"] == 1
+
+
+def test_ingestor_keeps_rows_whose_write_failed_for_the_next_flush():
+    attempts = []
+
+    def _write(symbol, timeframe, frame):
+        attempts.append(len(frame))
+        if len(attempts) == 1:
+            raise RuntimeError("db down")
+
+    ingestor = KlineStreamIngestor(
+        symbols=["BTC/USDT"],
+        timeframes=["1m"],
+        write_candles=_write,
+        repair_gap=lambda symbol, timeframe: None,
+        ws_base_url="ws://unit-test",
+    )
+    ingestor.handle_message(_kline("BTCUSDT", "1m", 0, 1.0))
+    asyncio.run(ingestor.flush())
+    assert ingestor.stats()["write_errors"] == 1
+    assert ingestor.stats()["buffered_rows"] == 1
+
+    ingestor.handle_message(_kline("BTCUSDT", "1m", 60_000, 2.0))
+    asyncio.run(ingestor.flush())
+    assert attempts == [1, 2]
+    assert ingestor.stats()["buffered_rows"] == 0
+
+
+def test_ingestor_repairs_gaps_on_connect_then_streams_without_rest():
+    writes, repairs = [], []
+    stop = threading.Event()
+
+    async def _scenario():
+        async def _server(websocket, *args):
+            await websocket.send(_kline("BTCUSDT", "1m", 0, 1.0))
+            await websocket.send(_kline("ETHUSDT", "15m", 0, 2.0))
+            await asyncio.sleep(0.2)
+            stop.set()
+            await websocket.wait_closed()
+
+        async with websockets.serve(_server, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            ingestor = _ingestor(writes, repairs, flush_seconds=0.1)
+            ingestor._ws_base_url = f"ws://127.0.0.1:{port}"
+            await asyncio.wait_for(ingestor.run(stop), timeout=10)
+            return ingestor
+
+    ingestor = asyncio.run(_scenario())
+
+    assert sorted(repairs) == sorted(
+        [("BTC/USDT", "1m"), ("BTC/USDT", "15m"), ("ETH/USDT", "1m"), ("ETH/USDT", "15m")]
+    )
+    assert {(symbol, tf) for symbol, tf, _ in writes} == {("BTC/USDT", "1m"), ("ETH/USDT", "15m")}
+    assert ingestor.stats()["connections"] == 1
+
+
+def test_socket_is_drained_while_the_gap_repair_is_still_running():
+    writes = []
+    stop = threading.Event()
+    seen_during_repair: list[int] = []
+    holder: dict[str, KlineStreamIngestor] = {}
+
+    def _slow_repair(symbol, timeframe):
+        # A long REST repair: it only returns once the read loop has handled messages.
+        for _ in range(200):
+            if holder["ingestor"].stats()["messages"] >= 2:
+                break
+            stop.wait(0.02)
+        seen_during_repair.append(holder["ingestor"].stats()["messages"])
+
+    async def _scenario():
+        async def _server(websocket, *args):
+            await websocket.send(_kline("BTCUSDT", "1m", 0, 1.0))
+            await websocket.send(_kline("ETHUSDT", "15m", 0, 2.0))
+            await asyncio.sleep(0.3)
+            stop.set()
+            await websocket.wait_closed()
+
+        async with websockets.serve(_server, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            ingestor = _ingestor(writes, flush_seconds=0.1)
+            ingestor._repair_gap = _slow_repair
+            ingestor._ws_base_url = f"ws://127.0.0.1:{port}"
+            holder["ingestor"] = ingestor
+            await asyncio.wait_for(ingestor.run(stop), timeout=10)
+
+    asyncio.run(_scenario())
+
+    assert seen_during_repair and seen_during_repair[0] >= 2
+    assert {(symbol, tf) for symbol, tf, _ in writes} == {("BTC/USDT", "1m"), ("ETH/USDT", "15m")}
+
+
+def test_ingestion_service_streams_binance_symbols_and_polls_the_rest(monkeypatch):
+    monkeypatch.setattr(ohlcv_storage.OhlcvIngestionService, "_instance", None)
+    service = ohlcv_storage.OhlcvIngestionService()
+    service._repo._enabled = True
+    service._symbols = ["BTC/USDT", "AAPL.US"]
+    service._timeframes = ["1d"]
+    monkeypatch.setenv("MARKET_OHLCV_INGESTION_ENABLED", "1")
+    monkeypatch.setenv("MARKET_OHLCV_INGESTION_MODE", "stream")
+    monkeypatch.setattr(
+        service,
+        "_resolve_source",
+        lambda symbol, timeframe: (
+            ohlcv_storage.STOOQ_SOURCE if symbol.endswith(".US") else ohlcv_storage.CCXT_SOURCE
+        ),
+    )
+    calls = {}
+    monkeypatch.setattr(service, "_run_stream", lambda symbols: calls.setdefault("stream", symbols))
+    monkeypatch.setattr(
+        service, "_run_loop", lambda symbols=None: calls.setdefault("poll", symbols)
+    )
+
+    service.start()
+    service.stop()
+
+    assert calls == {"stream": ["BTC/USDT"], "poll": ["AAPL.US"]}
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+import app.services.onchain_service as onchain_service
+
+
+class _KeyValueRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.expiries: dict[str, int] = {}
+        self.threads: set[int] = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.expiries[key] = ex
+
+
+class _Response:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._payload
+
+
+class _CountingClient:
+    def __init__(self, payload_by_url):
+        self.payload_by_url = payload_by_url
+        self.calls: list[str] = []
+
+    async def get(self, url, **kwargs):
+        self.calls.append(url)
+        await asyncio.sleep(0.01)
+        payload = self.payload_by_url[url]
+        if isinstance(payload, Exception):
+            raise payload
+        if isinstance(payload, _Response):
+            return payload
+        return _Response(payload)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = _KeyValueRedis()
+    monkeypatch.setattr(onchain_service, "get_redis_client", lambda: client)
+    monkeypatch.setattr(onchain_service, "_cache", onchain_service._OnchainCache())
+    return client
+
+
+GITHUB_REPO_URL = "https://api.github.com/repos/org/repo"
+
+
+def _install(monkeypatch, payload_by_url) -> _CountingClient:
+    client = _CountingClient(payload_by_url)
+    monkeypatch.setattr(onchain_service, "_get_onchain_client", lambda: client)
+    return client
+
+
+def test_concurrent_chains_share_one_defillama_chains_request(redis, monkeypatch):
+    client = _install(
+        monkeypatch,
+        {
+            "https://api.llama.fi/chains": [
+                {"name": "Ethereum", "tvl": 100.0, "gecko_id": "ethereum"},
+                {"name": "Solana", "tvl": 50.0, "chain_bridge_count": 7},
+            ]
+        },
+    )
+
+    async def _scenario():
+        return await asyncio.gather(
+            onchain_service._defillama_tvl("ethereum"),
+            onchain_service._defillama_tvl("solana"),
+            onchain_service._defillama_tvl("unknown"),
+        )
+
+    assert asyncio.run(_scenario()) == [(100.0, 100.0), (50.0, 7), (None, None)]
+    assert client.calls == ["https://api.llama.fi/chains"]
+    stored = redis.values[f"{onchain_service.CACHE_KEY_PREFIX}defillama_chains"]
+    assert "gecko_id" not in stored
+
+
+def test_other_workers_reuse_the_redis_copy(redis, monkeypatch):
+    asyncio.run(onchain_service._cache.set("github_org/repo", {"stars": 3}, ttl=300))
+    assert redis.expiries["onchain:cache:github_org/repo"] == (
+        300 + onchain_service.CACHE_STALE_SECONDS
+    )
+
+    monkeypatch.setattr(onchain_service, "_cache", onchain_service._OnchainCache())
+    assert asyncio.run(onchain_service._cache_get("github_org/repo")) == {"stars": 3}
+    # Redis reads happen off the event loop thread.
+    assert threading.get_ident() not in redis.threads
+
+
+def test_failed_refresh_serves_the_expired_entry(redis, monkeypatch):
+    asyncio.run(onchain_service._cache.set("defillama_flow_ethereum", {"flow": 12.5}, ttl=-1))
+    assert asyncio.run(onchain_service._cache_get("defillama_flow_ethereum")) is None
+
+    client = _install(
+        monkeypatch, {"https://api.llama.fi/charts/ethereum": RuntimeError("HTTP 429")}
+    )
+    flow = asyncio.run(onchain_service._defillama_exchange_flow("ethereum"))
+
+    assert flow == 12.5
+    assert client.calls == ["https://api.llama.fi/charts/ethereum"]
+
+
+def test_memory_copy_is_bounded(monkeypatch):
+    monkeypatch.setattr(onchain_service, "get_redis_client", lambda: None)
+    cache = onchain_service._OnchainCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        asyncio.run(cache.set(key, {"key": key}))
+
+    assert asyncio.run(cache.get("a")) is None
+    assert asyncio.run(cache.get("c")) == {"key": "c"}
+
+
+def test_github_errors_are_not_cached(redis, monkeypatch):
+    client = _install(
+        monkeypatch,
+        {
+            GITHUB_REPO_URL: _Response({"message": "rate limited"}, status_code=403),
+            f"{GITHUB_REPO_URL}/commits": [{"sha": "a"}],
+        },
+    )
+
+    metrics = asyncio.run(onchain_service._github_metrics("org/repo"))
+
+    assert metrics == {"stars": None, "issues": None, "prs": None, "commits_30d": None}
+    assert "onchain:cache:github_org/repo" not in redis.values
+
+    client.payload_by_url[GITHUB_REPO_URL] = {"stargazers_count": 9, "open_issues_count": 2}
+    metrics = asyncio.run(onchain_service._github_metrics("org/repo"))
+
+    assert metrics == {"stars": 9, "issues": 2, "prs": None, "commits_30d": 1}
+    assert len(client.calls) == 4
+
+
+def test_invalid_cache_env_values_fall_back_to_defaults(monkeypatch):
+    monkeypatch.setenv("ONCHAIN_CACHE_MAX_ENTRIES", "lots")
+    assert onchain_service._env_int("ONCHAIN_CACHE_MAX_ENTRIES", 512) == 512
+    monkeypatch.setenv("ONCHAIN_CACHE_MAX_ENTRIES", " 64 ")
+    assert onchain_service._env_int("ONCHAIN_CACHE_MAX_ENTRIES", 512) == 64
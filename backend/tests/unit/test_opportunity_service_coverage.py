@@ -89,6 +89,16 @@ class _FakeComboStrategy:
         return df.assign(signal=0, signal_reason=pd.NA)
 
 
+def _stub_analyzer(monkeypatch, service, payload: dict) -> None:
+    """Answer both the batched entry analysis and the per-favorite exit analysis."""
+    monkeypatch.setattr(service.analyzer, "analyze", lambda *args, **kwargs: dict(payload))
+    monkeypatch.setattr(
+        service.analyzer,
+        "analyze_many",
+        lambda _compiled, last_rows: [dict(payload) for _ in last_rows],
+    )
+
+
 class _FailingProvider:
     def __init__(self):
         self.calls = 0
@@ -431,10 +441,10 @@ def test_get_opportunities_marks_curated_fallback_payload(monkeypatch, opportuni
         },
     )
     monkeypatch.setattr(opportunity_service, "ComboStrategy", _FakeComboStrategy)
-    monkeypatch.setattr(
-        service.analyzer,
-        "analyze",
-        lambda *args, **kwargs: {
+    _stub_analyzer(
+        monkeypatch,
+        service,
+        {
             "status": "NEUTRAL",
             "badge": "neutral",
             "message": "ok",
@@ -492,10 +502,10 @@ def test_get_opportunities_resolves_public_exit_from_cached_favorite_trade(
         },
     )
     monkeypatch.setattr(opportunity_service, "ComboStrategy", _FakeComboStrategy)
-    monkeypatch.setattr(
-        service.analyzer,
-        "analyze",
-        lambda *args, **kwargs: {
+    _stub_analyzer(
+        monkeypatch,
+        service,
+        {
             "status": "HOLD",
             "badge": "info",
             "message": "raw hold",
@@ -575,10 +585,10 @@ def test_get_opportunities_parallel_fetch_timeout_keeps_fast_strategies(monkeypa
         },
     )
     monkeypatch.setattr(opportunity_service, "ComboStrategy", _FakeComboStrategy)
-    monkeypatch.setattr(
-        service.analyzer,
-        "analyze",
-        lambda *args, **kwargs: {
+    _stub_analyzer(
+        monkeypatch,
+        service,
+        {
             "status": "HOLD",
             "badge": "info",
             "message": "ok",
@@ -619,10 +629,10 @@ def test_get_opportunities_ccxt_applies_continuity_fix(monkeypatch):
         },
     )
     monkeypatch.setattr(opportunity_service, "ComboStrategy", _FakeComboStrategy)
-    monkeypatch.setattr(
-        service.analyzer,
-        "analyze",
-        lambda *args, **kwargs: {
+    _stub_analyzer(
+        monkeypatch,
+        service,
+        {
             "status": "HOLD",
             "badge": "info",
             "message": "ok",
@@ -637,6 +647,56 @@ def test_get_opportunities_ccxt_applies_continuity_fix(monkeypatch):
     assert out[0]["timeframe"] == "1h"
 
 
+def test_get_opportunities_batches_entry_analysis_per_template(monkeypatch):
+    service = OpportunityService(db_path=":memory:")
+    favorites = [
+        _sample_favorite("BTC/USDT", "1h", template="trend", data_source=CCXT_SOURCE),
+        _sample_favorite("ETH/USDT", "1h", template="trend", data_source=CCXT_SOURCE),
+        _sample_favorite("SOL/USDT", "1h", template="revert", data_source=CCXT_SOURCE),
+    ]
+    for favorite_id, favorite in enumerate(favorites, start=1):
+        favorite["id"] = favorite_id
+    service.get_favorites = lambda *_args, **_kwargs: favorites
+    entry_logic = {"trend": "short > medium", "revert": "crossover(short, long)"}
+
+    monkeypatch.setattr(
+        opportunity_service, "resolve_data_source_for_symbol", lambda *_args: CCXT_SOURCE
+    )
+    monkeypatch.setattr(opportunity_service, "_is_unsupported_symbol", lambda *_args: False)
+    monkeypatch.setattr(
+        opportunity_service,
+        "get_market_data_provider",
+        lambda *_args: _MockProvider(_sample_ohlcv()),
+    )
+    monkeypatch.setattr(
+        service.combo_service,
+        "get_template_metadata",
+        lambda template_name: {
+            "indicators": [],
+            "entry_logic": entry_logic[template_name],
+            "exit_logic": "",
+            "stop_loss": 0.1,
+        },
+    )
+    monkeypatch.setattr(opportunity_service, "ComboStrategy", _FakeComboStrategy)
+    calls = []
+    analyze_many = service.analyzer.analyze_many
+
+    def _recording_analyze_many(compiled, last_rows):
+        results = analyze_many(compiled, last_rows)
+        calls.append((compiled.logic, len(last_rows)))
+        assert results == [service.analyzer.analyze(rows, compiled.logic) for rows in last_rows]
+        return results
+
+    monkeypatch.setattr(service.analyzer, "analyze_many", _recording_analyze_many)
+
+    out = service.get_opportunities("user")
+
+    assert sorted(opportunity["id"] for opportunity in out) == [1, 2, 3]
+    # One call per template: the distance and closed-candle frames of each favorite.
+    assert calls == [("short > medium", 4), ("crossover(short, long)", 2)]
+
+
 def test_filter_by_tier_all_keeps_null_tier_favorites():
     service = OpportunityService(db_path=":memory:")
     favorites = [
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import random
+
+from app.services.optimization_results import (
+    BackgroundResultWriter,
+    ChunkWatermark,
+    TopKResults,
+    result_total_pnl,
+)
+
+
+def _result(pnl: float | None, marker: int) -> dict:
+    if pnl is None:
+        return {"error": "boom", "params": {"marker": marker}}
+    return {"params": {"marker": marker}, "metrics": {"total_pnl": pnl}}
+
+
+def test_top_k_matches_stable_descending_sort_of_all_results() -> None:
+    rng = random.Random(7)
+    results = [
+        _result(None if rng.random() < 0.1 else float(rng.randint(-20, 20)), marker)
+        for marker in range(500)
+    ]
+
+    top = TopKResults(k=25)
+    for start in range(0, len(results), 50):
+        top.extend(results[start : start + 50], start)
+
+    expected = sorted(results, key=result_total_pnl, reverse=True)[:25]
+    assert top.ranked() == expected
+    assert top.ranked(limit=3) == expected[:3]
+    assert len(top) == 25
+
+
+def test_top_k_ranking_is_independent_of_chunk_completion_order() -> None:
+    results = [_result(float(marker % 7), marker) for marker in range(60)]
+    chunks = [(start, results[start : start + 10]) for start in range(0, 60, 10)]
+
+    forward = TopKResults(k=8)
+    backward = TopKResults(k=8)
+    for start, chunk in chunks:
+        forward.extend(chunk, start)
+    for start, chunk in reversed(chunks):
+        backward.extend(chunk, start)
+
+    assert forward.ranked() == backward.ranked()
+
+
+def test_pending_persistence_skips_seeded_results_and_keeps_indexes() -> None:
+    top = TopKResults(k=3)
+    top.push(_result(50.0, 0), 0, persist=False)
+    top.extend([_result(10.0, 1), _result(70.0, 2), _result(-5.0, 3)], 10)
+
+    assert top.pending_persistence() == [(10, _result(10.0, 1)), (11, _result(70.0, 2))]
+
+
+def test_background_writer_flushes_every_submitted_batch() -> None:
+    written: list[tuple[str, list]] = []
+    writer = BackgroundResultWriter(lambda job_id, rows: written.append((job_id, rows)))
+
+    writer.submit("job", [(0, {"a": 1})])
+    writer.submit("job", [(1, {"a": 2})])
+    writer.close()
+
+    assert written == [("job", [(0, {"a": 1})]), ("job", [(1, {"a": 2})])]
+
+
+def test_watermark_only_advances_over_contiguously_finished_chunks() -> None:
+    watermark = ChunkWatermark(start_index=100, chunk_size=50, total=320)
+
+    # Chunks 1 and 3 finish first: nothing below them is safe to skip yet.
+    assert watermark.complete(1) == 100
+    assert watermark.complete(3) == 100
+    assert watermark.complete(0) == 200
+    assert watermark.complete(2) == 300
+    assert watermark.complete(4) == 320  # clamped to the last combination
+
+
+def test_pending_persistence_below_watermark_hands_each_result_out_once() -> None:
+    top = TopKResults(k=4)
+    top.extend([_result(10.0, 0), _result(30.0, 1)], 0)
+    top.extend([_result(20.0, 2), _result(40.0, 3)], 50)
+
+    assert top.pending_persistence(below=50) == [(0, _result(10.0, 0)), (1, _result(30.0, 1))]
+    assert top.pending_persistence(below=50) == []
+    assert top.pending_persistence() == [(50, _result(20.0, 2)), (51, _result(40.0, 3))]
+    assert top.ranked() == [_result(v, m) for v, m in ((40.0, 3), (30.0, 1), (20.0, 2), (10.0, 0))]
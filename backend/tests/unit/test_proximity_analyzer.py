@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import math
+
+import pandas as pd
+
+from app.strategies.combos.proximity_analyzer import ProximityAnalyzer, compile_logic
+
+ENTRY = "crossover(short, medium) and crossover(short, long)"
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["short", "medium", "long", "close"])
+
+
+def test_compiled_logic_is_cached_per_expression():
+    compile_logic.cache_clear()
+    first = compile_logic(ENTRY)
+
+    assert compile_logic(ENTRY) is first
+    assert compile_logic.cache_info().hits == 1
+    assert list(first.comparisons) == [
+        ("short", "CROSS_UP", "medium"),
+        ("short", "CROSS_UP", "long"),
+    ]
+    assert compile_logic("short >").error is not None
+
+
+def test_analyze_many_matches_analyze_frame_by_frame():
+    analyzer = ProximityAnalyzer()
+    frames = [
+        _frame([[97.0, 99.0, 100.0, 98.0], [98.0, 99.0, 100.0, 98.5]]),  # near both crosses
+        _frame([[90.0, 99.0, 100.0, 98.0], [99.5, 99.0, 100.0, 99.0]]),  # crossed medium only
+        _frame([[90.0, 99.0, 100.0, 98.0], [101.0, 99.0, 100.0, 101.0]]),  # signal
+        _frame([[98.0, 99.0, 100.0, 98.0]]),  # no previous candle
+        _frame([]),
+    ]
+
+    batched = analyzer.analyze_many(compile_logic(ENTRY), frames)
+
+    assert batched == [analyzer.analyze(frame, ENTRY) for frame in frames]
+    assert [result["status"] for result in batched[:3]] == ["NEUTRAL", "NEAR", "SIGNAL"]
+    assert batched[0]["distance"] == round(2 / 98 * 100, 2)  # distance to the slower long crossover
+    assert batched[1]["message"] == "Approaching short: 99.5000 crossing UP long: 100.0000"
+
+    # Only the last two candles are read, so a tail gives the full frame's result.
+    history = _frame([[80.0, 99.0, 100.0, 90.0], *frames[1].values.tolist()])
+    assert analyzer.analyze_many(compile_logic(ENTRY), [history.tail(2)]) == [
+        analyzer.analyze(history, ENTRY)
+    ]
+
+    # Rows with missing operands keep the row-by-row path.
+    gap = _frame([[98.0, 99.0, 100.0, 98.0], [math.nan, 99.0, 100.0, 98.0]])
+    assert (
+        analyzer.analyze_many(compile_logic(ENTRY), [gap])[0]["message"]
+        == analyzer.analyze(gap, ENTRY)["message"]
+    )
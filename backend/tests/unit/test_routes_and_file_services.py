@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import io
 import json
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,6 +13,7 @@ import app.globals as app_globals
 import app.routes.logs as logs_route
 import app.routes.market as market_route
 import app.routes.openspec as openspec_route
+import app.services.binance_http as binance_http
 import app.services.binance_trades as binance_trades
 import app.services.coordination_comments_service as coordination_comments_service
 
@@ -319,20 +319,17 @@ def test_binance_trades_helpers_and_trade_filters(monkeypatch):
 
     captured_request: dict[str, object] = {}
 
-    class JsonResponse(io.StringIO):
-        def __enter__(self):
-            return self
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured_request["url"] = str(request.url)
+        captured_request["headers"] = dict(request.headers)
+        captured_request["timeout"] = request.extensions["timeout"]["read"]
+        return httpx.Response(200, json={"ok": True})
 
-    def fake_urlopen(req, timeout):
-        captured_request["url"] = req.full_url
-        captured_request["headers"] = dict(req.header_items())
-        captured_request["timeout"] = timeout
-        return JsonResponse('{"ok": true}')
-
-    monkeypatch.setattr(binance_trades.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(
+        binance_http,
+        "_GATEWAY",
+        binance_http.BinanceGateway(transport=httpx.MockTransport(handler), http2=False),
+    )
     signed = binance_trades._signed_get(
         "key",
         "secret",
@@ -343,7 +340,7 @@ def test_binance_trades_helpers_and_trade_filters(monkeypatch):
     )
     assert signed == {"ok": True}
     assert "signature=" in str(captured_request["url"])
-    assert dict(captured_request["headers"]).get("X-mbx-apikey") == "key"
+    assert dict(captured_request["headers"]).get("x-mbx-apikey") == "key"
     assert captured_request["timeout"] == 9.0
 
     monkeypatch.delenv("BINANCE_API_KEY", raising=False)
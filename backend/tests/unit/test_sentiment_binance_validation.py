@@ -15,6 +15,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.workflow_database import WorkflowBase
 from app.workflow_models import Change, Project, WorkItem, WorkItemState, WorkItemType
+import app.services.binance_http as binance_http
 import app.services.binance_spot as binance_spot
 import app.services.sentiment_service as sentiment_service
 import app.services.workflow_validation_service as workflow_validation_service
@@ -183,20 +184,17 @@ def test_binance_spot_helpers_signed_get_and_snapshot_filters(monkeypatch):
 
     captured_request: dict[str, object] = {}
 
-    class JsonResponse(io.StringIO):
-        def __enter__(self):
-            return self
-
-        def __exit__(self, exc_type, exc, tb):
-            return False
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured_request["url"] = str(request.url)
+        captured_request["headers"] = dict(request.headers)
+        captured_request["timeout"] = request.extensions["timeout"]["read"]
+        return httpx.Response(200, json={"ok": True})
 
-    def fake_urlopen(req, timeout):
-        captured_request["url"] = req.full_url
-        captured_request["headers"] = dict(req.header_items())
-        captured_request["timeout"] = timeout
-        return JsonResponse('{"ok": true}')
-
-    monkeypatch.setattr(binance_spot.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(
+        binance_http,
+        "_GATEWAY",
+        binance_http.BinanceGateway(transport=httpx.MockTransport(handler), http2=False),
+    )
 
     signed = binance_spot._signed_get(
         "https://example.invalid",
@@ -208,7 +206,7 @@ def test_binance_spot_helpers_signed_get_and_snapshot_filters(monkeypatch):
     )
     assert signed == {"ok": True}
     assert "signature=" in str(captured_request["url"])
-    assert dict(captured_request["headers"]).get("X-mbx-apikey") == "key"
+    assert dict(captured_request["headers"]).get("x-mbx-apikey") == "key"
     assert captured_request["timeout"] == 9.0
 
     monkeypatch.delenv("BINANCE_API_KEY", raising=False)
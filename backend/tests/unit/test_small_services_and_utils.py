@@ -5,6 +5,7 @@ from datetime import datetime
 from types import SimpleNamespace
 from unittest.mock import Mock
 
+import httpx
 import pandas as pd
 import pytest
 from sqlalchemy import create_engine
@@ -12,7 +13,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.database import Base
 from app.models import AutoBacktestRun, FavoriteStrategy, SystemPreference
-from app.services import binance_prices, change_tasks_service, preset_service, upstream_guard
+from app.services import binance_http, change_tasks_service, preset_service, upstream_guard
 from app.services.binance_prices import compute_usdt_price_for_asset, fetch_all_binance_prices
 from app.services.favorite_backtest_refresh_service import FavoriteBacktestRefreshService
 from app.services.change_tasks_service import (
@@ -183,17 +184,15 @@ def test_fetch_all_binance_prices_ignores_bad_rows(monkeypatch):
         {"symbol": "", "price": "1.0"},
     ]
 
-    class _Response:
-        def __enter__(self):
-            return self
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/v3/ticker/price"
+        return httpx.Response(200, json=payload)
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-        def read(self):
-            return json.dumps(payload).encode("utf-8")
-
-    monkeypatch.setattr(binance_prices.urllib.request, "urlopen", lambda *_a, **_k: _Response())
+    monkeypatch.setattr(
+        binance_http,
+        "_GATEWAY",
+        binance_http.BinanceGateway(transport=httpx.MockTransport(handler), http2=False),
+    )
     monkeypatch.setenv("BINANCE_BASE_URL", "https://example.invalid")
 
     assert fetch_all_binance_prices() == {"BTCUSDT": 64000.0}
@@ -0,0 +1,229 @@
+"""Parity tests: vectorized trade metrics vs. the original per-trade loops."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.metrics.performance import calculate_cagr
+from app.metrics.trade_arrays import (
+    TradeArray,
+    as_trade_array,
+    entry_times_to_ns,
+    metrics_from_returns,
+)
+from app.services.combo_optimizer import (
+    _enrich_ranking_metrics,
+    _metrics_from_trades,
+    extract_trade_array_from_signals,
+    extract_trades_from_signals,
+)
+
+
+def _legacy_metrics_from_trades(trades: list, initial_capital: float = 100) -> dict:
+    """Loop implementation that _metrics_from_trades used before vectorization."""
+    out = metrics_from_returns(np.array([]))
+    if not trades:
+        return out
+
+    def _ts(t):
+        et = t.get("entry_time")
+        if et is None:
+            return 0
+        try:
+            return pd.Timestamp(et).timestamp()
+        except Exception:
+            return 0
+
+    returns = [float(t["profit"]) for t in sorted(trades, key=_ts) if t.get("profit") is not None]
+    n = len(returns)
+    if n == 0:
+        out["total_trades"] = len(trades)
+        return out
+
+    out["total_trades"] = n
+    out["win_rate"] = sum(1 for r in returns if r > 0) / n
+    cap = float(initial_capital)
+    equity_curve = [cap]
+    for r in returns:
+        cap *= 1.0 + r
+        equity_curve.append(cap)
+    out["total_return_pct"] = (cap / initial_capital - 1) * 100.0
+    out["total_return"] = out["total_return_pct"] / 100.0
+    arr = np.array(returns, dtype=float)
+    out["avg_profit"] = float(np.mean(arr))
+    std_dev = float(np.std(arr))
+    out["sharpe_ratio"] = float(np.mean(arr) / std_dev) if std_dev > 0 else 0.0
+    neg = arr[arr < 0]
+    out["neg_return_count"] = int(len(neg))
+    if len(neg) < 2:
+        out["sortino_ratio"], out["downside_deviation"], out["sortino_status"] = (
+            None,
+            0.0,
+            "degenerate",
+        )
+    else:
+        down_std = float(np.std(neg))
+        out["downside_deviation"] = down_std
+        if down_std < 1e-9:
+            out["sortino_ratio"], out["sortino_status"] = None, "degenerate"
+        else:
+            out["sortino_ratio"], out["sortino_status"] = float(np.mean(arr) / down_std), "ok"
+    cap2 = float(initial_capital)
+    gross_profit, gross_loss = 0.0, 0.0
+    for r in returns:
+        if r > 0:
+            gross_profit += cap2 * r
+        else:
+            gross_loss += abs(cap2 * r)
+        cap2 *= 1.0 + r
+    out["profit_factor"] = (
+        gross_profit / gross_loss if gross_loss > 0 else (999.0 if gross_profit > 0 else 0.0)
+    )
+    out["max_loss"] = float(np.min(arr))
+    mean_r = float(np.mean(arr))
+    out["expectancy"], out["expectancy_pct"], out["expectancy_usd_10k"] = (
+        mean_r,
+        mean_r * 100.0,
+        mean_r * 10000.0,
+    )
+    streak = max_streak = 0
+    for r in returns:
+        streak = streak + 1 if r < 0 else 0
+        max_streak = max(max_streak, streak)
+    out["max_consecutive_losses"] = max_streak
+    peak, max_dd = float(initial_capital), 0.0
+    for eq in equity_curve:
+        peak = max(peak, eq)
+        max_dd = max(max_dd, (peak - eq) / peak if peak > 0 else 0)
+    out["max_drawdown"] = float(max_dd)
+    out["max_drawdown_pct"] = float(max_dd) * 100.0
+    return out
+
+
+def _random_trades(rng: random.Random, count: int) -> list[dict]:
+    base = pd.Timestamp("2020-01-01", tz="UTC")
+    trades = []
+    for _ in range(count):
+        entry = base + pd.Timedelta(hours=rng.randint(0, 40_000))
+        trades.append(
+            {
+                "entry_time": rng.choice(
+                    [entry.isoformat(), entry.tz_localize(None).isoformat(), entry]
+                ),
+                "profit": None if rng.random() < 0.05 else rng.uniform(-0.2, 0.3),
+            }
+        )
+    return trades
+
+
+def _assert_same_metrics(actual: dict, expected: dict) -> None:
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+        else:
+            assert actual[key] == value, key
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_metrics_from_trades_matches_legacy_loops(seed: int) -> None:
+    rng = random.Random(seed)
+    trades = _random_trades(rng, rng.randint(1, 300))
+
+    _assert_same_metrics(
+        _metrics_from_trades(trades, 250.0), _legacy_metrics_from_trades(trades, 250.0)
+    )
+
+
+def test_metrics_edge_cases_match_legacy() -> None:
+    cases = [
+        [],
+        [{"entry_time": None, "profit": None}],
+        [{"entry_time": "not-a-date", "profit": 0.1}, {"entry_time": None, "profit": -0.1}],
+        [{"entry_time": "2024-01-01T00:00:00", "profit": 0.0}] * 3,
+        [{"entry_time": "2024-01-01T00:00:00", "profit": -0.3}] * 4,
+    ]
+    for trades in cases:
+        _assert_same_metrics(_metrics_from_trades(trades), _legacy_metrics_from_trades(trades))
+
+
+def test_metrics_from_returns_accepts_int64_entry_times() -> None:
+    trades = _random_trades(random.Random(99), 50)
+    trades = [t for t in trades if t["profit"] is not None]
+    returns = np.array([t["profit"] for t in trades])
+    entry_ns = entry_times_to_ns(t["entry_time"] for t in trades)
+
+    assert entry_ns.dtype == np.int64
+    _assert_same_metrics(
+        metrics_from_returns(returns, entry_ns), _legacy_metrics_from_trades(trades)
+    )
+
+
+def test_enrich_ranking_cagr_matches_legacy_concat_curve() -> None:
+    rng = random.Random(3)
+    trades = [
+        {
+            "entry_time": (
+                pd.Timestamp("2020-01-01", tz="UTC") + pd.Timedelta(days=rng.randint(0, 900))
+            ).isoformat(),
+            "profit": rng.choice([None, rng.uniform(-0.2, 0.3)]),
+        }
+        for _ in range(40)
+    ]
+    close = pd.Series(
+        np.linspace(100.0, 180.0, 200), index=pd.date_range("2020-01-01", periods=200, tz="UTC")
+    )
+    metrics: dict = {"max_drawdown": 0.2}
+
+    _enrich_ranking_metrics(trades, close, metrics)
+
+    equity = pd.Series([100.0])
+    cap = 100.0
+    for trade in sorted(trades, key=lambda t: pd.Timestamp(t.get("entry_time") or 0)):
+        cap *= 1.0 + float(trade.get("profit") or 0.0)
+        equity = pd.concat([equity, pd.Series([cap])])
+    assert metrics["cagr"] == pytest.approx(calculate_cagr(equity), rel=1e-12)
+
+
+def _signal_frame() -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=8, freq="D", tz="UTC")
+    return pd.DataFrame(
+        {
+            "open": [100.0, 101.0, 102.0, 95.0, 99.0, 100.0, 104.0, 110.0],
+            "high": [101.0, 103.0, 104.0, 99.0, 101.0, 106.0, 112.0, 111.0],
+            "low": [99.0, 100.0, 90.0, 94.0, 98.0, 99.0, 103.0, 108.0],
+            "close": [100.5, 102.0, 96.0, 98.0, 100.0, 104.0, 110.0, 109.0],
+            "signal": [0, 1, 0, 0, 1, 0, -1, 0],
+        },
+        index=index,
+    )
+
+
+def test_extract_trades_from_signals_builds_api_dicts_from_columns() -> None:
+    trades = extract_trades_from_signals(_signal_frame(), stop_loss=0.05)
+
+    assert [t["exit_reason"] for t in trades] == ["stop_loss", "signal"]
+    assert trades[0]["entry_time"] == "2024-01-02T00:00:00+00:00"
+    assert trades[0]["exit_price"] == pytest.approx(101.0 * 0.95)
+    assert trades[0]["signal_type"] == "Stop"
+    assert trades[1]["exit_time"] == "2024-01-07T00:00:00+00:00"
+    fee = 0.00075
+    assert trades[1]["profit"] == pytest.approx(
+        (104.0 * (1 - fee) - 99.0 * (1 + fee)) / (99.0 * (1 + fee))
+    )
+
+
+def test_trade_array_round_trips_through_dicts_and_feeds_metrics() -> None:
+    array = extract_trade_array_from_signals(_signal_frame(), stop_loss=0.05, direction="short")
+    dicts = array.to_dicts()
+
+    rebuilt = as_trade_array(dicts)
+    assert isinstance(rebuilt, TradeArray)
+    assert rebuilt.to_dicts() == dicts
+    assert as_trade_array(array) is array
+    _assert_same_metrics(_metrics_from_trades(array), _metrics_from_trades(dicts))
+    assert len(array.select(array.profit > 0)) == sum(1 for t in dicts if t["profit"] > 0)
@@ -311,3 +311,35 @@ def test_serialized_candles_preserve_price_only_exit_evidence():
     assert explained["status"] == "available"
     assert explained["decision_candle_time"] == candles[-2]["timestamp_utc"]
     assert any(item["key"] == "close" for item in explained["evidence"])
+
+
+def test_series_are_indexed_once_per_request_not_per_trade(monkeypatch):
+    import app.services.trade_explanations as trade_explanations
+
+    manifest = _manifest()
+    # Out-of-order points are fine: the index sorts them once.
+    manifest.market_series["close"] = list(reversed(manifest.market_series["close"]))
+    parse_calls = []
+    parse = trade_explanations._parse_timestamp
+    monkeypatch.setattr(
+        trade_explanations,
+        "_parse_timestamp",
+        lambda value: parse_calls.append(value) or parse(value),
+    )
+    trade = {
+        "entry_time": "2026-07-12T00:00:00+00:00",
+        "entry_price": 103.0,
+        "exit_time": "2026-07-14T00:00:00+00:00",
+        "exit_price": 102.0,
+        "exit_reason": "exit_logic",
+    }
+
+    explained = explain_trades([trade] * 50, manifest, direction="long", timeframe="1d")
+
+    assert {item["entry_explanation"]["decision_candle_time"] for item in explained} == {
+        "2026-07-11T00:00:00+00:00"
+    }
+    series_points = sum(len(points) for points in manifest.market_series.values()) + sum(
+        len(indicator.series) for indicator in manifest.indicators
+    )
+    assert len(parse_calls) <= series_points + 50 * 6
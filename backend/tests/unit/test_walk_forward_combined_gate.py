@@ -9,6 +9,7 @@ from app.metrics.criteria import (
     OOS_CRITERIA,
     evaluate_go_nogo,
     evaluate_walk_forward,
+    evaluate_walk_forward_folds,
 )
 
 
@@ -135,6 +136,18 @@ class TestWalkForwardGate:
         assert not any("retenção" in r for r in result.reasons)
         assert any("Treino (IS)" in r for r in result.reasons)
 
+    def test_multi_fold_requires_half_of_the_folds_go(self):
+        passing = evaluate_walk_forward_folds(
+            _metrics(sharpe=1.0), _oos_metrics(), ["GO", "NO-GO", "GO", "NO-GO"]
+        )
+        assert passing.status == "GO"
+
+        result = evaluate_walk_forward_folds(
+            _metrics(sharpe=1.0), _oos_metrics(), ["GO", "NO-GO", "NO-GO", "NO-GO", "GO"]
+        )
+        assert result.status == "NO-GO"
+        assert result.reasons == ["Folds — NO-GO: 2/5 folds aprovados isoladamente (mínimo 3)."]
+
 
 class TestMessages:
     def test_reasons_ordered_is_then_oos_then_consistency(self):
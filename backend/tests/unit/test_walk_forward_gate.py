@@ -159,7 +159,7 @@ class TestRevalidateAllFavorites:
             def close(self):
                 pass
 
-        def fake_revalidate(row, db=None):
+        def fake_revalidate(row, db=None, **_kwargs):
             return {
                 "favorite_id": row.id,
                 "symbol": row.symbol,
@@ -204,7 +204,7 @@ class TestRevalidateAllFavorites:
             def close(self):
                 pass
 
-        def fake_revalidate(row, db=None):
+        def fake_revalidate(row, db=None, **_kwargs):
             if row.id == 1:
                 raise RuntimeError("boom")
             return {"favorite_id": row.id, "symbol": row.symbol, "verdict": "GO"}
@@ -251,7 +251,7 @@ class TestRevalidateAllFavorites:
         monkeypatch.setattr(
             wfr,
             "revalidate_favorite",
-            lambda row, db=None: {
+            lambda row, db=None, **_kwargs: {
                 "favorite_id": row.id,
                 "symbol": row.symbol,
                 "verdict": "GO",
@@ -261,6 +261,74 @@ class TestRevalidateAllFavorites:
         summary = wfr.revalidate_all_favorites(max_favorites=2)
         assert summary["total"] == 2
 
+    def test_revalidate_all_shares_data_per_symbol_timeframe(self, monkeypatch):
+        from app.services import walk_forward_revalidation as wfr
+
+        class FakeRow:
+            def __init__(self, fid, symbol, stop_loss):
+                self.id = fid
+                self.symbol = symbol
+                self.timeframe = "1d"
+                self.strategy_name = "multi_ma_crossover"
+                self.parameters = {"direction": "long", "stop_loss": stop_loss}
+                self.metrics = {}
+
+        rows = [
+            FakeRow(1, "ETH/USDT", 0.02),
+            FakeRow(2, "BTC/USDT", 0.02),
+            FakeRow(3, "BTC/USDT", 0.03),
+            FakeRow(4, "BTC/USDT", 0.02),
+        ]
+        stored = FakeRow(0, "", 0.0)
+
+        class FakeSession:
+            def __init__(self, *a, **k):
+                pass
+
+            def query(self, model):
+                return self
+
+            def filter(self, *args, **kwargs):
+                return self
+
+            def order_by(self, *_a):
+                return self
+
+            def all(self):
+                return rows
+
+            def first(self):
+                return stored
+
+            def commit(self):
+                pass
+
+            def close(self):
+                pass
+
+        loads, evaluations = [], []
+
+        class FakeOptimizer:
+            def load_walk_forward_data(self, symbol, timeframe, **_kwargs):
+                loads.append((symbol, timeframe))
+                return symbol
+
+            def evaluate_fixed_parameters(self, template_name, parameters, data, **_kwargs):
+                evaluations.append((data, parameters["stop_loss"]))
+                status = "GO" if parameters["stop_loss"] == 0.02 else "NO-GO"
+                return {"best_metrics": {}, "oos_metrics": {}, "oos_verdict": {"status": status}}
+
+        monkeypatch.setattr(wfr, "SessionLocal", FakeSession)
+        monkeypatch.setattr(wfr, "ComboOptimizer", FakeOptimizer)
+
+        summary = wfr.revalidate_all_favorites()
+
+        assert loads == [("BTC/USDT", "1d"), ("ETH/USDT", "1d")]
+        assert evaluations == [("BTC/USDT", 0.02), ("BTC/USDT", 0.03), ("ETH/USDT", 0.02)]
+        assert [item["favorite_id"] for item in summary["results"]] == [1, 2, 3, 4]
+        assert [item["verdict"] for item in summary["results"]] == ["GO", "GO", "NO-GO", "GO"]
+        assert (summary["go"], summary["no_go"]) == (3, 1)
+
 
 class TestRevalidateFavoriteErrors:
     def test_revalidate_favorite_rolls_back_when_row_missing(self, monkeypatch):
@@ -298,7 +366,10 @@ class TestRevalidateFavoriteErrors:
                 pass
 
         class FakeOptimizer:
-            def run_optimization(self, **_kwargs):
+            def load_walk_forward_data(self, *_args, **_kwargs):
+                return object()
+
+            def evaluate_fixed_parameters(self, *_args, **_kwargs):
                 return {
                     "best_metrics": {},
                     "oos_metrics": {},
@@ -345,7 +416,7 @@ class TestRevalidateFavoriteErrors:
         monkeypatch.setattr(
             wfr,
             "revalidate_favorite",
-            lambda row, db=None: {
+            lambda row, db=None, **_kwargs: {
                 "favorite_id": row.id,
                 "symbol": row.symbol,
                 "verdict": "GO",